@@ -1,12 +1,14 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Union
-import requests
 import pandas as pd
 from datetime import datetime, timezone, timedelta
 from ..core.models import RequestSpec, CORE_COLUMNS
 from ..core.utils_geo import centroid_from_geometry
 from ..core.ids import compute_observation_id
+from ..core.planner import AdapterLimits
+from ..core.utils_http import get_http_client
+from ..core.deadline import request_context
 
 class BaseAdapter(ABC):
     DATASET: str = "BASE"
@@ -16,6 +18,9 @@ class BaseAdapter(ABC):
     REQUIRES_API_KEY: bool = False
     SERVICE_TYPE: str = "service"  # "service" or "meta" for meta-services like Earth Engine
 
+    # Upstream per-call limits; core.planner.QueryPlanner splits larger requests
+    LIMITS: AdapterLimits = AdapterLimits()
+
     # Filter capabilities - adapters override to declare supported filters
     SUPPORTED_FILTERS = {
         "domain": List[str],
@@ -27,9 +32,8 @@ class BaseAdapter(ABC):
 
     def __init__(self):
         self._router_ref = None
-        # Shared session with a friendly UA
-        self._session = requests.Session()
-        self._session.headers.update({"User-Agent": f"env-agents/{self.DATASET}"})
+        # Own headers (auth, UA), connection pools shared with every other adapter
+        self._session = get_http_client().new_session(f"env-agents/{self.DATASET}")
 
     @abstractmethod
     def capabilities(self, asset_id: str = None, extra: dict | None = None) -> dict:
@@ -47,6 +51,16 @@ class BaseAdapter(ABC):
     def _fetch_rows(self, spec: RequestSpec) -> List[Dict[str, Any]]:
         """Return list of dict rows matching core schema keys."""
         ...
+
+    def _fetch_frame(self, spec: RequestSpec) -> pd.DataFrame | None:
+        """
+        Columnar alternative to _fetch_rows.
+
+        Adapters that produce large, array-shaped results (e.g. raster pixels)
+        override this to return a DataFrame with core schema columns directly,
+        so no per-row dicts are built. Returns None when not supported.
+        """
+        return None
     
     def discover(self, 
                  query: str = None,
@@ -461,8 +475,13 @@ class BaseAdapter(ABC):
         }
 
     def fetch(self, spec: RequestSpec) -> pd.DataFrame:
-        rows = self._fetch_rows(spec)
-        df = pd.DataFrame(rows)
+        # Retries inside the adapter draw on this service's budget, within any enclosing deadline
+        with request_context(service=self.DATASET):
+            df = self._fetch_frame(spec)
+            if df is None:
+                df = pd.DataFrame(self._fetch_rows(spec))
+            else:
+                df = df.reset_index(drop=True)
     
         # Defaults
         if "dataset" not in df.columns:         df["dataset"] = self.DATASET
@@ -0,0 +1,88 @@
+"""
+Earth Engine asset introspection cache
+
+Asset type, band names and date extents rarely change, yet probing them costs
+a getInfo() round-trip each. This cache keeps them in memory for the process
+and on disk (via ServiceCache) across processes, with a TTL per kind of entry
+so they are refreshed lazily. Per-region extents are kept in memory only:
+there is one per requested bbox, and ServiceCache rewrites its whole file on
+every write.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from ...core.cache import ServiceCache
+
+
+class AssetIntrospectionCache:
+    """Two-level (memory + disk) cache of Earth Engine asset introspection results"""
+
+    # TTL in seconds per kind of entry
+    TTLS = {
+        "asset_type": 30 * 86400,    # Image vs ImageCollection never changes in practice
+        "bands": 30 * 86400,
+        "date_extent": 86400,        # Collections grow - refresh daily
+        "region_extent": 7 * 86400,  # Date extent of a collection within a region
+    }
+
+    # ServiceCache file each kind is persisted to (None = memory only)
+    CACHE_TYPES = {
+        "asset_type": "metadata",
+        "bands": "metadata",
+        "date_extent": "metadata",
+        "region_extent": None,
+    }
+
+    def __init__(self, service_cache: Optional[ServiceCache] = None):
+        """
+        Args:
+            service_cache: Disk cache to persist entries to (None = memory only)
+        """
+        self.service_cache = service_cache
+        self._memory: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, key: str) -> Optional[Any]:
+        """Return a cached value, or None if missing or expired"""
+        cache_key = f"{kind}:{key}"
+
+        with self._lock:
+            entry = self._memory.get(cache_key)
+        if entry is not None:
+            value, expires_at = entry
+            if time.time() < expires_at:
+                return value
+
+        if self.service_cache is None or self.CACHE_TYPES[kind] is None:
+            return None
+
+        value = self.service_cache.get(cache_key, self.CACHE_TYPES[kind])
+        if value is not None:
+            # ServiceCache doesn't expose the remaining TTL; re-check memory after a full TTL
+            with self._lock:
+                self._memory[cache_key] = (value, time.time() + self.TTLS[kind])
+        return value
+
+    def set(self, kind: str, key: str, value: Any) -> None:
+        """Store a value in memory and, for persisted kinds, on disk"""
+        cache_key = f"{kind}:{key}"
+        ttl = self.TTLS[kind]
+
+        with self._lock:
+            self._memory[cache_key] = (value, time.time() + ttl)
+
+        if self.service_cache is not None and self.CACHE_TYPES[kind] is not None:
+            self.service_cache.set(cache_key, value, self.CACHE_TYPES[kind], ttl)
+
+    def get_or_fetch(self, kind: str, key: str, fetch_func: Callable[[], Any]) -> Any:
+        """Return a cached value or fetch, cache and return it (None results are not cached)"""
+        value = self.get(kind, key)
+        if value is not None:
+            return value
+
+        value = fetch_func()
+        if value is not None:
+            self.set(kind, key, value)
+        return value
@@ -0,0 +1,161 @@
+"""
+Managed Earth Engine executor
+
+Blocking getInfo() calls cannot be interrupted, so timing one out means
+abandoning it while it keeps running. A fresh daemon thread per call lets
+abandoned calls pile up without bound. This executor owns every outstanding
+EE request on a fixed worker pool instead: deadlines are enforced by the
+caller, abandoned calls are counted while they drain, and new work is refused
+while too many of them are still occupying workers.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TimeoutError(Exception):
+    """Raised when Earth Engine query times out"""
+    pass
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when too many timed-out Earth Engine calls are still draining"""
+    pass
+
+
+class EarthEngineExecutor:
+    """Bounded worker pool that owns every outstanding Earth Engine request"""
+
+    def __init__(self, max_workers: int = 4, max_draining: Optional[int] = None):
+        """
+        Args:
+            max_workers: Maximum concurrent Earth Engine calls
+            max_draining: Refuse new work while this many abandoned calls are
+                still running (default: max_workers, i.e. every worker stuck)
+        """
+        self.max_workers = max_workers
+        self.max_draining = max_draining if max_draining is not None else max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ee-worker")
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self._in_flight = 0
+        self._draining = 0
+        self._completed = 0
+        self._failed = 0
+        self._timed_out = 0
+        self._rejected = 0
+
+    def run(self, func: Callable[..., Any], args=(), kwargs=None, timeout_sec: float = 60) -> Any:
+        """
+        Run func on the pool and wait at most timeout_sec for its result
+
+        Raises:
+            TimeoutError: The call missed its deadline (it keeps draining on its worker)
+            ExecutorSaturatedError: Too many abandoned calls are still draining
+        """
+        if kwargs is None:
+            kwargs = {}
+
+        # Nested call from a worker (e.g. a metadata lookup inside a query):
+        # run inline rather than wait on a pool that may be full of our callers
+        if getattr(self._local, "in_worker", False):
+            return func(*args, **kwargs)
+
+        with self._lock:
+            if self._draining >= self.max_draining:
+                self._rejected += 1
+                raise ExecutorSaturatedError(
+                    f"Earth Engine executor saturated: {self._draining} timed-out calls still draining"
+                )
+            self._in_flight += 1
+
+        future = self._pool.submit(self._call, func, args, kwargs)
+
+        try:
+            return future.result(timeout=timeout_sec)
+        except FuturesTimeoutError:
+            with self._lock:
+                self._timed_out += 1
+            if future.cancel():
+                # Never started - nothing left running
+                with self._lock:
+                    self._in_flight -= 1
+            else:
+                with self._lock:
+                    self._draining += 1
+                future.add_done_callback(self._drained)
+                logger.debug(f"Abandoned Earth Engine call after {timeout_sec}s; {self._draining} draining")
+            raise TimeoutError(f"Earth Engine query exceeded {timeout_sec}s timeout")
+
+    def _call(self, func: Callable[..., Any], args, kwargs) -> Any:
+        self._local.in_worker = True
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self._failed += 1
+            raise
+        else:
+            with self._lock:
+                self._completed += 1
+            return result
+        finally:
+            self._local.in_worker = False
+            with self._lock:
+                self._in_flight -= 1
+
+    def _drained(self, future) -> None:
+        with self._lock:
+            self._draining -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Gauges and counters for monitoring"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "in_flight": self._in_flight,
+                "draining": self._draining,
+                "completed": self._completed,
+                "failed": self._failed,
+                "timed_out": self._timed_out,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+# Module-level executor shared by every Earth Engine adapter in the process
+_EXECUTOR: Optional[EarthEngineExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_ee_executor() -> EarthEngineExecutor:
+    """Return the process-wide executor, sized from earth_engine performance config"""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            try:
+                from ...core.config import get_config
+                performance = get_config().get_earth_engine_config().get("performance", {})
+                max_workers = int(performance.get("concurrent_requests", 4))
+                max_draining = performance.get("max_draining_requests")
+            except Exception:
+                max_workers, max_draining = 4, None
+            _EXECUTOR = EarthEngineExecutor(max_workers=max_workers, max_draining=max_draining)
+        return _EXECUTOR
+
+
+def configure_ee_executor(max_workers: int = 4, max_draining: Optional[int] = None) -> EarthEngineExecutor:
+    """Replace the process-wide executor (outstanding calls keep draining on the old one)"""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=False)
+        _EXECUTOR = EarthEngineExecutor(max_workers=max_workers, max_draining=max_draining)
+        return _EXECUTOR
@@ -8,55 +8,29 @@ Just: authenticate once, query EE, return data.
 
 import logging
 import pandas as pd
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
-import threading
 
 from ..base import BaseAdapter
 from ...core.models import RequestSpec
 from ...core.config import get_config
+from ...core.cache import ServiceCache
+from .asset_cache import AssetIntrospectionCache
+from .executor import TimeoutError, ExecutorSaturatedError, get_ee_executor
 
 logger = logging.getLogger(__name__)
 
 
-class TimeoutError(Exception):
-    """Raised when Earth Engine query times out"""
-    pass
-
-
 def run_with_timeout(func, args=(), kwargs=None, timeout_sec=60):
     """
-    Run a function with a timeout using threading.
-    Returns (result, exception) tuple.
+    Run a function on the shared Earth Engine executor with a deadline.
 
-    Note: This uses daemon threads which will be killed if they timeout.
-    Earth Engine queries that timeout will be abandoned.
+    Calls that miss the deadline raise TimeoutError and keep draining on their
+    worker; the executor refuses new work (ExecutorSaturatedError) while too
+    many of them are still running.
     """
-    if kwargs is None:
-        kwargs = {}
-
-    result = [None]
-    exception = [None]
-
-    def target():
-        try:
-            result[0] = func(*args, **kwargs)
-        except Exception as e:
-            exception[0] = e
-
-    thread = threading.Thread(target=target, daemon=True)
-    thread.start()
-    thread.join(timeout=timeout_sec)
-
-    if thread.is_alive():
-        # Thread is still running - timeout occurred
-        raise TimeoutError(f"Earth Engine query exceeded {timeout_sec}s timeout")
-
-    if exception[0]:
-        raise exception[0]
-
-    return result[0]
+    return get_ee_executor().run(func, args=args, kwargs=kwargs, timeout_sec=timeout_sec)
 
 try:
     import ee
@@ -144,16 +118,31 @@ class ProductionEarthEngineAdapter(BaseAdapter):
     SOURCE_VERSION = "Production v1.0"
     LICENSE = "Various - see individual asset licenses"
 
-    # Class-level metadata cache (shared across all instances)
-    _METADATA_CACHE = {}
+    # Asset introspection cache (shared across all instances, persisted to disk)
+    _ASSET_CACHE: Optional[AssetIntrospectionCache] = None
+
+    # getInfo() refuses to serialise collections larger than this
+    MAX_FEATURES_PER_REQUEST = 5000
 
-    def __init__(self, asset_id: Optional[str] = None, scale: int = 500):
+    # Temporal reducers available to composite mode (ImageCollection methods)
+    TEMPORAL_REDUCERS = ("mean", "median", "min", "max", "sum")
+
+    def __init__(self, asset_id: Optional[str] = None, scale: int = 500,
+                 composite: Optional[Dict[str, Dict[str, Any]]] = None,
+                 temporal_reducer: str = "mean"):
         """
         Initialize lean Earth Engine adapter
 
         Args:
             asset_id: Earth Engine asset ID (e.g., "USGS/SRTMGL1_003") - optional for compatibility
             scale: Scale in meters for analysis (default: 500m)
+            composite: Optional composite-asset mode. Maps a member name to
+                {"asset_id": ..., "bands": [...], "time_range": (start, end)};
+                "bands" and "time_range" are optional. All members are stacked
+                into one image and fetched with a single request. Members that
+                share an asset and time window are fetched once.
+            temporal_reducer: How composite ImageCollections are collapsed over
+                their time window (one of TEMPORAL_REDUCERS)
         """
         super().__init__()
 
@@ -161,6 +150,15 @@ class ProductionEarthEngineAdapter(BaseAdapter):
         # but is required for actual data fetching
         self.asset_id = asset_id
         self.scale = scale
+        self.composite = composite
+        self.temporal_reducer = temporal_reducer
+
+        if composite:
+            if temporal_reducer not in self.TEMPORAL_REDUCERS:
+                raise ValueError(f"Unsupported temporal reducer: {temporal_reducer}")
+            self._composite_sources = self._plan_composite(composite)
+            _ensure_ee_authenticated()
+            return
 
         if not self.asset_id:
             # Allow initialization without asset_id (for compatibility with old notebooks)
@@ -170,56 +168,267 @@ class ProductionEarthEngineAdapter(BaseAdapter):
         # Authenticate once per process (singleton)
         _ensure_ee_authenticated()
 
-    def _get_asset_type(self) -> str:
+    @classmethod
+    def _asset_cache(cls) -> AssetIntrospectionCache:
+        """Shared asset introspection cache, created on first use"""
+        if cls._ASSET_CACHE is None:
+            cls._ASSET_CACHE = AssetIntrospectionCache(ServiceCache(cls.DATASET))
+        return cls._ASSET_CACHE
+
+    def _get_asset_type(self, asset_id: Optional[str] = None) -> str:
         """Get asset type (Image, ImageCollection, etc.) with caching"""
-        if self.asset_id in self._METADATA_CACHE:
-            return self._METADATA_CACHE[self.asset_id]["type"]
+        asset_id = asset_id or self.asset_id
+        cache = self._asset_cache()
+        asset_type = cache.get("asset_type", asset_id)
+        if asset_type:
+            return asset_type
 
         try:
             # Try as ImageCollection first (most common) - with timeout
             run_with_timeout(
-                lambda: ee.ImageCollection(self.asset_id).limit(1).getInfo(),
+                lambda: ee.ImageCollection(asset_id).limit(1).getInfo(),
                 timeout_sec=20
             )
             asset_type = "ImageCollection"
+        except ExecutorSaturatedError:
+            raise
         except:
             try:
                 # Try as Image - with timeout
                 run_with_timeout(
-                    lambda: ee.Image(self.asset_id).getInfo(),
+                    lambda: ee.Image(asset_id).getInfo(),
                     timeout_sec=20
                 )
                 asset_type = "Image"
+            except ExecutorSaturatedError:
+                raise
             except:
-                # Default to Image if both fail
-                asset_type = "Image"
+                # Default to Image if both fail, but don't persist the guess
+                return "Image"
 
-        self._METADATA_CACHE[self.asset_id] = {"type": asset_type}
+        cache.set("asset_type", asset_id, asset_type)
         return asset_type
 
+    def _get_band_names(self, asset_id: Optional[str] = None) -> List[str]:
+        """Get band names of an asset (first image for collections) with caching"""
+        asset_id = asset_id or self.asset_id
+        asset_type = self._get_asset_type(asset_id)
+
+        def fetch():
+            if asset_type == "ImageCollection":
+                return ee.ImageCollection(asset_id).first().bandNames().getInfo()
+            return ee.Image(asset_id).bandNames().getInfo()
+
+        try:
+            return self._asset_cache().get_or_fetch(
+                "bands", asset_id, lambda: run_with_timeout(fetch, timeout_sec=30)
+            )
+        except TimeoutError as e:
+            raise Exception(f"Earth Engine timeout (metadata fetch): {e}") from e
+
+    @staticmethod
+    def _ms_to_date(ms: float) -> str:
+        return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime('%Y-%m-%d')
+
+    def _date_extent(self, collection) -> Optional[List[str]]:
+        """[first, last] image date of a collection, or None if it is empty"""
+        stats = collection.reduceColumns(ee.Reducer.minMax(), ["system:time_start"]).getInfo()
+        if not stats or stats.get("min") is None:
+            return None
+        return [self._ms_to_date(stats["min"]), self._ms_to_date(stats["max"])]
+
+    def _get_date_extent(self, asset_id: Optional[str] = None) -> Optional[List[str]]:
+        """[first, last] image date of a whole collection with caching"""
+        asset_id = asset_id or self.asset_id
+        try:
+            return self._asset_cache().get_or_fetch(
+                "date_extent", asset_id,
+                lambda: run_with_timeout(lambda: self._date_extent(ee.ImageCollection(asset_id)),
+                                         timeout_sec=30)
+            )
+        except TimeoutError as e:
+            raise Exception(f"Earth Engine timeout (getting date extent): {e}") from e
+
+    def _get_region_extent(self, region, bbox: list) -> Optional[List[str]]:
+        """[first, last] image date of this collection within a region with caching"""
+        key = f"{self.asset_id}|" + ",".join(f"{c:.4f}" for c in bbox)
+        full_collection = ee.ImageCollection(self.asset_id).filterBounds(region)
+        try:
+            return self._asset_cache().get_or_fetch(
+                "region_extent", key,
+                lambda: run_with_timeout(lambda: self._date_extent(full_collection), timeout_sec=30)
+            )
+        except TimeoutError as e:
+            raise Exception(f"Earth Engine timeout (getting date range): {e}") from e
+
+    @staticmethod
+    def _plan_composite(composite: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Collapse composite members into unique sources
+
+        Members sharing an asset and time window become one source whose bands
+        are the union of the members' bands (None = all bands). Sources are keyed
+        by a short alias used to prefix their bands in the stacked image.
+        """
+        sources: Dict[str, Dict[str, Any]] = {}
+        by_key: Dict[tuple, str] = {}
+
+        for member, cfg in composite.items():
+            if "asset_id" not in cfg:
+                raise ValueError(f"Composite member '{member}' has no asset_id")
+            time_range = tuple(cfg["time_range"]) if cfg.get("time_range") else None
+            key = (cfg["asset_id"], time_range)
+            bands = list(cfg["bands"]) if cfg.get("bands") else None
+
+            if key not in by_key:
+                alias = f"s{len(sources)}"
+                by_key[key] = alias
+                sources[alias] = {
+                    "asset_id": cfg["asset_id"],
+                    "time_range": time_range,
+                    "bands": list(bands) if bands else None,
+                    "members": {member: bands}
+                }
+                continue
+
+            source = sources[by_key[key]]
+            source["members"][member] = bands
+            if source["bands"] is None or bands is None:
+                source["bands"] = None
+            else:
+                source["bands"] += [b for b in bands if b not in source["bands"]]
+
+        return sources
+
+    def _composite_image(self, start_date: str, end_date: str):
+        """Stack every composite source into one image with alias-prefixed band names"""
+        images = []
+        for alias, source in self._composite_sources.items():
+            asset_id = source["asset_id"]
+
+            if self._get_asset_type(asset_id) == "ImageCollection":
+                window_start, window_end = source["time_range"] or (start_date, end_date)
+                ic = ee.ImageCollection(asset_id).filterDate(window_start, window_end)
+                if source["bands"]:
+                    ic = ic.select(source["bands"])
+                img = getattr(ic, self.temporal_reducer)()
+            else:
+                img = ee.Image(asset_id)
+                if source["bands"]:
+                    img = img.select(source["bands"])
+
+            prefix = f"{alias}__"
+            images.append(img.rename(img.bandNames().map(lambda b: ee.String(prefix).cat(b))))
+
+        return ee.Image.cat(images)
+
+    def _composite_rows(self, props: Dict[str, Any], bbox: list, start_date: str,
+                        end_date: str) -> List[Dict]:
+        """Split a stacked-band result back into rows tagged with their composite member"""
+        minlon, minlat, maxlon, maxlat = bbox
+        wkt = f"POLYGON(({minlon} {minlat}, {maxlon} {minlat}, {maxlon} {maxlat}, {minlon} {maxlat}, {minlon} {minlat}))"
+        center_lat = (minlat + maxlat) / 2
+        center_lon = (minlon + maxlon) / 2
+
+        rows = []
+        for key, value in props.items():
+            if value is None or "__" not in key:
+                continue
+            alias, band = key.split("__", 1)
+            source = self._composite_sources.get(alias)
+            if source is None:
+                continue
+
+            is_collection = self._get_asset_type(source["asset_id"]) == "ImageCollection"
+            window_start, window_end = source["time_range"] or (start_date, end_date)
+
+            for member, bands in source["members"].items():
+                if bands is not None and band not in bands:
+                    continue
+                attributes = {
+                    "asset_id": source["asset_id"],
+                    "scale_m": self.scale,
+                    "composite_member": member
+                }
+                if is_collection:
+                    attributes["temporal_reducer"] = self.temporal_reducer
+                    attributes["actual_date_range"] = f"{window_start}_to_{window_end}"
+                rows.append(self._make_row(
+                    window_start, band, value, center_lat, center_lon, wkt, attributes,
+                    asset_id=source["asset_id"]
+                ))
+        return rows
+
+    def _query_composite(self, spec: RequestSpec, bbox: list, start_date: str, end_date: str) -> List[Dict]:
+        """Fetch every composite member for one geometry with a single reduceRegion"""
+        region = ee.Geometry.Rectangle(bbox)
+        img = self._composite_image(start_date, end_date)
+
+        def get_stats():
+            return img.reduceRegion(
+                reducer=ee.Reducer.mean(),
+                geometry=region,
+                scale=self.scale,
+                maxPixels=1e9
+            ).getInfo()
+
+        try:
+            stats = run_with_timeout(get_stats, timeout_sec=90)
+        except TimeoutError as e:
+            raise Exception(f"Earth Engine timeout (composite fetch): {e}") from e
+
+        return self._composite_rows(stats or {}, bbox, start_date, end_date)
+
+    def _missing_composite_members(self, rows: List[Dict]) -> List[str]:
+        """Composite members that produced no rows"""
+        found = {row["attributes"]["composite_member"] for row in rows}
+        return [m for m in self.composite if m not in found]
+
+    def _fetch_composite_member(self, member: str, spec: RequestSpec) -> List[Dict]:
+        """
+        Fetch one composite member through the single-asset path
+
+        Used for members that came back empty (e.g. no images in the window),
+        so the single-asset temporal fallback still applies.
+        """
+        cfg = self.composite[member]
+        if cfg.get("time_range"):
+            spec = RequestSpec(geometry=spec.geometry, time_range=tuple(cfg["time_range"]),
+                               variables=spec.variables, extra=spec.extra)
+
+        single = ProductionEarthEngineAdapter(asset_id=cfg["asset_id"], scale=self.scale)
+        rows = single._fetch_rows(spec)
+
+        bands = cfg.get("bands")
+        member_rows = []
+        for row in rows:
+            if bands and row["variable"][len("ee:"):] not in bands:
+                continue
+            row["attributes"]["composite_member"] = member
+            member_rows.append(row)
+        return member_rows
+
     def _fetch_rows(self, spec: RequestSpec) -> List[Dict]:
         """
         Fetch Earth Engine data with minimal overhead
 
         Returns list of dicts matching env-agents core schema
         """
-        # Parse geometry
-        if spec.geometry.type == "point":
-            lon, lat = spec.geometry.coordinates
-            buffer = 0.005  # Small buffer for point queries (~500m at equator)
-            bbox = [lon - buffer, lat - buffer, lon + buffer, lat + buffer]
-        elif spec.geometry.type == "bbox":
-            bbox = list(spec.geometry.coordinates)
-        else:
-            raise ValueError(f"Unsupported geometry type: {spec.geometry.type}")
+        bbox = self._spec_bbox(spec)
+
+        # Parse time range
+        start_date, end_date = spec.time_range or ("2020-01-01", "2020-12-31")
+
+        if self.composite:
+            rows = self._query_composite(spec, bbox, start_date, end_date)
+            for member in self._missing_composite_members(rows):
+                rows.extend(self._fetch_composite_member(member, spec))
+            return rows
 
         region = ee.Geometry.Rectangle(bbox)
         center_lat = (bbox[1] + bbox[3]) / 2
         center_lon = (bbox[0] + bbox[2]) / 2
 
-        # Parse time range
-        start_date, end_date = spec.time_range or ("2020-01-01", "2020-12-31")
-
         # Get asset type (cached)
         asset_type = self._get_asset_type()
 
@@ -229,6 +438,263 @@ class ProductionEarthEngineAdapter(BaseAdapter):
         else:
             return self._query_image(region, bbox, center_lat, center_lon, start_date)
 
+    @staticmethod
+    def _spec_bbox(spec: RequestSpec) -> list:
+        """Return [minlon, minlat, maxlon, maxlat] for a point or bbox spec"""
+        if spec.geometry.type == "point":
+            lon, lat = spec.geometry.coordinates
+            buffer = 0.005  # Small buffer for point queries (~500m at equator)
+            return [lon - buffer, lat - buffer, lon + buffer, lat + buffer]
+        elif spec.geometry.type == "bbox":
+            return list(spec.geometry.coordinates)
+        raise ValueError(f"Unsupported geometry type: {spec.geometry.type}")
+
+    def fetch_batch(self, specs: List[RequestSpec], chunk_size: int = 250,
+                    timeout_sec: int = 120, fallback_to_single: bool = True) -> List[List[Dict]]:
+        """
+        Fetch many geometries of this asset with one server-side reduction per chunk
+
+        All geometries are packed into a FeatureCollection and reduced with
+        ``reduceRegions`` so a whole chunk costs a single ``getInfo()`` instead of
+        3-4 round-trips per geometry. ImageCollections are grouped by time window
+        and chunked so that (features x images) stays under MAX_FEATURES_PER_REQUEST.
+
+        Args:
+            specs: Request specs (point or bbox geometries) for this asset
+            chunk_size: Maximum number of geometries per server-side request
+            timeout_sec: Timeout for each batched getInfo() call
+            fallback_to_single: Re-run specs that returned nothing through
+                _fetch_rows, which applies the temporal fallback
+
+        Returns:
+            List of row lists, aligned with ``specs``
+        """
+        if not self.asset_id and not self.composite:
+            raise ValueError("asset_id is required for fetch_batch")
+
+        results: List[List[Dict]] = [[] for _ in specs]
+        if not specs:
+            return results
+
+        bboxes = [self._spec_bbox(spec) for spec in specs]
+
+        if self.composite:
+            self._batch_composite(specs, bboxes, chunk_size, timeout_sec, results)
+            if fallback_to_single:
+                for i, spec in enumerate(specs):
+                    for member in self._missing_composite_members(results[i]):
+                        try:
+                            results[i].extend(self._fetch_composite_member(member, spec))
+                        except Exception as e:
+                            logger.warning(f"Single-asset fallback failed for composite member {member}: {e}")
+            return results
+
+        asset_type = self._get_asset_type()
+
+        if asset_type == "ImageCollection":
+            windows: Dict[tuple, List[int]] = {}
+            for i, spec in enumerate(specs):
+                window = tuple(spec.time_range or ("2020-01-01", "2020-12-31"))
+                windows.setdefault(window, []).append(i)
+
+            for (start_date, end_date), indices in windows.items():
+                self._batch_image_collection(indices, bboxes, start_date, end_date,
+                                             chunk_size, timeout_sec, results)
+        else:
+            dates = [(spec.time_range or ("2020-01-01", "2020-12-31"))[0] for spec in specs]
+            self._batch_image(list(range(len(specs))), bboxes, dates,
+                              chunk_size, timeout_sec, results)
+
+        if fallback_to_single:
+            for i, spec in enumerate(specs):
+                if not results[i]:
+                    try:
+                        results[i] = self._fetch_rows(spec)
+                    except Exception as e:
+                        logger.warning(f"Single-geometry fallback failed for {self.asset_id}: {e}")
+
+        return results
+
+    def _batch_features(self, indices: List[int], bboxes: List[list]):
+        """Build a FeatureCollection of spec rectangles tagged with their spec index"""
+        return ee.FeatureCollection([
+            ee.Feature(ee.Geometry.Rectangle(bboxes[i]), {"spec_index": i})
+            for i in indices
+        ])
+
+    def _reduce_regions_chunks(self, img, indices: List[int], bboxes: List[list],
+                               chunk_size: int, timeout_sec: int):
+        """Reduce an image over chunks of geometries, yielding (spec_index, band_values)"""
+        for start in range(0, len(indices), chunk_size):
+            chunk = indices[start:start + chunk_size]
+            fc = self._batch_features(chunk, bboxes)
+            reduced = img.reduceRegions(
+                collection=fc,
+                reducer=ee.Reducer.mean().forEachBand(img),
+                scale=self.scale
+            )
+
+            try:
+                features = run_with_timeout(lambda: reduced.getInfo()["features"],
+                                            timeout_sec=timeout_sec)
+            except TimeoutError as e:
+                raise Exception(f"Earth Engine timeout (batch reduce): {e}") from e
+
+            for feat in features:
+                props = dict(feat["properties"])
+                yield props.pop("spec_index"), props
+
+    def _batch_composite(self, specs: List[RequestSpec], bboxes: List[list], chunk_size: int,
+                         timeout_sec: int, results: List[List[Dict]]) -> None:
+        """Reduce the stacked composite image over chunks of geometries, per time window"""
+        windows: Dict[tuple, List[int]] = {}
+        for i, spec in enumerate(specs):
+            window = tuple(spec.time_range or ("2020-01-01", "2020-12-31"))
+            windows.setdefault(window, []).append(i)
+
+        for (start_date, end_date), indices in windows.items():
+            img = self._composite_image(start_date, end_date)
+            for i, props in self._reduce_regions_chunks(img, indices, bboxes, chunk_size, timeout_sec):
+                results[i].extend(self._composite_rows(props, bboxes[i], start_date, end_date))
+
+    def _batch_image(self, indices: List[int], bboxes: List[list], dates: List[str],
+                     chunk_size: int, timeout_sec: int, results: List[List[Dict]]) -> None:
+        """Reduce a single Image over chunks of geometries with reduceRegions"""
+        img = ee.Image(self.asset_id)
+
+        for i, props in self._reduce_regions_chunks(img, indices, bboxes, chunk_size, timeout_sec):
+            date = dates[i]
+            minlon, minlat, maxlon, maxlat = bboxes[i]
+            wkt = f"POLYGON(({minlon} {minlat}, {maxlon} {minlat}, {maxlon} {maxlat}, {minlon} {maxlat}, {minlon} {minlat}))"
+            center_lat = (minlat + maxlat) / 2
+            center_lon = (minlon + maxlon) / 2
+
+            for variable, value in props.items():
+                if value is not None:
+                    results[i].append(self._make_row(
+                        date, variable, value, center_lat, center_lon, wkt,
+                        {"asset_id": self.asset_id, "scale_m": self.scale}
+                    ))
+
+    def _batch_image_collection(self, indices: List[int], bboxes: List[list],
+                                start_date: str, end_date: str, chunk_size: int,
+                                timeout_sec: int, results: List[List[Dict]],
+                                requested_range: Optional[Tuple[str, str]] = None) -> None:
+        """
+        Reduce every image of a collection window over chunks of geometries
+
+        A window holding more than MAX_FEATURES_PER_REQUEST images is split into
+        shorter date ranges (recursively, as images need not be spread evenly),
+        so every request still carries at least one geometry per image.
+        """
+        window_fc = self._batch_features(indices, bboxes)
+        window_ic = ee.ImageCollection(self.asset_id).filterDate(start_date, end_date) \
+            .filterBounds(window_fc.geometry())
+
+        try:
+            count = run_with_timeout(lambda: window_ic.size().getInfo(), timeout_sec=30)
+        except TimeoutError as e:
+            raise Exception(f"Earth Engine timeout (checking image count): {e}") from e
+
+        if count == 0:
+            if requested_range is None:
+                logger.warning(f"No images found for {self.asset_id} in {start_date} to {end_date} "
+                               f"for {len(indices)} batched geometries")
+            return
+
+        if count > self.MAX_FEATURES_PER_REQUEST:
+            windows = self._split_date_window(start_date, end_date,
+                                              -(-count // self.MAX_FEATURES_PER_REQUEST))
+            if len(windows) > 1:
+                for sub_start, sub_end in windows:
+                    self._batch_image_collection(indices, bboxes, sub_start, sub_end, chunk_size, timeout_sec,
+                                                 results, requested_range or (start_date, end_date))
+                return
+            logger.warning(f"{count} images of {self.asset_id} on {start_date} exceed "
+                           f"{self.MAX_FEATURES_PER_REQUEST} features per request; fetching one geometry at a time")
+        requested_start, requested_end = requested_range or (start_date, end_date)
+
+        # Each image yields one feature per geometry
+        per_chunk = max(1, min(chunk_size, self.MAX_FEATURES_PER_REQUEST // count))
+
+        for start in range(0, len(indices), per_chunk):
+            chunk = indices[start:start + per_chunk]
+            fc = self._batch_features(chunk, bboxes)
+            ic = ee.ImageCollection(self.asset_id).filterDate(start_date, end_date) \
+                .filterBounds(fc.geometry())
+
+            def reduce_img(img):
+                date = img.date().format("YYYY-MM-dd")
+                return img.reduceRegions(
+                    collection=fc,
+                    reducer=ee.Reducer.mean().forEachBand(img),
+                    scale=self.scale
+                ).map(lambda f: f.set("date", date))
+
+            reduced = ic.map(reduce_img).flatten()
+
+            try:
+                features = run_with_timeout(lambda: reduced.getInfo()["features"],
+                                            timeout_sec=timeout_sec)
+            except TimeoutError as e:
+                raise Exception(f"Earth Engine timeout (batch data fetch): {e}") from e
+
+            for feat in features:
+                props = dict(feat["properties"])
+                i = props.pop("spec_index")
+                date = props.pop("date", None)
+                if not date:
+                    continue
+                minlon, minlat, maxlon, maxlat = bboxes[i]
+                center_lat = (minlat + maxlat) / 2
+                center_lon = (minlon + maxlon) / 2
+
+                for variable, value in props.items():
+                    if value is not None:
+                        results[i].append(self._make_row(
+                            date, variable, value, center_lat, center_lon,
+                            f"POINT({center_lon} {center_lat})",
+                            {
+                                "asset_id": self.asset_id,
+                                "scale_m": self.scale,
+                                "requested_date_range": f"{requested_start}_to_{requested_end}",
+                                "actual_date_range": f"{start_date}_to_{end_date}",
+                                "temporal_fallback_applied": False
+                            }
+                        ))
+
+    @staticmethod
+    def _split_date_window(start_date: str, end_date: str, parts: int) -> List[Tuple[str, str]]:
+        """Split a filterDate window (end exclusive) into up to `parts` consecutive whole-day windows"""
+        start, end = (datetime.fromisoformat(str(d)[:10]) for d in (start_date, end_date))
+        days = (end - start).days
+        parts = max(1, min(parts, days))
+        bounds = [start + timedelta(days=round(k * days / parts)) for k in range(parts + 1)]
+        return [(lo.strftime("%Y-%m-%d"), hi.strftime("%Y-%m-%d")) for lo, hi in zip(bounds, bounds[1:])]
+
+    def _make_row(self, date: str, variable: str, value, center_lat: float, center_lon: float,
+                  wkt: str, attributes: Dict[str, Any], asset_id: Optional[str] = None) -> Dict:
+        """Build a core-schema row for one band value"""
+        asset_id = asset_id or self.asset_id
+        return {
+            "observation_id": f"ee_{asset_id.replace('/', '_')}_{date}_{variable}",
+            "dataset": self.DATASET,
+            "source_url": self.SOURCE_URL,
+            "source_version": self.SOURCE_VERSION,
+            "license": self.LICENSE,
+            "retrieval_timestamp": datetime.now(),
+            "geometry_type": "bbox",
+            "latitude": center_lat,
+            "longitude": center_lon,
+            "geom_wkt": wkt,
+            "time": date,
+            "variable": f"ee:{variable}",
+            "value": float(value),
+            "unit": "",
+            "qc_flag": "ok",
+            "attributes": attributes
+        }
+
     def _query_image(self, region, bbox: list, center_lat: float, center_lon: float, date: str) -> List[Dict]:
         """Query single Image asset"""
         img = ee.Image(self.asset_id).clip(region)
@@ -256,27 +722,10 @@ class ProductionEarthEngineAdapter(BaseAdapter):
         rows = []
         for variable, value in stats.items():
             if value is not None:
-                rows.append({
-                    "observation_id": f"ee_{self.asset_id.replace('/', '_')}_{date}_{variable}",
-                    "dataset": self.DATASET,
-                    "source_url": self.SOURCE_URL,
-                    "source_version": self.SOURCE_VERSION,
-                    "license": self.LICENSE,
-                    "retrieval_timestamp": datetime.now(),
-                    "geometry_type": "bbox",
-                    "latitude": center_lat,
-                    "longitude": center_lon,
-                    "geom_wkt": wkt,
-                    "time": date,
-                    "variable": f"ee:{variable}",
-                    "value": float(value),
-                    "unit": "",
-                    "qc_flag": "ok",
-                    "attributes": {
-                        "asset_id": self.asset_id,
-                        "scale_m": self.scale
-                    }
-                })
+                rows.append(self._make_row(
+                    date, variable, value, center_lat, center_lon, wkt,
+                    {"asset_id": self.asset_id, "scale_m": self.scale}
+                ))
 
         return rows
 
@@ -297,38 +746,27 @@ class ProductionEarthEngineAdapter(BaseAdapter):
         def check_size():
             return ic.size().getInfo()
 
-        try:
-            count = run_with_timeout(check_size, timeout_sec=30)
-        except TimeoutError as e:
-            raise Exception(f"Earth Engine timeout (checking image count): {e}") from e
+        # Skip the count probe when the window lies outside the collection's extent
+        extent = self._get_date_extent()
+        if extent and (end_date < extent[0] or start_date > extent[1]):
+            count = 0
+        else:
+            try:
+                count = run_with_timeout(check_size, timeout_sec=30)
+            except TimeoutError as e:
+                raise Exception(f"Earth Engine timeout (checking image count): {e}") from e
 
         # If no images found, try temporal fallback
         if count == 0:
             logger.warning(f"No images found for {self.asset_id} in {start_date} to {end_date}, attempting temporal fallback")
             fallback_applied = True
 
-            # Get collection's actual date range
-            full_collection = ee.ImageCollection(self.asset_id).filterBounds(region)
-
-            def get_date_range():
-                dates = full_collection.aggregate_array('system:time_start').getInfo()
-                if not dates:
-                    return None, None
-                import datetime
-                min_ts = min(dates)
-                max_ts = max(dates)
-                min_date = datetime.datetime.fromtimestamp(min_ts / 1000).strftime('%Y-%m-%d')
-                max_date = datetime.datetime.fromtimestamp(max_ts / 1000).strftime('%Y-%m-%d')
-                return min_date, max_date
-
-            try:
-                available_start, available_end = run_with_timeout(get_date_range, timeout_sec=30)
-            except TimeoutError as e:
-                raise Exception(f"Earth Engine timeout (getting date range): {e}") from e
-
-            if not available_start or not available_end:
+            # Get collection's actual date range at this location (cached)
+            region_extent = self._get_region_extent(region, bbox)
+            if not region_extent:
                 logger.warning(f"No images found for {self.asset_id} at this location")
                 return []
+            available_start, available_end = region_extent
 
             # Use most recent year available if requested date is too late
             if requested_start > available_end:
@@ -365,15 +803,9 @@ class ProductionEarthEngineAdapter(BaseAdapter):
                 logger.warning(f"No images found even after fallback for {self.asset_id}")
                 return []
 
-        # Get band names from first image (with timeout)
-        def get_bands():
-            first_img = ic.first()
-            return first_img.bandNames().getInfo()
-
+        # Get band names (cached per asset)
         try:
-            band_names = run_with_timeout(get_bands, timeout_sec=30)
-        except TimeoutError as e:
-            raise Exception(f"Earth Engine timeout (metadata fetch): {e}") from e
+            band_names = self._get_band_names()
         except Exception as e:
             # Handle "image is null" errors more gracefully
             if "is required and may not be null" in str(e):
@@ -432,39 +864,37 @@ class ProductionEarthEngineAdapter(BaseAdapter):
                         else:
                             attributes["temporal_fallback_applied"] = False
 
-                        rows.append({
-                            "observation_id": f"ee_{self.asset_id.replace('/', '_')}_{date}_{variable}",
-                            "dataset": self.DATASET,
-                            "source_url": self.SOURCE_URL,
-                            "source_version": self.SOURCE_VERSION,
-                            "license": self.LICENSE,
-                            "retrieval_timestamp": datetime.now(),
-                            "geometry_type": "bbox",
-                            "latitude": center_lat,
-                            "longitude": center_lon,
-                            "geom_wkt": f"POINT({center_lon} {center_lat})",  # Simplified for collection
-                            "time": date,
-                            "variable": f"ee:{variable}",
-                            "value": float(value),
-                            "unit": "",
-                            "qc_flag": "ok",
-                            "attributes": attributes
-                        })
+                        rows.append(self._make_row(
+                            date, variable, value, center_lat, center_lon,
+                            f"POINT({center_lon} {center_lat})",  # Simplified for collection
+                            attributes
+                        ))
 
         return rows
 
     def capabilities(self) -> Dict[str, Any]:
         """Return basic capabilities"""
+        if self.composite:
+            variables = [
+                {"name": f"ee:{band}", "description": f"{member}: {cfg['asset_id']} {band}"}
+                for member, cfg in self.composite.items()
+                for band in (cfg.get("bands") or [])
+            ]
+            return {
+                "dataset": self.DATASET,
+                "asset_type": "Composite",
+                "composite_members": {m: cfg["asset_id"] for m, cfg in self.composite.items()},
+                "temporal_reducer": self.temporal_reducer,
+                "variables": variables,
+                "spatial_coverage": "Global",
+                "requires_auth": True
+            }
+
         asset_type = self._get_asset_type()
 
         # Try to get band names
         try:
-            if asset_type == "ImageCollection":
-                ic = ee.ImageCollection(self.asset_id).limit(1)
-                band_names = ic.first().bandNames().getInfo()
-            else:
-                img = ee.Image(self.asset_id)
-                band_names = img.bandNames().getInfo()
+            band_names = self._get_band_names()
         except:
             band_names = []
 
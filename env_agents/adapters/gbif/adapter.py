@@ -7,7 +7,8 @@ taxonomic context, conservation status, and ecological applications.
 
 import pandas as pd
 import requests
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timezone
 import json
 import warnings
@@ -15,6 +16,53 @@ import warnings
 from env_agents.adapters.base import BaseAdapter
 from env_agents.core.models import RequestSpec
 from ...core.adapter_mixins import StandardAdapterMixin
+from ...core.planner import AdapterLimits
+from ...core.deadline import propagate
+from ...core.utils_geo import bbox_from_geometry, polygon_wkt
+
+# Occurrence search paging (https://techdocs.gbif.org/en/openapi/v1/occurrence)
+PAGE_SIZE = 300               # Largest page the search API returns
+OFFSET_CEILING = 100_000      # offset + limit may not exceed this; larger result sets must be partitioned
+MAX_CONCURRENT_REQUESTS = 4
+DEFAULT_MAX_RECORDS = 1000
+DEFAULT_RADIUS_M = 1000
+MIN_SPLIT_DEG = 0.01          # Partitions are not split into smaller bboxes than this
+YEAR_FACET_LIMIT = 1000
+GBIF_TIMEOUT_S = 30
+
+# Map variable names to kingdoms if specified
+KINGDOM_VARIABLES = {
+    "Animal Occurrences": "Animalia",
+    "Plant Occurrences": "Plantae",
+    "Fungi Occurrences": "Fungi"
+}
+KINGDOM_VARIABLE_NAMES = {kingdom: name for name, kingdom in KINGDOM_VARIABLES.items()}
+
+# attributes key -> occurrence record field
+RECORD_ATTRIBUTES = {
+    "gbif_id": "key",
+    "dataset_key": "datasetKey",
+    "publishing_org": "publishingOrganizationKey",
+    "basis_of_record": "basisOfRecord",
+    "occurrence_status": "occurrenceStatus",
+    "species": "species",
+    "scientific_name": "scientificName",
+    "kingdom": "kingdom",
+    "phylum": "phylum",
+    "class": "class",
+    "order": "order",
+    "family": "family",
+    "genus": "genus",
+    "taxon_rank": "taxonRank",
+    "coordinate_uncertainty": "coordinateUncertaintyInMeters",
+    "year": "year",
+    "month": "month",
+    "day": "day",
+    "recorded_by": "recordedBy",
+    "identified_by": "identifiedBy",
+    "collection_code": "collectionCode",
+    "institution_code": "institutionCode",
+}
 
 
 class GBIFAdapter(BaseAdapter, StandardAdapterMixin):
@@ -29,6 +77,7 @@ class GBIFAdapter(BaseAdapter, StandardAdapterMixin):
     SOURCE_URL = "https://api.gbif.org/v1"
     SOURCE_VERSION = "v1.0"
     LICENSE = "https://creativecommons.org/licenses/by/4.0/"
+    LIMITS = AdapterLimits(pagination="offset", max_concurrent=MAX_CONCURRENT_REQUESTS)
     
     # Taxonomic kingdoms
     KINGDOMS = [
@@ -68,7 +117,7 @@ class GBIFAdapter(BaseAdapter, StandardAdapterMixin):
         try:
             # GBIF about page and documentation
             docs_url = "https://www.gbif.org/what-is-gbif"
-            response = requests.get(docs_url, timeout=10)
+            response = self._session.get(docs_url, timeout=10)
             
             enhanced_info = {
                 "description": """The Global Biodiversity Information Facility (GBIF) is an international 
@@ -410,166 +459,295 @@ class GBIFAdapter(BaseAdapter, StandardAdapterMixin):
         }
     
     def _fetch_rows(self, spec: RequestSpec) -> List[Dict[str, Any]]:
+        """Fetch GBIF occurrences as row dicts (prefer fetch(), which stays columnar)"""
+        frame = self._fetch_frame(spec)
+        if frame.empty:
+            return []
+        return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+    def _fetch_frame(self, spec: RequestSpec) -> pd.DataFrame:
         """
         Fetch GBIF occurrence data for specified taxa and location.
-        
-        Queries GBIF API and returns standardized biodiversity occurrence data
-        with comprehensive taxonomic and ecological metadata.
+
+        Strategy:
+        1. Translate spec.geometry / time_range / variables into search parameters
+        2. Count matches with limit=0 queries (with a year facet), splitting the
+           time range by year, then the bbox into quadrants, until every
+           partition fits under GBIF's paging ceiling (offset + limit <= 100,000)
+        3. Fetch all pages of all partitions concurrently, up to max_records
+           (extra, default service max_results; None for no cap)
+        4. Build standardized rows columnar from the page results
         """
         try:
-            # Extract spatial and temporal constraints from spec
-            bbox = getattr(spec, 'bbox', None)
-            start_time = getattr(spec, 'start_time', None)
-            end_time = getattr(spec, 'end_time', None)
-            variables = getattr(spec, 'variables', [])
-            
-            # Build GBIF query parameters
-            params = {}
-            
-            # Spatial constraints - GBIF uses decimal degrees
-            if bbox:
-                west, south, east, north = bbox
-                params['decimalLatitude'] = f"{south},{north}"
-                params['decimalLongitude'] = f"{west},{east}"
-            
-            # Temporal constraints
-            if start_time:
-                params['eventDate'] = start_time.strftime('%Y-%m-%d')
-            if start_time and end_time:
-                params['eventDate'] = f"{start_time.strftime('%Y-%m-%d')},{end_time.strftime('%Y-%m-%d')}"
-            
-            # Taxonomic constraints based on requested variables
-            if variables:
-                # Map variable names to kingdoms if specified
-                kingdom_mapping = {
-                    "Animal Occurrences": "Animalia",
-                    "Plant Occurrences": "Plantae", 
-                    "Fungi Occurrences": "Fungi"
-                }
-                
-                for var in variables:
-                    if var in kingdom_mapping:
-                        params['kingdom'] = kingdom_mapping[var]
-                        break  # Only one kingdom per query
-            
-            # Data quality filters
-            params['hasCoordinate'] = 'true'
-            params['hasGeospatialIssue'] = 'false'
-            params['occurrenceStatus'] = 'PRESENT'
-            
-            # Limit results for testing
-            params['limit'] = '1000'
-            
-            # Execute query
-            url = f"{self.base_url}/occurrence/search"
-            response = requests.get(url, params=params, timeout=30)
-            
-            if response.status_code != 200:
-                warnings.warn(f"GBIF query failed: {response.status_code}")
-                return []
-            
-            data = response.json()
-            
-            if not data.get('results'):
-                return []
-            
-            # Process results into standardized format
-            rows = []
-            retrieval_timestamp = datetime.now(timezone.utc).isoformat()
-            
-            for record in data['results']:
-                # Determine variable type based on kingdom
-                kingdom = record.get('kingdom', '')
-                if kingdom == 'Animalia':
-                    variable_name = "Animal Occurrences"
-                elif kingdom == 'Plantae':
-                    variable_name = "Plant Occurrences"
-                elif kingdom == 'Fungi':
-                    variable_name = "Fungi Occurrences"
-                else:
-                    variable_name = "Species Occurrences"
-                
-                # Find variable metadata
-                var_meta = next(
-                    (v for v in self.get_enhanced_taxonomy_metadata() 
-                     if v["name"] == variable_name),
-                    {"name": variable_name, "units": "count"}
-                )
-                
-                row = {
-                    # Identity columns
-                    "observation_id": f"gbif_{record.get('key', '')}",
-                    "dataset": self.DATASET,
-                    "source_url": self.SOURCE_URL,
-                    "source_version": self.SOURCE_VERSION,
-                    "license": self.LICENSE,
-                    "retrieval_timestamp": retrieval_timestamp,
-                    
-                    # Spatial columns
-                    "geometry_type": "point",
-                    "latitude": float(record.get('decimalLatitude', 0)),
-                    "longitude": float(record.get('decimalLongitude', 0)),
-                    "geom_wkt": f"POINT({record.get('decimalLongitude', 0)} {record.get('decimalLatitude', 0)})",
-                    "spatial_id": None,
-                    "site_name": record.get('locality'),
-                    "admin": record.get('country'),
-                    "elevation_m": record.get('elevation'),
-                    
-                    # Temporal columns
-                    "time": record.get('eventDate'),
-                    "temporal_coverage": "occurrence_date",
-                    
-                    # Value columns - for occurrence data, value is typically 1 (present)
-                    "variable": variable_name,
-                    "value": 1.0,  # Occurrence = presence
-                    "unit": var_meta.get("units", "count"),
-                    "depth_top_cm": None,
-                    "depth_bottom_cm": None,
-                    "qc_flag": "gbif_validated",
-                    
-                    # Metadata columns
-                    "attributes": {
-                        "gbif_id": record.get('key'),
-                        "dataset_key": record.get('datasetKey'),
-                        "publishing_org": record.get('publishingOrganizationKey'),
-                        "basis_of_record": record.get('basisOfRecord'),
-                        "occurrence_status": record.get('occurrenceStatus'),
-                        "species": record.get('species'),
-                        "scientific_name": record.get('scientificName'),
-                        "kingdom": kingdom,
-                        "phylum": record.get('phylum'),
-                        "class": record.get('class'),
-                        "order": record.get('order'),
-                        "family": record.get('family'),
-                        "genus": record.get('genus'),
-                        "taxon_rank": record.get('taxonRank'),
-                        "coordinate_uncertainty": record.get('coordinateUncertaintyInMeters'),
-                        "year": record.get('year'),
-                        "month": record.get('month'),
-                        "day": record.get('day'),
-                        "recorded_by": record.get('recordedBy'),
-                        "identified_by": record.get('identifiedBy'),
-                        "collection_code": record.get('collectionCode'),
-                        "institution_code": record.get('institutionCode'),
-                        "ecological_significance": var_meta.get("ecological_significance"),
-                        "conservation_applications": var_meta.get("conservation_applications", []),
-                        "terms": {
-                            "native_id": record.get('key'),
-                            "native_name": variable_name,
-                            "canonical_variable": None  # To be mapped by TermBroker
-                        }
-                    },
-                    "provenance": f"GBIF via {record.get('publishingOrganizationKey', 'unknown publisher')}"
-                }
-                
-                rows.append(row)
-            
-            return rows
-            
+            extra = spec.extra or {}
+            max_records = extra.get("max_records", self.get_service_setting("max_results", DEFAULT_MAX_RECORDS))
+            workers = int(extra.get("max_concurrent_requests",
+                                    self.get_service_setting("max_concurrent_requests", MAX_CONCURRENT_REQUESTS)))
+
+            base_params = self._search_params(spec)
+            bbox = self._search_bbox(spec)
+            time_params = self._time_params(spec.time_range)
+            partitions = self._plan_partitions(base_params, bbox, time_params, max_records)
+            pages = self._plan_pages(partitions, max_records)
+            if not pages:
+                return pd.DataFrame()
+
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pages))),
+                                    thread_name_prefix="gbif") as pool:
+                results = [r for page in pool.map(propagate(self._fetch_page), pages) for r in page]
+
+            if not results:
+                return pd.DataFrame()
+
+            records = pd.DataFrame(results)
+            if "key" in records.columns:
+                # Points on a shared partition edge match both partitions
+                records = records.drop_duplicates("key")
+            if max_records is not None:
+                records = records.head(int(max_records))
+            return self._records_to_core_frame(records.reset_index(drop=True))
+
         except Exception as e:
             warnings.warn(f"GBIF fetch error: {str(e)}")
+            return pd.DataFrame()
+
+    def _search_params(self, spec: RequestSpec) -> Dict[str, Any]:
+        """Occurrence search parameters shared by every partition and page"""
+        params: Dict[str, Any] = {}
+
+        # Taxonomic constraints based on requested variables
+        for var in spec.variables or []:
+            # Map variable names to kingdoms if specified
+            if var in KINGDOM_VARIABLES:
+                params['kingdom'] = KINGDOM_VARIABLES[var]
+                break  # Only one kingdom per query
+
+        # GBIF takes polygons as WKT (counter-clockwise); its bounds go through _search_bbox
+        if spec.geometry.type == "polygon":
+            params['geometry'] = polygon_wkt(spec.geometry.coordinates)
+
+        # Data quality filters
+        params['hasCoordinate'] = 'true'
+        params['hasGeospatialIssue'] = 'false'
+        params['occurrenceStatus'] = 'PRESENT'
+        return params
+
+    def _search_bbox(self, spec: RequestSpec) -> Optional[Tuple[float, float, float, float]]:
+        """(west, south, east, north) for bbox geometries, buffered points and polygon bounds"""
+        geometry = spec.geometry
+        if geometry.type == "bbox":
+            return tuple(float(c) for c in geometry.coordinates)
+        if geometry.type == "point":
+            lon, lat = geometry.coordinates
+            radius_m = float((spec.extra or {}).get("radius_m",
+                                                    self.get_service_setting("default_radius_m", DEFAULT_RADIUS_M)))
+            radius_deg = radius_m / 111000  # ~111km per degree
+            return (lon - radius_deg, lat - radius_deg, lon + radius_deg, lat + radius_deg)
+        if geometry.type == "polygon":
+            return bbox_from_geometry("polygon", geometry.coordinates)
+        raise ValueError(f"Unsupported geometry type: {geometry.type}")
+
+    @staticmethod
+    def _time_params(time_range: Optional[Tuple[str, str]]) -> Dict[str, str]:
+        """eventDate range for the spec's time_range (dates only, GBIF format)"""
+        if not time_range:
+            return {}
+        start, end = (pd.Timestamp(t).strftime('%Y-%m-%d') for t in time_range)
+        return {'eventDate': f"{start},{end}"}
+
+    @staticmethod
+    def _bbox_params(bbox: Optional[Tuple[float, float, float, float]]) -> Dict[str, str]:
+        """Spatial constraints - GBIF uses decimal degree ranges"""
+        if bbox is None:
+            return {}
+        west, south, east, north = bbox
+        return {'decimalLatitude': f"{south},{north}", 'decimalLongitude': f"{west},{east}"}
+
+    def _get_json(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """One /occurrence/search call"""
+        response = self._session.get(f"{self.base_url}/occurrence/search", params=params, timeout=GBIF_TIMEOUT_S)
+        response.raise_for_status()
+        return response.json()
+
+    def _count(self, params: Dict[str, Any]) -> Tuple[int, Dict[int, int]]:
+        """Match count and per-year counts for a partition, without fetching any records"""
+        data = self._get_json({**params, 'limit': 0, 'facet': 'year', 'facetLimit': YEAR_FACET_LIMIT})
+        years: Dict[int, int] = {}
+        for facet in data.get('facets') or []:
+            if str(facet.get('field', '')).upper() == 'YEAR':
+                years = {int(c['name']): int(c['count']) for c in facet.get('counts', []) if str(c.get('name')).isdigit()}
+        return int(data.get('count', 0)), years
+
+    def _plan_partitions(self, base_params: Dict[str, Any], bbox: Optional[Tuple[float, float, float, float]],
+                         time_params: Dict[str, str], max_records: Optional[int]) -> List[Tuple[Dict[str, Any], int]]:
+        """
+        Split the query into (params, count) partitions that can be paged.
+
+        A partition over OFFSET_CEILING is first split into runs of whole
+        years (using its year facet), then, for a single year, into bbox
+        quadrants - unless the records still wanted fit under the ceiling
+        anyway. A partition whose year facet doesn't account for its whole
+        count (records without a year) is split into quadrants only, since
+        those records fall outside every year window. Partitions that cannot
+        be split further are truncated at the ceiling with a warning.
+        Planning stops once max_records are covered.
+        """
+        ceiling = OFFSET_CEILING
+        partitions, planned = [], 0
+        pending = [(bbox, time_params)]
+        while pending and (max_records is None or planned < int(max_records)):
+            part_bbox, part_time = pending.pop(0)
+            params = {**base_params, **self._bbox_params(part_bbox), **part_time}
+            count, years = self._count(params)
+            if count == 0:
+                continue
+            if count <= ceiling or (max_records is not None and int(max_records) - planned <= ceiling):
+                partitions.append((params, count))
+                planned += count
+                continue
+
+            year_runs = self._year_runs(years, ceiling)
+            if len(year_runs) > 1 and sum(years.values()) >= count:
+                pending.extend((part_bbox, self._year_time_params(run, part_time)) for run in year_runs)
+                continue
+
+            if part_bbox is not None and min(part_bbox[2] - part_bbox[0], part_bbox[3] - part_bbox[1]) > MIN_SPLIT_DEG:
+                pending.extend((quadrant, part_time) for quadrant in self._quadrants(part_bbox))
+                continue
+
+            warnings.warn(f"GBIF partition with {count} records cannot be split further; "
+                          f"only the first {ceiling} are reachable")
+            partitions.append((params, ceiling))
+            planned += ceiling
+        return partitions
+
+    @staticmethod
+    def _year_runs(years: Dict[int, int], ceiling: int) -> List[Tuple[int, int]]:
+        """Group consecutive facet years into (first, last) runs of at most `ceiling` records"""
+        runs: List[Tuple[int, int]] = []
+        start, total = None, 0
+        for year in sorted(years):
+            if start is not None and total + years[year] > ceiling:
+                runs.append((start, prev))
+                start, total = None, 0
+            if start is None:
+                start = year
+            total += years[year]
+            prev = year
+        if start is not None:
+            runs.append((start, prev))
+        return runs
+
+    @staticmethod
+    def _year_time_params(run: Tuple[int, int], time_params: Dict[str, str]) -> Dict[str, str]:
+        """Time parameters for a run of years, clipped to the partition's eventDate range"""
+        first, last = run
+        if 'eventDate' not in time_params:
+            return {'year': f"{first},{last}"}
+        start, end = time_params['eventDate'].split(',')
+        start = max(start, f"{first}-01-01")
+        end = min(end, f"{last}-12-31")
+        return {'eventDate': f"{start},{end}"}
+
+    @staticmethod
+    def _quadrants(bbox: Tuple[float, float, float, float]) -> List[Tuple[float, float, float, float]]:
+        west, south, east, north = bbox
+        mid_lon, mid_lat = (west + east) / 2, (south + north) / 2
+        return [(west, south, mid_lon, mid_lat), (mid_lon, south, east, mid_lat),
+                (west, mid_lat, mid_lon, north), (mid_lon, mid_lat, east, north)]
+
+    @staticmethod
+    def _plan_pages(partitions: List[Tuple[Dict[str, Any], int]], max_records: Optional[int]) -> List[Dict[str, Any]]:
+        """Page requests (offset/limit) covering each partition, stopping once max_records are planned"""
+        pages = []
+        budget = None if max_records is None else int(max_records)
+        for params, count in partitions:
+            wanted = count if budget is None else min(count, budget)
+            for offset in range(0, min(wanted, OFFSET_CEILING), PAGE_SIZE):
+                pages.append({**params, 'offset': offset, 'limit': min(PAGE_SIZE, wanted - offset)})
+            if budget is not None:
+                budget -= wanted
+                if budget <= 0:
+                    break
+        return pages
+
+    def _fetch_page(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """One page of occurrence records (empty, with a warning, if the request fails)"""
+        try:
+            return self._get_json(params).get('results') or []
+        except Exception as e:
+            warnings.warn(f"GBIF page at offset {params.get('offset')} failed: {e}")
             return []
-    
+
+    def _records_to_core_frame(self, records: pd.DataFrame) -> pd.DataFrame:
+        """Standardize occurrence records into core schema columns"""
+        retrieval_timestamp = datetime.now(timezone.utc).isoformat()
+
+        def col(name, default=None):
+            if name not in records.columns:
+                return pd.Series([default] * len(records), index=records.index, dtype=object)
+            return records[name].astype(object).where(records[name].notna(), default)
+
+        # Determine variable type based on kingdom
+        kingdom = col('kingdom', '')
+        variable = kingdom.map(KINGDOM_VARIABLE_NAMES).fillna("Species Occurrences")
+        taxonomy = {v["name"]: v for v in self.get_enhanced_taxonomy_metadata()}
+        var_meta = {name: taxonomy.get(name, {"name": name, "units": "count"}) for name in variable.unique()}
+
+        lat, lon = col('decimalLatitude', 0), col('decimalLongitude', 0)
+        attribute_columns = {name: col(field).tolist() for name, field in RECORD_ATTRIBUTES.items()}
+        attribute_columns["kingdom"] = kingdom.tolist()
+        attributes = []
+        for i, (var_name, key) in enumerate(zip(variable, col('key'))):
+            meta = var_meta[var_name]
+            row_attributes = {name: values[i] for name, values in attribute_columns.items()}
+            row_attributes.update({
+                "ecological_significance": meta.get("ecological_significance"),
+                "conservation_applications": meta.get("conservation_applications", []),
+                "terms": {
+                    "native_id": key,
+                    "native_name": var_name,
+                    "canonical_variable": None  # To be mapped by TermBroker
+                }
+            })
+            attributes.append(row_attributes)
+
+        return pd.DataFrame({
+            # Identity columns
+            "observation_id": "gbif_" + col('key', '').astype(str),
+            "dataset": self.DATASET,
+            "source_url": self.SOURCE_URL,
+            "source_version": self.SOURCE_VERSION,
+            "license": self.LICENSE,
+            "retrieval_timestamp": retrieval_timestamp,
+
+            # Spatial columns
+            "geometry_type": "point",
+            "latitude": pd.to_numeric(lat).to_numpy(dtype=float),
+            "longitude": pd.to_numeric(lon).to_numpy(dtype=float),
+            "geom_wkt": "POINT(" + lon.astype(str) + " " + lat.astype(str) + ")",
+            "spatial_id": None,
+            "site_name": col('locality'),
+            "admin": col('country'),
+            "elevation_m": col('elevation'),
+
+            # Temporal columns
+            "time": col('eventDate'),
+            "temporal_coverage": "occurrence_date",
+
+            # Value columns - for occurrence data, value is typically 1 (present)
+            "variable": variable,
+            "value": 1.0,  # Occurrence = presence
+            "unit": variable.map(lambda name: var_meta[name].get("units", "count")),
+            "depth_top_cm": None,
+            "depth_bottom_cm": None,
+            "qc_flag": "gbif_validated",
+
+            # Metadata columns
+            "attributes": attributes,
+            "provenance": "GBIF via " + col('publishingOrganizationKey', 'unknown publisher').astype(str),
+        })
+
     def harvest(self) -> Dict[str, Any]:
         """
         Harvest GBIF taxonomy and occurrence catalog for semantic mapping.
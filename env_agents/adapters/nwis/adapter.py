@@ -7,8 +7,9 @@ import json
 import logging
 import requests
 import pandas as pd
+from dataclasses import replace
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, IO, Tuple
 from bs4 import BeautifulSoup
 import time
 
@@ -16,10 +17,85 @@ from ..base import BaseAdapter
 from ...core.models import RequestSpec
 from ...core.config import get_config
 from ...core.errors import FetchError
+from ...core.utils_geo import bbox_from_geometry
 from ...core.adapter_mixins import StandardAdapterMixin
+from ...core.planner import AdapterLimits
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+    ijson = None
 
 logger = logging.getLogger(__name__)
 
+# Use DAILY VALUES (dv) not instantaneous (iv)
+NWIS_DV_URL = "https://waterservices.usgs.gov/nwis/dv"
+NWIS_TIMEOUT_S = 120
+MAX_BBOX_DEG2 = 25.0          # NWIS: lat range x lon range may not exceed 25 square degrees
+MAX_CONCURRENT_REQUESTS = 4   # Sub-box requests in flight
+POINT_BUFFER_M = 11100        # Point queries search a ~0.1 degree box around the point
+
+# Comprehensive list of common USGS daily value parameters
+# These are ordered by frequency/importance
+DEFAULT_PARAMETER_CODES = [
+    # Physical (most common)
+    "00060",  # Discharge/streamflow - 96% of gauges
+    "00065",  # Gage height - 64% of gauges
+    # Temperature
+    "00010",  # Water temperature - 69% of gauges
+    "00020",  # Air temperature
+    # Water quality - basic
+    "00095",  # Specific conductance - 20% of gauges
+    "00400",  # pH - 15% of gauges
+    "00300",  # Dissolved oxygen
+    # Sediment
+    "80154",  # Suspended sediment concentration
+    "80155",  # Suspended sediment discharge
+    # Turbidity
+    "63680",  # Turbidity
+    "00076",  # Turbidity (alternative)
+    # Precipitation
+    "00045",  # Precipitation
+    # Nutrients (less common but important)
+    "00665",  # Total phosphorus
+    "00666",  # Phosphate dissolved
+    "00618",  # Nitrate
+    "00631",  # NO2+NO3
+]
+
+
+def iter_time_series(stream: IO[bytes]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the value.timeSeries entries of a WaterML-JSON document one at a time.
+
+    With ijson the document is decoded incrementally, so only one series is
+    in memory at once; without it the whole document is decoded first.
+    """
+    if IJSON_AVAILABLE:
+        yield from ijson.items(stream, "value.timeSeries.item", use_float=True)
+    else:
+        yield from json.load(stream).get("value", {}).get("timeSeries", [])
+
+
+_NAIVE_WHOLE_SECONDS = r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.0*)?"
+
+
+def _iso_times(dt_str: pd.Series) -> pd.Series:
+    """ISO-8601 timestamps as isoformat() strings; unparseable values are passed through"""
+    # Fast path for NWIS's usual "2020-01-01T00:00:00.000": isoformat() is the first 19 characters
+    if dt_str.str.fullmatch(_NAIVE_WHOLE_SECONDS).all():
+        return dt_str.str.slice(0, 19)
+
+    parsed = pd.to_datetime(dt_str.str.replace("Z", "+00:00", regex=False), format="ISO8601",
+                            errors="coerce")
+    if getattr(parsed.dt, "tz", None) is not None:
+        iso = pd.Series([t.isoformat() if not pd.isna(t) else None for t in parsed], index=dt_str.index)
+    else:
+        iso = parsed.dt.strftime("%Y-%m-%dT%H:%M:%S")
+    return iso.where(parsed.notna(), dt_str.where(dt_str != "unknown", None))
+
 class USGSNWISAdapter(BaseAdapter, StandardAdapterMixin):
     """
     Enhanced USGS NWIS Adapter with Earth Engine Gold Standard level richness
@@ -33,6 +109,8 @@ class USGSNWISAdapter(BaseAdapter, StandardAdapterMixin):
     SOURCE_URL = "https://waterservices.usgs.gov/nwis"
     SOURCE_VERSION = "current"
     LICENSE = "https://www.usgs.gov/information-policies-and-instructions/acknowledging-or-crediting-usgs"
+    # Larger bboxes are split into sub-boxes by QueryPlanner
+    LIMITS = AdapterLimits(max_bbox_deg2=MAX_BBOX_DEG2, max_concurrent=MAX_CONCURRENT_REQUESTS)
 
     def __init__(self):
         """Initialize enhanced USGS NWIS adapter"""
@@ -40,6 +118,10 @@ class USGSNWISAdapter(BaseAdapter, StandardAdapterMixin):
 
         # Initialize standard components (auth, config, logging)
         self.initialize_adapter()
+        self.LIMITS = replace(self.LIMITS,
+                              max_bbox_deg2=float(self.get_service_setting("max_bbox_deg2", MAX_BBOX_DEG2)),
+                              max_concurrent=int(self.get_service_setting("max_concurrent_requests",
+                                                                          MAX_CONCURRENT_REQUESTS)))
 
         # USGS NWIS-specific initialization
         self._web_metadata_cache = None
@@ -56,7 +138,7 @@ class USGSNWISAdapter(BaseAdapter, StandardAdapterMixin):
         try:
             # Scrape main USGS water data documentation
             docs_url = "https://waterdata.usgs.gov/nwis"
-            response = requests.get(docs_url, timeout=15)
+            response = self._session.get(docs_url, timeout=15)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -67,11 +149,11 @@ class USGSNWISAdapter(BaseAdapter, StandardAdapterMixin):
             
             # Scrape parameter codes documentation
             param_url = "https://help.waterdata.usgs.gov/parameter_cd"
-            param_response = requests.get(param_url, timeout=15)
+            param_response = self._session.get(param_url, timeout=15)
             
             # Get water quality standards information
             wq_url = "https://water.usgs.gov/water-resources/water-quality/"
-            wq_response = requests.get(wq_url, timeout=15)
+            wq_response = self._session.get(wq_url, timeout=15)
             
             # Extract monitoring network information
             network_url = "https://waterdata.usgs.gov/monitoring-location"
@@ -474,66 +556,36 @@ class USGSNWISAdapter(BaseAdapter, StandardAdapterMixin):
     def _fetch_rows(self, spec: RequestSpec) -> List[Dict]:
         """
         Fetch data with enhanced attributes matching Earth Engine richness
-        Returns list of dicts with comprehensive metadata preserved
+        Returns list of dicts with comprehensive metadata preserved (prefer fetch(), which stays columnar)
+        """
+        frame = self._fetch_frame(spec)
+        if frame.empty:
+            return []
+        return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+    def _fetch_frame(self, spec: RequestSpec) -> pd.DataFrame:
+        """
+        Fetch daily values as core schema columns.
+
+        The bbox must fit NWIS limits; QueryPlanner splits larger ones along
+        LIMITS. The response is decoded incrementally one time series at a
+        time (see iter_time_series) and every series becomes one columnar
+        batch, so a response is never held in full.
         """
         # Implement USGS NWIS API calls directly
         try:
             # Get comprehensive list of parameters if not specified
             # If spec.variables is None, we query for a comprehensive set of common parameters
             # to maximize data retrieval while keeping response manageable
-            if spec.variables is None:
-                # Comprehensive list of common USGS daily value parameters
-                # These are ordered by frequency/importance
-                default_params = [
-                    # Physical (most common)
-                    "00060",  # Discharge/streamflow - 96% of gauges
-                    "00065",  # Gage height - 64% of gauges
-                    # Temperature
-                    "00010",  # Water temperature - 69% of gauges
-                    "00020",  # Air temperature
-                    # Water quality - basic
-                    "00095",  # Specific conductance - 20% of gauges
-                    "00400",  # pH - 15% of gauges
-                    "00300",  # Dissolved oxygen
-                    # Sediment
-                    "80154",  # Suspended sediment concentration
-                    "80155",  # Suspended sediment discharge
-                    # Turbidity
-                    "63680",  # Turbidity
-                    "00076",  # Turbidity (alternative)
-                    # Precipitation
-                    "00045",  # Precipitation
-                    # Nutrients (less common but important)
-                    "00665",  # Total phosphorus
-                    "00666",  # Phosphate dissolved
-                    "00618",  # Nitrate
-                    "00631",  # NO2+NO3
-                ]
-                params = default_params
-            else:
-                params = spec.variables
-
-            # Build USGS NWIS API URL - use DAILY VALUES (dv) not instantaneous (iv)
-            base_url = "https://waterservices.usgs.gov/nwis/dv"
-
-            # Get bbox from geometry
-            if spec.geometry.type == "bbox":
-                coords = spec.geometry.coordinates
-                bbox = [coords[0], coords[1], coords[2], coords[3]]  # minlon, minlat, maxlon, maxlat
-            elif spec.geometry.type == "point":
-                lon, lat = spec.geometry.coordinates
-                # Add small buffer for point queries
-                bbox = [lon - 0.1, lat - 0.1, lon + 0.1, lat + 0.1]
-            else:
-                raise ValueError(f"Unsupported geometry type: {spec.geometry.type}")
+            params = DEFAULT_PARAMETER_CODES if spec.variables is None else spec.variables
 
-            # Convert parameter codes to comma-separated string
-            param_codes = ",".join(params) if isinstance(params, list) else str(params)
+            # Get bbox from geometry (minlon, minlat, maxlon, maxlat); points get a small buffer
+            bbox = bbox_from_geometry(spec.geometry.type, spec.geometry.coordinates, radius_m=POINT_BUFFER_M)
 
+            # Convert parameter codes to comma-separated string
             url_params = {
                 "format": "json",
-                "parameterCd": param_codes,
-                "bBox": ",".join(map(str, bbox)),
+                "parameterCd": ",".join(params) if isinstance(params, (list, tuple)) else str(params),
                 "siteStatus": "all"  # Changed from "active" to get historical data
             }
 
@@ -542,121 +594,112 @@ class USGSNWISAdapter(BaseAdapter, StandardAdapterMixin):
                 start_date, end_date = spec.time_range
                 url_params["startDT"] = start_date
                 url_params["endDT"] = end_date
-            
-            # Make API request
-            response = requests.get(base_url, params=url_params, timeout=30)
 
-            # Handle 400 errors gracefully (usually means no data or outside US coverage)
-            if response.status_code == 400:
-                logger.debug(f"USGS NWIS returned 400 for bbox {bbox} - likely outside US coverage or no data")
-                return []  # Return empty list, not an error
+            context = {
+                "retrieval_timestamp": datetime.now(timezone.utc).isoformat(),
+                "web_metadata": self.scrape_usgs_nwis_documentation(),
+                "parameter_metadata": {p["platform_native"]: p for p in self.get_enhanced_parameter_metadata()},
+            }
 
-            response.raise_for_status()
+            frames = self._fetch_box(bbox, url_params, context)
+            if not frames:
+                return pd.DataFrame()
 
-            data = response.json()
-            time_series = data.get("value", {}).get("timeSeries", [])
+            combined = pd.concat(frames, ignore_index=True)
+            self.logger.info(f"Successfully fetched {len(combined)} observations from USGS NWIS "
+                             f"({len(frames)} time series)")
+            return combined
 
-            # If no time series data, return empty list (not an error)
-            if not time_series:
-                return []
-            
-            rows = []
-            retrieval_timestamp = datetime.now(timezone.utc).isoformat()
-            
-            for ts in time_series:
-                site_info = ts.get("sourceInfo", {})
-                site_code = site_info.get("siteCode", [{}])[0].get("value", "unknown")
-                site_name = site_info.get("siteName", "Unknown Site")
-                
-                # Get location
-                geo_location = site_info.get("geoLocation", {}).get("geogLocation", {})
-                latitude = float(geo_location.get("latitude", 0)) if geo_location.get("latitude") else None
-                longitude = float(geo_location.get("longitude", 0)) if geo_location.get("longitude") else None
-                
-                # Get parameter info
-                variable_info = ts.get("variable", {})
-                param_code = variable_info.get("variableCode", [{}])[0].get("value", "unknown")
-                param_name = variable_info.get("variableName", "Unknown Parameter")
-                unit = variable_info.get("unit", {}).get("unitAbbreviation", "unknown")
-                
-                # Get time series values
-                values = ts.get("values", [{}])[0].get("value", [])
-                
-                for value_entry in values:
-                    if not value_entry.get("value"):
-                        continue
-                        
-                    # Create observation ID
-                    dt_str = value_entry.get("dateTime", "unknown")
-                    obs_id = f"usgs_nwis_{site_code}_{param_code}_{dt_str.replace(':', '').replace('-', '').replace('T', '')}"
-                    
-                    # Parse datetime
-                    observation_time = None
-                    if dt_str != "unknown":
-                        try:
-                            observation_time = datetime.fromisoformat(dt_str.replace('Z', '+00:00')).isoformat()
-                        except:
-                            observation_time = dt_str
-                    
-                    # Create WKT geometry
-                    geom_wkt = None
-                    if latitude is not None and longitude is not None:
-                        geom_wkt = f"POINT({longitude} {latitude})"
-                    
-                    # Create enhanced row
-                    row = {
-                        "observation_id": obs_id,
-                        "dataset": self.DATASET,
-                        "source_url": response.url,
-                        "source_version": self.SOURCE_VERSION,
-                        "license": self.LICENSE,
-                        "retrieval_timestamp": retrieval_timestamp,
-                        "geometry_type": "Point" if geom_wkt else None,
-                        "latitude": latitude,
-                        "longitude": longitude,
-                        "geom_wkt": geom_wkt,
-                        "spatial_id": site_code,
-                        "site_name": site_name,
-                        "admin": "USA",  # All USGS sites are in USA
-                        "elevation_m": None,  # Not typically provided in instant values
-                        "time": observation_time,
-                        "temporal_coverage": None,
-                        "variable": param_code,
-                        "value": float(value_entry["value"]) if value_entry["value"] else None,
-                        "unit": unit,
-                        "depth_top_cm": None,
-                        "depth_bottom_cm": None,
-                        "qc_flag": value_entry.get("qualifiers", [""])[0] if value_entry.get("qualifiers") else None,
-                        "attributes": {
-                            "parameter_cd": param_code,
-                            "parameter_name": param_name,
-                            "site_code": site_code,
-                            "dataset_enhanced": True,
-                            "enhancement_level": "earth_engine_gold_standard",
-                            "web_metadata": self.scrape_usgs_nwis_documentation(),
-                            "parameter_metadata": next(
-                                (p for p in self.get_enhanced_parameter_metadata() 
-                                 if p["platform_native"] == param_code),
-                                {}
-                            ),
-                            "monitoring_network": "USGS National Water Information System",
-                            "data_quality": "USGS quality assured",
-                            "hydrologic_context": "Watershed-scale monitoring",
-                            "variable_description": variable_info.get("variableDescription"),
-                            "terms": [{"native": param_code, "canonical": None}]  # Will be mapped by TermBroker
-                        },
-                        "provenance": {
-                            "fetch_method": "usgs_nwis_instant_values_api",
-                            "api_endpoint": base_url,
-                            "enhanced_metadata": True
-                        }
-                    }
-                    rows.append(row)
-            
-            self.logger.info(f"Successfully fetched {len(rows)} observations from USGS NWIS")
-            return rows
-            
         except Exception as e:
             self.logger.error(f"Enhanced USGS NWIS fetch failed: {e}")
             # Service error - don't mask as "no data"
-            raise FetchError(f"USGS NWIS service error: {e}")
\ No newline at end of file
+            raise FetchError(f"USGS NWIS service error: {e}")
+
+    def _fetch_box(self, box: Tuple[float, float, float, float], url_params: Dict[str, Any],
+                   context: Dict[str, Any]) -> List[pd.DataFrame]:
+        """Fetch one bbox and decode it series by series into one frame per time series"""
+        params = {**url_params, "bBox": ",".join(f"{c:.7f}" for c in box)}  # NWIS allows 7 decimals
+        with self._session.get(NWIS_DV_URL, params=params, timeout=NWIS_TIMEOUT_S, stream=True) as response:
+            # Handle 400 errors gracefully (usually means no data or outside US coverage)
+            if response.status_code == 400:
+                logger.debug(f"USGS NWIS returned 400 for bbox {box} - likely outside US coverage or no data")
+                return []
+            response.raise_for_status()
+            response.raw.decode_content = True  # Let urllib3 undo gzip transfer encoding
+
+            frames = (self._series_frame(ts, response.url, context) for ts in iter_time_series(response.raw))
+            return [frame for frame in frames if frame is not None]
+
+    def _series_frame(self, ts: Dict[str, Any], source_url: str, context: Dict[str, Any]) -> Optional[pd.DataFrame]:
+        """One WaterML time series as core schema columns (attributes/provenance shared by its rows)"""
+        values = [v for v in (ts.get("values") or [{}])[0].get("value", []) if v.get("value")]
+        if not values:
+            return None
+
+        site_info = ts.get("sourceInfo", {})
+        site_code = site_info.get("siteCode", [{}])[0].get("value", "unknown")
+        site_name = site_info.get("siteName", "Unknown Site")
+
+        # Get location
+        geo_location = site_info.get("geoLocation", {}).get("geogLocation", {})
+        latitude = float(geo_location.get("latitude", 0)) if geo_location.get("latitude") else None
+        longitude = float(geo_location.get("longitude", 0)) if geo_location.get("longitude") else None
+        geom_wkt = f"POINT({longitude} {latitude})" if latitude is not None and longitude is not None else None
+
+        # Get parameter info
+        variable_info = ts.get("variable", {})
+        param_code = variable_info.get("variableCode", [{}])[0].get("value", "unknown")
+        param_name = variable_info.get("variableName", "Unknown Parameter")
+        unit = variable_info.get("unit", {}).get("unitAbbreviation", "unknown")
+
+        dt_str = pd.Series([v.get("dateTime") or "unknown" for v in values], dtype=object)
+        observation_time = _iso_times(dt_str)
+        qc_flag = [q[0] if q else None for q in (v.get("qualifiers") for v in values)]
+
+        attributes = {
+            "parameter_cd": param_code,
+            "parameter_name": param_name,
+            "site_code": site_code,
+            "dataset_enhanced": True,
+            "enhancement_level": "earth_engine_gold_standard",
+            "web_metadata": context["web_metadata"],
+            "parameter_metadata": context["parameter_metadata"].get(param_code, {}),
+            "monitoring_network": "USGS National Water Information System",
+            "data_quality": "USGS quality assured",
+            "hydrologic_context": "Watershed-scale monitoring",
+            "variable_description": variable_info.get("variableDescription"),
+            "terms": [{"native": param_code, "canonical": None}]  # Will be mapped by TermBroker
+        }
+        provenance = {
+            "fetch_method": "usgs_nwis_instant_values_api",
+            "api_endpoint": NWIS_DV_URL,
+            "enhanced_metadata": True
+        }
+
+        return pd.DataFrame({
+            "observation_id": (f"usgs_nwis_{site_code}_{param_code}_"
+                               + dt_str.str.replace(r"[:\-T]", "", regex=True)),
+            "dataset": self.DATASET,
+            "source_url": source_url,
+            "source_version": self.SOURCE_VERSION,
+            "license": self.LICENSE,
+            "retrieval_timestamp": context["retrieval_timestamp"],
+            "geometry_type": "Point" if geom_wkt else None,
+            "latitude": latitude,
+            "longitude": longitude,
+            "geom_wkt": geom_wkt,
+            "spatial_id": site_code,
+            "site_name": site_name,
+            "admin": "USA",  # All USGS sites are in USA
+            "elevation_m": None,  # Not typically provided in instant values
+            "time": observation_time,
+            "temporal_coverage": None,
+            "variable": param_code,
+            "value": pd.to_numeric(pd.Series([v["value"] for v in values]), errors="coerce").to_numpy(dtype=float),
+            "unit": unit,
+            "depth_top_cm": None,
+            "depth_bottom_cm": None,
+            "qc_flag": qc_flag,
+            "attributes": [attributes] * len(values),
+            "provenance": [provenance] * len(values),
+        })
@@ -3,6 +3,9 @@ from typing import Any, Dict, List, Optional, Tuple
 import time
 import requests
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
 from datetime import datetime, timezone
 try:
     from shapely import wkt
@@ -13,6 +16,9 @@ from ..base import BaseAdapter
 from ...core.models import RequestSpec
 from ...core.cache import global_cache
 from ...core.adapter_mixins import StandardAdapterMixin
+from ...core.rate_limit import get_rate_limiter
+from ...core.deadline import current_context, propagate
+from ...core.planner import AdapterLimits
 from ...core.metadata import (
     AssetMetadata, BandMetadata, ProviderMetadata,
     create_earth_engine_style_metadata
@@ -24,6 +30,7 @@ class OpenAQAdapter(BaseAdapter, StandardAdapterMixin):
     SOURCE_VERSION = "v3"
     LICENSE = "https://docs.openaq.org/about/about#terms-of-use"
     REQUIRES_API_KEY = True
+    LIMITS = AdapterLimits(pagination="page")
 
     _PARAM_CACHE: Optional[List[Dict[str, Any]]] = None
     
@@ -37,21 +44,15 @@ class OpenAQAdapter(BaseAdapter, StandardAdapterMixin):
         # OpenAQ-specific initialization
         self.cache = global_cache.get_service_cache(self.DATASET)
 
-        # Rate limiting: Add delay between requests to prevent 429 errors
-        self._last_request_time = 0
-        self._min_request_interval = 1.0  # 1 second between requests (increased from 500ms)
+        # Rate limiting: one limiter per process, shared by all instances and threads,
+        # so concurrent requests still respect the upstream limit (default 1 req/s)
+        requests_per_minute = self.get_rate_limit_config().get("requests_per_minute", 60)
+        self._min_request_interval = 60.0 / requests_per_minute
+        self._rate_limiter = get_rate_limiter(self.DATASET, self._min_request_interval)
 
     def _rate_limited_get(self, url, **kwargs):
         """Make GET request with rate limiting to prevent 429 errors"""
-        import time
-
-        # Ensure minimum time between requests
-        current_time = time.time()
-        time_since_last = current_time - self._last_request_time
-        if time_since_last < self._min_request_interval:
-            time.sleep(self._min_request_interval - time_since_last)
-
-        self._last_request_time = time.time()
+        self._rate_limiter.acquire()
         return self._session.get(url, **kwargs)
 
     def _get_api_key(self, extra: Optional[Dict[str, Any]]) -> str:
@@ -214,15 +215,17 @@ class OpenAQAdapter(BaseAdapter, StandardAdapterMixin):
         """
         BASE = self.SOURCE_URL
 
+        request_context = current_context()
+
         def _get(path: str, **params):
             for i in range(max_attempts):
                 r = self._rate_limited_get(f"{BASE}{path}", params=params, headers=headers, timeout=30)
                 # auth failures should surface immediately
                 if r.status_code in (401, 403):
                     r.raise_for_status()
-                # brief backoff on 5xx / 408 / 429
+                # brief backoff on 5xx / 408 / 429, while the deadline and retry budget allow
                 if r.status_code in (408, 429) or r.status_code >= 500:
-                    if i + 1 < max_attempts:
+                    if i + 1 < max_attempts and request_context.can_retry(0.5 * (2 ** i)):
                         time.sleep(0.5 * (2 ** i))
                         continue
                 r.raise_for_status()
@@ -293,159 +296,225 @@ class OpenAQAdapter(BaseAdapter, StandardAdapterMixin):
         if not locations:
             return []
 
-        # 2) From locations → sensors, filtered by wanted parameters
-        sensor_ids: List[int] = []
-        for loc in locations:
-            lid = loc.get("id")
-            if lid is None:
-                continue
-            # Use proven exponential backoff pattern for rate limiting
-            max_attempts = 3
-            for attempt in range(max_attempts):
-                r = self._rate_limited_get(f"{self.SOURCE_URL}/locations/{lid}/sensors", headers=headers, timeout=60)
+        extra = spec.extra or {}
+        per_page = min(1000, int(extra.get("per_page", 500)))
+        max_sensors = int(extra.get("max_sensors", 50))
+        max_records = extra.get("max_records")
+        max_records = int(max_records) if max_records is not None else None
+        workers = int(extra.get("max_concurrent_requests", self.get_service_setting("max_concurrent_requests", 4)))
 
-                # Auth failures surface immediately
-                if r.status_code in (401, 403):
-                    r.raise_for_status()
+        retrieval_ts = datetime.now(timezone.utc).isoformat()
+        upstream = {"dataset": self.DATASET, "endpoint": self.SOURCE_URL, "upstream_version": self.SOURCE_VERSION, "license": self.LICENSE, "citation": "OpenAQ v3"}
+        context = {
+            "spec": spec,
+            "params_wanted": params_wanted,
+            "name_to_unit": name_to_unit,
+            "discovery_strategy": discovery_strategy,
+            "retrieval_ts": retrieval_ts,
+            "upstream": upstream,
+        }
 
-                # Skip missing locations
-                if r.status_code in (422, 404):
-                    break
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="openaq") as pool:
+            # 2) From locations → sensors, filtered by wanted parameters
+            sensor_ids = self._resolve_sensors(pool, locations, headers, params_wanted, max_sensors, workers)
+            if not sensor_ids:
+                return []
 
-                # Exponential backoff on rate limits and server errors
-                if r.status_code in (408, 429) or r.status_code >= 500:
-                    if attempt + 1 < max_attempts:
-                        sleep_time = 0.5 * (2 ** attempt)  # Exponential backoff: 0.5s, 1s, 2s
-                        time.sleep(sleep_time)
-                        continue
+            # 3) Sensors → measurement pages, fetched concurrently with prefetch
+            return self._fetch_measurements(pool, sensor_ids, headers, date_from, date_to,
+                                            per_page, max_records, context)
+
+    def _get_json(self, url: str, headers: dict, params: Optional[dict] = None, timeout: int = 60,
+                  skip_statuses: Tuple[int, ...] = ()) -> Optional[Dict[str, Any]]:
+        """
+        Rate-limited GET with exponential backoff on 408/429/5xx.
+
+        Returns None for statuses in skip_statuses; auth failures raise immediately.
+        """
+        max_attempts = 3
+        request_context = current_context()
+        for attempt in range(max_attempts):
+            r = self._rate_limited_get(url, params=params, headers=headers, timeout=timeout)
+
+            # Auth failures surface immediately
+            if r.status_code in (401, 403):
+                r.raise_for_status()
+
+            if r.status_code in skip_statuses:
+                return None
+
+            # Exponential backoff on rate limits and server errors
+            if r.status_code in (408, 429) or r.status_code >= 500:
+                if attempt + 1 < max_attempts and request_context.can_retry(0.5 * (2 ** attempt)):
+                    time.sleep(0.5 * (2 ** attempt))  # 0.5s, 1s, 2s
+                    continue
 
-                # Success or final attempt - break and handle
-                break
             r.raise_for_status()
-            sjs = r.json()
-            for s in sjs.get("results", []):
-                p = (s.get("parameter") or {}).get("name")
-                if p in params_wanted and s.get("id"):
-                    sensor_ids.append(s.get("id"))
+            return r.json()
 
-        if not sensor_ids:
-            return []
+    def _resolve_sensors(self, pool: ThreadPoolExecutor, locations: List[dict], headers: dict,
+                         params_wanted: set, max_sensors: int, window: int) -> List[int]:
+        """
+        Look up sensors for up to `window` locations at once, in location order.
 
-        retrieval_ts = datetime.now(timezone.utc).isoformat()
-        upstream = {"dataset": self.DATASET, "endpoint": self.SOURCE_URL, "upstream_version": self.SOURCE_VERSION, "license": self.LICENSE, "citation": "OpenAQ v3"}
-        rows: List[Dict[str, Any]] = []
-        per_page = min(1000, int((spec.extra or {}).get("per_page", 500)))
-        max_sensors = int((spec.extra or {}).get("max_sensors", 50))
-        sensor_ids = sensor_ids[:max_sensors]
+        Stops submitting lookups once max_sensors matching sensors have been found.
+        """
+        location_ids = [loc.get("id") for loc in locations if loc.get("id") is not None]
+        get_json = propagate(self._get_json)
+
+        def submit(lid):
+            return pool.submit(get_json, f"{self.SOURCE_URL}/locations/{lid}/sensors", headers,
+                               None, 60, (404, 422))
 
-        for sid in sensor_ids:
-            q = {"limit": per_page, "page": 1}
+        pending = iter(location_ids)
+        futures = deque(submit(lid) for lid in islice(pending, max(1, window)))
+
+        sensor_ids: List[int] = []
+        try:
+            while futures and len(sensor_ids) < max_sensors:
+                sjs = futures.popleft().result()
+                for s in (sjs or {}).get("results", []):
+                    p = (s.get("parameter") or {}).get("name")
+                    if p in params_wanted and s.get("id"):
+                        sensor_ids.append(s.get("id"))
+                if len(sensor_ids) < max_sensors:
+                    futures.extend(submit(lid) for lid in islice(pending, 1))
+        finally:
+            for future in futures:
+                future.cancel()
+
+        return sensor_ids[:max_sensors]
+
+    def _fetch_measurements(self, pool: ThreadPoolExecutor, sensor_ids: List[int], headers: dict,
+                            date_from: Optional[str], date_to: Optional[str], per_page: int,
+                            max_records: Optional[int], context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Fetch measurement pages for all sensors concurrently.
+
+        Page N+1 of a sensor is requested as soon as page N arrives, before page N
+        is parsed. Rows are returned in (sensor, page) order regardless of
+        completion order, truncated to max_records.
+        """
+        get_json = propagate(self._get_json)
+
+        def submit(sid: int, page: int):
+            q = {"limit": per_page, "page": page}
             if date_from: q["date_from"] = date_from
             if date_to:   q["date_to"] = date_to
+            return pool.submit(get_json, f"{self.SOURCE_URL}/sensors/{sid}/measurements", headers, q, 90)
 
-            while True:
-                url = f"{self.SOURCE_URL}/sensors/{sid}/measurements"
-
-                # Use proven exponential backoff pattern for rate limiting
-                max_attempts = 3
-                for attempt in range(max_attempts):
-                    r = self._rate_limited_get(url, params=q, headers=headers, timeout=90)
-
-                    # Exponential backoff on rate limits and server errors
-                    if r.status_code in (408, 429) or r.status_code >= 500:
-                        if attempt + 1 < max_attempts:
-                            sleep_time = 0.5 * (2 ** attempt)  # Exponential backoff: 0.5s, 1s, 2s
-                            time.sleep(sleep_time)
-                            continue
-                    break
+        running = {submit(sid, 1): (index, sid, 1) for index, sid in enumerate(sensor_ids)}
+        pages: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+        collected = 0
 
-                r.raise_for_status()
-                js = r.json()
-                results = js.get("results", [])
-                if not results:
-                    break
-
-                for item in results:
-                    param_obj = item.get("parameter") or {}
-                    pname = param_obj.get("name")
-                    if pname not in params_wanted:
+        try:
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, sid, page = running.pop(future)
+                    js = future.result()
+                    results = js.get("results", [])
+                    if not results:
                         continue
-                    val = item.get("value")
-                    period = (item.get("period") or {})
-                    dt_to = ((period.get("datetimeTo") or {}).get("utc")) or None
-                    coords = item.get("coordinates") or {}
-                    lat = coords.get("latitude"); lon = coords.get("longitude")
-                    
-                    # Try alternative coordinate locations if not found
-                    if lat is None or lon is None:
-                        # Try from parent location or other nested structures
-                        location = item.get("location", {})
-                        if "coordinates" in location:
-                            alt_coords = location["coordinates"]
-                            if lat is None:
-                                lat = alt_coords.get("latitude")
-                            if lon is None:
-                                lon = alt_coords.get("longitude")
-                    
-                    # Final fallback: use the original geometry from the request
-                    if lat is None or lon is None:
-                        if spec.geometry.type == "point" and len(spec.geometry.coordinates) == 2:
-                            if lon is None:
-                                lon = spec.geometry.coordinates[0]
-                            if lat is None:
-                                lat = spec.geometry.coordinates[1]
-                    unit = param_obj.get("units") or name_to_unit.get(pname) or ""
-
-                    # Generate deterministic observation ID
-                    obs_id = f"openaq_{sid}_{pname}_{dt_to.replace(':', '').replace('-', '') if dt_to else 'unknown'}"
-                    
-                    # Get location metadata from item
-                    location_info = item.get("location", {})
-                    site_name = location_info.get("name") or location_info.get("label")
-                    admin_info = location_info.get("country") or location_info.get("admin")
-                    elevation = location_info.get("elevation")
-                    
-                    # Create WKT geometry
-                    geom_wkt = f"POINT({lon} {lat})" if lon is not None and lat is not None else None
-                    
-                    # Determine temporal coverage
-                    period_start = (period.get("datetimeFrom") or {}).get("utc")
-                    temporal_coverage = f"{period_start}/{dt_to}" if period_start and dt_to else dt_to
-                    
-                    rows.append({
-                        "observation_id": obs_id,
-                        "dataset": self.DATASET,
-                        "source_url": self.SOURCE_URL,
-                        "source_version": self.SOURCE_VERSION,
-                        "license": self.LICENSE,
-                        "retrieval_timestamp": retrieval_ts,
-                        "geometry_type": "point",
-                        "latitude": float(lat) if lat is not None else None,
-                        "longitude": float(lon) if lon is not None else None,
-                        "geom_wkt": geom_wkt,
-                        "spatial_id": str(sid),
-                        "site_name": site_name,
-                        "admin": admin_info,
-                        "elevation_m": float(elevation) if elevation is not None else None,
-                        "time": dt_to,
-                        "temporal_coverage": temporal_coverage,
-                        "variable": f"air:{pname}",
-                        "value": None if val is None else float(val),
-                        "unit": unit,
-                        "depth_top_cm": None,  # Not applicable for air quality
-                        "depth_bottom_cm": None,  # Not applicable for air quality
-                        "qc_flag": "ok",
-                        "attributes": {"aggregation": period.get("label") or "raw", "interval": period.get("interval"),"discovery_strategy": discovery_strategy,"native_parameter": pname},
-                        "provenance": self._prov(spec, upstream),
-                    })
 
-                meta = js.get("meta", {})
-                page = meta.get("page", q["page"]); limit = meta.get("limit", per_page); found = meta.get("found", 0)
-                if isinstance(found, str) and found.startswith(">"): found = int(found[1:])
-                if page * limit >= (found or 0): break
-                q["page"] = page + 1
+                    # Prefetch the next page before parsing this one
+                    meta = js.get("meta", {})
+                    page = meta.get("page", page); limit = meta.get("limit", per_page); found = meta.get("found", 0)
+                    if isinstance(found, str) and found.startswith(">"): found = int(found[1:])
+                    if page * limit < (found or 0) and (max_records is None or collected < max_records):
+                        running[submit(sid, page + 1)] = (index, sid, page + 1)
+
+                    rows = [row for item in results
+                            if (row := self._measurement_row(item, sid, context)) is not None]
+                    pages[(index, page)] = rows
+                    collected += len(rows)
 
-        return rows
+                if max_records is not None and collected >= max_records:
+                    break
+        finally:
+            for future in running:
+                future.cancel()
+
+        out: List[Dict[str, Any]] = []
+        for key in sorted(pages):
+            out.extend(pages[key])
+        return out[:max_records] if max_records is not None else out
+
+    def _measurement_row(self, item: Dict[str, Any], sid: int, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Convert one /measurements result to a core-schema row (None if not a wanted parameter)"""
+        spec = context["spec"]
+        param_obj = item.get("parameter") or {}
+        pname = param_obj.get("name")
+        if pname not in context["params_wanted"]:
+            return None
+        val = item.get("value")
+        period = (item.get("period") or {})
+        dt_to = ((period.get("datetimeTo") or {}).get("utc")) or None
+        coords = item.get("coordinates") or {}
+        lat = coords.get("latitude"); lon = coords.get("longitude")
+        
+        # Try alternative coordinate locations if not found
+        if lat is None or lon is None:
+            # Try from parent location or other nested structures
+            location = item.get("location", {})
+            if "coordinates" in location:
+                alt_coords = location["coordinates"]
+                if lat is None:
+                    lat = alt_coords.get("latitude")
+                if lon is None:
+                    lon = alt_coords.get("longitude")
+        
+        # Final fallback: use the original geometry from the request
+        if lat is None or lon is None:
+            if spec.geometry.type == "point" and len(spec.geometry.coordinates) == 2:
+                if lon is None:
+                    lon = spec.geometry.coordinates[0]
+                if lat is None:
+                    lat = spec.geometry.coordinates[1]
+        unit = param_obj.get("units") or context["name_to_unit"].get(pname) or ""
+
+        # Generate deterministic observation ID
+        obs_id = f"openaq_{sid}_{pname}_{dt_to.replace(':', '').replace('-', '') if dt_to else 'unknown'}"
+        
+        # Get location metadata from item
+        location_info = item.get("location", {})
+        site_name = location_info.get("name") or location_info.get("label")
+        admin_info = location_info.get("country") or location_info.get("admin")
+        elevation = location_info.get("elevation")
+        
+        # Create WKT geometry
+        geom_wkt = f"POINT({lon} {lat})" if lon is not None and lat is not None else None
+        
+        # Determine temporal coverage
+        period_start = (period.get("datetimeFrom") or {}).get("utc")
+        temporal_coverage = f"{period_start}/{dt_to}" if period_start and dt_to else dt_to
+        
+        return {
+            "observation_id": obs_id,
+            "dataset": self.DATASET,
+            "source_url": self.SOURCE_URL,
+            "source_version": self.SOURCE_VERSION,
+            "license": self.LICENSE,
+            "retrieval_timestamp": context["retrieval_ts"],
+            "geometry_type": "point",
+            "latitude": float(lat) if lat is not None else None,
+            "longitude": float(lon) if lon is not None else None,
+            "geom_wkt": geom_wkt,
+            "spatial_id": str(sid),
+            "site_name": site_name,
+            "admin": admin_info,
+            "elevation_m": float(elevation) if elevation is not None else None,
+            "time": dt_to,
+            "temporal_coverage": temporal_coverage,
+            "variable": f"air:{pname}",
+            "value": None if val is None else float(val),
+            "unit": unit,
+            "depth_top_cm": None,  # Not applicable for air quality
+            "depth_bottom_cm": None,  # Not applicable for air quality
+            "qc_flag": "ok",
+            "attributes": {"aggregation": period.get("label") or "raw", "interval": period.get("interval"),"discovery_strategy": context["discovery_strategy"],"native_parameter": pname},
+            "provenance": self._prov(spec, context["upstream"]),
+        }
 
     def harvest(self) -> List[Dict[str, Any]]:
         """
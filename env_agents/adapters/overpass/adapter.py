@@ -7,44 +7,38 @@ infrastructure context, urban planning applications, and geospatial analytics.
 
 import pandas as pd
 import requests
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timezone
 import json
 import warnings
 import time
+import random
+import re
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 from env_agents.adapters.base import BaseAdapter
 from env_agents.core.models import RequestSpec, Geometry
 from env_agents.core.adapter_mixins import StandardAdapterMixin
-from typing import Dict, List, Any, Optional, Tuple
+from env_agents.core.utils_geo import bbox_from_geometry
+from env_agents.core.deadline import current_context, propagate
+from env_agents.core.endpoints import EndpointPool, endpoint_settings, get_endpoint_pool
+from .query import Selector, compile_query, merge_selectors, selector_label
+
+
+class OverpassQueryTooLarge(Exception):
+    """Raised when an Overpass tile times out or exceeds memory/size limits and should be split"""
+    pass
 
 
 class OverpassAdapter(BaseAdapter, StandardAdapterMixin):
     def _convert_geometry_to_bbox(self, geometry: Geometry, extra: Dict[str, Any]) -> Tuple[float, float, float, float]:
         """Convert geometry to bounding box with proper radius handling"""
-        if geometry.type == "bbox":
-            return tuple(geometry.coordinates)
-        elif geometry.type == "point":
-            lon, lat = geometry.coordinates
-            radius_m = extra.get('radius', 2000)  # Default 2km radius
-            # Convert radius from meters to degrees (rough approximation)
-            radius_deg = radius_m / 111000  # ~111km per degree
-            return (lon - radius_deg, lat - radius_deg, lon + radius_deg, lat + radius_deg)  # FIXED: (west, south, east, north)
-        else:
-            raise ValueError(f"Unsupported geometry type for {self.__class__.__name__}: {geometry.type}")
+        return bbox_from_geometry(geometry.type, geometry.coordinates, extra.get('radius', 2000))  # Default 2km radius
 
 
     def _point_to_bbox(self, geometry: Geometry, radius_m: float = 1000) -> Tuple[float, float, float, float]:
         """Convert point geometry to bounding box with radius"""
-        if geometry.type == "bbox":
-            return tuple(geometry.coordinates)
-        elif geometry.type == "point":
-            lon, lat = geometry.coordinates
-            # Convert radius from meters to degrees (rough approximation)
-            radius_deg = radius_m / 111000  # ~111km per degree
-            return (lon - radius_deg, lat - radius_deg, lon + radius_deg, lat + radius_deg)
-        else:
-            raise ValueError(f"Unsupported geometry type: {geometry.type}")
+        return bbox_from_geometry(geometry.type, geometry.coordinates, radius_m)
     """
     Enhanced OpenStreetMap Overpass adapter providing Earth Engine-level metadata richness.
     
@@ -56,6 +50,16 @@ class OverpassAdapter(BaseAdapter, StandardAdapterMixin):
     SOURCE_URL = "https://overpass-api.de/api/interpreter"
     SOURCE_VERSION = "0.7.60"
     LICENSE = "https://www.openstreetmap.org/copyright"
+
+    # Adaptive tiling defaults (overridable in services.yaml)
+    MAX_TILE_DEG = 0.25          # Root tile size; split on demand
+    MIN_TILE_DEG = 0.005         # Smallest tile before giving up on a region
+    MAX_TILE_REQUESTS = 256      # Request budget per fetch
+    MAX_CONCURRENT_TILES = 4     # Cap on slots taken from /api/status
+    MAX_RESULT_MB = 64           # Server-side [maxsize] per tile
+
+    # Queried when no requested variable maps to a known feature category
+    DEFAULT_SELECTORS = (("highway", None), ("building", None))
     
     # Comprehensive OSM feature categorization
     FEATURE_CATEGORIES = {
@@ -179,9 +183,11 @@ class OverpassAdapter(BaseAdapter, StandardAdapterMixin):
         self.initialize_adapter()
 
         # Overpass-specific initialization
-        self.base_url = base_url or "https://overpass-api.de/api/interpreter"
+        self.base_url = base_url or self.get_service_setting('base_url', "https://overpass-api.de/api/interpreter")
         self._web_enhanced_cache = None
         self._feature_cache = None
+        self._slot_count = None
+        self._endpoints = None
     
     def scrape_overpass_documentation(self) -> Dict[str, Any]:
         """
@@ -196,7 +202,7 @@ class OverpassAdapter(BaseAdapter, StandardAdapterMixin):
         try:
             # OpenStreetMap about page
             osm_url = "https://www.openstreetmap.org/about"
-            response = requests.get(osm_url, timeout=10)
+            response = self._session.get(osm_url, timeout=10)
             
             enhanced_info = {
                 "description": """OpenStreetMap (OSM) is a free, editable map of the world created by millions 
@@ -478,70 +484,297 @@ class OverpassAdapter(BaseAdapter, StandardAdapterMixin):
             }
         }
     
-    def _tile_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float, step: float = 0.005):
-        """Generate small bbox tiles using your exact working pattern from test_overpass_fix.py"""
+    def _tile_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                   step: Optional[float] = None) -> List[Tuple[float, float, float, float]]:
+        """
+        Cover a bbox with root tiles no larger than step degrees on a side.
+
+        Root tiles are deliberately large; _fetch_tiles splits them further only
+        when Overpass reports they are too expensive.
+        """
+        step = step or self.get_service_setting('max_tile_deg', self.MAX_TILE_DEG)
         tiles = []
         lat = min_lat
-        while lat < max_lat and len(tiles) < 4:  # Limit to 4 tiles like your working version
+        while lat < max_lat:
             next_lat = min(lat + step, max_lat)
             lon = min_lon
-            while lon < max_lon and len(tiles) < 4:
+            while lon < max_lon:
                 next_lon = min(lon + step, max_lon)
                 tiles.append((lat, lon, next_lat, next_lon))
                 lon = next_lon
             lat = next_lat
         return tiles
-    
+
+    @staticmethod
+    def _split_tile(tile: Tuple[float, float, float, float]) -> List[Tuple[float, float, float, float]]:
+        """Split a (min_lat, min_lon, max_lat, max_lon) tile into quadrants"""
+        min_lat, min_lon, max_lat, max_lon = tile
+        mid_lat = (min_lat + max_lat) / 2
+        mid_lon = (min_lon + max_lon) / 2
+        return [
+            (min_lat, min_lon, mid_lat, mid_lon),
+            (min_lat, mid_lon, mid_lat, max_lon),
+            (mid_lat, min_lon, max_lat, mid_lon),
+            (mid_lat, mid_lon, max_lat, max_lon),
+        ]
+
+    def _status_url(self) -> str:
+        """Derive the /api/status URL from the interpreter endpoint"""
+        base = self.base_url.rstrip('/')
+        if base.endswith('/interpreter'):
+            base = base[:-len('/interpreter')]
+        return f"{base}/status"
+
+    def _available_slots(self) -> int:
+        """
+        Number of concurrent queries this client may run, from /api/status.
+
+        The status page reports "Rate limit: N" (0 = unlimited). Falls back to
+        a single slot if the page can't be read.
+        """
+        if self._slot_count is not None:
+            return self._slot_count
+
+        max_slots = self.get_service_setting('max_concurrent_tiles', self.MAX_CONCURRENT_TILES)
+        slots = 1
+        try:
+            resp = self._session.get(self._status_url(), timeout=10)
+            resp.raise_for_status()
+            match = re.search(r"Rate limit:\s*(\d+)", resp.text)
+            if match:
+                limit = int(match.group(1))
+                slots = max_slots if limit == 0 else min(limit, max_slots)
+        except requests.exceptions.RequestException as e:
+            self.logger.warning(f"Could not read Overpass status, running tiles serially: {e}")
+
+        self._slot_count = slots
+        return slots
+
+    def _endpoint_pool(self) -> EndpointPool:
+        """
+        Interpreter endpoints: base_url first, then the configured mirror_urls.
+
+        Queries go to the fastest healthy one and fail over on connection
+        errors and 429/5xx; with hedge enabled a slow query is duplicated to a
+        second mirror (see core.endpoints).
+        """
+        if self._endpoints is None:
+            mirrors = self.get_service_setting('mirror_urls') or []
+            self._endpoints = get_endpoint_pool(self.DATASET, [self.base_url, *mirrors],
+                                                **endpoint_settings(getattr(self, 'service_config', {})))
+        return self._endpoints
+
     def _overpass_query(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
-                       feature_types: List[str] = None, timeout: int = 30):
-        """Execute Overpass query with exponential backoff and retry as requested by user"""
-        import requests
-        import time
-        import random
-
-        # Use your exact working query pattern
-        query = f"""
-        [out:json][timeout:{timeout}][bbox:{min_lat},{min_lon},{max_lat},{max_lon}];
-        (
-          node["highway"];
-          way["highway"];
-          node["building"];
-          way["building"];
-        );
-        out center meta;
+                       selectors: Optional[List[Selector]] = None, mode: str = "center",
+                       timeout: Optional[int] = None):
+        """
+        Execute one Overpass tile query with exponential backoff on rate limiting.
+
+        The query is compiled from selectors (default: highway and building);
+        mode picks the output statement, see overpass.query.
+
+        Raises:
+            OverpassQueryTooLarge: The tile timed out, ran out of memory or exceeded
+                the result size cap - the caller should split it
         """
+        timeout = timeout or self.get_service_setting('query_timeout', 25)
+        max_result_mb = self.get_service_setting('max_result_mb', self.MAX_RESULT_MB)
 
-        # Debug query
-        self.logger.info(f"Overpass query: {query.strip()}")
-        self.logger.info(f"Bbox: {min_lat},{min_lon},{max_lat},{max_lon}")
+        # [maxsize] makes the server abort oversized results with an out-of-memory
+        # remark instead of streaming them back
+        query = compile_query(
+            (min_lat, min_lon, max_lat, max_lon),
+            selectors or self.DEFAULT_SELECTORS,
+            mode=mode,
+            timeout=timeout,
+            maxsize=int(max_result_mb * 1024 * 1024),
+        )
+
+        self.logger.debug(f"Overpass query: {query.strip()}")
 
-        # Exponential backoff and retry logic
         max_retries = 3
         base_delay = 1.0
+        context = current_context()
+        endpoints = self._endpoint_pool()
+
+        # Leave the server time to report its own timeout before giving up;
+        # streamed so that a losing hedge is closed before its body is read
+        def send(url):
+            return self._session.post(url, data={"data": query}, timeout=timeout + 15, stream=True)
 
         for attempt in range(max_retries):
+            delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
             try:
-                resp = requests.post("https://overpass-api.de/api/interpreter",
-                                   data={"data": query}, timeout=timeout)
-                resp.raise_for_status()
-                return resp.json()
-
-            except (requests.exceptions.RequestException, requests.exceptions.Timeout) as e:
-                if attempt == max_retries - 1:
-                    # Last attempt failed, re-raise the exception
-                    raise e
-
-                # Calculate exponential backoff delay with jitter
-                delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
+                resp = endpoints.request(send)
+            except requests.exceptions.Timeout as e:
+                # Cut short by the request deadline, not by the size of the tile
+                context.check()
+                raise OverpassQueryTooLarge(f"client timeout: {e}")
+            except requests.exceptions.RequestException as e:
+                if attempt == max_retries - 1 or not context.can_retry(delay):
+                    raise
                 self.logger.warning(f"Overpass query failed (attempt {attempt + 1}/{max_retries}), retrying in {delay:.1f}s: {e}")
                 time.sleep(delay)
+                continue
+
+            if resp.status_code in (429, 504) and attempt < max_retries - 1 and context.can_retry(delay):
+                # Rate limited or server busy - the tile itself isn't the problem
+                self.logger.warning(f"Overpass returned HTTP {resp.status_code} (attempt {attempt + 1}/{max_retries}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            if resp.status_code == 400 and self._is_overload_remark(resp.text):
+                raise OverpassQueryTooLarge(resp.text[:200])
+            resp.raise_for_status()
+
+            data = resp.json()
+            # Runtime errors arrive as HTTP 200 with a partial result and a remark
+            remark = data.get("remark") or ""
+            if self._is_overload_remark(remark):
+                raise OverpassQueryTooLarge(remark)
+            return data
+
+    @staticmethod
+    def _is_overload_remark(text: str) -> bool:
+        text = text.lower()
+        return "runtime error" in text and ("out of memory" in text or "timed out" in text)
+
+    def _fetch_tiles(self, tiles: List[Tuple[float, float, float, float]],
+                     selectors: List[Selector], mode: str = "center"
+                     ) -> List[Tuple[Tuple[float, float, float, float], List[Dict[str, Any]]]]:
+        """
+        Fetch tiles concurrently, splitting any that prove too expensive.
+
+        Runs up to the Overpass slot count at once and returns (tile, elements)
+        for every leaf tile that was fetched successfully.
+        """
+        min_tile_deg = self.get_service_setting('min_tile_deg', self.MIN_TILE_DEG)
+        max_requests = self.get_service_setting('max_tile_requests', self.MAX_TILE_REQUESTS)
+
+        results = []
+        requests_made = 0
+        pending = list(tiles)
+        context = current_context()
+        query = propagate(self._overpass_query)
+
+        with ThreadPoolExecutor(max_workers=self._available_slots(), thread_name_prefix="overpass") as pool:
+            running = {}
+            while pending or running:
+                while pending and requests_made < max_requests and not context.expired():
+                    tile = pending.pop()
+                    running[pool.submit(query, *tile, selectors, mode)] = tile
+                    requests_made += 1
+
+                if not running:
+                    reason = "deadline reached" if context.expired() else \
+                        f"request budget of {max_requests} tiles exhausted"
+                    warnings.warn(f"Overpass {reason}; {len(pending)} tiles not fetched")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    tile = running.pop(future)
+                    try:
+                        data = future.result()
+                    except OverpassQueryTooLarge as e:
+                        if tile[2] - tile[0] <= min_tile_deg and tile[3] - tile[1] <= min_tile_deg:
+                            warnings.warn(f"Overpass tile {tile} still too large at minimum size: {e}")
+                        else:
+                            self.logger.info(f"Splitting Overpass tile {tile}: {e}")
+                            pending.extend(self._split_tile(tile))
+                        continue
+                    except Exception as e:
+                        warnings.warn(f"Failed to fetch tile {tile}: {e}")
+                        continue
+
+                    results.append((tile, data.get("elements", [])))
+
+        self.logger.info(f"Overpass: {len(results)} tiles fetched with {requests_made} requests")
+        return results
+
+    @staticmethod
+    def _dedupe_elements(tile_results) -> List[Dict[str, Any]]:
+        """Union of tile elements by (type, id) - features crossing a tile border come back from every tile"""
+        elements: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+        for _, tile_elements in tile_results:
+            for element in tile_elements:
+                elements.setdefault((element.get("type"), element.get("id")), element)
+        return list(elements.values())
+
+    def _resolve_selectors(self, variables: List[str]) -> List[Selector]:
+        """
+        Map requested variables to tag selectors.
+
+        Accepts category keys ("amenity", case-insensitive) for any value of
+        the key, and capabilities() codes ("amenity=restaurant") for one value.
+        """
+        available = {category.lower(): category for category in self.FEATURE_CATEGORIES}
+        selectors = []
+        for var in variables:
+            key, _, value = var.partition('=')
+            category = available.get(key.strip().lower())
+            if category is None:
+                self.logger.warning(f"Unknown OSM feature type: {var}, available: {list(self.FEATURE_CATEGORIES)}")
+                continue
+            selectors.append((category, (value.strip(),) if value.strip() else None))
+        return merge_selectors(selectors)
+
+    def _count_rows(self, tile_results, selectors: List[Selector]) -> List[Dict[str, Any]]:
+        """One row per (tile, selector) with the feature count Overpass reported"""
+        retrieval_timestamp = datetime.now(timezone.utc).isoformat()
+        rows = []
+        for tile, tile_elements in tile_results:
+            min_lat, min_lon, max_lat, max_lon = tile
+            counts = [e for e in tile_elements if e.get("type") == "count"]
+            for selector, count in zip(selectors, counts):
+                tags = count.get("tags", {})
+                variable = selector_label(selector)
+                rows.append({
+                    "observation_id": f"osm_count_{variable}_{min_lat:.5f}_{min_lon:.5f}",
+                    "dataset": self.DATASET,
+                    "source_url": self.SOURCE_URL,
+                    "source_version": self.SOURCE_VERSION,
+                    "license": self.LICENSE,
+                    "retrieval_timestamp": retrieval_timestamp,
+                    "geometry_type": "polygon",
+                    "latitude": (min_lat + max_lat) / 2,
+                    "longitude": (min_lon + max_lon) / 2,
+                    "geom_wkt": (f"POLYGON(({min_lon} {min_lat}, {max_lon} {min_lat}, {max_lon} {max_lat}, "
+                                 f"{min_lon} {max_lat}, {min_lon} {min_lat}))"),
+                    "spatial_id": f"{min_lat:.5f},{min_lon:.5f},{max_lat:.5f},{max_lon:.5f}",
+                    "site_name": None,
+                    "admin": None,
+                    "elevation_m": None,
+                    "time": None,
+                    "temporal_coverage": "current_osm_data",
+                    "variable": variable,
+                    "value": float(tags.get("total", 0)),
+                    "unit": "count",
+                    "depth_top_cm": None,
+                    "depth_bottom_cm": None,
+                    "qc_flag": "osm_validated",
+                    "attributes": {
+                        "nodes": int(tags.get("nodes", 0)),
+                        "ways": int(tags.get("ways", 0)),
+                        "relations": int(tags.get("relations", 0)),
+                        "tile_bbox": list(tile),
+                    },
+                    "provenance": {
+                        "data_source": "OpenStreetMap",
+                        "query_method": "overpass_api_tiled_count",
+                        "spatial_resolution": "tile_aggregate",
+                        "note": "Features crossing tile borders are counted in every tile they touch"
+                    }
+                })
+        return rows
 
     def _fetch_rows(self, spec: RequestSpec) -> List[Dict[str, Any]]:
         """
-        Fetch OSM feature data via Overpass API using tiled approach.
+        Fetch OSM feature data via Overpass API using adaptive tiling.
         
-        Queries Overpass API with small tiles to avoid timeout/memory limits
-        and returns standardized geographic feature data.
+        Covers the whole requested area with large tiles that are split only
+        when Overpass times out or runs out of memory, and returns standardized
+        geographic feature data.
         """
         try:
             # Convert geometry to bounding box with smaller radius for Overpass
@@ -557,60 +790,26 @@ class OverpassAdapter(BaseAdapter, StandardAdapterMixin):
             # bbox is in format [west, south, east, north] = [min_lon, min_lat, max_lon, max_lat]
             west, south, east, north = bbox
             
-            # Limit area size - Overpass has strict limits
-            max_area_deg = 0.1  # ~10km x 10km
-            if (north - south) * (east - west) > max_area_deg:
-                # Reduce area to manageable size
-                center_lat = (north + south) / 2
-                center_lon = (east + west) / 2
-                half_size = (max_area_deg ** 0.5) / 2
-                south = center_lat - half_size
-                north = center_lat + half_size 
-                west = center_lon - half_size
-                east = center_lon + half_size
-                
-                import warnings
-                warnings.warn(f"Reduced query area to {max_area_deg} deg² for Overpass API limits")
-            
-            # Map variables to OSM feature types
-            available_features = list(self.FEATURE_CATEGORIES.keys())
-            feature_types = []
-
-            for var in variables:
-                if var in available_features:
-                    feature_types.append(var)
-                elif var.lower() in [f.lower() for f in available_features]:
-                    # Case insensitive matching
-                    feature_types.append([f for f in available_features if f.lower() == var.lower()][0])
-                else:
-                    self.logger.warning(f"Unknown OSM feature type: {var}, available: {available_features}")
-
-            if not feature_types:
+            selectors = self._resolve_selectors(variables)
+            if not selectors:
                 # Default to most common features to avoid empty query
-                feature_types = ['building', 'highway']
-            
-            # Fetch data using tiled approach
-            all_elements = []
-            tile_count = 0
-            max_tiles = 16  # Limit number of tiles
-            
-            for tile_bbox in self._tile_bbox(south, west, north, east):
-                if tile_count >= max_tiles:
-                    break
-                    
-                try:
-                    data = self._overpass_query(*tile_bbox)
-                    all_elements.extend(data.get("elements", []))
-                    tile_count += 1
-                    
-                    # Be more polite to API (increased delay for rate limiting)
-                    import time
-                    time.sleep(2)  # Increased from 1s to 2s
-                    
-                except Exception as e:
-                    import warnings
-                    warnings.warn(f"Failed to fetch tile {tile_bbox}: {e}")
-                    continue
+                selectors = list(self.DEFAULT_SELECTORS)
+            feature_types = [key for key, _ in selectors]
+
+            # Counts-only mode skips element download entirely; meta output is opt-in
+            extra = spec.extra or {}
+            if extra.get('counts_only'):
+                mode = "count"
+            elif extra.get('include_meta'):
+                mode = "meta"
+            else:
+                mode = "center"
+
+            # Fetch the full area with adaptive tiling
+            tile_results = self._fetch_tiles(self._tile_bbox(south, west, north, east), selectors, mode)
+            if mode == "count":
+                return self._count_rows(tile_results, selectors)
+            all_elements = self._dedupe_elements(tile_results)
             
             # Convert OSM elements to standardized format
             standardized_rows = []
@@ -688,6 +887,7 @@ class OverpassAdapter(BaseAdapter, StandardAdapterMixin):
                         "provenance": {
                             "data_source": "OpenStreetMap",
                             "query_method": "overpass_api_tiled",
+                            "output_mode": mode,
                             "spatial_resolution": "individual_features"
                         }
                     }
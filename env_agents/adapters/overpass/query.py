@@ -0,0 +1,98 @@
+"""
+Overpass QL compiler
+
+Turns tag selectors resolved from OverpassAdapter.FEATURE_CATEGORIES into an
+Overpass QL query, choosing the leanest output statement that still carries
+what the caller needs:
+
+    center  - tags plus a representative point per element (default)
+    meta    - as center, plus user/changeset/version/timestamp
+    count   - one aggregated count per selector, no elements at all
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# (key, values) - values None/empty selects any value of the key
+Selector = Tuple[str, Optional[Tuple[str, ...]]]
+
+OUTPUT_MODES = ("center", "meta", "count")
+
+_OUTPUT_STATEMENTS = {
+    "center": "out center;",
+    "meta": "out center meta;",
+}
+
+
+def _quote(text: str) -> str:
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def compile_selector(selector: Selector) -> str:
+    """Compile one selector to an nwr statement (nodes, ways and relations)"""
+    key, values = selector
+    if not values:
+        return f"nwr[{_quote(key)}];"
+    if len(values) == 1:
+        return f"nwr[{_quote(key)}={_quote(values[0])}];"
+    pattern = "^(" + "|".join(re.escape(v) for v in values) + ")$"
+    return f"nwr[{_quote(key)}~{_quote(pattern)}];"
+
+
+def merge_selectors(selectors: Sequence[Selector]) -> List[Selector]:
+    """
+    Merge selectors on the same key into one regex selector, preserving order.
+
+    A bare key (any value) absorbs any value-specific selectors on that key.
+    """
+    merged: Dict[str, Optional[List[str]]] = {}
+    for key, values in selectors:
+        if key in merged and merged[key] is None:
+            continue
+        if not values:
+            merged[key] = None
+            continue
+        existing = merged.setdefault(key, [])
+        existing.extend(v for v in values if v not in existing)
+    return [(key, tuple(values) if values else None) for key, values in merged.items()]
+
+
+def compile_query(bbox: Tuple[float, float, float, float], selectors: Sequence[Selector],
+                  mode: str = "center", timeout: int = 25, maxsize: Optional[int] = None) -> str:
+    """
+    Compile selectors into an Overpass QL query.
+
+    Args:
+        bbox: (min_lat, min_lon, max_lat, max_lon), Overpass order
+        selectors: Tag selectors, see merge_selectors()
+        mode: One of OUTPUT_MODES
+        timeout: Server-side [timeout] in seconds
+        maxsize: Server-side [maxsize] in bytes (None = server default)
+
+    In count mode every selector gets its own ``out count`` statement, so the
+    n-th count element in the response belongs to the n-th merged selector.
+    """
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown Overpass output mode: {mode} (expected one of {OUTPUT_MODES})")
+    if not selectors:
+        raise ValueError("At least one tag selector is required")
+
+    min_lat, min_lon, max_lat, max_lon = bbox
+    settings = f"[out:json][timeout:{int(timeout)}]"
+    if maxsize:
+        settings += f"[maxsize:{int(maxsize)}]"
+    settings += f"[bbox:{min_lat},{min_lon},{max_lat},{max_lon}];"
+
+    statements = [compile_selector(s) for s in merge_selectors(selectors)]
+    if mode == "count":
+        body = "\n".join(f"{statement} out count;" for statement in statements)
+    else:
+        body = "(\n" + "\n".join(f"  {statement}" for statement in statements) + "\n);\n" + _OUTPUT_STATEMENTS[mode]
+
+    return f"{settings}\n{body}"
+
+
+def selector_label(selector: Selector) -> str:
+    """Variable name for a selector, matching the capabilities() code format"""
+    key, values = selector
+    return f"{key}={'|'.join(values)}" if values else key
@@ -15,35 +15,46 @@ import warnings
 from env_agents.adapters.base import BaseAdapter
 from env_agents.core.models import RequestSpec, Geometry
 from env_agents.core.adapter_mixins import StandardAdapterMixin
+from env_agents.core.utils_geo import bbox_from_geometry
+from env_agents.core.errors import FetchError
 from typing import Dict, List, Any, Optional, Tuple
 
+SDA_REST_PATH = "/Tabular/post.rest"
+SDA_TIMEOUT_S = 90
+POINTS_PER_QUERY = 200   # Point -> mukey lookups unioned into one query
+MUKEYS_PER_QUERY = 500   # mukey IN (...) values per horizon query
+
+# Major-component horizons of a set of map units
+MAP_UNIT_HORIZONS_QUERY = """SELECT co.cokey, ch.chkey, co.compname, co.comppct_r, ch.hzname, ch.hzdept_r, ch.hzdepb_r, ch.om_r, ch.ph1to1h2o_r, ch.awc_r, ch.claytotal_r, ch.silttotal_r, ch.sandtotal_r, ch.dbthirdbar_r, ch.ksat_r, ch.cec7_r, mu.mukey, mu.musym, mu.muname, mu.mukind, mu.farmlndcl, sa.areasymbol, sa.areaname
+FROM sacatalog sa
+INNER JOIN legend lg ON lg.areasymbol = sa.areasymbol
+INNER JOIN mapunit mu ON mu.lkey = lg.lkey AND mu.mukey IN ({mukeys})
+INNER JOIN component co ON co.mukey = mu.mukey AND co.majcompflag = 'Yes'
+INNER JOIN chorizon ch ON ch.cokey = co.cokey
+ORDER BY mu.mukey, co.cokey, ch.hzdept_r ASC"""
+
+SOIL_PROPERTIES = [
+    {'field': 'om_r', 'name': 'soil:organic_matter', 'unit': '%'},
+    {'field': 'ph1to1h2o_r', 'name': 'soil:ph', 'unit': 'pH'},
+    {'field': 'awc_r', 'name': 'soil:available_water_capacity', 'unit': 'cm/cm'},
+    {'field': 'claytotal_r', 'name': 'soil:clay_content', 'unit': '%'},
+    {'field': 'silttotal_r', 'name': 'soil:silt_content', 'unit': '%'},
+    {'field': 'sandtotal_r', 'name': 'soil:sand_content', 'unit': '%'},
+    {'field': 'dbthirdbar_r', 'name': 'soil:bulk_density', 'unit': 'g/cm³'},
+    {'field': 'ksat_r', 'name': 'soil:saturated_hydraulic_conductivity', 'unit': 'µm/s'},
+    {'field': 'cec7_r', 'name': 'soil:cation_exchange_capacity', 'unit': 'meq/100g'}
+]
+
 
 class SSURGOAdapter(BaseAdapter, StandardAdapterMixin):
     def _convert_geometry_to_bbox(self, geometry: Geometry, extra: Dict[str, Any]) -> Tuple[float, float, float, float]:
         """Convert geometry to bounding box with proper radius handling"""
-        if geometry.type == "bbox":
-            return tuple(geometry.coordinates)
-        elif geometry.type == "point":
-            lon, lat = geometry.coordinates
-            radius_m = extra.get('radius', 2000)  # Default 2km radius
-            # Convert radius from meters to degrees (rough approximation)
-            radius_deg = radius_m / 111000  # ~111km per degree
-            return (lon - radius_deg, lat - radius_deg, lon + radius_deg, lat + radius_deg)
-        else:
-            raise ValueError(f"Unsupported geometry type for {self.__class__.__name__}: {geometry.type}")
+        return bbox_from_geometry(geometry.type, geometry.coordinates, extra.get('radius', 2000))  # Default 2km radius
 
 
     def _point_to_bbox(self, geometry: Geometry, radius_m: float = 1000) -> Tuple[float, float, float, float]:
         """Convert point geometry to bounding box with radius"""
-        if geometry.type == "bbox":
-            return tuple(geometry.coordinates)
-        elif geometry.type == "point":
-            lon, lat = geometry.coordinates
-            # Convert radius from meters to degrees (rough approximation)
-            radius_deg = radius_m / 111000  # ~111km per degree
-            return (lon - radius_deg, lat - radius_deg, lon + radius_deg, lat + radius_deg)
-        else:
-            raise ValueError(f"Unsupported geometry type: {geometry.type}")
+        return bbox_from_geometry(geometry.type, geometry.coordinates, radius_m)
     """
     Enhanced SSURGO adapter providing Earth Engine-level metadata richness.
     
@@ -67,6 +78,10 @@ class SSURGOAdapter(BaseAdapter, StandardAdapterMixin):
         self.base_url = base_url or "https://sdmdataaccess.nrcs.usda.gov"
         self._web_enhanced_cache = None
         self._parameter_cache = None
+
+        # Query point -> mukeys, and mukey -> horizon records, shared by all fetches
+        self._point_mukeys: Dict[Tuple[float, float], List[str]] = {}
+        self._mukey_cache: Dict[str, List[Dict[str, Any]]] = {}
     
     def scrape_ssurgo_documentation(self) -> Dict[str, Any]:
         """
@@ -81,7 +96,7 @@ class SSURGOAdapter(BaseAdapter, StandardAdapterMixin):
         try:
             # NRCS SSURGO main documentation
             nrcs_url = "https://www.nrcs.usda.gov/resources/data-and-reports/soil-survey-geographic-database-ssurgo"
-            response = requests.get(nrcs_url, timeout=10)
+            response = self._session.get(nrcs_url, timeout=10)
             
             enhanced_info = {
                 "description": """SSURGO (Soil Survey Geographic Database) is the most detailed level of 
@@ -468,178 +483,178 @@ class SSURGOAdapter(BaseAdapter, StandardAdapterMixin):
             }
         }
     
+    def _spec_point(self, spec: RequestSpec) -> Tuple[float, float]:
+        """Query point of a spec: the point itself, or the centre of its bbox"""
+        west, south, east, north = bbox_from_geometry(spec.geometry.type, spec.geometry.coordinates, radius_m=0)
+        return float((west + east) / 2), float((south + north) / 2)
+
+    def _run_query(self, sql: str, timeout: float) -> List[Dict[str, Any]]:
+        """Run one query through the SDA JSON REST endpoint and return its records"""
+        response = self._session.post(f"{self.base_url}{SDA_REST_PATH}",
+                                      json={"query": sql, "format": "JSON+COLUMNNAME"},
+                                      timeout=timeout)
+        if response.status_code != 200:
+            raise FetchError(f"SSURGO SDA query failed: HTTP {response.status_code} {response.text[:200]}")
+
+        # Empty results come back as an empty body or "{}"; otherwise the
+        # first row of "Table" holds the column names
+        table = (response.json() if response.content.strip() else {}).get("Table") or []
+        if not table:
+            return []
+        columns = table[0]
+        return [dict(zip(columns, values)) for values in table[1:]]
+
+    def _resolve_mukeys(self, points: List[Tuple[float, float]], chunk_size: int,
+                        timeout: float) -> Dict[Tuple[float, float], List[str]]:
+        """Map unit keys under each point, resolving up to chunk_size uncached points per query"""
+        pending = [point for point in dict.fromkeys(points) if point not in self._point_mukeys]
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            sql = "\nUNION ALL\n".join(
+                f"SELECT {i} AS pt, mukey FROM SDA_Get_Mukey_from_intersection_with_WktWgs84('point({lon} {lat})')"
+                for i, (lon, lat) in enumerate(chunk)
+            )
+            found: Dict[Tuple[float, float], List[str]] = {point: [] for point in chunk}
+            for record in self._run_query(sql, timeout):
+                mukeys = found[chunk[int(record["pt"])]]
+                if str(record["mukey"]) not in mukeys:
+                    mukeys.append(str(record["mukey"]))
+            self._point_mukeys.update(found)
+        return {point: self._point_mukeys[point] for point in points}
+
+    def _map_unit_horizons(self, mukeys: List[str], chunk_size: int,
+                           timeout: float) -> Dict[str, List[Dict[str, Any]]]:
+        """Major-component horizons per map unit, querying only mukeys not already cached"""
+        pending = [mukey for mukey in dict.fromkeys(mukeys) if mukey not in self._mukey_cache]
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            records: Dict[str, List[Dict[str, Any]]] = {mukey: [] for mukey in chunk}
+            sql = MAP_UNIT_HORIZONS_QUERY.format(mukeys=", ".join(str(int(mukey)) for mukey in chunk))
+            for record in self._run_query(sql, timeout):
+                records[str(record["mukey"])].append(record)
+            self._mukey_cache.update(records)
+        return {mukey: self._mukey_cache[mukey] for mukey in mukeys}
+
+    def fetch_batch(self, specs: List[RequestSpec],
+                    timeout_sec: Optional[float] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Fetch SSURGO soil properties for many query points with a few SDA queries
+
+        Map unit keys for all points are resolved first (POINTS_PER_QUERY point
+        lookups unioned into one query), then horizons are fetched for the
+        distinct mukeys not already cached with one ``mukey IN (...)`` join per
+        MUKEYS_PER_QUERY keys. Rows are fanned back out to every spec whose
+        point falls in that map unit, so points sharing a map unit cost one
+        property lookup between them.
+
+        Args:
+            specs: Request specs (point or bbox geometries; bboxes use their centre)
+            timeout_sec: Timeout for each SDA query
+
+        Returns:
+            List of row lists, aligned with ``specs``
+        """
+        if not specs:
+            return []
+        timeout = timeout_sec or self.get_service_setting("timeout", SDA_TIMEOUT_S)
+        points_per_query = int(self.get_service_setting("points_per_query", POINTS_PER_QUERY))
+        mukeys_per_query = int(self.get_service_setting("mukeys_per_query", MUKEYS_PER_QUERY))
+
+        points = [self._spec_point(spec) for spec in specs]
+        point_mukeys = self._resolve_mukeys(points, points_per_query, timeout)
+        horizons = self._map_unit_horizons([mukey for point in points for mukey in point_mukeys[point]],
+                                           mukeys_per_query, timeout)
+
+        retrieval_timestamp = datetime.now(timezone.utc).isoformat()
+        return [
+            [row
+             for mukey in point_mukeys[point]
+             for record in horizons[mukey]
+             for row in self._horizon_rows(record, point, retrieval_timestamp)]
+            for point in points
+        ]
+
     def _fetch_rows(self, spec: RequestSpec) -> List[Dict[str, Any]]:
         """
-        Fetch SSURGO soil data using SOAP service like user's working pattern.
-        
-        Uses the SSURGO SOAP web service to query soil properties by coordinates
-        and returns soil property data in standardized format.
+        Fetch SSURGO soil data at the spec's point (or bbox centre).
+
+        Goes through fetch_batch, so repeated points and map units are served
+        from the adapter's caches.
         """
         try:
-            # Use xmltodict (now available after user installed it)
-            import xmltodict
-            
-            # Extract coordinates from geometry
-            if spec.geometry.type == "point":
-                lon, lat = spec.geometry.coordinates
-            elif spec.geometry.type == "bbox":
-                # Use center of bbox for SOAP query (SOAP works with points)
-                west, south, east, north = spec.geometry.coordinates
-                lon = (west + east) / 2
-                lat = (south + north) / 2
-            else:
-                raise ValueError(f"Unsupported geometry type: {spec.geometry.type}")
-            
-            # Create SOAP query using user's working pattern
-            lon_lat = f"{lon} {lat}"
-            
-            # SOAP envelope for comprehensive soil properties query (user's working pattern)
-            soap_envelope = f"""<?xml version="1.0" encoding="utf-8"?>
-            <soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
-                <soap:Body>
-                    <RunQuery xmlns="http://SDMDataAccess.nrcs.usda.gov/Tabular/SDMTabularService.asmx">
-                        <Query>SELECT co.cokey, ch.chkey, co.compname, co.comppct_r, ch.hzname, ch.hzdept_r, ch.hzdepb_r, ch.om_r, ch.ph1to1h2o_r, ch.awc_r, ch.claytotal_r, ch.silttotal_r, ch.sandtotal_r, ch.dbthirdbar_r, ch.ksat_r, ch.cec7_r, mu.mukey, mu.musym, mu.muname, mu.mukind, mu.farmlndcl, sa.areasymbol, sa.areaname
-FROM sacatalog sa 
-INNER JOIN legend lg ON lg.areasymbol = sa.areasymbol 
-INNER JOIN mapunit mu ON mu.lkey = lg.lkey 
-AND mu.mukey IN (SELECT * from SDA_Get_Mukey_from_intersection_with_WktWgs84('point({lon_lat})'))
-INNER JOIN component co ON co.mukey = mu.mukey AND co.majcompflag = 'Yes'
-INNER JOIN chorizon ch ON ch.cokey = co.cokey
-ORDER BY co.cokey, ch.hzdept_r ASC</Query>
-                    </RunQuery>
-                </soap:Body>
-            </soap:Envelope>"""
-            
-            # Submit SOAP request to SSURGO service
-            soap_url = "https://SDMDataAccess.nrcs.usda.gov/Tabular/SDMTabularService.asmx"
-            headers = {
-                'Content-Type': 'text/xml; charset=utf-8',
-                'SOAPAction': 'http://SDMDataAccess.nrcs.usda.gov/Tabular/SDMTabularService.asmx/RunQuery'
-            }
-            
-            response = requests.post(soap_url, data=soap_envelope, headers=headers, timeout=30)
-            
-            if response.status_code != 200:
-                warnings.warn(f"SSURGO SOAP query failed: {response.status_code}")
-                return []
-            
-            # Parse SOAP response using xmltodict
-            response_dict = xmltodict.parse(response.content)
-            
-            try:
-                soap_body = response_dict['soap:Envelope']['soap:Body']
-                query_response = soap_body['RunQueryResponse']['RunQueryResult']
-                
-                # Handle both direct diffgram and nested structure
-                if 'diffgr:diffgram' in query_response:
-                    diffgram = query_response['diffgr:diffgram']
-                else:
-                    diffgram = query_response
-                
-                # Extract table data
-                if 'NewDataSet' in diffgram and 'Table' in diffgram['NewDataSet']:
-                    table_data = diffgram['NewDataSet']['Table']
-                    
-                    # Handle both single record and multiple records
-                    if not isinstance(table_data, list):
-                        table_data = [table_data]
-                else:
-                    return []  # No data found
-                    
-            except (KeyError, TypeError) as e:
-                warnings.warn(f"Failed to parse SSURGO SOAP response: {e}")
-                return []
-            
-            # Process SOAP response data into standardized format  
-            rows = []
-            retrieval_timestamp = datetime.now(timezone.utc).isoformat()
-            
-            # Define the soil property parameters from the SOAP query
-            soil_properties = [
-                {'field': 'om_r', 'name': 'soil:organic_matter', 'unit': '%'},
-                {'field': 'ph1to1h2o_r', 'name': 'soil:ph', 'unit': 'pH'},
-                {'field': 'awc_r', 'name': 'soil:available_water_capacity', 'unit': 'cm/cm'},
-                {'field': 'claytotal_r', 'name': 'soil:clay_content', 'unit': '%'},
-                {'field': 'silttotal_r', 'name': 'soil:silt_content', 'unit': '%'},
-                {'field': 'sandtotal_r', 'name': 'soil:sand_content', 'unit': '%'},
-                {'field': 'dbthirdbar_r', 'name': 'soil:bulk_density', 'unit': 'g/cm³'},
-                {'field': 'ksat_r', 'name': 'soil:saturated_hydraulic_conductivity', 'unit': 'µm/s'},
-                {'field': 'cec7_r', 'name': 'soil:cation_exchange_capacity', 'unit': 'meq/100g'}
-            ]
-            
-            for record in table_data:
-                # Extract horizon depth info
-                depth_top = float(record.get('hzdept_r', 0)) if record.get('hzdept_r') else 0
-                depth_bottom = float(record.get('hzdepb_r', 0)) if record.get('hzdepb_r') else 0
-                
-                # Create observations for each soil property that has a value
-                for prop in soil_properties:
-                    field_value = record.get(prop['field'])
-                    if field_value is not None and field_value != '':
-                        try:
-                            numeric_value = float(field_value)
-                            
-                            row = {
-                                # Identity columns
-                                "observation_id": f"ssurgo_{record.get('mukey', '')}_{record.get('cokey', '')}_{prop['field']}_{depth_top}",
-                                "dataset": self.DATASET,
-                                "source_url": self.SOURCE_URL,
-                                "source_version": self.SOURCE_VERSION,
-                                "license": self.LICENSE,
-                                "retrieval_timestamp": retrieval_timestamp,
-                                
-                                # Spatial columns
-                                "geometry_type": "point",
-                                "latitude": lat,  # Use query coordinates
-                                "longitude": lon,
-                                "geom_wkt": f"POINT({lon} {lat})",
-                                "spatial_id": record.get('mukey', ''),  # Map unit key
-                                "site_name": record.get('muname', ''),   # Map unit name
-                                "admin": record.get('areaname', 'United States'),
-                                "elevation_m": None,
-                                
-                                # Temporal columns  
-                                "time": None,  # SSURGO is essentially static
-                                "temporal_coverage": "survey_date",
-                                
-                                # Value columns
-                                "variable": prop['name'],
-                                "value": numeric_value,
-                                "unit": prop['unit'],
-                                "depth_top_cm": depth_top,
-                                "depth_bottom_cm": depth_bottom,
-                                "qc_flag": "survey_grade",
-                                
-                                # Metadata columns
-                                "attributes": {
-                                    "mukey": record.get('mukey', ''),
-                                    "musym": record.get('musym', ''), 
-                                    "muname": record.get('muname', ''),
-                                    "compname": record.get('compname', ''),
-                                    "comppct_r": record.get('comppct_r', ''),
-                                    "cokey": record.get('cokey', ''),
-                                    "chkey": record.get('chkey', ''),
-                                    "hzname": record.get('hzname', ''),
-                                    "parameter_code": prop['field'],
-                                    "areasymbol": record.get('areasymbol', ''),
-                                    "areaname": record.get('areaname', ''),
-                                    "terms": [f"SSURGO:{prop['field']}"]
-                                },
-                                "provenance": f"USDA NRCS SSURGO via SOAP service"
-                            }
-                            
-                            rows.append(row)
-                            
-                        except ValueError:
-                            # Skip non-numeric values
-                            continue
-            
-            return rows
-            
+            return self.fetch_batch([spec], timeout_sec=(spec.extra or {}).get("timeout"))[0]
         except Exception as e:
             warnings.warn(f"SSURGO fetch error: {str(e)}")
             return []
-    
+
+    def _horizon_rows(self, record: Dict[str, Any], point: Tuple[float, float],
+                      retrieval_timestamp: str) -> List[Dict[str, Any]]:
+        """One row per soil property with a numeric value in a horizon record"""
+        lon, lat = point
+        depth_top = float(record.get('hzdept_r') or 0)
+        depth_bottom = float(record.get('hzdepb_r') or 0)
+
+        rows = []
+        for prop in SOIL_PROPERTIES:
+            field_value = record.get(prop['field'])
+            if field_value is None or field_value == '':
+                continue
+            try:
+                numeric_value = float(field_value)
+            except ValueError:
+                # Skip non-numeric values
+                continue
+
+            rows.append({
+                # Identity columns
+                "observation_id": f"ssurgo_{record.get('mukey', '')}_{record.get('cokey', '')}_{prop['field']}_{depth_top}",
+                "dataset": self.DATASET,
+                "source_url": self.SOURCE_URL,
+                "source_version": self.SOURCE_VERSION,
+                "license": self.LICENSE,
+                "retrieval_timestamp": retrieval_timestamp,
+
+                # Spatial columns
+                "geometry_type": "point",
+                "latitude": lat,  # Use query coordinates
+                "longitude": lon,
+                "geom_wkt": f"POINT({lon} {lat})",
+                "spatial_id": record.get('mukey', ''),  # Map unit key
+                "site_name": record.get('muname', ''),   # Map unit name
+                "admin": record.get('areaname', 'United States'),
+                "elevation_m": None,
+
+                # Temporal columns
+                "time": None,  # SSURGO is essentially static
+                "temporal_coverage": "survey_date",
+
+                # Value columns
+                "variable": prop['name'],
+                "value": numeric_value,
+                "unit": prop['unit'],
+                "depth_top_cm": depth_top,
+                "depth_bottom_cm": depth_bottom,
+                "qc_flag": "survey_grade",
+
+                # Metadata columns
+                "attributes": {
+                    "mukey": record.get('mukey', ''),
+                    "musym": record.get('musym', ''),
+                    "muname": record.get('muname', ''),
+                    "compname": record.get('compname', ''),
+                    "comppct_r": record.get('comppct_r', ''),
+                    "cokey": record.get('cokey', ''),
+                    "chkey": record.get('chkey', ''),
+                    "hzname": record.get('hzname', ''),
+                    "parameter_code": prop['field'],
+                    "areasymbol": record.get('areasymbol', ''),
+                    "areaname": record.get('areaname', ''),
+                    "terms": [f"SSURGO:{prop['field']}"]
+                },
+                "provenance": "USDA NRCS SSURGO via Soil Data Access REST service"
+            })
+        return rows
+
     def harvest(self) -> Dict[str, Any]:
         """
         Harvest SSURGO parameter catalog for semantic mapping.
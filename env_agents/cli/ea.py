@@ -8,6 +8,8 @@ def main():
     sub = parser.add_subparsers(dest="cmd")
     sub.add_parser("list", help="List registered adapters")
     sub.add_parser("caps", help="Print capabilities JSON")
+    compile_parser = sub.add_parser("compile-mappings", help="Compile native->canonical mapping artifacts")
+    compile_parser.add_argument("datasets", nargs="*", help="Datasets to compile (default: all registered adapters)")
     args = parser.parse_args()
     router = EnvRouter(args.base_dir)
 
@@ -33,6 +35,11 @@ def main():
         print("\n".join(router.list_adapters()))
     elif args.cmd == "caps":
         print(json.dumps(router.capabilities(), indent=2))
+    elif args.cmd == "compile-mappings":
+        from ..core.mappings import compile_mappings
+        artifacts = compile_mappings(router.registry, args.datasets or router.list_adapters())
+        for dataset, artifact in artifacts.items():
+            print(f"{dataset}\t{artifact.version}\t{len(artifact.table)} mappings")
     else:
         parser.print_help()
 
@@ -4,6 +4,8 @@ Provides intelligent caching for metadata, parameter lists, and geographic data
 """
 
 import json
+import os
+import tempfile
 import time
 import hashlib
 import logging
@@ -111,8 +113,7 @@ class ServiceCache:
             }
             
             # Write back to file
-            with open(cache_file, 'w') as f:
-                json.dump(cache_data, f, indent=2, default=str)
+            self._write_cache_file(cache_file, cache_data)
             
             self.logger.debug(f"Cached '{key}' in {cache_type} with TTL {ttl}s")
             
@@ -184,8 +185,7 @@ class ServiceCache:
                 if key in cache_data:
                     del cache_data[key]
                     
-                    with open(cache_file, 'w') as f:
-                        json.dump(cache_data, f, indent=2, default=str)
+                    self._write_cache_file(cache_file, cache_data)
                     
                     self.logger.info(f"Invalidated '{key}' from {cache_type} cache")
                 
@@ -223,8 +223,7 @@ class ServiceCache:
                     removed_count += 1
                 
                 if expired_keys:
-                    with open(cache_file, 'w') as f:
-                        json.dump(cache_data, f, indent=2, default=str)
+                    self._write_cache_file(cache_file, cache_data)
                     
                     self.logger.info(f"Removed {len(expired_keys)} expired entries from {cache_type}")
                 
@@ -285,6 +284,18 @@ class ServiceCache:
         else:
             raise ValueError(f"Unknown cache type: {cache_type}")
     
+    def _write_cache_file(self, cache_file: Path, cache_data: Dict[str, Any]) -> None:
+        """Write a cache file atomically, so concurrent readers and writers never see a partial file"""
+        fd, tmp = tempfile.mkstemp(dir=cache_file.parent, prefix=f".{cache_file.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(cache_data, f, indent=2, default=str)
+            os.replace(tmp, cache_file)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
     def _is_expired(self, entry: Dict[str, Any]) -> bool:
         """Check if cache entry is expired"""
         timestamp = entry.get('timestamp', 0)
@@ -0,0 +1,228 @@
+"""
+Per-service circuit breakers
+
+A service that keeps failing is taken out of rotation instead of making
+every caller wait out its timeouts. Each breaker watches the outcomes of
+recent fetches:
+
+- closed: requests flow; once ``failure_threshold`` of the last ``window``
+  outcomes failed (and at least ``failure_rate`` of them), it opens
+- open: requests are refused immediately for ``reset_timeout_s``
+- half-open: after the cooldown a single probe is let through (callers make
+  it cheap: one attempt, short deadline). Success closes the breaker;
+  failure reopens it with the cooldown doubled, up to ``max_reset_timeout_s``
+
+Breakers are shared by every thread through get_circuit_breakers(). With a
+``state_path`` the open/closed state is saved on every transition and
+reloaded at start-up, so a restarted process doesn't hammer a service that
+was already known to be down.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BreakerState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Thread-safe closed/open/half-open breaker for one service"""
+
+    def __init__(self, service: str, failure_threshold: int = 5, failure_rate: float = 0.5,
+                 window: int = 20, reset_timeout_s: float = 60.0, max_reset_timeout_s: float = 900.0,
+                 on_transition=None):
+        """
+        Args:
+            service: Service ID, for logging and persistence
+            failure_threshold: Failures among the last `window` outcomes that open the breaker
+            failure_rate: Minimum failed fraction of those outcomes
+            window: Outcomes remembered while closed
+            reset_timeout_s: First cooldown before a half-open probe
+            max_reset_timeout_s: Cap for the cooldown, which doubles on every failed probe
+            on_transition: Called with the breaker after every state change
+        """
+        self.service = service
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.failure_rate = float(failure_rate)
+        self.base_reset_timeout_s = float(reset_timeout_s)
+        self.max_reset_timeout_s = max(float(max_reset_timeout_s), self.base_reset_timeout_s)
+        self.on_transition = on_transition
+
+        self.state = BreakerState.CLOSED
+        self.reset_timeout_s = self.base_reset_timeout_s
+        self.opened_at: Optional[float] = None  # Wall clock, so it survives a restart
+        self._outcomes: deque = deque(maxlen=max(int(window), self.failure_threshold))
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> Optional[str]:
+        """
+        Ask to send a request
+
+        Returns "closed" for normal traffic, "probe" for the single half-open
+        trial request (keep it cheap), or None when the request must not be sent.
+        """
+        with self._lock:
+            if self.state is BreakerState.CLOSED:
+                return "closed"
+            if self.state is BreakerState.OPEN:
+                if time.time() < self.opened_at + self.reset_timeout_s:
+                    return None
+                self._transition(BreakerState.HALF_OPEN)
+            if self._probe_in_flight:
+                return None
+            self._probe_in_flight = True
+            return "probe"
+
+    def record_success(self):
+        with self._lock:
+            self._probe_in_flight = False
+            if self.state is not BreakerState.CLOSED:
+                self.reset_timeout_s = self.base_reset_timeout_s
+                self._outcomes.clear()
+                self._transition(BreakerState.CLOSED)
+            else:
+                self._outcomes.append(False)
+
+    def record_failure(self):
+        with self._lock:
+            self._probe_in_flight = False
+            if self.state is BreakerState.HALF_OPEN:
+                self.reset_timeout_s = min(self.reset_timeout_s * 2, self.max_reset_timeout_s)
+                self._open()
+            elif self.state is BreakerState.CLOSED:
+                self._outcomes.append(True)
+                failures = sum(self._outcomes)
+                if failures >= self.failure_threshold and failures / len(self._outcomes) >= self.failure_rate:
+                    self._open()
+
+    def release(self):
+        """Give back a probe whose outcome says nothing about the service (e.g. a rejected request)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed (0 unless open)"""
+        if self.state is not BreakerState.OPEN or self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout_s - time.time())
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "opened_at": self.opened_at,
+            "reset_timeout_s": self.reset_timeout_s,
+            "recent_failures": sum(self._outcomes),
+            "recent_outcomes": len(self._outcomes),
+        }
+
+    def restore(self, saved: Dict[str, Any]):
+        """Resume from snapshot(); a breaker that was half-open resumes open"""
+        with self._lock:
+            state = BreakerState(saved.get("state", "closed"))
+            if state is BreakerState.CLOSED or saved.get("opened_at") is None:
+                return
+            self.state = BreakerState.OPEN
+            self.opened_at = float(saved["opened_at"])
+            self.reset_timeout_s = float(saved.get("reset_timeout_s", self.base_reset_timeout_s))
+
+    def _open(self):
+        self.opened_at = time.time()
+        self._outcomes.clear()
+        self._transition(BreakerState.OPEN)
+
+    def _transition(self, state: BreakerState):
+        previous, self.state = self.state, state
+        logger.info(f"Circuit breaker for {self.service}: {previous.value} -> {state.value}"
+                    + (f" for {self.reset_timeout_s:.0f}s" if state is BreakerState.OPEN else ""))
+        if self.on_transition:
+            self.on_transition(self)
+
+
+class CircuitBreakerRegistry:
+    """One CircuitBreaker per service, optionally persisted to a JSON file"""
+
+    def __init__(self, state_path: Optional[Path] = None, probe_timeout_s: float = 10.0, **breaker_settings):
+        """
+        Args:
+            state_path: JSON file that keeps breaker state across restarts
+            probe_timeout_s: Deadline callers give a half-open probe
+            breaker_settings: CircuitBreaker keyword arguments applied to every service
+        """
+        self.state_path = Path(state_path) if state_path else None
+        self.probe_timeout_s = float(probe_timeout_s)
+        self.breaker_settings = breaker_settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.RLock()
+        self._saved = self._load()
+
+    def get(self, service: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(service)
+            if breaker is None:
+                breaker = CircuitBreaker(service, on_transition=self._on_transition, **self.breaker_settings)
+                if service in self._saved:
+                    breaker.restore(self._saved[service])
+                self._breakers[service] = breaker
+            return breaker
+
+    def is_open(self, service: str) -> bool:
+        """True while the service is refusing requests (open and still cooling down)"""
+        breaker = self.get(service)
+        return breaker.state is BreakerState.OPEN and breaker.retry_after() > 0
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {service: breaker.snapshot() for service, breaker in self._breakers.items()}
+
+    def _on_transition(self, breaker: CircuitBreaker):
+        if self.state_path is None:
+            return
+        with self._lock:
+            self._saved[breaker.service] = breaker.snapshot()
+            try:
+                self.state_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.state_path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(self._saved, indent=2))
+                tmp.replace(self.state_path)
+            except OSError as e:
+                logger.warning(f"Could not save circuit breaker state to {self.state_path}: {e}")
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self.state_path is None or not self.state_path.exists():
+            return {}
+        try:
+            return json.loads(self.state_path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable circuit breaker state {self.state_path}: {e}")
+            return {}
+
+
+_BREAKERS: Optional[CircuitBreakerRegistry] = None
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_circuit_breakers() -> CircuitBreakerRegistry:
+    """Return the process-wide breakers, configured from the circuit_breaker section of defaults.yaml"""
+    global _BREAKERS
+    with _BREAKERS_LOCK:
+        if _BREAKERS is None:
+            try:
+                from .config import get_config
+                settings = dict(get_config().get_circuit_breaker_config() or {})
+            except Exception as e:
+                logger.warning(f"Circuit breaker config unavailable, using defaults: {e}")
+                settings = {}
+            _BREAKERS = CircuitBreakerRegistry(**settings)
+        return _BREAKERS
@@ -158,6 +158,14 @@ class ConfigManager:
             'auto_refresh': True
         })
     
+    def get_http_config(self) -> Dict[str, Any]:
+        """Get shared HTTP transport configuration (pool sizes, HTTP/2, per-host limits)"""
+        return self._defaults.get('http', {})
+
+    def get_circuit_breaker_config(self) -> Dict[str, Any]:
+        """Get per-service circuit breaker settings (thresholds, cooldown, state file)"""
+        return self._defaults.get('circuit_breaker', {})
+
     def get_data_paths(self) -> Dict[str, Path]:
         """Get standardized data directory paths"""
         return {
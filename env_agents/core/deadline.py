@@ -0,0 +1,196 @@
+"""
+Request deadlines and retry budgets
+
+Several layers can retry the same call: the acquisition script, the
+resilient fetcher, adapter backoff loops. Left alone, their attempts
+multiply. A RequestContext carries one absolute deadline and the service's
+RetryBudget through all of them:
+
+    with request_context(timeout_s=120, service="OSM_Overpass"):
+        adapter.fetch(spec)
+
+Every layer asks the active context before retrying (ctx.can_retry(delay))
+and bounds its socket timeouts by ctx.timeout(). A retry is allowed only if
+it can start before the deadline and the service's budget has a token left.
+The budget refills by ``ratio`` tokens per request sent, so retries stay a
+bounded fraction of traffic (ratio=0.1 is at most ~10% extra load) however
+many layers retry. With no active context, behaviour is unchanged: no
+deadline, and every retry is allowed.
+
+Contexts are per thread (contextvars); wrap functions handed to an executor
+with propagate() so that worker threads share the caller's context.
+"""
+
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, Optional
+
+from .errors import DeadlineExceeded
+
+DEFAULT_BUDGET_RATIO = 0.1   # Retry tokens earned per request sent
+DEFAULT_BUDGET_RESERVE = 10  # Tokens a service starts with, so a cold service may still retry
+DEFAULT_BUDGET_MAX = 20      # Tokens that can be banked
+
+
+class RetryBudget:
+    """Thread-safe token bucket: requests deposit ``ratio`` tokens, each retry spends one"""
+
+    def __init__(self, ratio: float = DEFAULT_BUDGET_RATIO, reserve: float = DEFAULT_BUDGET_RESERVE,
+                 max_tokens: float = DEFAULT_BUDGET_MAX):
+        """
+        Args:
+            ratio: Tokens deposited per request sent
+            reserve: Tokens available at start
+            max_tokens: Cap on banked tokens
+        """
+        self.ratio = max(0.0, float(ratio))
+        self.max_tokens = max(float(max_tokens), float(reserve))
+        self._tokens = float(reserve)
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def record_request(self):
+        """Deposit the per-request share"""
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take one token for a retry; False when the budget is exhausted"""
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+_BUDGETS: Dict[str, RetryBudget] = {}
+_BUDGETS_LOCK = threading.Lock()
+
+
+def get_retry_budget(service: str) -> RetryBudget:
+    """Return the process-wide retry budget of a service, sized from config on first use"""
+    with _BUDGETS_LOCK:
+        budget = _BUDGETS.get(service)
+        if budget is None:
+            budget = _BUDGETS[service] = RetryBudget(**_budget_settings(service))
+        return budget
+
+
+def _budget_settings(service: str) -> Dict[str, float]:
+    """http.retry_budget from defaults.yaml, overridden by the service's retry_budget_* settings"""
+    try:
+        from .config import get_config
+        config = get_config()
+        settings = dict(config.get_http_config().get("retry_budget") or {})
+        service_config = config.get_services_config().get(service) or {}
+    except Exception:
+        return {}
+    settings.update({key[len("retry_budget_"):]: value for key, value in service_config.items()
+                     if key.startswith("retry_budget_")})
+    return {key: float(settings[key]) for key in ("ratio", "reserve", "max_tokens") if key in settings}
+
+
+@dataclass(frozen=True)
+class RequestContext:
+    """Absolute deadline (time.monotonic) and retry budget shared by every layer of one request"""
+    deadline: Optional[float] = None
+    service: Optional[str] = None
+    budget: Optional[RetryBudget] = None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None without a deadline"""
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def check(self):
+        """Raise DeadlineExceeded once the deadline has passed"""
+        if self.expired():
+            raise DeadlineExceeded(f"{self.service or 'request'}: deadline exceeded")
+
+    def timeout(self, default: Optional[float] = None) -> Optional[float]:
+        """default bounded by the time left; raises DeadlineExceeded when none is"""
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return remaining if default is None else min(default, remaining)
+
+    def record_request(self):
+        if self.budget is not None:
+            self.budget.record_request()
+
+    def can_retry(self, delay: float = 0.0) -> bool:
+        """
+        Whether a retry after ``delay`` seconds is allowed
+
+        False if it would start after the deadline or the service's budget
+        is spent; otherwise takes a budget token.
+        """
+        remaining = self.remaining()
+        if remaining is not None and remaining <= delay:
+            return False
+        return self.budget is None or self.budget.try_spend()
+
+    def sleep(self, delay: float):
+        """Sleep for delay, but never past the deadline"""
+        remaining = self.remaining()
+        time.sleep(max(0.0, delay if remaining is None else min(delay, remaining)))
+
+
+_NO_CONTEXT = RequestContext()
+_CURRENT: contextvars.ContextVar = contextvars.ContextVar("env_agents_request_context", default=_NO_CONTEXT)
+
+
+def current_context() -> RequestContext:
+    """The active RequestContext (an unbounded one when none is active)"""
+    return _CURRENT.get()
+
+
+@contextmanager
+def request_context(timeout_s: Optional[float] = None, service: Optional[str] = None) -> Iterator[RequestContext]:
+    """
+    Activate a context for the enclosed calls
+
+    The deadline is the earlier of the enclosing context's deadline and
+    now + timeout_s, so inner layers can only tighten it. The budget is the
+    named service's (or the enclosing one when service is None).
+    """
+    parent = current_context()
+    deadline = parent.deadline
+    if timeout_s is not None:
+        own = time.monotonic() + float(timeout_s)
+        deadline = own if deadline is None else min(deadline, own)
+    if service is not None and service != parent.service:
+        context = RequestContext(deadline, service, get_retry_budget(service))
+    else:
+        context = RequestContext(deadline, parent.service, parent.budget)
+
+    token = _CURRENT.set(context)
+    try:
+        yield context
+    finally:
+        _CURRENT.reset(token)
+
+
+def propagate(fn: Callable) -> Callable:
+    """Wrap fn so it runs under the caller's context in whichever thread calls it"""
+    context = current_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _CURRENT.set(context)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _CURRENT.reset(token)
+    return wrapper
@@ -15,6 +15,7 @@ from datetime import datetime
 
 from .service_registry import ServiceRegistry
 from .metadata_schema import ServiceMetadata, VariableInfo
+from .search_index import SearchHit, SearchIndex, tokenize
 
 logger = logging.getLogger(__name__)
 
@@ -108,6 +109,14 @@ class SemanticDiscoveryEngine:
         self.registry = registry
         self._variable_aliases = self._build_variable_aliases()
         self._domain_keywords = self._build_domain_keywords()
+
+        # Text and variable matching go through the registry's BM25 index,
+        # which register_service keeps up to date
+        self.index = getattr(registry, 'search_index', None)
+        if self.index is None:
+            self.index = SearchIndex()
+            for metadata in registry.get_all_metadata().values():
+                self.index.index_service(metadata)
         
     def discover(self, query: Union[str, DiscoveryQuery]) -> List[SearchResult]:
         """
@@ -125,15 +134,24 @@ class SemanticDiscoveryEngine:
             
         # Get candidate services
         candidates = self._get_candidates(query)
-        
+
+        # One index lookup per query, not a pass over every service's text
+        text_hits = self.index.search_services(query.query_text) if query.query_text else {}
+        text_top = max((hit.score for hit in text_hits.values()), default=0.0)
+        variable_matches = self._match_variables(query.variables) if query.variables else {}
+
         # Score and rank candidates
         results = []
         for service_id in candidates:
             metadata = self.registry.get_service(service_id)
             if not metadata:
                 continue
-                
-            result = self._score_service(metadata, query)
+
+            text_matches = (self._match_text_query(query.query_text, metadata,
+                                                   text_hits.get(service_id), text_top)
+                            if query.query_text else [])
+            result = self._score_service(metadata, query, text_matches,
+                                         variable_matches.get(service_id, []))
             if result.relevance_score > 0:
                 results.append(result)
         
@@ -159,11 +177,9 @@ class SemanticDiscoveryEngine:
         )
         
         results = []
-        for service_id, metadata in self.registry.get_all_metadata().items():
-            matches = self._match_variables([variable], metadata.capabilities.variables, 
-                                          canonical_only=canonical_only)
-            
-            if matches:
+        for service_id, matches in self._match_variables([variable], canonical_only=canonical_only).items():
+            metadata = self.registry.get_service(service_id)
+            if metadata:
                 relevance_score = max(score for _, _, score in matches)
                 result = SearchResult(
                     service_id=service_id,
@@ -345,21 +361,11 @@ class SemanticDiscoveryEngine:
             
         return candidates
     
-    def _score_service(self, metadata: ServiceMetadata, 
-                      query: DiscoveryQuery) -> SearchResult:
-        """Score a service against a discovery query"""
-        matches = []
-        
-        # Text query matching
-        if query.query_text:
-            text_matches = self._match_text_query(query.query_text, metadata)
-            matches.extend(text_matches)
-        
-        # Variable matching
-        if query.variables:
-            var_matches = self._match_variables(query.variables, 
-                                              metadata.capabilities.variables)
-            matches.extend(var_matches)
+    def _score_service(self, metadata: ServiceMetadata, query: DiscoveryQuery,
+                       text_matches: List[Tuple[MatchType, str, float]],
+                       variable_matches: List[Tuple[MatchType, str, float]]) -> SearchResult:
+        """Score a service against a discovery query, given its text and variable matches"""
+        matches = list(text_matches) + list(variable_matches)
         
         # Spatial matching
         if query.bbox or query.spatial_coverage:
@@ -404,84 +410,83 @@ class SemanticDiscoveryEngine:
             reason=reason
         )
     
-    def _match_text_query(self, query_text: str, 
-                         metadata: ServiceMetadata) -> List[Tuple[MatchType, str, float]]:
-        """Match text query against service metadata"""
+    def _match_text_query(self, query_text: str, metadata: ServiceMetadata,
+                         hit: Optional[SearchHit] = None,
+                         top_score: float = 0.0) -> List[Tuple[MatchType, str, float]]:
+        """
+        Match text query against service metadata
+
+        hit is the service's best document in the search index and top_score
+        the best score of any service; BM25 scores are reported relative to it.
+        """
         matches = []
-        query_lower = query_text.lower()
-        query_words = set(query_lower.split())
-        
-        # Check service title and description
-        title_words = set(metadata.title.lower().split())
-        desc_words = set(metadata.description.lower().split())
-        
-        title_overlap = len(query_words & title_words) / len(query_words) if query_words else 0
-        if title_overlap > 0:
-            matches.append((MatchType.EXACT, f"title: {metadata.title}", title_overlap))
-            
-        desc_overlap = len(query_words & desc_words) / len(query_words) if query_words else 0
-        if desc_overlap > 0.3:  # Threshold for description matches
-            matches.append((MatchType.FUZZY, "description", desc_overlap))
-        
+        if hit is not None and top_score > 0:
+            score = hit.score / top_score
+            if hit.kind == "service":
+                if set(tokenize(query_text)) & set(tokenize(metadata.title)):
+                    matches.append((MatchType.EXACT, f"title: {metadata.title}", score))
+                else:
+                    matches.append((MatchType.FUZZY, "description", score))
+            else:
+                matches.append((MatchType.FUZZY, f"{hit.kind}: {hit.label}", score))
+
         # Check domain keywords
+        query_words = set(query_text.lower().split())
         for domain in metadata.capabilities.domains:
             domain_keywords = self._domain_keywords.get(domain, set())
             keyword_overlap = len(query_words & domain_keywords) / len(query_words) if query_words else 0
             if keyword_overlap > 0:
                 matches.append((MatchType.DOMAIN, f"domain: {domain}", keyword_overlap))
-        
-        # Check variable names and descriptions
-        for variable in metadata.capabilities.variables:
-            if variable.name:
-                var_words = set(variable.name.lower().split())
-                var_overlap = len(query_words & var_words) / len(query_words) if query_words else 0
-                if var_overlap > 0:
-                    matches.append((MatchType.FUZZY, f"variable: {variable.name}", var_overlap))
-            
-            if variable.description:
-                desc_words = set(variable.description.lower().split())
-                desc_overlap = len(query_words & desc_words) / len(query_words) if query_words else 0
-                if desc_overlap > 0.3:
-                    matches.append((MatchType.FUZZY, f"variable desc: {variable.name}", desc_overlap))
-        
+
         return matches
-    
-    def _match_variables(self, query_vars: List[str], 
-                        service_vars: List[VariableInfo],
-                        canonical_only: bool = False) -> List[Tuple[MatchType, str, float]]:
-        """Match query variables against service variables"""
-        matches = []
-        
+
+    def _match_variables(self, query_vars: List[str],
+                        canonical_only: bool = False) -> Dict[str, List[Tuple[MatchType, str, float]]]:
+        """
+        Match query variables against every service's variables
+
+        Exact id, canonical and name matches come from the index's value
+        lookup; partial matches (the query anywhere in a variable's name)
+        from its trigram substring search.
+
+        Returns:
+            service_id -> matches
+        """
+        exact_types = {
+            "id": (MatchType.EXACT, "variable", 1.0),
+            "canonical": (MatchType.CANONICAL, "canonical", 0.95),
+            "name": (MatchType.SYNONYM, "name", 0.8),
+        }
+        fields = ("id", "canonical") if canonical_only else ("id", "canonical", "name")
+        matches = defaultdict(list)
+
         for query_var in query_vars:
             query_lower = query_var.lower()
-            
-            for service_var in service_vars:
-                # Exact ID match
-                if service_var.id and service_var.id.lower() == query_lower:
-                    matches.append((MatchType.EXACT, f"variable: {service_var.id}", 1.0))
-                    continue
-                
-                # Canonical match
-                if service_var.canonical and service_var.canonical.lower() == query_lower:
-                    matches.append((MatchType.CANONICAL, f"canonical: {service_var.canonical}", 0.95))
-                    continue
-                
-                if canonical_only:
-                    continue
-                
-                # Name match
-                if service_var.name and service_var.name.lower() == query_lower:
-                    matches.append((MatchType.SYNONYM, f"name: {service_var.name}", 0.8))
+
+            # Best exact field per variable: id, then canonical, then name
+            exact = {}
+            for hit, field in self.index.lookup(query_var, fields):
+                if hit.kind == "variable" and (hit.doc_id not in exact or
+                                               fields.index(field) < fields.index(exact[hit.doc_id][1])):
+                    exact[hit.doc_id] = (hit, field)
+            for hit, field in exact.values():
+                match_type, prefix, score = exact_types[field]
+                value = {"id": hit.doc_id.split(":", 2)[2], "canonical": query_var, "name": hit.label}[field]
+                matches[hit.service_id].append((match_type, f"{prefix}: {value}", score))
+
+            if canonical_only:
+                continue
+
+            # Fuzzy matches
+            for hit in self.index.contains(query_lower, kinds=("variable",)):
+                if hit.doc_id in exact:
                     continue
-                    
-                # Fuzzy matches
-                if service_var.name and query_lower in service_var.name.lower():
-                    score = len(query_lower) / len(service_var.name) if service_var.name else 0
-                    if score > 0.3:
-                        matches.append((MatchType.FUZZY, f"partial: {service_var.name}", score * 0.6))
-        
-        return matches
-    
+                score = len(query_lower) / len(hit.label)
+                if score > 0.3:
+                    matches[hit.service_id].append((MatchType.FUZZY, f"partial: {hit.label}", score * 0.6))
+
+        return dict(matches)
+
     def _match_spatial(self, query: DiscoveryQuery, 
                       coverage) -> List[Tuple[MatchType, str, float]]:
         """Match spatial requirements"""
@@ -0,0 +1,293 @@
+"""
+Mirror pools with latency-aware selection, failover and hedging
+
+Some services are served by several interchangeable endpoints (Overpass
+mirrors, WCS hosts), and each has a long latency tail. An EndpointPool
+remembers how every mirror has been doing and sends each request to the
+best one:
+
+- ranking: mirrors that failed recently go last; the rest are ordered by
+  median latency. A mirror without samples ranks as well as the best known
+  one, so ties keep the configured order (the first URL is the primary)
+- failover: a connection error or a 429/5xx response moves on to the next
+  mirror
+- hedging (optional): if no answer arrived after the pool's
+  ``hedge_quantile`` latency (p95 by default), the same request is also sent
+  to the next mirror (or again to the only one) and whichever answers first
+  wins. The loser is cancelled: a hedge that hasn't started is dropped, one
+  in flight has its response closed as soon as it returns, so its body is
+  never downloaded and its connection is discarded
+
+Failovers and hedges are extra requests, so each one must pass the active
+request context's can_retry(): they respect the deadline and spend the
+service's retry budget.
+
+    pool = get_endpoint_pool("OSM_Overpass", urls, hedge=True)
+    resp = pool.request(lambda url: session.post(url, data=..., stream=True))
+
+Pass stream=True so a losing response can be closed before its body is read.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from statistics import median
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from .deadline import current_context, propagate
+
+logger = logging.getLogger(__name__)
+
+FAILOVER_STATUSES = (429, 500, 502, 503, 504)
+
+
+class _EndpointStats:
+    """Recent latencies and failures of one mirror"""
+
+    def __init__(self, window: int):
+        self.latencies: deque = deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_failure = 0.0
+
+
+class EndpointPool:
+    """Thread-safe set of interchangeable endpoints for one service"""
+
+    def __init__(self, urls: Iterable[str], hedge: bool = False, hedge_quantile: float = 0.95,
+                 initial_hedge_delay_s: float = 2.0, min_hedge_delay_s: float = 0.05,
+                 min_samples: int = 10, window: int = 100, failure_cooldown_s: float = 30.0,
+                 failover_statuses: Iterable[int] = FAILOVER_STATUSES, name: Optional[str] = None):
+        """
+        Args:
+            urls: Endpoints in order of preference; the first is the primary
+            hedge: Send a duplicate request when the first is slow
+            hedge_quantile: Latency quantile after which a hedge is sent
+            initial_hedge_delay_s: Hedge delay until min_samples latencies are known
+            min_hedge_delay_s: Lower bound on the hedge delay
+            min_samples: Latencies needed before the quantile is trusted
+            window: Latencies remembered per endpoint and for the pool
+            failure_cooldown_s: How long a failure keeps an endpoint at the back
+            failover_statuses: Responses that move on to the next endpoint
+            name: Service name, for logging
+        """
+        self.urls: List[str] = list(dict.fromkeys(u for u in urls if u))
+        if not self.urls:
+            raise ValueError("EndpointPool needs at least one URL")
+        self.hedge = bool(hedge)
+        self.hedge_quantile = min(max(float(hedge_quantile), 0.0), 1.0)
+        self.initial_hedge_delay_s = float(initial_hedge_delay_s)
+        self.min_hedge_delay_s = float(min_hedge_delay_s)
+        self.min_samples = max(1, int(min_samples))
+        self.failure_cooldown_s = float(failure_cooldown_s)
+        self.failover_statuses = frozenset(int(s) for s in failover_statuses)
+        self.name = name or self.urls[0]
+
+        self._stats = {url: _EndpointStats(window) for url in self.urls}
+        self._latencies: deque = deque(maxlen=window)
+        self._counters = {"hedges": 0, "hedge_wins": 0, "failovers": 0, "cancelled": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def primary(self) -> str:
+        return self.urls[0]
+
+    def ranked(self) -> List[str]:
+        """Endpoints best first: no recent failure, then lowest median latency"""
+        now = time.monotonic()
+        with self._lock:
+            medians = {url: median(s.latencies) for url, s in self._stats.items() if s.latencies}
+            best = min(medians.values(), default=0.0)
+
+            def key(item: Tuple[int, str]):
+                index, url = item
+                stats = self._stats[url]
+                recent = stats.consecutive_failures if now - stats.last_failure < self.failure_cooldown_s else 0
+                return recent, medians.get(url, best), index
+            return [url for _, url in sorted(enumerate(self.urls), key=key)]
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the first answer before hedging"""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < self.min_samples:
+            return max(self.initial_hedge_delay_s, self.min_hedge_delay_s)
+        index = min(len(samples) - 1, int(self.hedge_quantile * len(samples)))
+        return max(samples[index], self.min_hedge_delay_s)
+
+    def record_success(self, url: str, latency: float):
+        with self._lock:
+            stats = self._stats[url]
+            stats.requests += 1
+            stats.consecutive_failures = 0
+            stats.latencies.append(latency)
+            self._latencies.append(latency)
+
+    def record_failure(self, url: str):
+        with self._lock:
+            stats = self._stats[url]
+            stats.requests += 1
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            stats.last_failure = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and latency summary per endpoint"""
+        with self._lock:
+            endpoints = {
+                url: {
+                    "requests": s.requests,
+                    "failures": s.failures,
+                    "median_s": round(median(s.latencies), 4) if s.latencies else None,
+                }
+                for url, s in self._stats.items()
+            }
+            return {"endpoints": endpoints, **self._counters}
+
+    def request(self, send: Callable[[str], requests.Response]) -> requests.Response:
+        """
+        Run send(url) against the pool and return the winning response
+
+        Returns the first response that isn't a failover status; if every
+        endpoint failed, the last response, or raises the last exception.
+        Timeouts other than connect timeouts are not failed over (the caller
+        decides what a slow query means) but, with hedging, a pending hedge
+        may still answer.
+        """
+        if self.hedge:
+            return self._hedged(send)
+
+        context = current_context()
+        last_error: Optional[BaseException] = None
+        resp = None
+        for attempt, url in enumerate(self.ranked()):
+            if attempt and not context.can_retry():
+                break
+            if attempt:
+                self._count("failovers")
+                logger.info(f"{self.name}: failing over to {url}")
+                if resp is not None:
+                    resp.close()
+            resp, last_error = self._attempt(send, url)
+            if last_error is not None and not isinstance(last_error, requests.exceptions.ConnectionError):
+                raise last_error
+            if resp is not None and resp.status_code not in self.failover_statuses:
+                return resp
+        if resp is None and last_error is not None:
+            raise last_error
+        return resp
+
+    def _attempt(self, send: Callable[[str], requests.Response],
+                 url: str) -> Tuple[Optional[requests.Response], Optional[BaseException]]:
+        """One timed request; records the outcome"""
+        start = time.monotonic()
+        try:
+            resp = send(url)
+        except requests.exceptions.RequestException as e:
+            self.record_failure(url)
+            return None, e
+        if resp.status_code in self.failover_statuses:
+            self.record_failure(url)
+        else:
+            self.record_success(url, time.monotonic() - start)
+        return resp, None
+
+    def _hedged(self, send: Callable[[str], requests.Response]) -> requests.Response:
+        context = current_context()
+        candidates = self.ranked()
+        if len(candidates) == 1:
+            candidates = candidates * 2  # Hedge against the same endpoint
+        pending = deque(candidates)
+        attempt = propagate(self._attempt)
+        running: Dict[Future, str] = {}
+        hedged = False
+        last: Tuple[Optional[requests.Response], Optional[BaseException]] = (None, None)
+
+        executor = ThreadPoolExecutor(max_workers=len(candidates), thread_name_prefix="hedge")
+        try:
+            url = pending.popleft()
+            first = executor.submit(attempt, send, url)
+            running[first] = url
+            while running:
+                timeout = self.hedge_delay() if not hedged and pending else None
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    if context.can_retry():
+                        url = pending.popleft()
+                        self._count("hedges")
+                        logger.debug(f"{self.name}: no answer after {timeout:.2f}s, hedging to {url}")
+                        running[executor.submit(attempt, send, url)] = url
+                    continue
+
+                for future in done:
+                    url = running.pop(future)
+                    resp, error = future.result()
+                    if resp is not None and resp.status_code not in self.failover_statuses:
+                        if hedged and future is not first:
+                            self._count("hedge_wins")
+                        self._cancel(running)
+                        running.clear()
+                        return resp
+                    if last[0] is not None:
+                        last[0].close()
+                    last = (resp, error)
+
+                failed_over = last[0] is not None or isinstance(last[1], requests.exceptions.ConnectionError)
+                if not running and pending and failed_over and context.can_retry():
+                    url = pending.popleft()
+                    self._count("failovers")
+                    logger.info(f"{self.name}: failing over to {url}")
+                    running[executor.submit(attempt, send, url)] = url
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        resp, error = last
+        if resp is None and error is not None:
+            raise error
+        return resp
+
+    def _cancel(self, running: Dict[Future, str]):
+        """Drop losing attempts: unstarted ones are cancelled, the rest closed on arrival"""
+        for future in running:
+            self._count("cancelled")
+            if not future.cancel():
+                future.add_done_callback(_close_response)
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+
+def _close_response(future: Future):
+    if future.cancelled():
+        return
+    resp, _ = future.result()
+    if resp is not None:
+        resp.close()
+
+
+def endpoint_settings(service_config: Dict[str, Any]) -> Dict[str, Any]:
+    """EndpointPool options from a service's settings in services.yaml"""
+    keys = {"hedge": "hedge", "hedge_quantile": "hedge_quantile",
+            "hedge_initial_delay_s": "initial_hedge_delay_s", "hedge_min_delay_s": "min_hedge_delay_s"}
+    return {option: service_config[key] for key, option in keys.items() if service_config.get(key) is not None}
+
+
+_POOLS: Dict[Tuple[str, Tuple[str, ...]], EndpointPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_endpoint_pool(service: str, urls: Iterable[str], **settings) -> EndpointPool:
+    """Return the process-wide pool for a service's URLs (the first caller sets the options)"""
+    urls = tuple(dict.fromkeys(u for u in urls if u))
+    with _POOLS_LOCK:
+        pool = _POOLS.get((service, urls))
+        if pool is None:
+            pool = _POOLS[(service, urls)] = EndpointPool(urls, name=service, **settings)
+        return pool
@@ -2,3 +2,4 @@ class EnvAgentsError(Exception): ...
 class CapabilityDiscoveryError(EnvAgentsError): ...
 class FetchError(EnvAgentsError): ...
 class RegistryError(EnvAgentsError): ...
+class DeadlineExceeded(FetchError): ...
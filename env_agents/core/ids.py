@@ -48,22 +48,40 @@ def _norm_time_for_id(t_raw, cov_hint: str | None) -> str:
         return dt.strftime("%Y-%m-%d")
 
 def compute_observation_id(df: pd.DataFrame) -> pd.Series:
+    if df.empty:
+        return pd.Series([], index=df.index, dtype=object)
     lat = pd.to_numeric(df.get("latitude"), errors="coerce").round(LATLON_DP)
     lon = pd.to_numeric(df.get("longitude"), errors="coerce").round(LATLON_DP)
 
     cov = df.get("temporal_coverage")
     cov_vals = cov if cov is not None else pd.Series([""] * len(df), index=df.index)
 
-    # build the normalized time string with coverage hint
-    time_norm = pd.Series(index=df.index, dtype=object)
-    for i in df.index:
-        time_norm.loc[i] = _norm_time_for_id(df.at[i, "time"] if "time" in df.columns else None,
-                                             cov_vals.at[i] if i in cov_vals.index else None)
+    # build the normalized time string with coverage hint, once per distinct
+    # (time, coverage) pair - large results usually share a handful of timestamps
+    times = df["time"] if "time" in df.columns else pd.Series([None] * len(df), index=df.index)
+    cache: dict = {}
+    norm = []
+    for t_raw, cov_hint in zip(times.tolist(), cov_vals.tolist()):
+        try:
+            key = (t_raw, cov_hint)
+            value = cache.get(key)
+        except TypeError:  # unhashable value - normalize without caching
+            key, value = None, None
+        if value is None:
+            value = _norm_time_for_id(t_raw, cov_hint)
+            if key is not None:
+                cache[key] = value
+        norm.append(value)
+    time_norm = pd.Series(norm, index=df.index, dtype=object)
 
     # Helper function to safely get series with fillna
     def get_series(df, col, default=""):
         if col in df.columns:
-            return df[col].fillna(default).astype(str)
+            series = df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # fillna on a categorical only accepts existing categories
+                series = series.astype(object)
+            return series.fillna(default).astype(str)
         else:
             return pd.Series([default] * len(df), index=df.index, dtype=str)
     
@@ -0,0 +1,201 @@
+"""
+Compiled native -> canonical mapping artifacts.
+
+compile_mapping() merges everything that maps a dataset's native parameter
+ids to canonical variables into one lookup table: the adapter's rule packs
+(rules_enhanced.py, then rules.py), registry variables (seed, harvest,
+overrides) and accepted curations, later sources winning. Registry variables
+are also listed under their own id so that already-canonical rows find their
+metadata in the same table.
+
+Artifacts are written offline as Parquet (``ea compile-mappings``) with a
+version derived from their content. attach_semantics() joins fetched frames
+against them and records the dataset and version in provenance.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .registry import RegistryManager
+from .term_broker import _resolve_rules_module_path
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+# Mapping sources, lowest precedence first
+SOURCES = ("rules_enhanced", "rules", "registry", "curation")
+COLUMNS = ["native_id", "canonical", "source", "label", "observed_property_uri", "unit_uri", "preferred_unit"]
+_METADATA_KEY = b"env_agents.mapping"
+
+
+@dataclass
+class MappingArtifact:
+    """Versioned native -> canonical lookup table for one dataset"""
+    dataset: str
+    table: pd.DataFrame   # COLUMNS, one row per native_id
+    version: str          # content hash, identical for identical mappings
+    compiled_at: str
+    _index: pd.Index = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._index = pd.Index(self.table["native_id"])
+
+    @property
+    def provenance(self) -> Dict[str, str]:
+        return {"dataset": self.dataset, "version": self.version}
+
+    def lookup(self, native_ids: Iterable[Any]) -> np.ndarray:
+        """Table row per native id, -1 where unmapped"""
+        return self._index.get_indexer(pd.Index(list(native_ids), dtype=object))
+
+    def save(self, path: os.PathLike) -> Path:
+        """Write as Parquet with the version in the schema metadata (atomic)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(self.table, preserve_index=False)
+        metadata = {"dataset": self.dataset, "version": self.version,
+                    "compiled_at": self.compiled_at, "schema_version": SCHEMA_VERSION}
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                               _METADATA_KEY: json.dumps(metadata).encode()})
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        pq.write_table(table, tmp, compression="snappy")
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: os.PathLike) -> "MappingArtifact":
+        table = pq.read_table(path)
+        metadata = json.loads(table.schema.metadata[_METADATA_KEY])
+        if metadata.get("schema_version") != SCHEMA_VERSION:
+            raise ValueError(f"Unsupported mapping artifact schema: {metadata.get('schema_version')}")
+        frame = table.to_pandas()[COLUMNS].astype(object)
+        return cls(dataset=metadata["dataset"], table=frame.where(frame.notna(), None),
+                   version=metadata["version"], compiled_at=metadata["compiled_at"])
+
+
+def artifact_path(registry: RegistryManager, dataset: str) -> Path:
+    return Path(registry.mappings_dir) / f"{dataset}.parquet"
+
+
+def compile_mapping(registry: RegistryManager, dataset: str) -> MappingArtifact:
+    """Merge rule packs, registry variables and accepted curations for dataset"""
+    variables = _registry_variables(registry)
+    mapped: Dict[str, Tuple[str, str]] = {}  # native_id -> (canonical, source)
+
+    for source, module in _rule_modules(dataset):
+        exact = getattr(module, "CANONICAL_MAP", {})
+        if isinstance(exact, dict):
+            mapped.update((str(nid), (cid, source)) for nid, cid in exact.items() if cid)
+
+    for cid, var in variables.items():
+        entry = (var.get("datasets") or {}).get(dataset)
+        if not isinstance(entry, dict):
+            continue
+        natives = entry.get("native")
+        curated = entry.get("manually_curated") or entry.get("auto_accepted")
+        for nid in natives if isinstance(natives, list) else [natives]:
+            if nid:
+                mapped[str(nid)] = (cid, "curation" if curated else "registry")
+
+    for suggestion in registry.get_delta().values():
+        if (isinstance(suggestion, dict) and suggestion.get("status") == "accepted"
+                and suggestion.get("dataset") == dataset and suggestion.get("accepted_canonical")):
+            mapped[str(suggestion["native_id"])] = (suggestion["accepted_canonical"], "curation")
+
+    # Canonical ids resolve to themselves, carrying their metadata
+    for cid in variables:
+        mapped.setdefault(cid, (cid, "registry"))
+
+    rows = []
+    for nid in sorted(mapped):
+        cid, source = mapped[nid]
+        meta = variables.get(cid, {})
+        rows.append((nid, cid, source, meta.get("label"), meta.get("observed_property_uri"),
+                     meta.get("unit_uri"), meta.get("preferred_unit")))
+    table = pd.DataFrame(rows, columns=COLUMNS, dtype=object)
+    version = hashlib.sha256(json.dumps(rows, ensure_ascii=False).encode()).hexdigest()[:12]
+    return MappingArtifact(dataset=dataset, table=table, version=version,
+                           compiled_at=datetime.now(timezone.utc).isoformat())
+
+
+def compile_mappings(registry: RegistryManager, datasets: Iterable[str]) -> Dict[str, MappingArtifact]:
+    """Compile and save artifacts for datasets (the offline step)"""
+    artifacts = {}
+    for dataset in datasets:
+        artifact = compile_mapping(registry, dataset)
+        artifact.save(artifact_path(registry, dataset))
+        logger.info(f"Compiled {len(artifact.table)} mappings for {dataset} (version {artifact.version})")
+        artifacts[dataset] = artifact
+    return artifacts
+
+
+# Artifacts by (path, mtime) for saved files and (dataset, registry file mtimes) otherwise
+_ARTIFACTS: Dict[Tuple, MappingArtifact] = {}
+_ARTIFACTS_LOCK = threading.Lock()
+
+
+def get_mapping(registry: RegistryManager, dataset: str) -> MappingArtifact:
+    """
+    The saved artifact for dataset, or one compiled in memory if none has
+    been compiled yet. Either is cached until its inputs change.
+    """
+    path = artifact_path(registry, dataset)
+    if path.exists():
+        key: Tuple = (str(path), path.stat().st_mtime_ns)
+        build = lambda: MappingArtifact.load(path)
+    else:
+        inputs = (registry.seed_path, registry.harvest_path, registry.overrides_path, registry.delta_path)
+        key = (registry.base_dir, dataset) + tuple(os.stat(p).st_mtime_ns for p in inputs)
+        build = lambda: compile_mapping(registry, dataset)
+    with _ARTIFACTS_LOCK:
+        if key in _ARTIFACTS:
+            return _ARTIFACTS[key]
+    artifact = build()
+    with _ARTIFACTS_LOCK:
+        return _ARTIFACTS.setdefault(key, artifact)
+
+
+def _rule_modules(dataset: str) -> List[Tuple[str, Any]]:
+    """(source, module) for the dataset's rule packs, lowest precedence first"""
+    for path in _resolve_rules_module_path(dataset):
+        try:
+            module = importlib.import_module(path)
+        except ImportError:
+            continue
+        modules = [("rules", module)]
+        if path.endswith(".rules"):
+            try:
+                modules.insert(0, ("rules_enhanced", importlib.import_module(path + "_enhanced")))
+            except ImportError:
+                pass
+        return modules
+    return []
+
+
+def _registry_variables(registry: RegistryManager) -> Dict[str, Dict[str, Any]]:
+    """Registry variables with seed, harvest and overrides merged per variable"""
+    variables: Dict[str, Dict[str, Any]] = {}
+    for layer in (registry.get_seed(), registry.get_harvest(), registry.get_overrides()):
+        for cid, var in (layer.get("variables") or {}).items():
+            if not isinstance(var, dict):
+                continue
+            merged = variables.setdefault(cid, {})
+            datasets = {**merged.get("datasets", {}), **(var.get("datasets") or {})}
+            merged.update(var)
+            merged["datasets"] = datasets
+    return variables
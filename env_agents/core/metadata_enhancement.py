@@ -3,7 +3,7 @@ Metadata Enhancement System
 Brings all services up to Earth Engine Gold Standard level of information richness
 """
 
-import requests
+from .utils_http import get_http_client
 from bs4 import BeautifulSoup
 import re
 import json
@@ -132,7 +132,7 @@ class MetadataEnhancementEngine:
         
         try:
             # Scrape main documentation
-            resp = requests.get("https://docs.openaq.org/docs/about", timeout=10)
+            resp = get_http_client().session.get("https://docs.openaq.org/docs/about", timeout=10)
             if resp.status_code == 200:
                 soup = BeautifulSoup(resp.text, "html.parser")
                 
@@ -142,7 +142,7 @@ class MetadataEnhancementEngine:
                     docs["description"] = desc_elem.text.strip()
             
             # Scrape parameter information
-            param_resp = requests.get("https://docs.openaq.org/docs/parameters", timeout=10)
+            param_resp = get_http_client().session.get("https://docs.openaq.org/docs/parameters", timeout=10)
             if param_resp.status_code == 200:
                 soup = BeautifulSoup(param_resp.text, "html.parser")
                 
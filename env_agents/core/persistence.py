@@ -13,6 +13,7 @@ def save_df_with_meta(df: pd.DataFrame, path: str | os.PathLike, *, compression:
         "schema": df.attrs.get("schema"),
         "capabilities": df.attrs.get("capabilities"),
         "variable_registry": df.attrs.get("variable_registry"),
+        "mapping_artifact": df.attrs.get("mapping_artifact"),
     }
 
     # Write parquet (optionally compressed)
@@ -41,7 +42,7 @@ def load_df_with_meta(path: str | os.PathLike) -> pd.DataFrame:
         try:
             meta = json.loads(sidecar.read_text(encoding="utf-8"))
             # Only attach known keys
-            for k in ("schema","capabilities","variable_registry"):
+            for k in ("schema","capabilities","variable_registry","mapping_artifact"):
                 if k in meta:
                     df.attrs[k] = meta[k]
         except Exception:
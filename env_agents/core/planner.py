@@ -0,0 +1,147 @@
+"""
+Request planning against upstream limits
+
+Adapters declare what one upstream call may cover in a LIMITS class
+attribute (AdapterLimits). QueryPlanner splits a RequestSpec that exceeds
+those limits into sub-requests (bbox tiles x time windows x variable
+chunks), fetches them concurrently through the adapter and merges the
+results, dropping rows that neighbouring sub-requests both returned.
+
+Adapters that fill in defaults (e.g. every parameter, or the last year)
+expose them through an optional resolve_spec(spec) method, so defaulted
+requests are split along the same limits.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from itertools import product
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from .models import RequestSpec, Geometry, CORE_COLUMNS
+from .utils_geo import split_bbox
+from .deadline import propagate
+
+logger = logging.getLogger(__name__)
+
+PAGINATION_STYLES = ("none", "page", "offset", "cursor")
+
+
+@dataclass(frozen=True)
+class AdapterLimits:
+    """
+    What a single upstream call may cover; None means unlimited
+
+    Pagination is handled inside the adapter; ``pagination`` records the
+    upstream style ("none", "page", "offset" or "cursor") so a plan can be
+    explained, and so callers know "none" services need smaller sub-requests
+    rather than more pages.
+    """
+    max_bbox_deg2: Optional[float] = None
+    max_bbox_side_deg: Optional[float] = None
+    max_days: Optional[int] = None
+    calendar_year: bool = False       # Time windows must not cross 1 January
+    max_variables: Optional[int] = None
+    pagination: str = "none"
+    max_concurrent: int = 4
+
+    def __post_init__(self):
+        if self.pagination not in PAGINATION_STYLES:
+            raise ValueError(f"Unknown pagination style '{self.pagination}', expected one of {PAGINATION_STYLES}")
+
+
+def split_time_range(time_range: Tuple[str, str], max_days: Optional[int] = None,
+                     calendar_year: bool = False) -> List[Tuple[str, str]]:
+    """
+    Split an inclusive (start, end) date range into consecutive windows
+
+    Windows are at most max_days long and, with calendar_year, never cross
+    1 January. Dates are returned as YYYY-MM-DD; a range that needs no
+    splitting is returned unchanged.
+    """
+    start, end = (date.fromisoformat(str(t)[:10]) for t in time_range)
+    if end < start:
+        start, end = end, start
+    if (not max_days or (end - start).days < max_days) and (not calendar_year or start.year == end.year):
+        return [tuple(time_range)]
+
+    windows = []
+    while start <= end:
+        stop = end
+        if max_days:
+            stop = min(stop, start + timedelta(days=max_days - 1))
+        if calendar_year:
+            stop = min(stop, date(start.year, 12, 31))
+        windows.append((start.isoformat(), stop.isoformat()))
+        start = stop + timedelta(days=1)
+    return windows
+
+
+class QueryPlanner:
+    """Split one RequestSpec along an adapter's declared limits and fetch the parts concurrently"""
+
+    def __init__(self, adapter, limits: Optional[AdapterLimits] = None, max_workers: Optional[int] = None):
+        """
+        Args:
+            adapter: Adapter whose fetch() runs each sub-request
+            limits: Overrides the adapter's LIMITS
+            max_workers: Overrides limits.max_concurrent
+        """
+        self.adapter = adapter
+        limits = limits or getattr(adapter, "LIMITS", None)
+        self.limits = limits if isinstance(limits, AdapterLimits) else AdapterLimits()
+        self.max_workers = max_workers or self.limits.max_concurrent
+
+    def plan(self, spec: RequestSpec) -> List[RequestSpec]:
+        """Sub-requests that each fit the limits and together cover spec"""
+        limits = self.limits
+        resolve = getattr(self.adapter, "resolve_spec", None)
+        if callable(resolve):
+            spec = resolve(spec)
+
+        geometries = [spec.geometry]
+        if spec.geometry.type == "bbox" and (limits.max_bbox_deg2 or limits.max_bbox_side_deg):
+            geometries = [Geometry(type="bbox", coordinates=list(box))
+                          for box in split_bbox(tuple(spec.geometry.coordinates),
+                                                limits.max_bbox_deg2, limits.max_bbox_side_deg)]
+
+        windows = [spec.time_range]
+        if spec.time_range and (limits.max_days or limits.calendar_year):
+            windows = split_time_range(spec.time_range, limits.max_days, limits.calendar_year)
+
+        variable_chunks = [spec.variables]
+        if spec.variables and limits.max_variables:
+            variable_chunks = [spec.variables[i:i + limits.max_variables]
+                               for i in range(0, len(spec.variables), limits.max_variables)]
+
+        if len(geometries) == len(windows) == len(variable_chunks) == 1:
+            return [spec]
+        return [replace(spec, geometry=geometry, time_range=window, variables=variables)
+                for geometry, window, variables in product(geometries, windows, variable_chunks)]
+
+    def fetch(self, spec: RequestSpec) -> pd.DataFrame:
+        """
+        Fetch spec through as many sub-requests as its limits need
+
+        Sub-requests run concurrently (up to max_workers). Any failing
+        sub-request fails the whole fetch, so results are never silently
+        partial. Rows returned by more than one sub-request (e.g. sites on a
+        shared tile edge) are kept once, by observation_id.
+        """
+        sub_specs = self.plan(spec)
+        if len(sub_specs) == 1:
+            return self.adapter.fetch(sub_specs[0])
+
+        logger.info(f"{getattr(self.adapter, 'DATASET', type(self.adapter).__name__)}: "
+                    f"split request into {len(sub_specs)} sub-requests "
+                    f"({self.limits.pagination} pagination, {self.max_workers} in flight)")
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(sub_specs)))) as pool:
+            frames = [df for df in pool.map(propagate(self.adapter.fetch), sub_specs) if len(df)]
+
+        if not frames:
+            return pd.DataFrame(columns=CORE_COLUMNS)
+        merged = pd.concat(frames, ignore_index=True)
+        return merged.drop_duplicates(subset="observation_id", ignore_index=True)
@@ -0,0 +1,49 @@
+"""
+Shared request rate limiting
+
+Adapters that issue requests from several threads (or several instances of
+the same adapter in one process) must still respect a single upstream rate
+limit. RateLimiter hands out request start times at a fixed minimum
+interval; get_rate_limiter() returns the one limiter per service.
+"""
+
+import threading
+import time
+from typing import Dict
+
+
+class RateLimiter:
+    """Thread-safe minimum-interval limiter"""
+
+    def __init__(self, min_interval: float):
+        """
+        Args:
+            min_interval: Minimum seconds between consecutive request starts
+        """
+        self.min_interval = max(0.0, float(min_interval))
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until the caller may start a request; returns the seconds waited"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+_LIMITERS: Dict[str, RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(service: str, min_interval: float) -> RateLimiter:
+    """Return the process-wide limiter for a service (the first caller sets the interval)"""
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(service)
+        if limiter is None:
+            limiter = _LIMITERS[service] = RateLimiter(min_interval)
+        return limiter
@@ -10,6 +10,8 @@ class RegistryManager:
         self.harvest_path = os.path.join(base_dir, "env_agents", "registry", "registry_harvest.json")
         self.overrides_path = os.path.join(base_dir, "env_agents", "registry", "registry_overrides.json")
         self.delta_path = os.path.join(base_dir, "env_agents", "registry", "registry_delta.json")
+        # Compiled per-dataset mapping artifacts (see core.mappings)
+        self.mappings_dir = os.path.join(base_dir, "env_agents", "registry", "mappings")
         for p in [self.seed_path, self.harvest_path, self.overrides_path, self.delta_path]:
             os.makedirs(os.path.dirname(p), exist_ok=True)
             if not os.path.exists(p):
@@ -39,6 +41,27 @@ class RegistryManager:
             "qc_flags":  merge(seed.get("qc_flags",{}),  merge(harv.get("qc_flags",{}),  over.get("qc_flags",{}))),
         }
 
+    def get_seed(self) -> Dict[str, Any]:
+        return self._load(self.seed_path)
+
+    def get_harvest(self) -> Dict[str, Any]:
+        return self._load(self.harvest_path)
+
+    def get_overrides(self) -> Dict[str, Any]:
+        return self._load(self.overrides_path)
+
+    def get_delta(self) -> Dict[str, Any]:
+        return self._load(self.delta_path)
+
+    def write_seed(self, seed: Dict[str, Any]) -> None:
+        self._save(self.seed_path, seed)
+
+    def write_overrides(self, overrides: Dict[str, Any]) -> None:
+        self._save(self.overrides_path, overrides)
+
+    def write_delta(self, delta: Dict[str, Any]) -> None:
+        self._save(self.delta_path, delta)
+
     def record_unknown(self, dataset: str, native: str, example: Dict[str, Any]):
         delta = self._load(self.delta_path)
         bucket = delta.setdefault(dataset, {})
@@ -14,10 +14,13 @@ import logging
 from datetime import datetime, timedelta
 import pandas as pd
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
+from .circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, get_circuit_breakers
+from .deadline import current_context, propagate, request_context
+from .errors import DeadlineExceeded
+from .planner import QueryPlanner
 from .service_registry import ServiceRegistry
+from .utils_http import get_http_client
 from .metadata_schema import ServiceMetadata
 from ..adapters.base import BaseAdapter, RequestSpec
 
@@ -76,6 +79,7 @@ class RetryConfig:
     retry_on_status: List[int] = field(default_factory=lambda: [500, 502, 503, 504])
     retry_on_timeout: bool = True
     retry_on_connection_error: bool = True
+    deadline_s: Optional[float] = None  # Wall-clock limit per fetch, attempts and fallbacks included
 
 
 @dataclass
@@ -108,11 +112,14 @@ class ResilientDataFetcher:
                  registry: ServiceRegistry,
                  adapters: Dict[str, BaseAdapter],
                  retry_config: Optional[RetryConfig] = None,
-                 fallback_config: Optional[FallbackConfig] = None):
+                 fallback_config: Optional[FallbackConfig] = None,
+                 breakers: Optional[CircuitBreakerRegistry] = None):
         self.registry = registry
         self.adapters = adapters
         self.retry_config = retry_config or RetryConfig()
         self.fallback_config = fallback_config or FallbackConfig()
+        # Shared across fetchers and threads, so a failing service is skipped everywhere
+        self.breakers = breakers or get_circuit_breakers()
         
         # Setup session with retry configuration
         self.session = self._create_resilient_session()
@@ -154,12 +161,14 @@ class ResilientDataFetcher:
                 response_time=time.time() - start_time
             )
         
-        # Try primary fetch
-        result = self._attempt_primary_fetch(adapter, spec, metadata)
-        
-        # Apply fallback strategies if primary fetch failed
-        if not result.is_success and self.fallback_config:
-            result = self._apply_fallback_strategies(adapter, spec, metadata, result)
+        # Attempts and fallbacks share one deadline and the service's retry budget
+        with request_context(timeout_s=self.retry_config.deadline_s, service=service_id):
+            # Try primary fetch (refused at once while the service's breaker is open)
+            result = self._guarded_fetch(adapter, spec, metadata)
+
+            # Apply fallback strategies if primary fetch failed
+            if not result.is_success and self.fallback_config:
+                result = self._apply_fallback_strategies(adapter, spec, metadata, result)
         
         # Update statistics and service health
         result.response_time = time.time() - start_time
@@ -181,7 +190,7 @@ class ResilientDataFetcher:
         import concurrent.futures
         
         with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(self.fetch, service_id, spec)
+            future = executor.submit(propagate(self.fetch), service_id, spec)
             return await asyncio.wrap_future(future)
     
     def fetch_multiple(self, requests: List[Tuple[str, RequestSpec]]) -> List[FetchResult]:
@@ -223,11 +232,50 @@ class ResilientDataFetcher:
         tasks = [fetch_with_semaphore(service_id, spec) for service_id, spec in requests]
         return await asyncio.gather(*tasks, return_exceptions=True)
     
+    def _guarded_fetch(self, adapter: BaseAdapter, spec: RequestSpec,
+                       metadata: ServiceMetadata) -> FetchResult:
+        """
+        Fetch through the service's circuit breaker
+
+        Open: fail fast without touching the service. Half-open: send one
+        cheap probe (single attempt, probe deadline). The outcome feeds the
+        breaker.
+        """
+        breaker = self.breakers.get(metadata.service_id)
+        admission = breaker.try_acquire()
+        if admission is None:
+            return FetchResult(
+                status=FetchStatus.SERVICE_UNAVAILABLE,
+                error_details=f"Circuit breaker open for {metadata.service_id}; "
+                              f"next probe in {breaker.retry_after():.0f}s",
+                diagnostics={'circuit_breaker': breaker.state.value}
+            )
+
+        if admission == "probe":
+            with request_context(timeout_s=self.breakers.probe_timeout_s):
+                result = self._attempt_primary_fetch(adapter, spec, metadata, max_attempts=1)
+        else:
+            result = self._attempt_primary_fetch(adapter, spec, metadata)
+        self._record_outcome(breaker, result)
+        return result
+
+    @staticmethod
+    def _record_outcome(breaker: CircuitBreaker, result: FetchResult):
+        """Feed a fetch outcome to the breaker; rejected requests say nothing about the service"""
+        if result.is_success or result.error_details == "No data returned from service":
+            breaker.record_success()
+        elif (result.status == FetchStatus.AUTH_ERROR
+              or (result.error_details or "").startswith("Request validation failed")):
+            breaker.release()
+        else:
+            breaker.record_failure()
+
     def _attempt_primary_fetch(self, adapter: BaseAdapter, spec: RequestSpec, 
-                              metadata: ServiceMetadata) -> FetchResult:
+                              metadata: ServiceMetadata, max_attempts: Optional[int] = None) -> FetchResult:
         """Attempt primary data fetch with retries"""
+        max_attempts = max_attempts or self.retry_config.max_attempts
         
-        for attempt in range(self.retry_config.max_attempts):
+        for attempt in range(max_attempts):
             try:
                 # Pre-fetch validation
                 validation_issues = self._validate_request(spec, metadata)
@@ -241,13 +289,12 @@ class ResilientDataFetcher:
                 # Apply rate limiting
                 self._apply_rate_limiting(metadata)
                 
-                # Perform fetch
-                data = adapter.fetch(spec)
+                # Perform fetch, split along the adapter's declared limits
+                data = QueryPlanner(adapter).fetch(spec)
                 
                 # Validate response
                 if data is None or (isinstance(data, pd.DataFrame) and data.empty):
-                    if attempt < self.retry_config.max_attempts - 1:
-                        self._wait_between_retries(attempt)
+                    if attempt < max_attempts - 1 and self._wait_between_retries(attempt):
                         continue
                     
                     return FetchResult(
@@ -266,8 +313,7 @@ class ResilientDataFetcher:
                 )
                 
             except requests.exceptions.Timeout as e:
-                if attempt < self.retry_config.max_attempts - 1:
-                    self._wait_between_retries(attempt)
+                if attempt < max_attempts - 1 and self._wait_between_retries(attempt):
                     continue
                 return FetchResult(
                     status=FetchStatus.TIMEOUT,
@@ -286,8 +332,7 @@ class ResilientDataFetcher:
                         error_details=f"Rate limited: {str(e)}"
                     )
                 elif e.response.status_code in self.retry_config.retry_on_status:
-                    if attempt < self.retry_config.max_attempts - 1:
-                        self._wait_between_retries(attempt)
+                    if attempt < max_attempts - 1 and self._wait_between_retries(attempt):
                         continue
                 
                 return FetchResult(
@@ -296,18 +341,23 @@ class ResilientDataFetcher:
                 )
                 
             except requests.exceptions.ConnectionError as e:
-                if attempt < self.retry_config.max_attempts - 1 and self.retry_config.retry_on_connection_error:
-                    self._wait_between_retries(attempt)
+                if (attempt < max_attempts - 1 and self.retry_config.retry_on_connection_error
+                        and self._wait_between_retries(attempt)):
                     continue
                 return FetchResult(
                     status=FetchStatus.SERVICE_UNAVAILABLE,
                     error_details=f"Connection error: {str(e)}"
                 )
                 
+            except DeadlineExceeded as e:
+                return FetchResult(
+                    status=FetchStatus.TIMEOUT,
+                    error_details=f"Deadline exceeded: {str(e)}"
+                )
+
             except Exception as e:
                 logger.error(f"Unexpected error fetching from {metadata.service_id}: {e}")
-                if attempt < self.retry_config.max_attempts - 1:
-                    self._wait_between_retries(attempt)
+                if attempt < max_attempts - 1 and self._wait_between_retries(attempt):
                     continue
                     
                 return FetchResult(
@@ -317,7 +367,7 @@ class ResilientDataFetcher:
         
         return FetchResult(
             status=FetchStatus.FAILED,
-            error_details=f"All {self.retry_config.max_attempts} attempts failed"
+            error_details=f"All {max_attempts} attempts failed"
         )
     
     def _apply_fallback_strategies(self, adapter: BaseAdapter, spec: RequestSpec,
@@ -334,6 +384,11 @@ class ResilientDataFetcher:
                 cached_result.fallbacks_used.append(FallbackStrategy.CACHED_RESULT)
                 return cached_result
         
+        # Network fallbacks can't help once the deadline has passed
+        if current_context().expired():
+            primary_result.diagnostics['fallbacks_skipped'] = 'deadline exceeded'
+            return primary_result
+
         # Strategy 2: Temporal expansion (relax time constraints)
         if (self.fallback_config.enable_temporal_expansion and 
             spec.time_range and primary_result.status != FetchStatus.AUTH_ERROR):
@@ -426,7 +481,7 @@ class ResilientDataFetcher:
                 filters=spec.filters
             )
             
-            return self._attempt_primary_fetch(adapter, expanded_spec, metadata)
+            return self._guarded_fetch(adapter, expanded_spec, metadata)
             
         except Exception as e:
             return FetchResult(
@@ -448,7 +503,7 @@ class ResilientDataFetcher:
             filters=spec.filters
         )
         
-        return self._attempt_primary_fetch(adapter, reduced_spec, metadata)
+        return self._guarded_fetch(adapter, reduced_spec, metadata)
     
     def _try_spatial_simplification(self, adapter: BaseAdapter, spec: RequestSpec,
                                   metadata: ServiceMetadata) -> FetchResult:
@@ -475,7 +530,7 @@ class ResilientDataFetcher:
                 filters=spec.filters
             )
             
-            return self._attempt_primary_fetch(adapter, simplified_spec, metadata)
+            return self._guarded_fetch(adapter, simplified_spec, metadata)
             
         except Exception as e:
             return FetchResult(
@@ -509,7 +564,8 @@ class ResilientDataFetcher:
         for alt_service_id, alt_metadata in alternatives:
             alt_adapter = self.adapters.get(alt_service_id)
             if alt_adapter:
-                result = self._attempt_primary_fetch(alt_adapter, spec, alt_metadata)
+                with request_context(service=alt_service_id):
+                    result = self._guarded_fetch(alt_adapter, spec, alt_metadata)
                 if result.is_success:
                     result.metadata['alternative_service'] = alt_service_id
                     result.warnings.append(f"Used alternative service: {alt_service_id}")
@@ -551,13 +607,21 @@ class ResilientDataFetcher:
             if metadata.rate_limiting.requests_per_second:
                 time.sleep(1.0 / metadata.rate_limiting.requests_per_second)
     
-    def _wait_between_retries(self, attempt: int):
-        """Wait between retry attempts with exponential backoff"""
+    def _wait_between_retries(self, attempt: int) -> bool:
+        """
+        Wait between retry attempts with exponential backoff
+
+        Returns False without waiting when the request's deadline or the
+        service's retry budget doesn't allow another attempt.
+        """
         wait_time = min(
             self.retry_config.backoff_factor ** attempt,
             self.retry_config.backoff_max
         )
+        if not current_context().can_retry(wait_time):
+            return False
         time.sleep(wait_time)
+        return True
     
     def _generate_diagnostics(self, spec: RequestSpec, data: pd.DataFrame, 
                             metadata: ServiceMetadata) -> Dict[str, Any]:
@@ -627,10 +691,11 @@ class ResilientDataFetcher:
         return "|".join(key_parts)
     
     def _sort_by_reliability(self, requests: List[Tuple[str, RequestSpec]]) -> List[Tuple[str, RequestSpec]]:
-        """Sort requests by service reliability score"""
-        def get_reliability(service_id: str) -> float:
+        """Sort requests by service reliability score, services with an open breaker last"""
+        def get_reliability(service_id: str) -> Tuple[bool, float]:
             metadata = self.registry.get_service(service_id)
-            return metadata.quality_metrics.reliability_score if metadata else 0.0
+            return (not self.breakers.is_open(service_id),
+                    metadata.quality_metrics.reliability_score if metadata else 0.0)
         
         return sorted(requests, key=lambda x: get_reliability(x[0]), reverse=True)
     
@@ -652,21 +717,13 @@ class ResilientDataFetcher:
         )
     
     def _create_resilient_session(self) -> requests.Session:
-        """Create requests session with retry configuration"""
-        session = requests.Session()
-        
-        retry_strategy = Retry(
-            total=self.retry_config.max_attempts,
-            status_forcelist=self.retry_config.retry_on_status,
-            backoff_factor=self.retry_config.backoff_factor,
-            raise_on_status=False
-        )
-        
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        
-        return session
+        """
+        Create a session on the shared transport
+
+        No transport-level retries: attempts are made once, in
+        _attempt_primary_fetch, under the request's deadline and retry budget.
+        """
+        return get_http_client().new_session("env-agents/resilient-fetcher")
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get fetcher performance statistics"""
@@ -11,7 +11,8 @@ from .ids import compute_observation_id as _cid
 
 from datetime import datetime, timezone
 
-from .term_broker import TermBroker
+from .mappings import get_mapping
+from .planner import QueryPlanner
 from .semantics import attach_semantics
 
 
@@ -48,8 +49,8 @@ class EnvRouter:
             raise FetchError(f"Adapter not registered: {dataset}")
         adapter = self.adapters[dataset]
 
-        # 1) Fetch from adapter
-        df = adapter.fetch(spec)
+        # 1) Fetch from adapter, split along its declared limits
+        df = QueryPlanner(adapter).fetch(spec)
 
         # 2) Ensure all core columns exist (structure guard)
         for col in CORE_COLUMNS:
@@ -61,14 +62,10 @@ class EnvRouter:
             df["retrieval_timestamp"] = datetime.now(timezone.utc).isoformat()
 
         # 4) Attach semantics (ontology URIs, preferred units, conversions, and/or canonical variable mapping)
-        #    Build broker from merged registry; broker will also pick up per-service rules packs.
+        #    Join against the dataset's compiled mapping (rule packs + registry + curations).
         # semantics
         try:
-            registry = self.registry.merged()
-            from env_agents.core.term_broker import TermBroker
-            from env_agents.core.semantics import attach_semantics
-            broker = TermBroker(registry)
-            df = attach_semantics(df, broker, dataset)
+            df = attach_semantics(df, get_mapping(self.registry, dataset))
         except Exception:
             pass
 
@@ -0,0 +1,439 @@
+"""
+Inverted index with BM25 ranking for service discovery
+
+Every registered service contributes documents to one index:
+
+- a service document: title, description, provider, domains and tags
+- one variable document per VariableInfo: id, name, canonical and description
+- asset documents for catalog entries that are not services themselves
+  (e.g. Earth Engine assets), added with index_assets()
+
+Text is lower-cased and split on anything that isn't a letter or digit, so
+"water:discharge_cfs" yields water, discharge and cfs. Fields are weighted
+(a word in a title counts three times one in a description), and documents
+are ranked with Okapi BM25. With prefix=True each query word also matches
+the words it begins ("temp" finds "temperature"). contains() finds labels
+containing a string anywhere ("flow" finds "Streamflow"), using an index of
+label trigrams, built on first use, to pick candidates.
+
+Postings are kept as dicts for cheap incremental updates. On first use, a
+term's postings are compiled to numpy arrays of slots, term frequencies and
+document lengths, so a query is one vectorized update per term rather than a
+pass over every document. Adding or removing a document drops only the
+compiled arrays of its own terms; BM25 weights, which depend on the document
+count and average length, are applied per query.
+
+The index replaces a service's documents whenever it is re-indexed, and can
+be saved to and loaded from JSON.
+"""
+
+import json
+import logging
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "id": 2.0,
+    "name": 2.0,
+    "canonical": 2.0,
+    "tags": 1.5,
+    "domains": 1.5,
+    "provider": 1.0,
+    "description": 1.0,
+}
+EXACT_FIELDS = ("id", "canonical", "name")  # Matched as whole values by lookup()
+KINDS = ("service", "variable", "asset")
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "as", "at", "by", "for", "from", "in", "into", "is", "of",
+    "on", "or", "per", "the", "to", "with",
+})
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-case word tokens without stopwords; a trailing plural 's' is dropped"""
+    tokens = []
+    for token in _TOKEN.findall((text or "").lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _trigrams(text: str) -> Set[str]:
+    text = (text or "").lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """One ranked document"""
+    doc_id: str
+    kind: str        # "service", "variable" or "asset"
+    service_id: str
+    label: str
+    score: float
+
+
+class SearchIndex:
+    """Thread-safe BM25 index over service, variable and asset documents"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization (0 = none, 1 = full)
+        """
+        self.k1 = float(k1)
+        self.b = float(b)
+
+        # Documents live in integer slots; freed slots are reused
+        self._slots: Dict[str, int] = {}
+        self._docs: List[Optional[Tuple[str, str, str, str]]] = []  # (doc_id, kind, service_id, label)
+        self._terms: List[Optional[Dict[str, float]]] = []
+        self._exact: List[Optional[Dict[str, str]]] = []
+        self._lengths: List[float] = []
+        self._codes: List[int] = []  # Service code per slot, -1 when free
+        self._kinds: List[int] = []  # Index into KINDS per slot
+        self._free: List[int] = []
+        self._total_length = 0.0
+
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._exact_postings: Dict[Tuple[str, str], Set[int]] = defaultdict(set)
+        self._service_slots: Dict[str, Set[int]] = defaultdict(set)
+        self._service_codes: Dict[str, int] = {}
+
+        self._grams: Optional[Dict[str, Set[int]]] = None  # Label trigram -> slots, see contains()
+        self._compiled: Dict[str, Tuple[np.ndarray, ...]] = {}  # term -> (slots, term frequencies, lengths)
+        self._vocabulary: Optional[List[str]] = None  # Sorted, for prefix expansion
+        self._arrays: Optional[Tuple[np.ndarray, ...]] = None  # See _vectors()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    # Updates
+
+    def add(self, doc_id: str, kind: str, service_id: str, label: str, fields: Dict[str, Any]):
+        """Add or replace a document; field values may be strings or lists of strings"""
+        terms: Counter = Counter()
+        exact = {}
+        for field, value in fields.items():
+            if not value:
+                continue
+            text = " ".join(value) if isinstance(value, (list, tuple, set)) else str(value)
+            weight = FIELD_WEIGHTS.get(field, 1.0)
+            for token in tokenize(text):
+                terms[token] += weight
+            if field in EXACT_FIELDS:
+                exact[field] = text.lower()
+
+        with self._lock:
+            self.remove(doc_id)
+            slot = self._free.pop() if self._free else len(self._docs)
+            if slot == len(self._docs):
+                self._docs.append(None)
+                self._terms.append(None)
+                self._exact.append(None)
+                self._lengths.append(0.0)
+                self._codes.append(-1)
+                self._kinds.append(-1)
+            length = float(sum(terms.values()))
+            self._docs[slot] = (doc_id, kind, service_id, label)
+            self._terms[slot] = dict(terms)
+            self._exact[slot] = exact
+            self._lengths[slot] = length
+            self._total_length += length
+            self._slots[doc_id] = slot
+            self._service_slots[service_id].add(slot)
+            self._codes[slot] = self._service_codes.setdefault(service_id, len(self._service_codes))
+            self._kinds[slot] = KINDS.index(kind)
+            for term, tf in terms.items():
+                if term not in self._postings:
+                    self._vocabulary = None
+                self._postings[term][slot] = tf
+                self._compiled.pop(term, None)
+            for field, value in exact.items():
+                self._exact_postings[(field, value)].add(slot)
+            self._index_label(slot, label)
+            self._arrays = None
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            slot = self._slots.pop(doc_id, None)
+            if slot is None:
+                return False
+            _, _, service_id, label = self._docs[slot]
+            for term in self._terms[slot]:
+                postings = self._postings[term]
+                postings.pop(slot, None)
+                self._compiled.pop(term, None)
+                if not postings:
+                    del self._postings[term]
+                    self._vocabulary = None
+            for field, value in self._exact[slot].items():
+                self._exact_postings[(field, value)].discard(slot)
+            for gram in _trigrams(label) if self._grams is not None else ():
+                grams = self._grams[gram]
+                grams.discard(slot)
+                if not grams:
+                    del self._grams[gram]
+            self._service_slots[service_id].discard(slot)
+            self._total_length -= self._lengths[slot]
+            self._docs[slot] = self._terms[slot] = self._exact[slot] = None
+            self._lengths[slot] = 0.0
+            self._codes[slot] = self._kinds[slot] = -1
+            self._free.append(slot)
+            self._arrays = None
+            return True
+
+    def remove_service(self, service_id: str, kinds: Optional[Iterable[str]] = None):
+        """Drop a service's documents (only those of the given kinds, if set)"""
+        kinds = set(kinds) if kinds else None
+        with self._lock:
+            for slot in list(self._service_slots.get(service_id, ())):
+                doc_id, kind, _, _ = self._docs[slot]
+                if kinds is None or kind in kinds:
+                    self.remove(doc_id)
+
+    def index_service(self, metadata):
+        """(Re)index a ServiceMetadata: its service document and one document per variable"""
+        service_id = metadata.service_id
+        with self._lock:
+            self.remove_service(service_id, kinds=("service", "variable"))
+            self.add(f"service:{service_id}", "service", service_id, metadata.title, {
+                "title": metadata.title,
+                "description": metadata.description,
+                "provider": metadata.provider,
+                "domains": metadata.capabilities.domains,
+                "tags": metadata.tags,
+            })
+            for var in metadata.capabilities.variables:
+                self.add(f"variable:{service_id}:{var.id}", "variable", service_id, var.name or var.id, {
+                    "id": var.id,
+                    "name": var.name,
+                    "canonical": var.canonical,
+                    "description": var.description,
+                })
+
+    def index_assets(self, service_id: str, assets: Iterable[Dict[str, Any]]):
+        """
+        Index catalog entries served through a service
+
+        Each asset is a dict with an "id" and optionally "title",
+        "description" and "keywords".
+        """
+        with self._lock:
+            for asset in assets:
+                self.add(f"asset:{service_id}:{asset['id']}", "asset", service_id,
+                         asset.get("title") or asset["id"], {
+                             "id": asset["id"],
+                             "title": asset.get("title"),
+                             "description": asset.get("description"),
+                             "tags": asset.get("keywords"),
+                         })
+
+    # Queries
+
+    def search(self, query: str, limit: Optional[int] = 20, kinds: Optional[Iterable[str]] = None,
+               prefix: bool = False) -> List[SearchHit]:
+        """Top documents for a text query, best first (all matches with limit=None)"""
+        with self._lock:
+            scores, matched = self._score(query, prefix)
+            matched = self._filter_kinds(matched, kinds)
+            if limit is not None and len(matched) > limit:
+                matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+            order = matched[np.argsort(-scores[matched], kind="stable")]
+            return [SearchHit(*self._docs[slot], float(scores[slot])) for slot in order]
+
+    def search_services(self, query: str, kinds: Optional[Iterable[str]] = None,
+                        prefix: bool = False) -> Dict[str, SearchHit]:
+        """Best-scoring document per service for a text query"""
+        with self._lock:
+            scores, matched = self._score(query, prefix)
+            if not len(matched):
+                return {}
+            _, _, kind_codes, by_service, starts = self._vectors()
+            if kinds:
+                scores = scores * np.isin(kind_codes, [KINDS.index(kind) for kind in kinds])
+
+            # Maximum per run of slots grouped by service
+            grouped = scores[by_service]
+            best = np.maximum.reduceat(grouped, starts)
+            ends = np.append(starts[1:], len(grouped))
+            hits = {}
+            for i in np.flatnonzero(best > 0):
+                slot = by_service[starts[i] + np.argmax(grouped[starts[i]:ends[i]])]
+                hits[self._docs[slot][2]] = SearchHit(*self._docs[slot], float(scores[slot]))
+            return hits
+
+    def lookup(self, value: str, fields: Iterable[str] = EXACT_FIELDS) -> List[Tuple[SearchHit, str]]:
+        """Documents whose id, canonical or name equals value (case-insensitive), with the matching field"""
+        value = value.lower()
+        results = []
+        with self._lock:
+            for field in fields:
+                for slot in self._exact_postings.get((field, value), ()):
+                    doc_id, kind, service_id, label = self._docs[slot]
+                    results.append((SearchHit(doc_id, kind, service_id, label, 1.0), field))
+        return results
+
+    def contains(self, text: str, kinds: Optional[Iterable[str]] = None) -> List[SearchHit]:
+        """Documents whose label contains text (case-insensitive), in index order"""
+        text = text.lower()
+        kinds = set(kinds) if kinds else None
+        with self._lock:
+            if self._grams is None:
+                self._grams = defaultdict(set)
+                for slot in self._slots.values():
+                    self._index_label(slot, self._docs[slot][3])
+            grams = sorted((self._grams.get(gram, set()) for gram in _trigrams(text)), key=len)
+            slots = grams[0].intersection(*grams[1:]) if grams else self._slots.values()
+            hits = []
+            for slot in sorted(slots):
+                doc_id, kind, service_id, label = self._docs[slot]
+                if (kinds is None or kind in kinds) and text in label.lower():
+                    hits.append(SearchHit(doc_id, kind, service_id, label, 1.0))
+            return hits
+
+    def documents(self, service_id: str, kinds: Optional[Iterable[str]] = None) -> List[str]:
+        """Document ids of a service"""
+        kinds = set(kinds) if kinds else None
+        with self._lock:
+            return [self._docs[slot][0] for slot in self._service_slots.get(service_id, ())
+                    if kinds is None or self._docs[slot][1] in kinds]
+
+    def _score(self, query: str, prefix: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """BM25 score per slot and the slots that matched at least one term"""
+        n_docs = len(self._slots)
+        tokens = dict.fromkeys(tokenize(query))
+        if prefix:
+            terms = list(dict.fromkeys(term for token in tokens for term in self._expand(token)))
+        else:
+            terms = [t for t in tokens if t in self._postings]
+        if not n_docs or not terms:
+            return np.zeros(0), np.zeros(0, dtype=np.int64)
+
+        scores = np.zeros(len(self._docs))
+        for term in terms:
+            slots, contributions = self._compile(term)
+            scores[slots] += contributions
+        return scores, np.flatnonzero(scores)
+
+    def _expand(self, token: str, max_terms: int = 64) -> List[str]:
+        """Indexed terms starting with token, at most max_terms"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        start = bisect_left(self._vocabulary, token)
+        terms = []
+        for term in self._vocabulary[start:start + max_terms]:
+            if not term.startswith(token):
+                break
+            terms.append(term)
+        return terms
+
+    def _compile(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Slots containing term and their BM25 contributions"""
+        compiled = self._compiled.get(term)
+        if compiled is None:
+            postings = self._postings[term]
+            slots = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+            tfs = np.fromiter(postings.values(), dtype=float, count=len(postings))
+            compiled = self._compiled[term] = (slots, tfs, self._vectors()[0][slots])
+        slots, tfs, lengths = compiled
+        n_docs = len(self._slots)
+        idf = math.log(1.0 + (n_docs - len(slots) + 0.5) / (len(slots) + 0.5))
+        norm = self.k1 * (1.0 - self.b + self.b * lengths / (self._total_length / n_docs or 1.0))
+        return slots, idf * tfs * (self.k1 + 1.0) / (tfs + norm)
+
+    def _index_label(self, slot: int, label: str):
+        if self._grams is not None:
+            for gram in _trigrams(label):
+                self._grams[gram].add(slot)
+
+    def _vectors(self) -> Tuple[np.ndarray, ...]:
+        """Per-slot lengths, service codes and kind codes; slots ordered by service and where each service starts"""
+        if self._arrays is None:
+            codes = np.asarray(self._codes, dtype=np.int64)
+            by_service = np.argsort(codes, kind="stable")
+            grouped = codes[by_service]
+            starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]]) if len(codes) else np.zeros(0, dtype=np.int64)
+            self._arrays = (np.asarray(self._lengths, dtype=float), codes,
+                            np.asarray(self._kinds, dtype=np.int8), by_service, starts)
+        return self._arrays
+
+    def _filter_kinds(self, slots: np.ndarray, kinds: Optional[Iterable[str]]) -> np.ndarray:
+        if not kinds:
+            return slots
+        kind_codes = self._vectors()[2]
+        return slots[np.isin(kind_codes[slots], [KINDS.index(kind) for kind in kinds])]
+
+    # Persistence
+
+    def save(self, path: Path):
+        """Write the index as JSON (atomically, via a temporary file)"""
+        path = Path(path)
+        with self._lock:
+            data = {
+                "version": INDEX_FORMAT_VERSION,
+                "k1": self.k1,
+                "b": self.b,
+                "documents": [[*self._docs[slot], self._terms[slot], self._exact[slot]]
+                              for slot in sorted(self._slots.values())],
+            }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "SearchIndex":
+        """Read an index written by save(); an unreadable or outdated file gives an empty index"""
+        path = Path(path)
+        try:
+            data = json.loads(path.read_text())
+            if data.get("version") != INDEX_FORMAT_VERSION:
+                raise ValueError(f"format version {data.get('version')}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring search index {path}: {e}")
+            return cls()
+
+        index = cls(k1=data.get("k1", 1.2), b=data.get("b", 0.75))
+        for doc_id, kind, service_id, label, terms, exact in data["documents"]:
+            index._restore(doc_id, kind, service_id, label, terms, exact)
+        return index
+
+    def _restore(self, doc_id: str, kind: str, service_id: str, label: str,
+                 terms: Dict[str, float], exact: Dict[str, str]):
+        slot = len(self._docs)
+        length = float(sum(terms.values()))
+        self._docs.append((doc_id, kind, service_id, label))
+        self._terms.append(terms)
+        self._exact.append(exact)
+        self._lengths.append(length)
+        self._codes.append(self._service_codes.setdefault(service_id, len(self._service_codes)))
+        self._kinds.append(KINDS.index(kind))
+        self._total_length += length
+        self._slots[doc_id] = slot
+        self._service_slots[service_id].add(slot)
+        for term, tf in terms.items():
+            self._postings[term][slot] = tf
+        for field, value in exact.items():
+            self._exact_postings[(field, value)].add(slot)
+        self._index_label(slot, label)
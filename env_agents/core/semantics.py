@@ -1,8 +1,12 @@
 # env_agents/core/semantics.py
 from __future__ import annotations
+import numpy as np
 import pandas as pd
 from typing import Any
 
+from .mappings import MappingArtifact
+from .units import convert_value
+
 RAW_PREFIX = "raw:"
 
 def _get_native_hint(attrs: Any) -> tuple[str|None, str|None, str|None]:
@@ -16,7 +20,7 @@ def _get_native_hint(attrs: Any) -> tuple[str|None, str|None, str|None]:
         return nat.get("id"), nat.get("label"), nat.get("unit")
     return None, None, None
 
-def attach_semantics(df: pd.DataFrame, broker, dataset: str) -> pd.DataFrame:
+def attach_semantics(df: pd.DataFrame, mapping: MappingArtifact) -> pd.DataFrame:
     """
     Adds (or ensures) semantic columns:
       - observed_property_uri
@@ -24,78 +28,97 @@ def attach_semantics(df: pd.DataFrame, broker, dataset: str) -> pd.DataFrame:
       - preferred_unit
       - value_converted (optional, when conversion is known)
 
-    May also remap df['variable'] from 'raw:*' to canonical when confident.
+    May also remap df['variable'] from 'raw:*' to canonical when the
+    dataset's compiled mapping knows the native id. Semantics are a join
+    against the mapping artifact, whose dataset and version are recorded in
+    df.attrs and in dict provenance.
     Never mutates df['value'] or df['unit'].
     """
     # Ensure columns exist even for empty frames
     for col in ("observed_property_uri", "unit_uri", "preferred_unit"):
         if col not in df.columns:
             df[col] = None
+    df.attrs["mapping_artifact"] = mapping.provenance
     if df.empty:
         return df
 
-    # Work row-by-row (small frames) or vectorize later if needed
-    for i in df.index:
-        var = df.at[i, "variable"] if "variable" in df.columns else None
-        unit = df.at[i, "unit"] if "unit" in df.columns else None
+    table = mapping.table
+    variable = df["variable"].astype(object) if "variable" in df.columns else pd.Series(None, index=df.index, dtype=object)
+    unit = df["unit"].astype(object) if "unit" in df.columns else pd.Series(None, index=df.index, dtype=object)
+
+    # Promote raw variables: native id from attributes, else the raw suffix
+    raw = np.fromiter((isinstance(v, str) and v.startswith(RAW_PREFIX) for v in variable), dtype=bool, count=len(df))
+    if raw.any():
+        attrs = df["attributes"] if "attributes" in df.columns else pd.Series(None, index=df.index)
+        native = [_get_native_hint(a)[0] or v[len(RAW_PREFIX):]
+                  for a, v in zip(attrs[raw], variable[raw])]
+        rows = mapping.lookup(native)
+        hit = rows >= 0
+        if hit.any():
+            positions = np.flatnonzero(raw)[hit]
+            variable = variable.copy()
+            variable.iloc[positions] = table["canonical"].to_numpy()[rows[hit]]
+            df["variable"] = variable
+            # Attach a light trace
+            if "attributes" in df.columns:
+                attributes = df["attributes"].tolist()
+                for pos, source in zip(positions, table["source"].to_numpy()[rows[hit]]):
+                    if isinstance(attributes[pos], dict):
+                        attributes[pos] = {**attributes[pos], "mapping_source": source}
+                df["attributes"] = pd.Series(attributes, index=df.index, dtype=object)
 
-        # Try to promote raw variables using native hints
-        if isinstance(var, str) and var.startswith(RAW_PREFIX):
-            attrs = df.at[i, "attributes"] if "attributes" in df.columns else None
-            native_id, native_label, native_unit = _get_native_hint(attrs)
-            try:
-                # Prefer an explicit native id; broker should look in rule pack first, then registry
-                mapped = None
-                if native_id:
-                    mapped = broker.match_one(dataset, native_id=native_id, native_label=native_label, native_unit=native_unit)
-                elif native_label or native_unit:
-                    mapped = broker.match_one(dataset, native_label=native_label, native_unit=native_unit)
+    # Lookup canonical metadata (only for variables that are canonical ids)
+    rows = mapping.lookup(variable)
+    found = rows >= 0
+    found[found] = table["canonical"].to_numpy()[rows[found]] == variable.to_numpy()[found]
 
-                if mapped and mapped.get("canonical") and float(mapped.get("confidence", 1.0)) >= 0.9:
-                    df.at[i, "variable"] = mapped["canonical"]
-                    # Attach a light trace
-                    if "attributes" in df.columns and isinstance(attrs, dict):
-                        attrs = dict(attrs)
-                        attrs["mapping_source"] = mapped.get("source", "rules/registry")
-                        df.at[i, "attributes"] = attrs
-            except Exception:
-                # fail soft
-                pass
+    def _meta(col: str) -> pd.Series:
+        values = np.full(len(df), None, dtype=object)
+        values[found] = table[col].to_numpy()[rows[found]]
+        return pd.Series(values, index=df.index, dtype=object)
 
-        # Lookup canonical metadata
-        var = df.at[i, "variable"] if "variable" in df.columns else None
-        meta = None
-        try:
-            meta = broker.lookup_canonical(var) if var else None
-        except Exception:
-            meta = None
+    preferred = _meta("preferred_unit")
+    # Fill semantic columns
+    df["observed_property_uri"] = df["observed_property_uri"].astype(object).where(
+        df["observed_property_uri"].notna(), _meta("observed_property_uri"))
+    df["unit_uri"] = df["unit_uri"].astype(object).where(df["unit_uri"].notna(), _meta("unit_uri"))
+    df["preferred_unit"] = (df["preferred_unit"].astype(object)
+                            .where(df["preferred_unit"].notna(), preferred)
+                            .where(lambda s: s.notna(), unit))
 
-        # Fill semantic columns
-        if meta:
-            if "observed_property_uri" in meta and df.at[i, "observed_property_uri"] in (None, pd.NA):
-                df.at[i, "observed_property_uri"] = meta.get("observed_property_uri")
-            if "unit_uri" in meta and df.at[i, "unit_uri"] in (None, pd.NA):
-                df.at[i, "unit_uri"] = meta.get("unit_uri")
-            if df.at[i, "preferred_unit"] in (None, pd.NA):
-                df.at[i, "preferred_unit"] = meta.get("preferred_unit") or unit
+    # Optional conversion (non-destructive), one affine map per (unit, preferred unit)
+    if "value" in df.columns:
+        value = pd.to_numeric(df["value"], errors="coerce")
+        convert = (found & unit.notna().to_numpy() & preferred.notna().to_numpy()
+                   & (unit != preferred).to_numpy() & value.notna().to_numpy())
+        if convert.any():
+            converted = pd.Series(np.full(len(df), None, dtype=object), index=df.index)
+            pairs = pd.DataFrame({"unit": unit[convert].to_numpy(), "preferred": preferred[convert].to_numpy()},
+                                 index=np.flatnonzero(convert))
+            for (u_from, u_to), positions in pairs.groupby(["unit", "preferred"]).groups.items():
+                offset = convert_value(0.0, u_from, u_to)
+                if offset is None:
+                    continue
+                scale = convert_value(1.0, u_from, u_to) - offset
+                converted.iloc[positions] = value.to_numpy()[positions] * scale + offset
+            if converted.notna().any():
+                if "value_converted" not in df.columns:
+                    df["value_converted"] = None
+                df["value_converted"] = converted.where(converted.notna(), df["value_converted"].astype(object))
 
-            # Optional conversion (non-destructive)
-            try:
-                if "value" in df.columns:
-                    v = df.at[i, "value"]
-                    preferred = meta.get("preferred_unit")
-                    if v is not None and unit and preferred and preferred != unit:
-                        conv = broker.convert_value(var, v, unit)
-                        if conv is not None:
-                            # Create the column if not present
-                            if "value_converted" not in df.columns:
-                                df["value_converted"] = None
-                            df.at[i, "value_converted"] = conv
-            except Exception:
-                pass
-        else:
-            # No meta: still make sure preferred_unit has something sensible
-            if df.at[i, "preferred_unit"] in (None, pd.NA):
-                df.at[i, "preferred_unit"] = unit
+    # Record the mapping in provenance; rows sharing one dict keep sharing one
+    if "provenance" in df.columns:
+        tag = f"{mapping.dataset}@{mapping.version}"
+        updated: dict = {}
+        def _tag(p):
+            if isinstance(p, dict):
+                key = id(p)
+                if key not in updated:
+                    updated[key] = {**p, "mapping_artifact": tag}
+                return updated[key]
+            if p is None or (isinstance(p, float) and np.isnan(p)):
+                return {"mapping_artifact": tag}
+            return p
+        df["provenance"] = [_tag(p) for p in df["provenance"]]
 
     return df
@@ -11,15 +11,22 @@ import json
 import logging
 from datetime import datetime, timedelta
 from collections import defaultdict
+from bisect import bisect_left, bisect_right, insort
 
 from .metadata_schema import (
     ServiceMetadata, 
     MetadataValidator,
     VariableInfo,
+    ServiceCapabilities,
+    SpatialCoverage,
+    TemporalCoverage,
+    AuthenticationInfo,
+    AuthenticationType,
     QualityMetrics,
     ProvenanceInfo,
     RegistrySource
 )
+from .search_index import SearchIndex
 
 logger = logging.getLogger(__name__)
 
@@ -34,13 +41,25 @@ class ServiceRegistry:
     
     def __init__(self, registry_path: Optional[Path] = None):
         self.registry_path = registry_path or Path("registry/services.json")
+        self.search_index_path = self.registry_path.with_name("search_index.json")
         self._services: Dict[str, ServiceMetadata] = {}
         self._service_index = ServiceIndex()
+        # Full-text index used by SemanticDiscoveryEngine; also holds catalog
+        # assets that aren't registered as services, hence persisted separately
+        self.search_index = (SearchIndex.load(self.search_index_path)
+                             if self.search_index_path.exists() else SearchIndex())
+        # Unsaved changes to services.json and search_index.json
+        self._dirty = False
+        self._index_dirty = False
         self._load_registry()
         
     def register_service(self, metadata: ServiceMetadata, validate: bool = True) -> bool:
         """
         Register a new service or update existing service metadata.
+
+        The change is written to disk by save(), register_services() or
+        close(), so registering services one at a time doesn't rewrite the
+        registry and search index each time.
         
         Args:
             metadata: Complete service metadata
@@ -67,14 +86,79 @@ class ServiceRegistry:
             
             self._services[metadata.service_id] = metadata
             self._service_index.index_service(metadata)
-            self._save_registry()
+            self.search_index.index_service(metadata)
+            self._dirty = self._index_dirty = True
             
             return True
             
         except Exception as e:
             logger.error(f"Failed to register service {metadata.service_id}: {e}")
             return False
+
+    def register_services(self, services: List[ServiceMetadata], validate: bool = True) -> List[str]:
+        """
+        Register many services at once, indexing and saving the registry once.
+
+        Args:
+            services: Service metadata to register or update
+            validate: Whether to validate metadata before registration
+
+        Returns:
+            IDs of the services that were registered
+        """
+        registered = []
+        now = datetime.now()
+        for metadata in services:
+            if validate:
+                issues = MetadataValidator.validate_metadata(metadata)
+                if issues:
+                    logger.warning(f"Service {metadata.service_id} has validation issues: {issues}")
+                    continue
+            if metadata.service_id not in self._services:
+                metadata.provenance.created_date = now
+            metadata.provenance.last_updated = now
+            self._services[metadata.service_id] = metadata
+            self.search_index.index_service(metadata)
+            registered.append(metadata)
+
+        self._service_index.bulk_load(registered)
+        if registered:
+            logger.info(f"Registered {len(registered)} services")
+            self._dirty = self._index_dirty = True
+        self.save()
+        return [metadata.service_id for metadata in registered]
     
+    def register_assets(self, service_id: str, assets: List[Dict[str, Any]]) -> int:
+        """
+        Make catalog entries served through a registered service searchable.
+
+        Args:
+            service_id: Service that serves the assets (e.g. EARTH_ENGINE)
+            assets: Dicts with "id" and optional "title", "description", "keywords"
+
+        Returns:
+            Number of assets indexed
+        """
+        assets = list(assets)
+        self.search_index.index_assets(service_id, assets)
+        self._index_dirty = True
+        self.save()
+        return len(assets)
+
+    def save(self):
+        """Write unsaved registrations and index changes to disk"""
+        if self._dirty or self._index_dirty:
+            self._save_registry()
+
+    def close(self):
+        self.save()
+
+    def __enter__(self) -> "ServiceRegistry":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     def get_service(self, service_id: str) -> Optional[ServiceMetadata]:
         """Get service metadata by ID"""
         return self._services.get(service_id)
@@ -151,7 +235,9 @@ class ServiceRegistry:
         metadata = self._services.get(service_id)
         if metadata:
             metadata.update_quality_metrics(success, response_time, error)
-            self._save_registry()
+            self._service_index.update_quality(metadata)
+            self._dirty = True
+            self.save()
     
     def get_variables_by_domain(self, domain: str) -> List[Tuple[str, VariableInfo]]:
         """Get all variables available for a specific domain"""
@@ -238,11 +324,13 @@ class ServiceRegistry:
                     metadata.quality_metrics.reliability_score < 0.1):
                     stale_services.append(service_id)
                     del self._services[service_id]
+                    self._service_index.remove_service(service_id)
+                    self.search_index.remove_service(service_id)
                     logger.info(f"Removed stale service: {service_id}")
         
         if stale_services:
-            self._service_index.rebuild(list(self._services.values()))
-            self._save_registry()
+            self._dirty = self._index_dirty = True
+            self.save()
             
         return stale_services
     
@@ -261,38 +349,84 @@ class ServiceRegistry:
                     # Convert from dict to ServiceMetadata object
                     metadata = self._dict_to_metadata(service_data)
                     self._services[metadata.service_id] = metadata
-                    self._service_index.index_service(metadata)
+                    # A persisted search index already holds the service's documents
+                    if not self.search_index.documents(metadata.service_id, kinds=("service",)):
+                        self.search_index.index_service(metadata)
+                        self._index_dirty = True
                 except Exception as e:
                     logger.error(f"Failed to load service from registry: {e}")
-                    
+
+            self._service_index.bulk_load(list(self._services.values()))
             logger.info(f"Loaded {len(self._services)} services from registry")
             
         except Exception as e:
             logger.error(f"Failed to load registry: {e}")
     
     def _save_registry(self):
-        """Save service registry to disk"""
+        """Save service registry to disk; the search index only when it changed"""
         try:
             self.registry_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            data = {
-                'version': '1.0',
-                'updated': datetime.now().isoformat(),
-                'services': [self._metadata_to_dict(m) for m in self._services.values()]
-            }
-            
-            with open(self.registry_path, 'w') as f:
-                json.dump(data, f, indent=2)
-                
+
+            if self._dirty:
+                data = {
+                    'version': '1.0',
+                    'updated': datetime.now().isoformat(),
+                    'services': [self._metadata_to_dict(m) for m in self._services.values()]
+                }
+
+                tmp = self.registry_path.with_suffix(".tmp")
+                with open(tmp, 'w') as f:
+                    json.dump(data, f, indent=2)
+                tmp.replace(self.registry_path)
+                self._dirty = False
+
+            if self._index_dirty:
+                self.search_index.save(self.search_index_path)
+                self._index_dirty = False
+
         except Exception as e:
             logger.error(f"Failed to save registry: {e}")
     
     def _dict_to_metadata(self, data: Dict[str, Any]) -> ServiceMetadata:
-        """Convert dictionary to ServiceMetadata object"""
-        # This is a simplified conversion - in practice you'd need
-        # more sophisticated deserialization
-        # For now, we'll use the dict data directly
-        pass
+        """Convert dictionary (as written by ServiceMetadata.to_dict) to ServiceMetadata object"""
+        variables = [
+            VariableInfo(
+                id=var['id'],
+                canonical=var.get('canonical'),
+                name=var.get('name') or "",
+                description=var.get('description') or "",
+                unit=var.get('unit'),
+                domain=var.get('domain')
+            )
+            for var in data.get('variables', [])
+        ]
+        metadata = ServiceMetadata(
+            service_id=data['service_id'],
+            title=data['title'],
+            description=data['description'],
+            provider=data['provider'],
+            source_url=data['source_url'],
+            license=data['license'],
+            version=data.get('version', "1.0"),
+            capabilities=ServiceCapabilities(
+                domains=list(data.get('domains', [])),
+                variables=variables,
+                spatial_coverage=SpatialCoverage(description=data.get('spatial_coverage') or ""),
+                temporal_coverage=TemporalCoverage(description=data.get('temporal_coverage') or ""),
+                data_formats=[]
+            ),
+            authentication=AuthenticationInfo(
+                required=bool(data.get('authentication_required', False)),
+                type=AuthenticationType(data.get('authentication_type') or 'none')
+            ),
+            tags=list(data.get('tags', [])),
+            notes=data.get('notes') or ""
+        )
+        metadata.quality_metrics.reliability_score = data.get('reliability_score', 0.0)
+        metadata.quality_metrics.data_quality_score = data.get('data_quality_score', 0.0)
+        if data.get('last_updated'):
+            metadata.provenance.last_updated = datetime.fromisoformat(data['last_updated'])
+        return metadata
     
     def _metadata_to_dict(self, metadata: ServiceMetadata) -> Dict[str, Any]:
         """Convert ServiceMetadata to dictionary"""
@@ -305,6 +439,11 @@ class ServiceIndex:
     
     Maintains multiple indexes for fast lookup by domain, variable,
     provider, and other service characteristics.
+
+    Each service's index keys are remembered (reverse postings), so
+    re-indexing or removing a service touches only its own keys. The quality
+    list is kept sorted with bisect; bulk_load() indexes many services with
+    a single sort.
     """
     
     def __init__(self):
@@ -312,38 +451,36 @@ class ServiceIndex:
         self.variable_index: Dict[str, Set[str]] = defaultdict(set)  
         self.provider_index: Dict[str, Set[str]] = defaultdict(set)
         self.auth_index: Dict[bool, Set[str]] = {True: set(), False: set()}
-        self.quality_index: List[Tuple[float, str]] = []  # (score, service_id)
+        self.quality_index: List[Tuple[float, str]] = []  # (-score, service_id), ascending = best first
+        self._postings: Dict[str, List[Tuple[Dict[Any, Set[str]], Any]]] = {}  # service_id -> (index, key)
+        self._quality: Dict[str, float] = {}  # service_id -> score in quality_index
         
     def index_service(self, metadata: ServiceMetadata):
         """Add or update service in search indexes"""
+        self._remove_from_indexes(metadata.service_id)
+        self._add_to_indexes(metadata)
+        entry = (-self._quality[metadata.service_id], metadata.service_id)
+        insort(self.quality_index, entry)
+
+    def bulk_load(self, services: List[ServiceMetadata]):
+        """Add or update many services, sorting the quality list once"""
+        for metadata in services:
+            self._remove_from_indexes(metadata.service_id)
+            self._add_to_indexes(metadata)
+        self.quality_index = sorted((-score, service_id) for service_id, score in self._quality.items())
+
+    def update_quality(self, metadata: ServiceMetadata):
+        """Move a service whose quality score changed (e.g. after a health update)"""
         service_id = metadata.service_id
-        
-        # Remove from existing indexes
+        if service_id not in self._quality:
+            return
+        self._remove_quality(service_id)
+        self._quality[service_id] = metadata.get_quality_score()
+        insort(self.quality_index, (-self._quality[service_id], service_id))
+
+    def remove_service(self, service_id: str):
+        """Remove service from all indexes"""
         self._remove_from_indexes(service_id)
-        
-        # Domain index
-        for domain in metadata.capabilities.domains:
-            self.domain_index[domain.lower()].add(service_id)
-        
-        # Variable index (by ID, canonical, and name)
-        for var in metadata.capabilities.variables:
-            if var.id:
-                self.variable_index[var.id.lower()].add(service_id)
-            if var.canonical:
-                self.variable_index[var.canonical.lower()].add(service_id)
-            if var.name:
-                self.variable_index[var.name.lower()].add(service_id)
-        
-        # Provider index
-        self.provider_index[metadata.provider.lower()].add(service_id)
-        
-        # Authentication index
-        self.auth_index[metadata.authentication.required].add(service_id)
-        
-        # Quality index
-        quality_score = metadata.get_quality_score()
-        self.quality_index.append((quality_score, service_id))
-        self.quality_index.sort(reverse=True)  # Keep sorted by quality desc
     
     def search(
         self,
@@ -356,33 +493,22 @@ class ServiceIndex:
     ) -> List[str]:
         """Search for services matching criteria"""
         
-        # Start with all services
-        candidates = set(service_id for _, service_id in self.quality_index)
-        
-        # Apply filters
+        # Intersect the postings of the filters that are set
+        filters = []
         if domain:
-            domain_matches = self.domain_index.get(domain.lower(), set())
-            candidates &= domain_matches
-            
+            filters.append(self.domain_index.get(domain.lower(), set()))
         if variable:
-            variable_matches = self.variable_index.get(variable.lower(), set())
-            candidates &= variable_matches
-            
+            filters.append(self.variable_index.get(variable.lower(), set()))
         if provider:
-            provider_matches = self.provider_index.get(provider.lower(), set())
-            candidates &= provider_matches
-            
+            filters.append(self.provider_index.get(provider.lower(), set()))
         if authentication_required is not None:
-            auth_matches = self.auth_index[authentication_required]
-            candidates &= auth_matches
+            filters.append(self.auth_index[authentication_required])
+        candidates = set.intersection(*sorted(filters, key=len)) if filters else None
         
-        # Apply quality filter and return in quality order
-        results = []
-        for quality_score, service_id in self.quality_index:
-            if service_id in candidates and quality_score >= min_quality_score:
-                results.append(service_id)
-                
-        return results
+        # Services at or above min_quality_score form a prefix of the quality list
+        end = bisect_right(self.quality_index, (-min_quality_score, chr(0x10FFFF)))
+        return [service_id for _, service_id in self.quality_index[:end]
+                if candidates is None or service_id in candidates]
     
     def rebuild(self, services: List[ServiceMetadata]):
         """Rebuild all indexes from scratch"""
@@ -390,32 +516,49 @@ class ServiceIndex:
         self.variable_index.clear()
         self.provider_index.clear()
         self.auth_index = {True: set(), False: set()}
-        self.quality_index.clear()
-        
-        for metadata in services:
-            self.index_service(metadata)
-    
+        self.quality_index = []
+        self._postings.clear()
+        self._quality.clear()
+        self.bulk_load(services)
+
+    def _add_to_indexes(self, metadata: ServiceMetadata):
+        service_id = metadata.service_id
+        postings = []
+
+        # Domain index
+        for domain in {d.lower() for d in metadata.capabilities.domains}:
+            postings.append((self.domain_index, domain))
+
+        # Variable index (by ID, canonical, and name)
+        variable_keys = set()
+        for var in metadata.capabilities.variables:
+            variable_keys.update(value.lower() for value in (var.id, var.canonical, var.name) if value)
+        postings.extend((self.variable_index, key) for key in variable_keys)
+
+        # Provider and authentication indexes
+        postings.append((self.provider_index, metadata.provider.lower()))
+        postings.append((self.auth_index, metadata.authentication.required))
+
+        for index, key in postings:
+            index[key].add(service_id)
+        self._postings[service_id] = postings
+        self._quality[service_id] = metadata.get_quality_score()
+
     def _remove_from_indexes(self, service_id: str):
-        """Remove service from all indexes"""
-        # Remove from domain index
-        for domain_services in self.domain_index.values():
-            domain_services.discard(service_id)
-            
-        # Remove from variable index
-        for variable_services in self.variable_index.values():
-            variable_services.discard(service_id)
-            
-        # Remove from provider index  
-        for provider_services in self.provider_index.values():
-            provider_services.discard(service_id)
-            
-        # Remove from auth index
-        for auth_services in self.auth_index.values():
-            auth_services.discard(service_id)
-            
-        # Remove from quality index
-        self.quality_index = [(score, sid) for score, sid in self.quality_index 
-                             if sid != service_id]
+        """Remove service from the postings it was added to"""
+        for index, key in self._postings.pop(service_id, ()):
+            services = index[key]
+            services.discard(service_id)
+            if not services and index is not self.auth_index:
+                del index[key]
+        if service_id in self._quality:
+            self._remove_quality(service_id)
+            del self._quality[service_id]
+
+    def _remove_quality(self, service_id: str):
+        position = bisect_left(self.quality_index, (-self._quality[service_id], service_id))
+        if position < len(self.quality_index) and self.quality_index[position][1] == service_id:
+            del self.quality_index[position]
 
 
 class ServiceHealthTracker:
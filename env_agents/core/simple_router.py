@@ -6,6 +6,7 @@ from typing import Dict, Any, List, Union, Tuple
 from .registry import RegistryManager
 from .models import RequestSpec, CORE_COLUMNS
 from .errors import FetchError
+from .planner import QueryPlanner
 from datetime import datetime, timezone
 from .ids import compute_observation_id as _cid
 
@@ -415,8 +416,8 @@ class SimpleEnvRouter:
         adapter = self.adapters[dataset]
         
         try:
-            # 1. Fetch raw data from adapter
-            df = adapter.fetch(spec)
+            # 1. Fetch raw data from adapter, split along its declared limits
+            df = QueryPlanner(adapter).fetch(spec)
             
             # 2. Apply standardized post-processing
             df = self._apply_standard_processing(df, adapter, spec)
@@ -448,11 +449,9 @@ class SimpleEnvRouter:
         
         # Apply semantic processing if registry available
         try:
-            registry = self.registry.merged()
-            from .term_broker import TermBroker
+            from .mappings import get_mapping
             from .semantics import attach_semantics
-            broker = TermBroker(registry)
-            df = attach_semantics(df, broker, adapter.DATASET)
+            df = attach_semantics(df, get_mapping(self.registry, adapter.DATASET))
         except Exception:
             # Semantic processing is optional - continue without it
             pass
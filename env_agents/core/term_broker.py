@@ -1,9 +1,12 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple, Any
 import re
+import threading
+
+import numpy as np
 
 from .units import normalize_unit, convertible
 
@@ -73,6 +76,9 @@ def _norm_label(s: Optional[str]) -> str:
 def _starts_or_contains(a: str, b: str) -> bool:
     return a.startswith(b) or (b in a)
 
+def _trigrams(s: str) -> set:
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
 @dataclass
 class CanonicalVar:
     id: str                     # e.g., "water:discharge_cfs"
@@ -109,12 +115,32 @@ class RulePack:
     exact_map: Dict[str, str]        # native_id -> canonical
     unit_aliases: Dict[str, str]     # unit alias normalization additions (optional)
     label_hints: Dict[str, str]      # native_id -> label hint (optional)
+    normalized_hints: Dict[str, str] = field(default_factory=dict)  # native_id -> _norm_label(hint)
+
+# Compiled packs by dataset; None records a dataset without a rules module
+_RULE_PACKS: Dict[str, Optional[RulePack]] = {}
+_RULE_PACKS_LOCK = threading.Lock()
 
 def load_rule_pack(dataset: str) -> Optional[RulePack]:
     """
     Attempts to import adapters.<dataset_name_lower>.rules and retrieve
     CANONICAL_MAP, UNIT_ALIASES, LABEL_HINTS. Missing module is OK.
+    Packs are compiled once per dataset; clear_rule_packs() forces a reload.
     """
+    key = dataset.upper()
+    with _RULE_PACKS_LOCK:
+        if key in _RULE_PACKS:
+            return _RULE_PACKS[key]
+    rp = _compile_rule_pack(dataset)
+    with _RULE_PACKS_LOCK:
+        return _RULE_PACKS.setdefault(key, rp)
+
+def clear_rule_packs() -> None:
+    """Drop compiled rule packs (e.g. after editing a rules module)"""
+    with _RULE_PACKS_LOCK:
+        _RULE_PACKS.clear()
+
+def _compile_rule_pack(dataset: str) -> Optional[RulePack]:
     mod_name = None
     if dataset.upper() == "NASA_POWER" or dataset.upper() == "POWER":
         mod_name = "env_agents.adapters.power.rules"
@@ -135,7 +161,65 @@ def load_rule_pack(dataset: str) -> Optional[RulePack]:
     if not isinstance(exact, dict): exact = {}
     if not isinstance(units, dict): units = {}
     if not isinstance(hints, dict): hints = {}
-    return RulePack(exact_map=exact, unit_aliases=units, label_hints=hints)
+    normalized = {nid: _norm_label(hint) for nid, hint in hints.items() if hint}
+    return RulePack(exact_map=exact, unit_aliases=units, label_hints=hints, normalized_hints=normalized)
+
+# ----------------------------
+# Candidate index
+# ----------------------------
+
+class _LabelIndex:
+    """
+    Character-trigram index over normalized canonical labels.
+
+    The generic label rules test substring containment in both directions,
+    and a string can only occur inside another if all of its trigrams do.
+    Keys are filed under their rarest trigram, so the keys a label may
+    contain are those filed under one of its trigrams, and the keys that may
+    contain the label are the postings of its rarest trigram. Candidates are
+    confirmed with the substring test itself.
+    """
+
+    def __init__(self, keys: List[str]):
+        self.keys = keys
+        grams = [_trigrams(k) for k in keys]
+        self._postings: Dict[str, List[int]] = {}
+        for i, g in enumerate(grams):
+            for t in g:
+                self._postings.setdefault(t, []).append(i)
+        self._by_rarest: Dict[str, List[int]] = {}
+        self._short: List[int] = []  # keys under 3 chars, checked against every label
+        for i, g in enumerate(grams):
+            if g:
+                self._by_rarest.setdefault(min(g, key=lambda t: len(self._postings[t])), []).append(i)
+            else:
+                self._short.append(i)
+
+    def matches(self, label: str) -> Tuple[List[int], List[int]]:
+        """
+        (keys occurring in label, keys label occurs in that don't also occur
+        in it), as key indexes in ascending order.
+        """
+        grams = _trigrams(label)
+        contained = sorted(i for i in [j for t in grams for j in self._by_rarest.get(t, ())] + self._short
+                           if self.keys[i] in label)
+        if not grams:
+            candidates = range(len(self.keys))
+        elif all(t in self._postings for t in grams):
+            candidates = min((self._postings[t] for t in grams), key=len)
+        else:
+            candidates = []
+        seen = set(contained)
+        containing = [i for i in candidates if i not in seen and label in self.keys[i]]
+        return contained, containing
+
+
+# Scores in thousandths so that sums, thresholds and ties are exact
+_EXACT, _HINT, _LABEL_EQ, _LABEL_CONTAINS, _LABEL_PREFIX = 950, 700, 250, 200, 100
+_UNIT_EQ, _UNIT_CONVERTIBLE, _DOMAIN_EQ = 30, 20, 10
+
+# Reason flags per (native, canonical) pair
+_R_EXACT, _R_HINT, _R_EQ, _R_CONTAINS, _R_PREFIX, _R_UNIT_EQ, _R_UNIT_CONV, _R_DOMAIN = (1 << i for i in range(8))
 
 # ----------------------------
 # Term Broker
@@ -147,6 +231,10 @@ class TermBroker:
     - service rule packs (exact id maps + hints + unit aliases)
     - generic label+unit heuristics
     Produces scored suggestions for auto-accept and curation.
+
+    Generic label candidates come from a trigram index over the normalized
+    canonical labels, and match_batch() scores all natives of a dataset in
+    one vectorized pass.
     """
 
     def __init__(self, registry_seed: Dict[str, Any]):
@@ -178,54 +266,184 @@ class TermBroker:
         for c in self._canon.values():
             self._canon_by_label.setdefault(_norm_label(c.label), []).append(c)
 
+        # Canonical columns follow _canon_by_label order; ties between equal
+        # scores go to the first candidate found in that order
+        self._ids: List[str] = []
+        self._key_cols: Dict[str, np.ndarray] = {}
+        for k, cands in self._canon_by_label.items():
+            self._key_cols[k] = np.arange(len(self._ids), len(self._ids) + len(cands))
+            self._ids.extend(c.id for c in cands)
+        self._col = {cid: i for i, cid in enumerate(self._ids)}
+        self._col_key = [k for k, cands in self._canon_by_label.items() for _ in cands]
+        self._label_index = _LabelIndex([k for k in self._canon_by_label if k])
+
+        canon = [self._canon[cid] for cid in self._ids]
+        self._units = sorted({c.preferred_unit for c in canon if c.preferred_unit})
+        self._unit_codes = self._codes([c.preferred_unit for c in canon], self._units)
+        self._domains = sorted({c.domain for c in canon if c.domain})
+        self._domain_codes = self._codes([c.domain for c in canon], self._domains)
+        self._unit_scores: Dict[Tuple[str, str], Tuple[int, int]] = {}
+
+    @staticmethod
+    def _codes(values: List[Optional[str]], vocabulary: List[str]) -> np.ndarray:
+        """Positions of values in vocabulary, -1 for missing/unknown"""
+        index = {v: i for i, v in enumerate(vocabulary)}
+        return np.fromiter((index.get(v, -1) if v else -1 for v in values), dtype=np.int64, count=len(values))
+
     # ---- scoring helpers ----
 
-    def _score_exact_rule(self, native_id: str, rp: Optional[RulePack]) -> Optional[Tuple[str, float, List[str]]]:
-        if not rp or native_id not in rp.exact_map:
-            return None
-        return (rp.exact_map[native_id], 0.95, [f"exact:{native_id}"])
-
-    def _score_label_hint(self, dataset: str, native_id: str, label: Optional[str], rp: Optional[RulePack]) -> Optional[Tuple[str, float, List[str]]]:
-        if not rp:
-            return None
-        hint = rp.label_hints.get(native_id)
-        if not hint:
-            return None
-        k = _norm_label(hint)
-        cands = self._canon_by_label.get(k, [])
-        if not cands:
-            return None
-        # if multiple, pick first; they share same normalized label
-        return (cands[0].id, 0.70, [f"label_hint:{native_id}->{hint}"])
-
-    def _score_label_generic(self, label: Optional[str]) -> List[Tuple[str, float, List[str]]]:
-        if not label:
-            return []
-        nl = _norm_label(label)
+    def _score_units(self, native_unit: str, preferred_unit: str) -> Tuple[int, int]:
+        """(bonus, reason flag) for a native unit against a preferred unit, cached"""
+        key = (native_unit, preferred_unit)
+        if key not in self._unit_scores:
+            nu = normalize_unit(native_unit)
+            if nu == preferred_unit:
+                self._unit_scores[key] = (_UNIT_EQ, _R_UNIT_EQ)
+            elif convertible(nu, preferred_unit):
+                self._unit_scores[key] = (_UNIT_CONVERTIBLE, _R_UNIT_CONV)
+            else:
+                self._unit_scores[key] = (0, 0)
+        return self._unit_scores[key]
+
+    def _label_candidates(self, labels: List[str]) -> List[List[Tuple[np.ndarray, int, int, int]]]:
+        """Per normalized label: (columns, points, insertion stage, reason flag) groups"""
+        keys = self._label_index.keys
         out = []
-        # exact-normalized label
-        if nl in self._canon_by_label:
-            out.extend([(c.id, 0.25, [f"label_eq:{label}"]) for c in self._canon_by_label[nl]])
-        # contains/startswith loosened
-        for k, cands in self._canon_by_label.items():
-            if k and _starts_or_contains(nl, k):
-                out.extend([(c.id, 0.20, [f"label_contains:{label}->{k}"]) for c in cands])
-            elif k and _starts_or_contains(k, nl):
-                out.extend([(c.id, 0.10, [f"label_prefix:{label}->{k}"]) for c in cands])
+        for nl in labels:
+            contained, containing = self._label_index.matches(nl)
+            groups = []
+            if nl in self._key_cols:
+                groups.append((self._key_cols[nl], _LABEL_EQ, 2, _R_EQ))
+            if contained:
+                groups.append((np.concatenate([self._key_cols[keys[j]] for j in contained]), _LABEL_CONTAINS, 3, _R_CONTAINS))
+            if containing:
+                groups.append((np.concatenate([self._key_cols[keys[j]] for j in containing]), _LABEL_PREFIX, 3, _R_PREFIX))
+            out.append(groups)
         return out
 
-    def _score_units(self, canonical: CanonicalVar, native_unit: Optional[str]) -> Tuple[float, List[str]]:
-        bonus = 0.0
-        reasons: List[str] = []
-        if not canonical.preferred_unit or not native_unit:
-            return bonus, reasons
-        nu = normalize_unit(native_unit)
-        pu = canonical.preferred_unit
-        if nu == pu:
-            bonus += 0.03; reasons.append("unit:eq")
-        elif convertible(nu, pu):
-            bonus += 0.02; reasons.append("unit:convertible")
-        return bonus, reasons
+    def match_batch(self, dataset: str, natives: List[NativeParam]) -> List[Optional[MatchSuggestion]]:
+        """
+        Best-scoring suggestion per native parameter, aligned with natives
+        (None where nothing matched). Candidates from the rule pack and the
+        label index are scored together as (native, canonical) pairs.
+        """
+        rp = load_rule_pack(dataset)
+        n_canon = len(self._ids)
+        extra: Dict[str, int] = {}  # rule-pack canonicals missing from the registry
+
+        def col(cid: str) -> int:
+            c = self._col.get(cid)
+            return c if c is not None else extra.setdefault(cid, n_canon + len(extra))
+
+        # (native row, canonical column, points, insertion stage, reason flag) pairs
+        rows, cols, points, stages, flags = [], [], [], [], []
+
+        def add(pair_rows, pair_cols, pair_points, stage, flag):
+            rows.append(pair_rows)
+            cols.append(pair_cols)
+            points.append(pair_points)
+            stages.append(stage)
+            flags.append(flag)
+
+        # 1) rule pack: exact id map and label hints
+        if rp:
+            exact = [(row, col(rp.exact_map[n.id])) for row, n in enumerate(natives) if n.id in rp.exact_map]
+            hinted = [(row, self._canon_by_label.get(rp.normalized_hints[n.id]))
+                      for row, n in enumerate(natives) if n.id in rp.normalized_hints]
+            hinted = [(row, self._col[cands[0].id]) for row, cands in hinted if cands]
+            for pairs, pair_points, stage, flag in ((exact, _EXACT, 0, _R_EXACT), (hinted, _HINT, 1, _R_HINT)):
+                if pairs:
+                    pair_rows, pair_cols = np.array(pairs, dtype=np.int64).T
+                    add(pair_rows, pair_cols, pair_points, stage, flag)
+
+        # 2) generic labels, once per distinct normalized label
+        by_label: Dict[str, List[int]] = {}
+        for row, n in enumerate(natives):
+            if n.label:
+                by_label.setdefault(_norm_label(n.label), []).append(row)
+        for label_rows, groups in zip(by_label.values(), self._label_candidates(list(by_label))):
+            label_rows = np.array(label_rows, dtype=np.int64)
+            for group_cols, group_points, stage, flag in groups:
+                add(np.repeat(label_rows, len(group_cols)), np.tile(group_cols, len(label_rows)),
+                    group_points, stage, flag)
+
+        best: List[Optional[MatchSuggestion]] = [None] * len(natives)
+        if not rows:
+            return best
+        lengths = np.fromiter(map(len, cols), dtype=np.int64, count=len(cols))
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+        points, stages, flags = (np.repeat(np.array(v, dtype=np.int64), lengths) for v in (points, stages, flags))
+
+        # 3) aggregate per (native, canonical) pair
+        width = n_canon + len(extra)
+        codes = rows * width + cols
+        perm = np.argsort(codes, kind="stable")
+        codes = codes[perm]
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        score = np.add.reduceat(points[perm], starts)
+        order = np.minimum.reduceat((stages * width + cols)[perm], starts)
+        reason = np.bitwise_or.reduceat(flags[perm], starts)
+        row, c = np.divmod(codes[starts], width)
+        known = c < n_canon
+
+        # 4) unit bonus, computed once per distinct (native unit, preferred unit)
+        native_units = sorted({n.unit for n in natives if n.unit})
+        unit_of_row = self._codes([n.unit for n in natives], native_units)
+        nu = unit_of_row[row]
+        pu = np.full(len(c), -1, dtype=np.int64)
+        pu[known] = self._unit_codes[c[known]]
+        has_units = (nu >= 0) & (pu >= 0)
+        combos, combo_inverse = np.unique(nu[has_units] * len(self._units) + pu[has_units], return_inverse=True)
+        combo_scores = np.array([self._score_units(native_units[k // len(self._units)], self._units[k % len(self._units)])
+                                 for k in combos.tolist()], dtype=np.int64).reshape(-1, 2)
+        score[has_units] += combo_scores[combo_inverse, 0]
+        reason[has_units] |= combo_scores[combo_inverse, 1]
+
+        # 5) domain bonus (tiny)
+        domain_of_row = self._codes([n.domain for n in natives], self._domains)
+        cd = np.full(len(c), -1, dtype=np.int64)
+        cd[known] = self._domain_codes[c[known]]
+        same_domain = (cd >= 0) & (cd == domain_of_row[row])
+        score[same_domain] += _DOMAIN_EQ
+        reason[same_domain] |= _R_DOMAIN
+
+        # 6) best per native: highest score, then first inserted
+        ranked = np.lexsort((order, -score, row))
+        first = ranked[np.r_[True, row[ranked][1:] != row[ranked][:-1]]]
+        ids = self._ids + list(extra)
+        for p in first.tolist():
+            n = natives[row[p]]
+            best[row[p]] = MatchSuggestion(
+                dataset=dataset,
+                native_id=n.id,
+                native_label=n.label,
+                native_unit=n.unit,
+                canonical=ids[c[p]],
+                score=round(int(score[p]) / 1000, 3),
+                reasons=self._reasons(int(reason[p]), n, self._col_key[c[p]] if c[p] < n_canon else None, rp),
+            )
+        return best
+
+    @staticmethod
+    def _reasons(flags: int, n: NativeParam, key: Optional[str], rp: Optional[RulePack]) -> List[str]:
+        reasons = []
+        if flags & _R_EXACT:
+            reasons.append(f"exact:{n.id}")
+        if flags & _R_HINT:
+            reasons.append(f"label_hint:{n.id}->{rp.label_hints[n.id]}")
+        if flags & _R_EQ:
+            reasons.append(f"label_eq:{n.label}")
+        if flags & _R_CONTAINS:
+            reasons.append(f"label_contains:{n.label}->{key}")
+        if flags & _R_PREFIX:
+            reasons.append(f"label_prefix:{n.label}->{key}")
+        if flags & _R_UNIT_EQ:
+            reasons.append("unit:eq")
+        if flags & _R_UNIT_CONV:
+            reasons.append("unit:convertible")
+        if flags & _R_DOMAIN:
+            reasons.append("domain:eq")
+        return reasons
 
     def match(self, dataset: str, natives: List[NativeParam],
               auto_accept_threshold: float = 0.90,
@@ -235,67 +453,15 @@ class TermBroker:
         - accepted: score ≥ auto_accept_threshold
         - suggestions: suggest_threshold ≤ score < auto_accept_threshold
         """
-        rp = load_rule_pack(dataset)
-
         accepted: List[MatchSuggestion] = []
         suggest: List[MatchSuggestion] = []
 
-        for n in natives:
-            # aggregate candidate scores per canonical
-            cand: Dict[str, Tuple[float, List[str]]] = {}
-
-            # 1) exact rule pack id match
-            ex = self._score_exact_rule(n.id, rp)
-            if ex:
-                cid, sc, rs = ex
-                cand[cid] = (cand.get(cid, (0.0, []))[0] + sc, (cand.get(cid, (0.0, []))[1] + rs))
-
-            # 2) label hint from rule pack
-            lh = self._score_label_hint(dataset, n.id, n.label, rp)
-            if lh:
-                cid, sc, rs = lh
-                cand[cid] = (cand.get(cid, (0.0, []))[0] + sc, (cand.get(cid, (0.0, []))[1] + rs))
-
-            # 3) generic label scoring
-            for cid, sc, rs in self._score_label_generic(n.label):
-                cand[cid] = (cand.get(cid, (0.0, []))[0] + sc, (cand.get(cid, (0.0, []))[1] + rs))
-
-            # 4) units bonus
-            add_cand = list(cand.items())
-            for cid, (sc, rs) in add_cand:
-                cv = self._canon.get(cid)
-                if not cv:
-                    continue
-                b, r2 = self._score_units(cv, n.unit)
-                if b:
-                    cand[cid] = (sc + b, rs + r2)
-
-            # 5) domain bonus (tiny)
-            add_cand = list(cand.items())
-            for cid, (sc, rs) in add_cand:
-                cv = self._canon.get(cid)
-                if not cv:
-                    continue
-                if cv.domain and n.domain and cv.domain == n.domain:
-                    cand[cid] = (sc + 0.01, rs + ["domain:eq"])
-
-            if not cand:
+        for sug in self.match_batch(dataset, natives):
+            if sug is None:
                 continue
-
-            # pick best
-            best_cid, (best_sc, best_rs) = max(cand.items(), key=lambda kv: kv[1][0])
-            sug = MatchSuggestion(
-                dataset=dataset,
-                native_id=n.id,
-                native_label=n.label,
-                native_unit=n.unit,
-                canonical=best_cid,
-                score=round(best_sc, 3),
-                reasons=best_rs,
-            )
-            if best_sc >= auto_accept_threshold:
+            if sug.score >= auto_accept_threshold:
                 accepted.append(sug)
-            elif best_sc >= suggest_threshold:
+            elif sug.score >= suggest_threshold:
                 suggest.append(sug)
             # else: drop
 
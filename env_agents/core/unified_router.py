@@ -16,6 +16,7 @@ from pathlib import Path
 from .service_registry import ServiceRegistry
 from .discovery_engine import SemanticDiscoveryEngine, DiscoveryQuery, SearchResult
 from .resilient_fetcher import ResilientDataFetcher, FetchResult, RetryConfig, FallbackConfig
+from .circuit_breaker import CircuitBreakerRegistry, get_circuit_breakers
 from .metadata_schema import ServiceMetadata, create_service_metadata_template
 
 # Legacy components (preserved for compatibility)
@@ -42,7 +43,8 @@ class UnifiedEnvRouter:
                  base_dir: Optional[str] = None,
                  registry_path: Optional[Path] = None,
                  retry_config: Optional[RetryConfig] = None,
-                 fallback_config: Optional[FallbackConfig] = None):
+                 fallback_config: Optional[FallbackConfig] = None,
+                 circuit_breakers: Optional[CircuitBreakerRegistry] = None):
         
         # Initialize paths
         self.base_dir = base_dir or "."
@@ -62,6 +64,7 @@ class UnifiedEnvRouter:
         # Initialize resilient fetcher (will be configured after adapters are registered)
         self.retry_config = retry_config or RetryConfig()
         self.fallback_config = fallback_config or FallbackConfig()
+        self.circuit_breakers = circuit_breakers or get_circuit_breakers()
         self._resilient_fetcher: Optional[ResilientDataFetcher] = None
         
         # Statistics tracking
@@ -76,7 +79,7 @@ class UnifiedEnvRouter:
     # Service Registration
     # ===================
     
-    def register(self, adapter, metadata: Optional[ServiceMetadata] = None) -> bool:
+    def register(self, adapter, metadata: Optional[ServiceMetadata] = None, save: bool = True) -> bool:
         """
         Register an adapter with optional rich metadata.
         
@@ -84,6 +87,7 @@ class UnifiedEnvRouter:
             adapter: Adapter instance implementing BaseAdapter interface
             metadata: Optional ServiceMetadata object. If not provided, 
                      will be auto-generated from adapter capabilities.
+            save: Write the service registry to disk afterwards
                      
         Returns:
             True if registration successful, False otherwise
@@ -104,6 +108,8 @@ class UnifiedEnvRouter:
             success = self.service_registry.register_service(metadata)
             
             if success:
+                if save:
+                    self.service_registry.save()
                 logger.info(f"Successfully registered adapter: {dataset}")
                 # Invalidate resilient fetcher to trigger rebuild with new adapter
                 self._resilient_fetcher = None
@@ -125,8 +131,9 @@ class UnifiedEnvRouter:
         
         for adapter, metadata in zip(adapters, metadata_list):
             dataset = getattr(adapter, 'DATASET', adapter.__class__.__name__)
-            results[dataset] = self.register(adapter, metadata)
-            
+            results[dataset] = self.register(adapter, metadata, save=False)
+
+        self.service_registry.save()
         return results
     
     # ===================
@@ -272,7 +279,8 @@ class UnifiedEnvRouter:
                 self.service_registry,
                 self.adapters,
                 self.retry_config,
-                self.fallback_config
+                self.fallback_config,
+                self.circuit_breakers
             )
         
         # Use resilient fetcher
@@ -310,7 +318,8 @@ class UnifiedEnvRouter:
                 self.service_registry,
                 self.adapters,
                 self.retry_config,
-                self.fallback_config
+                self.fallback_config,
+                self.circuit_breakers
             )
         
         result = self._resilient_fetcher.fetch(dataset, spec)
@@ -334,7 +343,8 @@ class UnifiedEnvRouter:
                 self.service_registry,
                 self.adapters,
                 self.retry_config,
-                self.fallback_config
+                self.fallback_config,
+                self.circuit_breakers
             )
         
         results = self._resilient_fetcher.fetch_multiple(requests)
@@ -372,14 +382,19 @@ class UnifiedEnvRouter:
             'status': 'healthy' if len(unhealthy_services) < stats['total_services'] * 0.2 else 'degraded',
             'total_services': stats['total_services'],
             'unhealthy_services': unhealthy_services,
+            'open_circuits': [service_id for service_id in self.list_services()
+                              if self.circuit_breakers.is_open(service_id)],
             'avg_reliability': stats['avg_reliability_score'],
             'avg_quality': stats['avg_quality_score'],
             'router_stats': self._stats.copy()
         }
     
     def get_service_health(self, service_id: str) -> Optional[Dict[str, Any]]:
-        """Get health status for a specific service"""
-        return self.service_registry.get_service_health(service_id)
+        """Get health status for a specific service, including its circuit breaker"""
+        health = self.service_registry.get_service_health(service_id)
+        if health is not None:
+            health['circuit_breaker'] = self.circuit_breakers.get(service_id).snapshot()
+        return health
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get router performance statistics"""
@@ -497,12 +512,10 @@ class UnifiedEnvRouter:
             # Apply semantic processing if available
             try:
                 if hasattr(self.legacy_registry, 'merged'):
-                    registry = self.legacy_registry.merged()
-                    from .term_broker import TermBroker
+                    from .mappings import get_mapping
                     from .semantics import attach_semantics
-                    
-                    broker = TermBroker(registry)
-                    df = attach_semantics(df, broker, dataset)
+
+                    df = attach_semantics(df, get_mapping(self.legacy_registry, dataset))
             except Exception as e:
                 logger.debug(f"Semantic processing failed for {dataset}: {e}")
             
@@ -1,5 +1,8 @@
+import math
+
 try:
-    from shapely.geometry import shape, box
+    from shapely.geometry import MultiPolygon, Polygon, shape, box
+    from shapely.geometry.polygon import orient
     from shapely import wkt
     SHAPELY_AVAILABLE = True
 except ImportError:
@@ -21,8 +24,79 @@ def centroid_from_geometry(geom_type: str, coordinates):
             return center_lat, center_lon
     else:
         if SHAPELY_AVAILABLE:
-            g = wkt.loads(coordinates) if isinstance(coordinates, str) else shape(coordinates)
-            c = g.centroid
+            c = shape_from_coordinates(coordinates).centroid
             return c.y, c.x
         else:
             raise RuntimeError("Complex geometry types require shapely library")
+
+
+def shape_from_coordinates(coordinates):
+    """
+    Shapely geometry from WKT, a GeoJSON geometry dict, or polygon rings
+    given as nested [lon, lat] lists (one ring, or exterior then holes)
+    """
+    if not SHAPELY_AVAILABLE:
+        raise RuntimeError("Complex geometry types require shapely library")
+    if isinstance(coordinates, str):
+        return wkt.loads(coordinates)
+    if isinstance(coordinates, dict):
+        return shape(coordinates)
+    rings = coordinates
+    if rings and isinstance(rings[0][0], (int, float)):
+        rings = [rings]
+    return Polygon(rings[0], rings[1:])
+
+
+def polygon_wkt(coordinates) -> str:
+    """WKT of a (multi)polygon with counter-clockwise exterior rings, as OGC-style APIs expect"""
+    g = shape_from_coordinates(coordinates)
+    if isinstance(g, Polygon):
+        g = orient(g, 1.0)
+    elif isinstance(g, MultiPolygon):
+        g = MultiPolygon([orient(p, 1.0) for p in g.geoms])
+    else:
+        raise ValueError(f"Expected a polygon, got {g.geom_type}")
+    return g.wkt
+
+
+def bbox_from_geometry(geom_type: str, coordinates, radius_m: float = 1000):
+    """
+    (west, south, east, north) of a geometry; points are buffered by radius_m
+    """
+    if geom_type == "bbox":
+        return tuple(coordinates)
+    elif geom_type == "point":
+        lon, lat = coordinates
+        # Convert radius from meters to degrees (rough approximation, ~111km per degree)
+        radius_deg = radius_m / 111000
+        return (lon - radius_deg, lat - radius_deg, lon + radius_deg, lat + radius_deg)
+    elif SHAPELY_AVAILABLE and geom_type == "polygon":
+        return tuple(shape_from_coordinates(coordinates).bounds)
+    else:
+        raise ValueError(f"Unsupported geometry type: {geom_type}")
+
+
+def split_bbox(bbox, max_area_deg2: float = None, max_side_deg: float = None):
+    """
+    Split (minlon, minlat, maxlon, maxlat) into an nx x ny grid of sub-boxes.
+
+    Every sub-box fits max_area_deg2 and max_side_deg (either may be None);
+    neighbouring sub-boxes share their edges exactly.
+    """
+    minlon, minlat, maxlon, maxlat = bbox
+    width, height = max(maxlon - minlon, 0.0), max(maxlat - minlat, 0.0)
+
+    nx = ny = 1
+    if max_side_deg:
+        nx = max(1, math.ceil(width / max_side_deg - 1e-9))
+        ny = max(1, math.ceil(height / max_side_deg - 1e-9))
+    while max_area_deg2 and (width / nx) * (height / ny) > max_area_deg2:
+        # Split the longer cell side
+        if width / nx >= height / ny:
+            nx += 1
+        else:
+            ny += 1
+
+    lons = [minlon + width * i / nx for i in range(nx)] + [maxlon]
+    lats = [minlat + height * j / ny for j in range(ny)] + [maxlat]
+    return [(lons[i], lats[j], lons[i + 1], lats[j + 1]) for j in range(ny) for i in range(nx)]
@@ -1,19 +1,282 @@
-import time, requests
+"""
+Shared HTTP transport
+
+Every adapter session is created by the process-wide HttpClient
+(get_http_client()), so all sessions share one set of keep-alive connection
+pools: a TCP+TLS handshake to a host is paid once and reused by every
+adapter and thread. Pools are sized per host from config (each service's
+URLs and max_concurrent_* settings in services.yaml, plus the ``http``
+section of defaults.yaml). Responses are negotiated with gzip/deflate, and
+brotli when the brotli package is installed. HTTP/2 is used for https when
+enabled in config and httpx + h2 are installed. Socket timeouts are cut to
+the active request deadline (core/deadline).
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.util.request import ACCEPT_ENCODING  # "gzip,deflate" (+ ",br" with brotli)
+
+from .deadline import current_context
+from .rate_limit import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+try:
+    import httpx
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+    httpx = None
+
+DEFAULT_USER_AGENT = "env-agents/0.1.0"
+DEFAULT_POOL_CONNECTIONS = 32   # Hosts with a cached pool in the default transport
+DEFAULT_POOL_MAXSIZE = 10       # Keep-alive connections kept per host
+
+
+def host_prefix(url: str) -> str:
+    """scheme://host[:port]/ of a URL, the key requests mounts transports under"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}/".lower()
+
+
+def bounded_timeout(timeout):
+    """
+    A requests timeout (seconds or (connect, read)) cut to the active deadline
+
+    Counts the request against the active retry budget; raises
+    DeadlineExceeded when the deadline has already passed.
+    """
+    context = current_context()
+    context.record_request()
+    if isinstance(timeout, tuple):
+        return tuple(context.timeout(t) for t in timeout)
+    return context.timeout(timeout)
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter with an optional per-host request rate limit, bounded by the request deadline"""
+
+    def __init__(self, min_interval: float = 0.0, **kwargs):
+        self.min_interval = min_interval
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if self.min_interval:
+            get_rate_limiter(host_prefix(request.url), self.min_interval).acquire()
+        kwargs["timeout"] = bounded_timeout(kwargs.get("timeout"))
+        return super().send(request, **kwargs)
+
+
+class _Http2Stream:
+    """File-like view of a streamed httpx response, used as requests' Response.raw"""
+
+    decode_content = True  # httpx already undoes Content-Encoding
+
+    def __init__(self, response):
+        self._response = response
+        self._chunks = response.iter_bytes()
+        self._buffer = b""
+
+    def read(self, amt: Optional[int] = None, **kwargs) -> bytes:
+        while amt is None or amt < 0 or len(self._buffer) < amt:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if amt is None or amt < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def close(self):
+        self._response.close()
+
+
+class Http2Adapter(BaseAdapter):
+    """requests transport that sends over an HTTP/2-capable httpx client"""
+
+    def __init__(self, max_connections: int = DEFAULT_POOL_CONNECTIONS * DEFAULT_POOL_MAXSIZE):
+        super().__init__()
+        self._client = httpx.Client(http2=True, limits=httpx.Limits(max_connections=max_connections))
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        timeout = bounded_timeout(timeout)
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        upstream = self._client.send(
+            self._client.build_request(request.method, request.url, headers=dict(request.headers),
+                                       content=request.body, timeout=timeout),
+            stream=True,
+        )
+
+        response = requests.Response()
+        response.status_code = upstream.status_code
+        response.reason = upstream.reason_phrase
+        response.headers = CaseInsensitiveDict(upstream.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = _Http2Stream(upstream)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        if not stream:
+            response.content  # Read the body now, as HTTPAdapter does
+        return response
+
+    def close(self):
+        self._client.close()
+
+
 class HttpClient:
-    def __init__(self, user_agent: str="env-agents/0.1.0", timeout: int=60):
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": user_agent})
+    """
+    Process-wide transport: every session it hands out shares its connection pools
+
+    Sessions keep their own headers and params (adapters add auth to them),
+    only the transports are shared.
+    """
+
+    def __init__(self, user_agent: str = DEFAULT_USER_AGENT, timeout: int = 60,
+                 pool_connections: int = DEFAULT_POOL_CONNECTIONS, pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 host_pool_sizes: Optional[Dict[str, int]] = None,
+                 host_min_intervals: Optional[Dict[str, float]] = None, http2: bool = False):
+        """
+        Args:
+            user_agent: User-Agent of sessions created without one
+            timeout: Default timeout of get()
+            pool_connections: Hosts whose pools the default transport keeps
+            pool_maxsize: Keep-alive connections per host without an explicit size
+            host_pool_sizes: Keep-alive connections per host, keyed by URL
+            host_min_intervals: Minimum seconds between request starts per host, keyed by URL
+            http2: Use HTTP/2 for https URLs (needs httpx and h2; ignored otherwise)
+        """
         self.timeout = timeout
+        self.user_agent = user_agent
+        self.http2 = bool(http2) and HTTP2_AVAILABLE
+        self._default = PooledAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+
+        hosts = {host_prefix(url): (max(int(size), 1), 0.0) for url, size in (host_pool_sizes or {}).items()}
+        for url, interval in (host_min_intervals or {}).items():
+            size, _ = hosts.get(host_prefix(url), (pool_maxsize, 0.0))
+            hosts[host_prefix(url)] = (size, float(interval))
+        self._hosts = {prefix: PooledAdapter(min_interval=interval, pool_connections=1, pool_maxsize=size)
+                       for prefix, (size, interval) in hosts.items()}
+        self._http2 = Http2Adapter() if self.http2 else None
+
+        # Session used by get(); adapters get their own via new_session()
+        self.session = self.new_session(user_agent)
+
+    @classmethod
+    def from_config(cls, config) -> "HttpClient":
+        """Client sized from the http defaults and each service's URLs and concurrency settings"""
+        http = config.get_http_config()
+        pool_maxsize = int(http.get("pool_maxsize", DEFAULT_POOL_MAXSIZE))
+        host_pool_sizes = {}
+        for settings in config.get_services_config().values():
+            if not isinstance(settings, dict):
+                continue
+            concurrency = max([int(v) for k, v in settings.items()
+                               if k.startswith("max_concurrent") and isinstance(v, int)] or [0])
+            for url in _service_urls(settings):
+                prefix = host_prefix(url)
+                host_pool_sizes[prefix] = max(host_pool_sizes.get(prefix, pool_maxsize), concurrency)
+        host_pool_sizes.update({host_prefix(url): size for url, size in (http.get("pools") or {}).items()})
+
+        return cls(
+            user_agent=http.get("user_agent", DEFAULT_USER_AGENT),
+            timeout=int(http.get("timeout", 60)),
+            pool_connections=int(http.get("pool_connections", DEFAULT_POOL_CONNECTIONS)),
+            pool_maxsize=pool_maxsize,
+            host_pool_sizes=host_pool_sizes,
+            host_min_intervals=http.get("min_interval_seconds") or {},
+            http2=bool(http.get("http2", False)),
+        )
+
+    def new_session(self, user_agent: Optional[str] = None) -> requests.Session:
+        """A session with its own headers that sends through the shared pools"""
+        session = requests.Session()
+        session.headers.update({"User-Agent": user_agent or self.user_agent,
+                                "Accept-Encoding": ACCEPT_ENCODING})
+        session.mount("http://", self._default)
+        session.mount("https://", self._http2 or self._default)
+        for prefix, transport in self._hosts.items():
+            if not (self._http2 and prefix.startswith("https://")):
+                session.mount(prefix, transport)
+        return session
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Requests sent and connections opened per host over HTTP/1.1 pools
+
+        connections < requests means keep-alive reuse; every connection is
+        one TCP (+TLS) handshake.
+        """
+        stats: Dict[str, Dict[str, int]] = {}
+        for transport in [self._default, *self._hosts.values()]:
+            pools = transport.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host = stats.setdefault(f"{pool.scheme}://{pool.host}:{pool.port}",
+                                        {"requests": 0, "connections": 0})
+                host["requests"] += pool.num_requests
+                host["connections"] += pool.num_connections
+        return stats
+
     def get(self, url: str, params: dict | None = None, retries: int = 3):
+        context = current_context()
         backoff = 1.0
-        for _ in range(retries+1):
+        for attempt in range(retries+1):
             resp = self.session.get(url, params=params, timeout=self.timeout)
             if resp.status_code in (429,500,502,503,504):
                 ra = resp.headers.get("Retry-After")
                 sleep = float(ra) if ra else backoff
+                if attempt == retries or not context.can_retry(sleep):
+                    break
                 time.sleep(sleep)
                 backoff *= 2
                 continue
             resp.raise_for_status()
             return resp
         return resp
+
+    def close(self):
+        """Close every pooled connection"""
+        for transport in [self._default, *self._hosts.values(), *([self._http2] if self._http2 else [])]:
+            transport.close()
+
+
+def _service_urls(settings: Dict[str, Any]) -> Iterable[str]:
+    """URLs in a service's settings (base_url, wcs_url, ...)"""
+    for key, value in settings.items():
+        if key.endswith("url") and isinstance(value, str) and value.startswith(("http://", "https://")):
+            yield value
+        elif key.endswith("urls") and isinstance(value, list):
+            yield from (v for v in value if isinstance(v, str) and v.startswith(("http://", "https://")))
+
+
+_CLIENT: Optional[HttpClient] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Return the process-wide HttpClient, built from config on first use"""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            from .config import get_config
+            try:
+                _CLIENT = HttpClient.from_config(get_config())
+            except Exception as e:
+                logger.warning(f"HTTP config unavailable, using default pools: {e}")
+                _CLIENT = HttpClient()
+        return _CLIENT
@@ -13,6 +13,7 @@ import logging
 from ..base import BaseAdapter
 from ...core.models import RequestSpec
 from ...core.errors import FetchError
+from ...core.deadline import current_context
 
 
 class EnvironmentalServiceAdapter(BaseAdapter):
@@ -305,13 +306,17 @@ class EnvironmentalServiceAdapter(BaseAdapter):
         import requests
         
         last_exception = None
+        context = current_context()
         
         for attempt in range(self._max_retries):
+            # Back off between attempts, within the request's deadline and retry budget
+            if attempt > 0:
+                delay = self._rate_limit_delay * (2 ** (attempt - 1))
+                if not context.can_retry(delay):
+                    break
+                time.sleep(delay)
+
             try:
-                # Add rate limiting
-                if attempt > 0:
-                    time.sleep(self._rate_limit_delay * (2 ** (attempt - 1)))
-                
                 # Make API call
                 response = self._session.get(
                     self.SOURCE_URL + "/data",  # Adjust endpoint
@@ -319,12 +324,9 @@ class EnvironmentalServiceAdapter(BaseAdapter):
                     timeout=self._timeout
                 )
                 
-                # Handle different response types
-                if response.status_code == 429:  # Rate limited
-                    time.sleep(self._rate_limit_delay * 2)
-                    continue
-                elif response.status_code >= 500:  # Server error
-                    time.sleep(self._rate_limit_delay)
+                # Rate limited or server error: retry after backoff
+                if response.status_code == 429 or response.status_code >= 500:
+                    last_exception = FetchError(f"HTTP {response.status_code}")
                     continue
                 
                 response.raise_for_status()
@@ -339,7 +341,7 @@ class EnvironmentalServiceAdapter(BaseAdapter):
                 last_exception = e
                 self.logger.warning(f"Attempt {attempt + 1} failed: {e}")
         
-        raise FetchError(f"{self.DATASET} API call failed after {self._max_retries} attempts: {last_exception}")
+        raise FetchError(f"{self.DATASET} API call failed after {attempt + 1} attempts: {last_exception}")
     
     def _parse_response_data(self, raw_data: Any, spec: RequestSpec) -> List[Dict[str, Any]]:
         """
@@ -32,6 +32,14 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from env_agents.adapters import CANONICAL_SERVICES
 from env_agents.core.models import RequestSpec, Geometry
+from env_agents.adapters.earth_engine.executor import get_ee_executor
+from env_agents.core.deadline import request_context
+
+
+# Error messages worth retrying after backoff. Retries here and inside adapters
+# draw on one per-service retry budget, and stop at the service's deadline_seconds
+# (wall clock per cluster, all attempts included).
+TRANSIENT_ERRORS = ['quota', 'rate limit', 'too many requests', 'user rate limit exceeded', 'timeout', 'saturated']
 
 
 # Service configurations with rate limiting
@@ -44,29 +52,34 @@ PHASE0_SERVICES = {
     "NASA_POWER": {
         "rate_limit": 0.5,  # Min seconds between requests (2 req/sec)
         "timeout": 60,
-        "time_range": ("2021-01-01", "2021-12-31")
+        "time_range": ("2021-01-01", "2021-12-31"),
+        "batch_size": 500  # Clusters per batch; clusters sharing a POWER grid cell share requests
     },
     "GBIF": {
         "rate_limit": 1.0,  # GBIF rate limits
         "timeout": 60,
         "time_range": ("2021-01-01", "2021-12-31"),
+        "deadline_seconds": 300,  # All attempts for one cluster
         "max_records": 10000
     },
     "OpenAQ": {
         "rate_limit": 1.0,  # OpenAQ API limits
         "timeout": 60,
         "time_range": ("2021-06-01", "2021-08-31"),  # Summer only for better coverage
+        "deadline_seconds": 600,  # All attempts for one cluster
         "max_records": 20000
     },
     "USGS_NWIS": {
         "rate_limit": 0.5,  # USGS is usually fast
         "timeout": 60,
-        "time_range": ("2021-01-01", "2021-12-31")
+        "time_range": ("2021-01-01", "2021-12-31"),
+        "deadline_seconds": 300  # All attempts for one cluster
     },
     "WQP": {
         "rate_limit": 2.0,  # Water Quality Portal can be slow
         "timeout": 90,
         "time_range": ("2021-01-01", "2021-12-31"),
+        "deadline_seconds": 600,  # All attempts for one cluster
         "retry_on_quota": False,
         "max_retries": 2,
         "backoff_seconds": 10
@@ -75,6 +88,7 @@ PHASE0_SERVICES = {
         "rate_limit": 3.0,  # Spatial queries can be slow
         "timeout": 90,
         "time_range": None,  # Static data
+        "batch_size": 500,  # Clusters per batched SDA lookup (mukeys cached across batches)
         "retry_on_quota": False,
         "max_retries": 2,
         "backoff_seconds": 10
@@ -83,6 +97,7 @@ PHASE0_SERVICES = {
         "rate_limit": 3.0,  # Be polite to OSM, complex queries
         "timeout": 120,
         "time_range": None,  # Static data
+        "deadline_seconds": 900,  # All attempts for one cluster
         "retry_on_quota": True,  # Overpass has rate limits
         "max_retries": 3,
         "backoff_seconds": 30
@@ -100,6 +115,7 @@ PHASE1_SERVICES = {
         "timeout": 60,
         "time_range": ("2021-01-01", "2021-12-31"),
         "is_earth_engine": True,
+        "batch_size": 200,  # Clusters per batched reduceRegions request
         "retry_on_quota": True,
         "max_retries": 3,
         "backoff_seconds": 60
@@ -110,6 +126,7 @@ PHASE1_SERVICES = {
         "timeout": 90,
         "time_range": ("2021-01-01", "2021-12-31"),
         "is_earth_engine": True,
+        "batch_size": 200,  # Clusters per batched reduceRegions request
         "retry_on_quota": True,
         "max_retries": 3,
         "backoff_seconds": 60
@@ -120,6 +137,7 @@ PHASE1_SERVICES = {
         "timeout": 90,
         "time_range": ("2021-01-01", "2021-12-31"),
         "is_earth_engine": True,
+        "batch_size": 200,  # Clusters per batched reduceRegions request
         "retry_on_quota": True,
         "max_retries": 3,
         "backoff_seconds": 60
@@ -130,6 +148,7 @@ PHASE1_SERVICES = {
         "timeout": 60,
         "time_range": None,  # Static data
         "is_earth_engine": True,
+        "batch_size": 200,  # Clusters per batched reduceRegions request
         "retry_on_quota": True,
         "max_retries": 3,
         "backoff_seconds": 60
@@ -140,6 +159,7 @@ PHASE1_SERVICES = {
         "timeout": 60,
         "time_range": None,  # Static data
         "is_earth_engine": True,
+        "batch_size": 200,  # Clusters per batched reduceRegions request
         "retry_on_quota": True,
         "max_retries": 3,
         "backoff_seconds": 60
@@ -150,6 +170,7 @@ PHASE1_SERVICES = {
         "timeout": 60,
         "time_range": None,
         "is_earth_engine": True,
+        "batch_size": 200,  # Clusters per batched reduceRegions request
         "retry_on_quota": True,
         "max_retries": 3,
         "backoff_seconds": 60
@@ -160,6 +181,7 @@ PHASE1_SERVICES = {
         "timeout": 60,
         "time_range": None,
         "is_earth_engine": True,
+        "batch_size": 200,  # Clusters per batched reduceRegions request
         "retry_on_quota": True,
         "max_retries": 3,
         "backoff_seconds": 60
@@ -170,6 +192,7 @@ PHASE1_SERVICES = {
         "timeout": 90,
         "time_range": ("2021-01-01", "2021-12-31"),
         "is_earth_engine": True,
+        "batch_size": 200,  # Clusters per batched reduceRegions request
         "retry_on_quota": True,
         "max_retries": 3,
         "backoff_seconds": 60
@@ -181,6 +204,7 @@ PHASE1_SERVICES = {
         # V061 available 2001-2023+, using 2022 as recent stable year
         "time_range": ("2022-01-01", "2022-12-31"),
         "is_earth_engine": True,
+        "batch_size": 200,  # Clusters per batched reduceRegions request
         "retry_on_quota": True,
         "max_retries": 3,
         "backoff_seconds": 60
@@ -191,6 +215,7 @@ PHASE1_SERVICES = {
         "timeout": 90,
         "time_range": ("2021-01-01", "2021-12-31"),
         "is_earth_engine": True,
+        "batch_size": 200,  # Clusters per batched reduceRegions request
         "retry_on_quota": True,
         "max_retries": 3,
         "backoff_seconds": 60
@@ -201,12 +226,32 @@ PHASE1_SERVICES = {
         "timeout": 90,
         "time_range": ("2021-01-01", "2021-12-31"),
         "is_earth_engine": True,
+        "batch_size": 200,  # Clusters per batched reduceRegions request
         "retry_on_quota": True,
         "max_retries": 3,
         "backoff_seconds": 60
     }
 }
 
+# Phase 1 composite mode (--phase 1 --composite): all Phase 1 assets are stacked
+# into one image and fetched with a single request per batch of clusters.
+# MOD13Q1 is fetched once for both NDVI and EVI. Collections are collapsed over
+# their time window with the temporal reducer instead of returned as time series.
+PHASE1_COMPOSITE = {
+    "rate_limit": 3.0,
+    "timeout": 120,
+    "time_range": ("2021-01-01", "2021-12-31"),
+    "batch_size": 100,
+    "temporal_reducer": "mean",
+    "bands": {
+        "MODIS_NDVI": ["NDVI"],
+        "MODIS_EVI": ["EVI"]
+    },
+    "retry_on_quota": True,
+    "max_retries": 3,
+    "backoff_seconds": 60
+}
+
 # Phase 2: Google Embeddings (separate from other EE to manage quotas)
 # OPTIMIZED: 44s avg query time → 5s rate limit (query itself is very slow, minimal wait needed)
 # NOTE: Temporal fallback enabled - if requested dates unavailable, adapter will use closest available data
@@ -218,6 +263,7 @@ PHASE2_SERVICES = {
         # Dataset: 2017-present, adapter will fall back if location lacks 2021 data
         "time_range": ("2021-01-01", "2021-12-31"),
         "is_earth_engine": True,
+        "batch_size": 50,  # Embedding reductions are heavy - keep batches small
         "retry_on_quota": True,
         "max_retries": 3,
         "backoff_seconds": 60
@@ -487,61 +533,280 @@ class EnvironmentalDataAcquisition:
         max_retries = config.get('max_retries', 1) if config.get('retry_on_quota') else 1
         backoff = config.get('backoff_seconds', 60)
 
-        for attempt in range(max_retries):
-            try:
-                adapter = self.get_or_create_adapter(service_name, config)
+        try:
+            adapter = self.get_or_create_adapter(service_name, config)
+        except Exception as e:
+            self.logger.error(f"Error creating {service_name} adapter: {str(e)}")
+            return ("error", 0, 0, str(e)[:200])
+
+        # One deadline and retry budget for these attempts and every retry inside the adapter
+        with request_context(timeout_s=config.get('deadline_seconds'), service=adapter.DATASET) as context:
+            for attempt in range(max_retries):
+                try:
+                    spec = RequestSpec(
+                        geometry=geometry,
+                        time_range=config['time_range'],
+                        variables=None,
+                        extra={"timeout": config['timeout']}
+                    )
 
-                spec = RequestSpec(
-                    geometry=geometry,
-                    time_range=config['time_range'],
-                    variables=None,
-                    extra={"timeout": config['timeout']}
-                )
+                    start_time = time.time()
+                    # Columnar adapters (e.g. SoilGrids) skip building a dict per row
+                    result = adapter._fetch_frame(spec)
+                    if result is None:
+                        result = adapter._fetch_rows(spec)
+                    elapsed = time.time() - start_time
+
+                    if result is not None and len(result) > 0:
+                        # Store observations
+                        obs_count = self._store_observations(cluster_id, service_name, result)
+                        return ("success", obs_count, elapsed, None)
+                    else:
+                        return ("no_data", 0, elapsed, "No data returned from service")
 
-                start_time = time.time()
-                result = adapter._fetch_rows(spec)
-                elapsed = time.time() - start_time
+                except Exception as e:
+                    error_msg = str(e).lower()
+
+                    # Check for transient errors (timeout, quota, rate limit, network)
+                    if config.get('retry_on_quota') and attempt < max_retries - 1:
+                        if any(keyword in error_msg for keyword in TRANSIENT_ERRORS) and context.can_retry(backoff):
+                            self.logger.warning(f"Transient error for {service_name} cluster {cluster_id}, attempt {attempt+1}/{max_retries}. Retrying after {backoff}s...")
+                            time.sleep(backoff)
+                            continue  # Retry
+
+                    # Not a quota error or out of retries
+                    self.logger.error(f"Error processing cluster {cluster_id} for {service_name}: {str(e)}")
+                    return ("error", 0, 0, str(e)[:200])
+
+            return ("error", 0, 0, "Max retries exceeded")
+
+    def process_cluster_batch(self, cluster_ids: List[int], service_name: str, config: Dict) -> List[tuple]:
+        """
+        Process many clusters for a service with one batched adapter call
+
+        Uses the adapter's fetch_batch: ProductionEarthEngineAdapter reduces all
+        cluster geometries server-side, NASAPowerAdapter shares requests between
+        clusters in the same grid cell, SSURGOAdapter resolves them with a few
+        Soil Data Access queries, instead of several requests per cluster.
 
-                if result and len(result) > 0:
-                    # Store observations
-                    obs_count = self._store_observations(cluster_id, service_name, result)
-                    return ("success", obs_count, elapsed, None)
+        Returns:
+            List of (cluster_id, status, obs_count, elapsed, error_msg) tuples
+        """
+        geometries = {cid: self.get_cluster_geometry(cid) for cid in cluster_ids}
+        outcomes = [(cid, "error", 0, 0, "Cluster geometry not found")
+                    for cid, geom in geometries.items() if not geom]
+        valid_ids = [cid for cid, geom in geometries.items() if geom]
+        if not valid_ids:
+            return outcomes
+
+        specs = [
+            RequestSpec(
+                geometry=geometries[cid],
+                time_range=config['time_range'],
+                variables=None,
+                extra={"timeout": config['timeout']}
+            )
+            for cid in valid_ids
+        ]
+
+        max_retries = config.get('max_retries', 1) if config.get('retry_on_quota') else 1
+        backoff = config.get('backoff_seconds', 60)
+
+        try:
+            adapter = self.get_or_create_adapter(service_name, config)
+        except Exception as e:
+            self.logger.error(f"Error creating {service_name} adapter: {str(e)}")
+            return outcomes + [(cid, "error", 0, 0, str(e)[:200]) for cid in valid_ids]
+
+        with request_context(timeout_s=config.get('deadline_seconds'), service=adapter.DATASET) as context:
+            for attempt in range(max_retries):
+                try:
+                    start_time = time.time()
+                    batch_rows = adapter.fetch_batch(specs, timeout_sec=config['timeout'] * 2)
+                    elapsed = (time.time() - start_time) / len(valid_ids)
+
+                    for cid, rows in zip(valid_ids, batch_rows):
+                        if rows:
+                            obs_count = self._store_observations(cid, service_name, rows)
+                            outcomes.append((cid, "success", obs_count, elapsed, None))
+                        else:
+                            outcomes.append((cid, "no_data", 0, elapsed, "No data returned from service"))
+                    return outcomes
+
+                except Exception as e:
+                    error_msg = str(e).lower()
+
+                    if config.get('retry_on_quota') and attempt < max_retries - 1:
+                        if any(keyword in error_msg for keyword in TRANSIENT_ERRORS) and context.can_retry(backoff):
+                            self.logger.warning(f"Transient error for {service_name} batch of {len(valid_ids)} clusters, attempt {attempt+1}/{max_retries}. Retrying after {backoff}s...")
+                            time.sleep(backoff)
+                            continue
+
+                    self.logger.error(f"Error processing batch of {len(valid_ids)} clusters for {service_name}: {str(e)}")
+                    return outcomes + [(cid, "error", 0, 0, str(e)[:200]) for cid in valid_ids]
+
+            return outcomes + [(cid, "error", 0, 0, "Max retries exceeded") for cid in valid_ids]
+
+    def run_service(self, service_name: str, config: Dict, pending: List[int]) -> Dict[str, int]:
+        """
+        Process pending clusters for one service with rate limiting and progress tracking
+
+        Services with a batch_size (Earth Engine, NASA POWER, SSURGO) are processed through
+        process_cluster_batch; everything else goes cluster by cluster.
+        """
+        stats = {'success': 0, 'no_data': 0, 'failed': 0, 'obs': 0}
+
+        batch_size = config.get('batch_size', 1)
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+
+        with tqdm(total=len(pending), desc=service_name) as pbar:
+            for batch in batches:
+                if batch_size > 1:
+                    outcomes = self.process_cluster_batch(batch, service_name, config)
                 else:
-                    return ("no_data", 0, elapsed, "No data returned from service")
+                    outcomes = [(batch[0], *self.process_cluster(batch[0], service_name, config))]
 
-            except Exception as e:
-                error_msg = str(e).lower()
+                for cluster_id, status, obs_count, elapsed, error_msg in outcomes:
+                    if status == "success":
+                        stats['success'] += 1
+                        stats['obs'] += obs_count
+                    elif status == "no_data":
+                        stats['no_data'] += 1
+                    else:
+                        stats['failed'] += 1
 
-                # Check for transient errors (timeout, quota, rate limit, network)
-                if config.get('retry_on_quota') and attempt < max_retries - 1:
-                    if any(keyword in error_msg for keyword in ['quota', 'rate limit', 'too many requests', 'user rate limit exceeded', 'timeout']):
-                        self.logger.warning(f"Transient error for {service_name} cluster {cluster_id}, attempt {attempt+1}/{max_retries}. Retrying after {backoff}s...")
-                        time.sleep(backoff)
-                        continue  # Retry
+                    self.mark_cluster_processed(
+                        cluster_id, service_name, status, obs_count, elapsed, error_msg
+                    )
 
-                # Not a quota error or out of retries
-                self.logger.error(f"Error processing cluster {cluster_id} for {service_name}: {str(e)}")
-                return ("error", 0, 0, str(e)[:200])
+                pbar.set_postfix(stats)
+                pbar.update(len(batch))
 
-        return ("error", 0, 0, "Max retries exceeded")
+                # Rate limiting - be polite to servers
+                time.sleep(config['rate_limit'])
+
+        return stats
+
+    def run_phase1_composite(self, max_clusters: Optional[int] = None) -> Dict[str, int]:
+        """
+        Run Phase 1 as a single composite Earth Engine request per batch of clusters
+
+        Rows are routed back to their Phase 1 service via the composite_member
+        attribute, so status and observations are recorded per service as usual.
+        """
+        config = PHASE1_COMPOSITE
+        members = {
+            name: {
+                "asset_id": cfg["asset_id"],
+                "time_range": cfg["time_range"],
+                "bands": config["bands"].get(name)
+            }
+            for name, cfg in PHASE1_SERVICES.items()
+        }
 
-    def _store_observations(self, cluster_id: int, service_name: str, rows: List[Dict]) -> int:
-        """Store environmental observations"""
+        pending_by_member = {name: set(self.get_pending_clusters(name)) for name in members}
+        pending = sorted(set().union(*pending_by_member.values()))
+        if max_clusters:
+            pending = pending[:max_clusters]
+
+        self.logger.info(f"Composite Phase 1: {len(members)} services, {len(pending):,} pending clusters")
+        stats = {'success': 0, 'no_data': 0, 'failed': 0, 'obs': 0}
+        if not pending:
+            return stats
+
+        EARTH_ENGINE = CANONICAL_SERVICES["EARTH_ENGINE"]
+        adapter = EARTH_ENGINE(composite=members, temporal_reducer=config["temporal_reducer"])
+
+        max_retries = config['max_retries'] if config.get('retry_on_quota') else 1
+        batch_size = config['batch_size']
+
+        with tqdm(total=len(pending), desc="PHASE1_COMPOSITE") as pbar:
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                geometries = {cid: self.get_cluster_geometry(cid) for cid in batch}
+                valid_ids = [cid for cid in batch if geometries[cid]]
+                specs = [
+                    RequestSpec(geometry=geometries[cid], time_range=config['time_range'],
+                                extra={"timeout": config['timeout']})
+                    for cid in valid_ids
+                ]
+
+                batch_rows, error_msg = None, None
+                start_time = time.time()
+                with request_context(timeout_s=config.get('deadline_seconds'), service=adapter.DATASET) as context:
+                    for attempt in range(max_retries):
+                        try:
+                            batch_rows = adapter.fetch_batch(specs, timeout_sec=config['timeout'])
+                            break
+                        except Exception as e:
+                            error_msg = str(e)[:200]
+                            if (attempt < max_retries - 1 and any(keyword in error_msg.lower() for keyword in TRANSIENT_ERRORS)
+                                    and context.can_retry(config['backoff_seconds'])):
+                                self.logger.warning(f"Transient composite error, attempt {attempt+1}/{max_retries}. Retrying after {config['backoff_seconds']}s...")
+                                time.sleep(config['backoff_seconds'])
+                                continue
+                            self.logger.error(f"Composite batch failed: {e}")
+                            break
+                elapsed = (time.time() - start_time) / max(len(valid_ids), 1)
+
+                for cid in batch:
+                    if cid not in valid_ids:
+                        rows_by_member, status_error = {}, "Cluster geometry not found"
+                    elif batch_rows is None:
+                        rows_by_member, status_error = None, error_msg
+                    else:
+                        rows_by_member, status_error = {}, None
+                        for row in batch_rows[valid_ids.index(cid)]:
+                            rows_by_member.setdefault(row["attributes"]["composite_member"], []).append(row)
+
+                    for name in members:
+                        if cid not in pending_by_member[name]:
+                            continue
+                        if rows_by_member is None or status_error:
+                            status, obs_count, member_error = "error", 0, status_error
+                            stats['failed'] += 1
+                        elif rows_by_member.get(name):
+                            status, member_error = "success", None
+                            obs_count = self._store_observations(cid, name, rows_by_member[name])
+                            stats['success'] += 1
+                            stats['obs'] += obs_count
+                        else:
+                            status, obs_count, member_error = "no_data", 0, "No data returned from service"
+                            stats['no_data'] += 1
+
+                        self.mark_cluster_processed(cid, name, status, obs_count, elapsed, member_error)
+
+                pbar.set_postfix(stats)
+                pbar.update(len(batch))
+                time.sleep(config['rate_limit'])
+
+        return stats
+
+    def _store_observations(self, cluster_id: int, service_name: str, rows) -> int:
+        """Store environmental observations (a list of row dicts or a core-schema DataFrame)"""
         conn = sqlite3.connect(self.db_path)
 
-        obs_data = []
-        for row in rows:
-            obs_data.append((
-                row.get('observation_id'),
-                cluster_id,
-                service_name,
-                row.get('variable'),
-                row.get('value'),
-                row.get('unit'),
-                row.get('time'),
-                row.get('latitude'),
-                row.get('longitude')
-            ))
+        if isinstance(rows, pd.DataFrame):
+            columns = ['observation_id', 'variable', 'value', 'unit', 'time', 'latitude', 'longitude']
+            frame = rows.reindex(columns=columns).astype(object)
+            frame = frame.where(frame.notna(), None)
+            frame.insert(1, 'cluster_id', cluster_id)
+            frame.insert(2, 'service_name', service_name)
+            obs_data = list(frame.itertuples(index=False, name=None))
+        else:
+            obs_data = []
+            for row in rows:
+                obs_data.append((
+                    row.get('observation_id'),
+                    cluster_id,
+                    service_name,
+                    row.get('variable'),
+                    row.get('value'),
+                    row.get('unit'),
+                    row.get('time'),
+                    row.get('latitude'),
+                    row.get('longitude')
+                ))
 
         conn.executemany("""
         INSERT OR REPLACE INTO env_observations
@@ -596,50 +861,16 @@ class EnvironmentalDataAcquisition:
                 self.logger.info(f"No pending clusters for {service_name}")
                 continue
 
-            total_obs = 0
-            successful = 0
-            failed = 0
-            no_data = 0
-
-            with tqdm(total=len(pending), desc=service_name) as pbar:
-                for cluster_id in pending:
-                    # Process cluster
-                    status, obs_count, elapsed, error_msg = self.process_cluster(
-                        cluster_id, service_name, config
-                    )
-
-                    # Update statistics
-                    if status == "success":
-                        successful += 1
-                        total_obs += obs_count
-                    elif status == "no_data":
-                        no_data += 1
-                    else:
-                        failed += 1
-
-                    # Record status
-                    self.mark_cluster_processed(
-                        cluster_id, service_name, status, obs_count, elapsed, error_msg
-                    )
-
-                    # Update progress bar
-                    pbar.set_postfix({
-                        'success': successful,
-                        'no_data': no_data,
-                        'failed': failed,
-                        'obs': total_obs
-                    })
-                    pbar.update(1)
-
-                    # Rate limiting - be polite to servers
-                    time.sleep(config['rate_limit'])
+            stats = self.run_service(service_name, config, pending)
 
             # Service summary
             self.logger.info(f"\n{service_name} Summary:")
-            self.logger.info(f"  Success: {successful:,} clusters")
-            self.logger.info(f"  No data: {no_data:,} clusters")
-            self.logger.info(f"  Failed: {failed:,} clusters")
-            self.logger.info(f"  Total observations: {total_obs:,}")
+            self.logger.info(f"  Success: {stats['success']:,} clusters")
+            self.logger.info(f"  No data: {stats['no_data']:,} clusters")
+            self.logger.info(f"  Failed: {stats['failed']:,} clusters")
+            self.logger.info(f"  Total observations: {stats['obs']:,}")
+            if config.get('is_earth_engine'):
+                self.logger.info(f"  EE executor: {get_ee_executor().stats()}")
 
         self.logger.info(f"\n{phase_name} complete!")
 
@@ -699,6 +930,9 @@ Examples:
   # Test with 10 clusters
   %(prog)s --phase 1 --clusters clusters.csv --samples samples.tsv --max-clusters 10
 
+  # Run Phase 1 as one composite Earth Engine request per batch of clusters
+  %(prog)s --phase 1 --composite
+
   # Run Phase 1 and Phase 2 in parallel (separate terminals)
   Terminal 1: %(prog)s --phase 1 --clusters clusters.csv --samples samples.tsv
   Terminal 2: %(prog)s --phase 2
@@ -719,6 +953,8 @@ Examples:
     )
     parser.add_argument('--phase', type=int, choices=[0, 1, 2],
                        help='Phase to run (0=unitary services, 1=EE terrain/NDVI, 2=embeddings). Can run Phase 0 with anything!')
+    parser.add_argument('--composite', action='store_true',
+                       help='With --phase 1: fetch all Phase 1 Earth Engine assets in one composite request per batch')
     parser.add_argument('--service',
                        choices=all_services,
                        help='Run specific service only (allows fine-grained parallelization)')
@@ -779,43 +1015,16 @@ Examples:
 
         acq.logger.info(f"Processing {len(pending):,} clusters for {args.service}")
 
-        total_obs = 0
-        successful = 0
-        failed = 0
-        no_data = 0
-
-        with tqdm(total=len(pending), desc=args.service) as pbar:
-            for cluster_id in pending:
-                status, obs_count, elapsed, error_msg = acq.process_cluster(
-                    cluster_id, args.service, config
-                )
-
-                if status == "success":
-                    successful += 1
-                    total_obs += obs_count
-                elif status == "no_data":
-                    no_data += 1
-                else:
-                    failed += 1
-
-                acq.mark_cluster_processed(
-                    cluster_id, args.service, status, obs_count, elapsed, error_msg
-                )
-
-                pbar.set_postfix({
-                    'success': successful,
-                    'no_data': no_data,
-                    'failed': failed,
-                    'obs': total_obs
-                })
-                pbar.update(1)
-                time.sleep(config['rate_limit'])
+        stats = acq.run_service(args.service, config, pending)
 
-        acq.logger.info(f"{args.service} complete: {successful:,} successful, {total_obs:,} observations")
+        acq.logger.info(f"{args.service} complete: {stats['success']:,} successful, {stats['obs']:,} observations")
         return
 
     # Run phase
-    if args.phase:
+    if args.phase == 1 and args.composite:
+        stats = acq.run_phase1_composite(max_clusters=args.max_clusters)
+        acq.logger.info(f"Composite Phase 1 complete: {stats['success']:,} service-cluster successes, {stats['obs']:,} observations")
+    elif args.phase:
         acq.run_phase(args.phase, max_clusters=args.max_clusters)
     else:
         print("Please specify --phase, --service, or use --status")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Auto-Curation Benchmark
+Runs AutoCurationPipeline.run_discovery_pipeline on a synthetic adapter that
+harvests n_natives WQP-characteristic-like parameters against a registry of
+n_canonical variables, and times TermBroker.match_batch on its own. For
+reference, the per-native scan of every canonical label that generic label
+matching used to do is timed on the first n_scan natives.
+
+Runs offline: python tests/integration/curation/performance_benchmark_curation.py [n_natives] [n_canonical] [n_scan]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the package to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from env_agents.core.registry import RegistryManager
+from env_agents.core.registry_curation import AutoCurationPipeline
+from env_agents.core.service_discovery import ServiceDiscoveryEngine
+from env_agents.core.term_broker import NativeParam, TermBroker, _norm_label, _starts_or_contains
+
+WORDS = ("dissolved total suspended organic inorganic carbon nitrogen phosphorus nitrate nitrite "
+         "ammonia sulfate chloride fluoride calcium magnesium sodium potassium iron manganese zinc "
+         "copper lead arsenic mercury cadmium chromium oxygen temperature water air soil sediment "
+         "turbidity conductance specific alkalinity hardness solids fecal coliform escherichia "
+         "chlorophyll pheophytin biomass discharge stage precipitation ozone particulate matter "
+         "benzene toluene atrazine glyphosate radium uranium strontium silica bromide boron").split()
+UNITS = ["mg/l", "ug/l", "degC", "ft3/s", "NTU", "uS/cm", "%"]
+
+
+class SyntheticAdapter:
+    DATASET = "SYNTHETIC_WQP"
+
+    def __init__(self, n_natives: int, seed: int = 1):
+        rng = random.Random(seed)
+        self.items = [{"id": f"C{i:06d}",
+                       "name": " ".join(rng.sample(WORDS, rng.randint(1, 4))).title() + rng.choice(["", ", total", " (as N)"]),
+                       "unit": rng.choice(UNITS), "domain": "water"} for i in range(n_natives)]
+
+    def harvest(self):
+        return self.items
+
+
+class SyntheticRouter:
+    def __init__(self, adapter):
+        self.adapters = {adapter.DATASET: adapter}
+
+
+def build_seed(n_canonical: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    variables = {f"water:var_{i}": {"label": " ".join(rng.sample(WORDS, rng.randint(1, 3))),
+                                    "preferred_unit": rng.choice(UNITS), "domain": "water"}
+                 for i in range(n_canonical)}
+    return {"variables": variables, "units": {}, "methods": {}, "qc_flags": {}}
+
+
+def scan_labels(broker: TermBroker, labels) -> int:
+    """Generic label matching as a scan of every canonical label per native"""
+    matched = 0
+    for label in labels:
+        nl = _norm_label(label)
+        for k in broker._canon_by_label:
+            if k and (_starts_or_contains(nl, k) or _starts_or_contains(k, nl)):
+                matched += 1
+    return matched
+
+
+def main():
+    n_natives = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    n_canonical = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    n_scan = int(sys.argv[3]) if len(sys.argv) > 3 else 2_000
+    adapter = SyntheticAdapter(n_natives)
+    seed = build_seed(n_canonical)
+    natives = [NativeParam(adapter.DATASET, item["id"], item["name"], item["unit"], "water") for item in adapter.items]
+
+    start = time.perf_counter()
+    broker = TermBroker(seed)
+    build_s = time.perf_counter() - start
+    start = time.perf_counter()
+    best = broker.match_batch(adapter.DATASET, natives)
+    batch_s = time.perf_counter() - start
+    start = time.perf_counter()
+    scan_labels(broker, [n.label for n in natives[:n_scan]])
+    scan_s = time.perf_counter() - start
+
+    print(f"{n_natives} natives, {n_canonical} canonical variables")
+    print({"mode": "label scan", "natives": n_scan, "s": round(scan_s, 2),
+           "extrapolated_s": round(scan_s * n_natives / max(n_scan, 1), 1)})
+    print({"mode": "match_batch", "build_s": round(build_s, 3), "s": round(batch_s, 2),
+           "matched": sum(b is not None for b in best)})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = RegistryManager(tmp)
+        registry.write_seed(seed)
+        pipeline = AutoCurationPipeline(registry, ServiceDiscoveryEngine(registry, tmp))
+        start = time.perf_counter()
+        report = pipeline.run_discovery_pipeline(SyntheticRouter(adapter))[adapter.DATASET]
+        pipeline_s = time.perf_counter() - start
+
+    print({"mode": "run_discovery_pipeline", "s": round(pipeline_s, 2), "discovered": report.discovered_count,
+           "auto_accepted": len(report.auto_accepted), "review_queue": len(report.review_queue),
+           "errors": report.errors})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Discovery Search Benchmark
+Measures query latency of the BM25 SearchIndex on a synthetic catalog of
+n_docs variable/asset documents (WQP-characteristic-like names), against a
+linear scan that splits every document's text per query, as discovery used
+to. Cold queries are the first after building, which compile postings.
+Also times queries right after an update, substring search on labels, and
+building, saving and loading the index.
+
+Runs offline: python tests/integration/discovery/performance_benchmark_search.py [n_docs] [n_queries]
+"""
+
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the package to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from env_agents.core.search_index import SearchIndex
+
+WORDS = ("dissolved total suspended organic inorganic carbon nitrogen phosphorus nitrate nitrite "
+         "ammonia sulfate chloride fluoride calcium magnesium sodium potassium iron manganese zinc "
+         "copper lead arsenic mercury cadmium chromium oxygen temperature water air soil sediment "
+         "turbidity conductance specific alkalinity hardness solids fecal coliform escherichia "
+         "chlorophyll pheophytin biomass discharge stage precipitation ozone particulate matter "
+         "benzene toluene atrazine glyphosate radium uranium strontium silica bromide boron").split()
+QUERIES = ["dissolved oxygen", "water temperature", "total nitrogen", "fecal coliform bacteria",
+           "specific conductance", "suspended sediment discharge", "particulate matter ozone",
+           "arsenic", "chlorophyll", "atrazine water"]
+
+
+def build_documents(n_docs: int, seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(n_docs):
+        name = " ".join(rng.sample(WORDS, rng.randint(2, 4))).title()
+        description = " ".join(rng.choices(WORDS, k=rng.randint(6, 20)))
+        yield f"SVC{i % 50}", f"P{i:06d}", name, description
+
+
+def linear_scan(documents, query: str, limit: int = 20):
+    """Per-query word overlap over every document (the old discovery approach)"""
+    query_words = set(query.lower().split())
+    scored = []
+    for service_id, doc_id, name, description in documents:
+        overlap = len(query_words & set(name.lower().split())) + len(query_words & set(description.lower().split()))
+        if overlap:
+            scored.append((overlap, doc_id))
+    scored.sort(reverse=True)
+    return scored[:limit]
+
+
+def time_queries(search, queries, repeat: int) -> dict:
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            search(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {"p50_ms": round(statistics.median(latencies), 3),
+            "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 3)}
+
+
+def main():
+    n_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    queries = (QUERIES * (n_queries // len(QUERIES) + 1))[:n_queries]
+    documents = list(build_documents(n_docs))
+
+    start = time.perf_counter()
+    index = SearchIndex()
+    for service_id, doc_id, name, description in documents:
+        index.add(f"variable:{service_id}:{doc_id}", "variable", service_id, name,
+                  {"id": doc_id, "name": name, "description": description})
+    build_s = time.perf_counter() - start
+
+    print(f"{n_docs} documents, {len(queries)} queries")
+    print({"mode": "linear scan", **time_queries(lambda q: linear_scan(documents, q), queries, 1)})
+    # The first query per term after an update compiles that term's postings
+    print({"mode": "BM25 search, cold", **time_queries(lambda q: index.search(q), queries, 1)})
+    print({"mode": "BM25 search", **time_queries(lambda q: index.search(q), queries, 5)})
+    print({"mode": "BM25 best per service", **time_queries(index.search_services, queries, 5)})
+    print({"mode": "BM25 prefix search", **time_queries(lambda q: index.search(q[:4], prefix=True), queries, 5)})
+
+    def update_then_search(query):
+        index.add("variable:SVC0:NEW", "variable", "SVC0", "New Parameter", {"name": "New Parameter"})
+        index.search(query)
+    # An update only drops the compiled postings of the updated document's terms
+    print({"mode": "BM25 search after an update", **time_queries(update_then_search, queries, 5)})
+    index.contains("xyz")  # Builds the trigram index
+    print({"mode": "substring search", **time_queries(lambda q: index.contains(q.split()[0][2:7]), queries, 5)})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "search_index.json"
+        start = time.perf_counter()
+        index.save(path)
+        save_s = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = SearchIndex.load(path)
+        load_s = time.perf_counter() - start
+        assert len(loaded) == len(index)
+        size_mb = path.stat().st_size / 1e6
+
+    print({"build_s": round(build_s, 2), "save_s": round(save_s, 2), "load_s": round(load_s, 2),
+           "file_mb": round(size_mb, 1)})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Client Benchmark
+Measures TLS handshakes and wall time for n small HTTPS requests against a
+local stub server, one fresh connection per request (module-level
+requests.get, as adapters used to) vs. the shared pooled HttpClient.
+
+Runs offline (needs the openssl CLI for a throwaway certificate):
+python tests/integration/http/performance_benchmark_http.py [n_requests] [n_threads]
+"""
+
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+# Add the package to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from env_agents.core.utils_http import HttpClient
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        body = b'{"results": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TLSServer(ThreadingHTTPServer):
+    """Stub HTTPS server that counts completed TLS handshakes"""
+
+    daemon_threads = True
+
+    def __init__(self, certfile: str, keyfile: str):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        self.context.load_cert_chain(certfile, keyfile)
+        self.handshakes = 0
+        self.lock = threading.Lock()
+
+    def get_request(self):
+        sock, addr = super().get_request()
+        return self.context.wrap_socket(sock, server_side=True, do_handshake_on_connect=False), addr
+
+    def finish_request(self, request, client_address):
+        try:
+            request.do_handshake()
+        except (ssl.SSLError, OSError):
+            return
+        with self.lock:
+            self.handshakes += 1
+        super().finish_request(request, client_address)
+
+
+def make_certificate(directory: str):
+    """Self-signed certificate for 127.0.0.1 via the openssl CLI"""
+    cert, key = f"{directory}/cert.pem", f"{directory}/key.pem"
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                    "-keyout", key, "-out", cert, "-subj", "/CN=127.0.0.1",
+                    "-addext", "subjectAltName=IP:127.0.0.1"],
+                   check=True, capture_output=True)
+    return cert, key
+
+
+def run(server: TLSServer, url: str, get, n_requests: int, n_threads: int, mode: str) -> dict:
+    """Send n_requests through get() from n_threads threads"""
+    server.handshakes = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        statuses = list(pool.map(lambda i: get(f"{url}/q{i}").status_code, range(n_requests)))
+    elapsed = time.perf_counter() - start
+    assert set(statuses) == {200}
+
+    return {
+        "mode": mode,
+        "requests": n_requests,
+        "handshakes": server.handshakes,
+        "seconds": round(elapsed, 3),
+        "ms_per_request": round(elapsed / n_requests * 1000, 2),
+    }
+
+
+def main():
+    n_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    if not shutil.which("openssl"):
+        sys.exit("openssl CLI not found; it is needed to create the stub server's certificate")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = make_certificate(tmp)
+        server = TLSServer(cert, key)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"https://127.0.0.1:{server.server_address[1]}"
+        print(f"Stub server: {url}, {n_requests} requests from {n_threads} threads")
+
+        try:
+            print(run(server, url, lambda u: requests.get(u, verify=cert, timeout=10),
+                      n_requests, n_threads, "requests.get per call"))
+
+            client = HttpClient(pool_maxsize=n_threads)
+            session = client.new_session()
+            print(run(server, url, lambda u: session.get(u, verify=cert, timeout=10),
+                      n_requests, n_threads, "shared HttpClient"))
+            print(f"Pool stats: {client.stats()}")
+            client.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
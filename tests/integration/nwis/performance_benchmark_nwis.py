@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+USGS NWIS WaterML-JSON Parse Benchmark
+Measures decode throughput and peak memory of the NWIS ingestion path on a
+synthetic daily-values document, streamed (ijson) vs. decoded in full.
+
+Runs offline: python tests/integration/nwis/performance_benchmark_nwis.py [n_series] [n_values]
+"""
+
+import io
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add the package to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from env_agents.adapters.nwis import adapter as nwis_adapter
+from env_agents.adapters.nwis.adapter import USGSNWISAdapter
+
+
+def build_document(n_series: int, n_values: int) -> bytes:
+    """WaterML-JSON body with n_series daily discharge series of n_values each"""
+    series = []
+    for i in range(n_series):
+        series.append({
+            "name": f"USGS:{i:08d}:00060:00003",
+            "sourceInfo": {"siteName": f"Site {i}", "siteCode": [{"value": f"{i:08d}"}],
+                           "geoLocation": {"geogLocation": {"latitude": 35 + i / 1e4, "longitude": -100 - i / 1e4}}},
+            "variable": {"variableCode": [{"value": "00060"}], "variableName": "Streamflow, ft&#179;/s",
+                         "unit": {"unitAbbreviation": "ft3/s"}},
+            "values": [{"value": [
+                {"value": f"{(i + d) % 997 / 3:.2f}", "qualifiers": ["A"],
+                 "dateTime": f"{2000 + d // 365}-{d % 12 + 1:02d}-{d % 28 + 1:02d}T00:00:00.000"}
+                for d in range(n_values)
+            ]}],
+        })
+    return json.dumps({"value": {"timeSeries": series}}).encode()
+
+
+def decode(adapter: USGSNWISAdapter, body: bytes) -> int:
+    """Decode body into core-schema batches (discarded, as a consumer would write them out)"""
+    context = {"retrieval_timestamp": "benchmark", "web_metadata": {}, "parameter_metadata": {}}
+    n_rows = 0
+    for ts in nwis_adapter.iter_time_series(io.BytesIO(body)):
+        frame = adapter._series_frame(ts, "benchmark", context)
+        n_rows += 0 if frame is None else len(frame)
+    return n_rows
+
+
+def run(adapter: USGSNWISAdapter, body: bytes, streaming: bool) -> dict:
+    """Time one untraced pass, then measure peak memory in a traced pass"""
+    nwis_adapter.IJSON_AVAILABLE = streaming and nwis_adapter.ijson is not None
+
+    start = time.perf_counter()
+    n_rows = decode(adapter, body)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    decode(adapter, body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "mode": "streaming" if nwis_adapter.IJSON_AVAILABLE else "full decode",
+        "rows": n_rows,
+        "seconds": round(elapsed, 3),
+        "mb_per_s": round(len(body) / 2**20 / elapsed, 1),
+        "rows_per_s": int(n_rows / elapsed),
+        "peak_mb": round(peak / 2**20, 1),
+    }
+
+
+def main():
+    n_series = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_values = int(sys.argv[2]) if len(sys.argv) > 2 else 3650
+    body = build_document(n_series, n_values)
+    print(f"Document: {n_series} series x {n_values} values, {len(body) / 2**20:.1f} MB")
+
+    adapter = USGSNWISAdapter()
+    available = nwis_adapter.IJSON_AVAILABLE
+    try:
+        for streaming in (True, False):
+            print(run(adapter, body, streaming))
+    finally:
+        nwis_adapter.IJSON_AVAILABLE = available
+
+
+if __name__ == "__main__":
+    main()
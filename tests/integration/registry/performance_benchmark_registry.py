@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Service Registry Benchmark
+Measures ServiceIndex maintenance on n_services synthetic service metadata
+entries: one-at-a-time index_service against bulk_load, re-indexing and
+removal, and the old scheme that scanned every posting and re-sorted the
+quality list on each update. Also times registering, saving and reloading
+a ServiceRegistry with the same entries.
+
+Runs offline: python tests/integration/registry/performance_benchmark_registry.py [n_services]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the package to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from env_agents.core.metadata_schema import (DataFormat, ServiceCapabilities, ServiceMetadata,
+                                             SpatialCoverage, TemporalCoverage, VariableInfo)
+from env_agents.core.service_registry import ServiceIndex, ServiceRegistry
+
+DOMAINS = ["water", "air", "soil", "climate", "biodiversity", "ocean"]
+
+
+def build_services(n_services: int, seed: int = 0):
+    rng = random.Random(seed)
+    services = []
+    for i in range(n_services):
+        variables = [VariableInfo(id=f"P{rng.randrange(5000):05d}", name=f"Parameter {j}",
+                                  description="Synthetic parameter measurement")
+                     for j in range(rng.randint(3, 12))]
+        metadata = ServiceMetadata(
+            service_id=f"SVC{i:06d}", title=f"Service {i}",
+            description="Synthetic environmental data service for benchmarking",
+            provider=f"Provider {i % 40}", source_url=f"https://example.com/{i}", license="CC0",
+            capabilities=ServiceCapabilities(
+                domains=rng.sample(DOMAINS, rng.randint(1, 2)), variables=variables,
+                spatial_coverage=SpatialCoverage(description="Global"),
+                temporal_coverage=TemporalCoverage(description="2000-present"),
+                data_formats=[DataFormat.TIME_SERIES]))
+        metadata.quality_metrics.reliability_score = rng.random()
+        services.append(metadata)
+    return services
+
+
+class ScanningIndex(ServiceIndex):
+    """The previous maintenance scheme: scan every posting, re-sort on each add"""
+
+    def index_service(self, metadata):
+        self._remove_from_indexes(metadata.service_id)
+        self._add_to_indexes(metadata)
+        self.quality_index.append((-self._quality[metadata.service_id], metadata.service_id))
+        self.quality_index.sort()
+
+    def _remove_from_indexes(self, service_id):
+        self._postings.pop(service_id, None)
+        self._quality.pop(service_id, None)
+        for index in (self.domain_index, self.variable_index, self.provider_index, self.auth_index):
+            for services in index.values():
+                services.discard(service_id)
+        self.quality_index = [entry for entry in self.quality_index if entry[1] != service_id]
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return round(time.perf_counter() - start, 3)
+
+
+def index_each(index, services):
+    for metadata in services:
+        index.index_service(metadata)
+
+
+def main():
+    n_services = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    services = build_services(n_services)
+    updates = services[::10]
+
+    print(f"{n_services} services, {len(updates)} re-indexed")
+    for name, index_type in (("previous scan + re-sort", ScanningIndex), ("reverse postings + bisect", ServiceIndex)):
+        index = index_type()
+        build_s = timed(lambda: index_each(index, services))
+        update_s = timed(lambda: index_each(index, updates))
+        remove_s = timed(lambda: [index.remove_service(m.service_id) for m in updates])
+        print({"mode": name, "index_each_s": build_s, "reindex_s": update_s, "remove_s": remove_s})
+
+    index = ServiceIndex()
+    print({"mode": "bulk_load", "index_all_s": timed(lambda: index.bulk_load(services))})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "services.json"
+        registry = ServiceRegistry(path)
+        register_s = timed(lambda: registry.register_services(services))
+        start = time.perf_counter()
+        reloaded = ServiceRegistry(path)
+        load_s = round(time.perf_counter() - start, 3)
+        assert len(reloaded.list_services()) == n_services
+        # Without a persisted search index, loading also rebuilds it
+        registry.search_index_path.unlink()
+        start = time.perf_counter()
+        ServiceRegistry(path)
+        cold_load_s = round(time.perf_counter() - start, 3)
+        size_mb = path.stat().st_size / 1e6
+
+    print({"register_services_s": register_s, "load_s": load_s, "load_without_search_index_s": cold_load_s,
+           "file_mb": round(size_mb, 1)})
+
+
+if __name__ == "__main__":
+    main()
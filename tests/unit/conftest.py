@@ -0,0 +1,340 @@
+"""
+Shared fixtures for unit tests.
+
+``FakeEE`` is a minimal stand-in for the earthengine-api module: it evaluates
+the handful of server-side calls the Earth Engine adapter builds and records
+every ``getInfo()`` round-trip.
+
+``FakeResponse`` is a configurable HTTP response (JSON payload, text or raw
+bytes) shared by the fake service sessions, and ``ConcurrencyRecorder``
+counts the calls a fake service has in flight and keeps the peak.
+
+``FakeOverpass`` stands in for the Overpass API session: tiles taller than
+``max_span`` report an out-of-memory remark, smaller ones return a node per
+tile plus a way that crosses every tile border.
+"""
+
+import io
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pytest
+
+from env_agents.adapters.earth_engine import production_adapter
+from env_agents.adapters.earth_engine.production_adapter import ProductionEarthEngineAdapter
+from env_agents.adapters.earth_engine.asset_cache import AssetIntrospectionCache
+from env_agents.adapters.overpass.adapter import OverpassAdapter
+
+
+class FakeEE:
+    """Minimal stand-in for the earthengine-api module"""
+
+    def __init__(self, assets):
+        # asset_id -> {"type": "Image", "values": {...}}
+        #          or {"type": "ImageCollection", "images": [(date, {...}), ...]}
+        self.assets = assets
+        self.calls = []
+        fake = self
+
+        class Rectangle:
+            def __init__(self, coords):
+                self.coords = coords
+
+        class Geometry:
+            pass
+        Geometry.Rectangle = Rectangle
+
+        class Feature:
+            def __init__(self, geom, props):
+                self.geom = geom
+                self.props = dict(props or {})
+
+            def set(self, key, value):
+                return Feature(self.geom, {**self.props, key: value})
+
+        class FeatureCollection:
+            def __init__(self, features):
+                self.features = list(features)
+
+            def geometry(self):
+                return self
+
+            def map(self, fn):
+                return FeatureCollection(fn(f) for f in self.features)
+
+            def getInfo(self):
+                fake.calls.append(("getInfo", "FeatureCollection", len(self.features)))
+                return {"features": [{"properties": dict(f.props)} for f in self.features]}
+
+        class Reducer:
+            @staticmethod
+            def mean():
+                return Reducer()
+
+            @staticmethod
+            def minMax():
+                return Reducer()
+
+            def forEachBand(self, img):
+                return self
+
+        class Date:
+            def __init__(self, date):
+                self.value = date
+
+            def format(self, fmt):
+                return self.value
+
+        class Image:
+            def __init__(self, asset_id, values=None, date=None):
+                self.asset_id = asset_id
+                self.values = values if values is not None else fake.assets[asset_id]["values"]
+                self._date = date
+
+            def getInfo(self):
+                fake.calls.append(("getInfo", "Image", self.asset_id))
+                return {"type": "Image"}
+
+            def select(self, bands):
+                return Image(self.asset_id, {b: self.values[b] for b in bands}, self._date)
+
+            def bandNames(self):
+                fake.calls.append(("bandNames", self.asset_id))
+                return List(self.values)
+
+            def rename(self, names):
+                return Image(self.asset_id, dict(zip(names, self.values.values())), self._date)
+
+            @staticmethod
+            def cat(images):
+                merged = {}
+                for img in images:
+                    merged.update(img.values)
+                return Image("composite", merged)
+
+            def reduceRegion(self, reducer, geometry, scale, maxPixels):
+                fake.calls.append(("reduceRegion", self.asset_id))
+                return Dictionary(self.values)
+
+            def date(self):
+                return Date(self._date)
+
+            def reduceRegions(self, collection, reducer, scale):
+                fake.calls.append(("reduceRegions", self.asset_id, len(collection.features)))
+                return FeatureCollection(
+                    Feature(f.geom, {**f.props, **self.values}) for f in collection.features
+                )
+
+        class List(list):
+            def map(self, fn):
+                return List(fn(item) for item in self)
+
+            def getInfo(self):
+                fake.calls.append(("getInfo", "List"))
+                return list(self)
+
+        class String:
+            def __init__(self, value):
+                self.value = value
+
+            def cat(self, other):
+                return self.value + other
+
+        class Dictionary:
+            def __init__(self, values):
+                self.values = values
+
+            def getInfo(self):
+                fake.calls.append(("getInfo", "Dictionary"))
+                return dict(self.values)
+
+        class Number:
+            def __init__(self, value):
+                self.value = value
+
+            def getInfo(self):
+                fake.calls.append(("getInfo", "size"))
+                return self.value
+
+        class ImageCollection:
+            def __init__(self, asset_id, images=None):
+                asset = fake.assets[asset_id]
+                if asset["type"] != "ImageCollection":
+                    raise RuntimeError(f"{asset_id} is not an ImageCollection")
+                self.asset_id = asset_id
+                self.images = images if images is not None else [
+                    Image(asset_id, values, date) for date, values in asset["images"]
+                ]
+
+            def limit(self, n):
+                return ImageCollection(self.asset_id, self.images[:n])
+
+            def getInfo(self):
+                fake.calls.append(("getInfo", "ImageCollection", self.asset_id))
+                return {"type": "ImageCollection"}
+
+            def filterDate(self, start, end):
+                # The end date is exclusive, as in Earth Engine
+                return ImageCollection(self.asset_id,
+                                       [img for img in self.images if start <= img._date < end])
+
+            def filterBounds(self, geometry):
+                return self
+
+            def size(self):
+                return Number(len(self.images))
+
+            def first(self):
+                return self.images[0]
+
+            def reduceColumns(self, reducer, selectors):
+                ms = [datetime.strptime(img._date, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000
+                      for img in self.images]
+                return Dictionary({"min": min(ms), "max": max(ms)} if ms else {"min": None, "max": None})
+
+            def select(self, bands):
+                return ImageCollection(self.asset_id, [img.select(bands) for img in self.images])
+
+            def mean(self):
+                fake.calls.append(("mean", self.asset_id))
+                bands = self.images[0].values if self.images else {}
+                values = {}
+                for band in bands:
+                    present = [img.values[band] for img in self.images if img.values[band] is not None]
+                    values[band] = sum(present) / len(present) if present else None
+                return Image(self.asset_id, values)
+
+            def map(self, fn):
+                return FeatureCollection(fn(img) for img in self.images)
+
+        def flatten(fc):
+            return FeatureCollection(f for inner in fc.features for f in inner.features)
+        FeatureCollection.flatten = flatten
+
+        self.Geometry = Geometry
+        self.Feature = Feature
+        self.FeatureCollection = FeatureCollection
+        self.Reducer = Reducer
+        self.String = String
+        self.Image = Image
+        self.ImageCollection = ImageCollection
+
+    def round_trips(self):
+        return [c for c in self.calls if c[0] == "getInfo"]
+
+
+@pytest.fixture
+def fake_ee(monkeypatch):
+    fake = FakeEE({
+        "USGS/SRTMGL1_003": {"type": "Image", "values": {"elevation": 120.0}},
+        "WORLDCLIM/V1/BIO": {"type": "Image", "values": {"bio01": 150.0, "bio12": 800.0}},
+        "MODIS/061/MOD13Q1": {"type": "ImageCollection", "images": [
+            ("2021-01-01", {"NDVI": 0.4, "EVI": 0.2}),
+            ("2021-01-17", {"NDVI": 0.5, "EVI": None}),
+        ]},
+    })
+    monkeypatch.setattr(production_adapter, "ee", fake)
+    monkeypatch.setattr(production_adapter, "_EE_AUTHENTICATED", True)
+    monkeypatch.setattr(ProductionEarthEngineAdapter, "_ASSET_CACHE", AssetIntrospectionCache())
+    return fake
+
+
+class FakeResponse:
+    """HTTP response with a JSON payload or a raw body (content defaults to the encoded payload or text)"""
+
+    def __init__(self, payload=None, status_code=200, text="", content=None, url=None, headers=None):
+        self._payload = payload
+        self.status_code = status_code
+        self.text = text
+        if content is None:
+            content = (json.dumps(payload) if payload else text).encode()
+        self.content = content
+        self.raw = io.BytesIO(content)
+        self.url = url
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self._payload
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class ConcurrencyRecorder:
+    """Base for fake sessions: counts calls in flight and keeps the peak"""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def in_flight(self, delay=0.0):
+        """Count one call in flight, held for `delay` seconds so concurrent calls overlap"""
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(delay)
+            yield
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class FakeOverpass(ConcurrencyRecorder):
+    def __init__(self, status_text="Rate limit: 2\n2 slots available now.\n", max_span=0.15):
+        super().__init__()
+        self.status_text = status_text
+        self.max_span = max_span
+        self.queries = []
+
+    def get(self, url, timeout=None):
+        assert url.endswith("/api/status")
+        return FakeResponse(text=self.status_text)
+
+    def post(self, url, data=None, timeout=None, stream=False):
+        south, west, north, east = map(float, re.search(r"\[bbox:([^\]]+)\]", data["data"]).group(1).split(","))
+        with self._lock:
+            self.queries.append((south, west, north, east))
+            node_id = 1000 + len(self.queries)
+        with self.in_flight():
+            if north - south > self.max_span:
+                return FakeResponse(payload={
+                    "elements": [],
+                    "remark": 'runtime error: Query ran out of memory in "query" at line 3.',
+                })
+            if "out count;" in data["data"]:
+                statements = data["data"].count("out count;")
+                return FakeResponse(payload={"elements": [
+                    {"type": "count", "id": 0,
+                     "tags": {"nodes": "2", "ways": "1", "relations": "0", "total": str(3 + i)}}
+                    for i in range(statements)
+                ]})
+            node = {"type": "node", "id": node_id, "lat": south, "lon": west,
+                    "tags": {"highway": "bus_stop"}}
+            way = {"type": "way", "id": 1, "center": {"lat": 37.0, "lon": -122.0},
+                   "tags": {"highway": "primary"}}
+            return FakeResponse(payload={"elements": [node, way]})
+
+
+@pytest.fixture
+def overpass_adapter():
+    adapter = OverpassAdapter()
+    adapter._session = FakeOverpass()
+    return adapter
@@ -0,0 +1,134 @@
+"""
+Unit tests for per-service circuit breakers and their use in ResilientDataFetcher.
+
+``FakeRegistry`` holds a failing service (DOWN) and a healthier alternative
+in the same domain (BACKUP); ``CountingAdapter`` counts every fetch.
+"""
+
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+import requests
+
+from env_agents.core.circuit_breaker import BreakerState, CircuitBreaker, CircuitBreakerRegistry
+from env_agents.core.models import RequestSpec, Geometry
+from env_agents.core.resilient_fetcher import (FallbackConfig, FallbackStrategy, FetchStatus,
+                                               ResilientDataFetcher, RetryConfig)
+
+SPEC = RequestSpec(geometry=Geometry(type="point", coordinates=[-122.0, 37.0]))
+
+
+def _metadata(service_id, reliability):
+    return SimpleNamespace(service_id=service_id, version="1", rate_limiting=None,
+                           capabilities=SimpleNamespace(variables=[], spatial_coverage=None,
+                                                        temporal_coverage=None, domains=["air"]),
+                           quality_metrics=SimpleNamespace(reliability_score=reliability))
+
+
+class FakeRegistry:
+    def __init__(self):
+        self.services = {"DOWN": _metadata("DOWN", 0.2), "BACKUP": _metadata("BACKUP", 0.9)}
+
+    def get_service(self, service_id):
+        return self.services.get(service_id)
+
+    def get_all_metadata(self):
+        return dict(self.services)
+
+    def update_service_health(self, *args):
+        pass
+
+
+class CountingAdapter:
+    def __init__(self, fail=True):
+        self.fail = fail
+        self.calls = 0
+
+    def fetch(self, spec):
+        self.calls += 1
+        if self.fail:
+            raise requests.exceptions.ConnectionError("connection refused")
+        return pd.DataFrame({"value": [1.0], "time": ["2024-01-01"]})
+
+
+def _fetcher(adapters, breakers, alternatives=False, max_attempts=1):
+    return ResilientDataFetcher(
+        FakeRegistry(), adapters, RetryConfig(max_attempts=max_attempts, backoff_max=0.0),
+        FallbackConfig(enable_temporal_expansion=False, enable_spatial_simplification=False,
+                       enable_parameter_reduction=False, enable_cached_results=False,
+                       enable_alternative_services=alternatives),
+        breakers)
+
+
+def test_breaker_opens_probes_and_closes():
+    breaker = CircuitBreaker("X", failure_threshold=3, window=5, reset_timeout_s=0.05)
+    for _ in range(2):
+        assert breaker.try_acquire() == "closed"
+        breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state is BreakerState.OPEN  # 3 of the last 4 failed
+    assert breaker.try_acquire() is None
+
+    time.sleep(0.06)
+    assert breaker.try_acquire() == "probe"
+    assert breaker.try_acquire() is None  # One probe at a time
+    breaker.record_failure()
+    assert breaker.state is BreakerState.OPEN and breaker.reset_timeout_s == 0.1
+
+    time.sleep(0.11)
+    assert breaker.try_acquire() == "probe"
+    breaker.record_success()
+    assert breaker.state is BreakerState.CLOSED and breaker.reset_timeout_s == 0.05
+
+
+def test_open_state_survives_a_restart(tmp_path):
+    path = tmp_path / "breakers.json"
+    breakers = CircuitBreakerRegistry(state_path=path, failure_threshold=1, reset_timeout_s=60)
+    breakers.get("DOWN").record_failure()
+    assert breakers.is_open("DOWN")
+
+    restarted = CircuitBreakerRegistry(state_path=path, failure_threshold=1, reset_timeout_s=60)
+    assert restarted.is_open("DOWN")
+    assert restarted.get("DOWN").try_acquire() is None
+    assert not restarted.is_open("BACKUP")
+
+
+def test_open_breaker_fails_fast_without_calling_the_service():
+    adapter = CountingAdapter()
+    fetcher = _fetcher({"DOWN": adapter}, CircuitBreakerRegistry(failure_threshold=2, reset_timeout_s=60))
+
+    for _ in range(2):
+        assert fetcher.fetch("DOWN", SPEC).status == FetchStatus.SERVICE_UNAVAILABLE
+    result = fetcher.fetch("DOWN", SPEC)
+
+    assert adapter.calls == 2
+    assert result.status == FetchStatus.SERVICE_UNAVAILABLE
+    assert "Circuit breaker open" in result.error_details
+
+
+def test_open_breaker_routes_to_alternative_service():
+    down, backup = CountingAdapter(), CountingAdapter(fail=False)
+    breakers = CircuitBreakerRegistry(failure_threshold=1, reset_timeout_s=60)
+    breakers.get("DOWN").record_failure()
+
+    result = _fetcher({"DOWN": down, "BACKUP": backup}, breakers, alternatives=True).fetch("DOWN", SPEC)
+
+    assert result.is_success
+    assert result.fallbacks_used == [FallbackStrategy.ALTERNATIVE_SERVICE]
+    assert (down.calls, backup.calls) == (0, 1)
+
+
+def test_half_open_probe_is_a_single_attempt():
+    adapter = CountingAdapter()
+    breakers = CircuitBreakerRegistry(failure_threshold=1, reset_timeout_s=0.01)
+    fetcher = _fetcher({"DOWN": adapter}, breakers, max_attempts=3)
+
+    fetcher.fetch("DOWN", SPEC)
+    assert adapter.calls == 3 and breakers.is_open("DOWN")
+
+    time.sleep(0.02)
+    fetcher.fetch("DOWN", SPEC)
+    assert adapter.calls == 4
+    assert breakers.get("DOWN").reset_timeout_s == 0.02
@@ -0,0 +1,119 @@
+"""
+Unit tests for request deadlines and retry budgets.
+
+``FlakyAdapter`` always fails with a connection error and retries internally
+(as adapter backoff loops do), so every layer of retries is exercised.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from env_agents.core import deadline
+from env_agents.core.deadline import (RetryBudget, current_context, propagate, request_context)
+from env_agents.core.errors import DeadlineExceeded
+from env_agents.core.models import RequestSpec, Geometry
+from env_agents.core.resilient_fetcher import FetchStatus, ResilientDataFetcher, RetryConfig, FallbackConfig
+from env_agents.core.utils_http import bounded_timeout
+
+
+class FlakyAdapter:
+    def __init__(self, inner_retries=2, delay=0.0):
+        self.inner_retries = inner_retries
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, spec):
+        context = current_context()
+        for attempt in range(self.inner_retries + 1):
+            with self._lock:
+                self.calls += 1
+            time.sleep(self.delay)
+            if attempt == self.inner_retries or not context.can_retry():
+                break
+        raise requests.exceptions.ConnectionError("connection reset")
+
+
+def _fetcher(**retry):
+    fetcher = ResilientDataFetcher.__new__(ResilientDataFetcher)
+    fetcher.retry_config = RetryConfig(backoff_max=0.0, **retry)
+    fetcher.fallback_config = FallbackConfig(enable_cached_results=False)
+    return fetcher
+
+
+METADATA = SimpleNamespace(service_id="FLAKY", rate_limiting=None,
+                           capabilities=SimpleNamespace(variables=[], spatial_coverage=None,
+                                                        temporal_coverage=None))
+SPEC = RequestSpec(geometry=Geometry(type="point", coordinates=[-122.0, 37.0]))
+
+
+def test_budget_refills_per_request():
+    budget = RetryBudget(ratio=0.5, reserve=2, max_tokens=2)
+    assert budget.try_spend() and budget.try_spend()
+    assert not budget.try_spend()
+
+    budget.record_request()
+    budget.record_request()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+
+def test_layered_retries_share_one_budget(monkeypatch):
+    adapter = FlakyAdapter(inner_retries=2)
+
+    # Without a context every layer retries: 5 outer x 3 inner attempts
+    fetcher = _fetcher(max_attempts=5)
+    assert fetcher._attempt_primary_fetch(adapter, SPEC, METADATA).status == FetchStatus.SERVICE_UNAVAILABLE
+    assert adapter.calls == 15
+
+    # One first attempt plus 4 budgeted retries, whichever layer takes them
+    monkeypatch.setitem(deadline._BUDGETS, "FLAKY", RetryBudget(ratio=0.0, reserve=4))
+    adapter.calls = 0
+    with request_context(service="FLAKY"):
+        result = fetcher._attempt_primary_fetch(adapter, SPEC, METADATA)
+    assert result.status == FetchStatus.SERVICE_UNAVAILABLE
+    assert adapter.calls == 5
+
+
+def test_deadline_stops_retries():
+    adapter = FlakyAdapter(inner_retries=0, delay=0.05)
+    fetcher = _fetcher(max_attempts=50)
+
+    start = time.monotonic()
+    with request_context(timeout_s=0.12):
+        fetcher._attempt_primary_fetch(adapter, SPEC, METADATA)
+    assert adapter.calls <= 3
+    assert time.monotonic() - start < 0.3
+
+
+def test_inner_contexts_only_tighten_the_deadline():
+    with request_context(timeout_s=0.5) as outer:
+        with request_context(timeout_s=60, service="FLAKY") as inner:
+            assert inner.deadline == outer.deadline
+            assert inner.budget is deadline.get_retry_budget("FLAKY")
+        assert current_context() is outer
+    assert current_context().deadline is None
+
+
+def test_transport_timeouts_are_cut_to_the_deadline():
+    assert bounded_timeout(30) == 30
+    with request_context(timeout_s=0.5):
+        assert bounded_timeout(30) <= 0.5
+        assert all(t <= 0.5 for t in bounded_timeout((5, 30)))
+        assert bounded_timeout(None) <= 0.5
+
+    with request_context(timeout_s=0):
+        with pytest.raises(DeadlineExceeded):
+            bounded_timeout(30)
+
+
+def test_propagate_carries_the_context_into_worker_threads():
+    with request_context(timeout_s=10, service="FLAKY") as context:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            assert list(pool.map(propagate(lambda _: current_context()), range(2))) == [context, context]
+            assert pool.submit(current_context).result() is not context
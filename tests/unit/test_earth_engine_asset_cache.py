@@ -0,0 +1,57 @@
+"""
+Unit tests for the persistent Earth Engine asset introspection cache.
+
+The ``fake_ee`` fixture (see conftest.py) records every ``getInfo()`` round-trip.
+"""
+
+from env_agents.adapters.earth_engine.asset_cache import AssetIntrospectionCache
+from env_agents.adapters.earth_engine.production_adapter import ProductionEarthEngineAdapter
+from env_agents.core.cache import ServiceCache
+
+
+def test_introspection_persists_across_processes(fake_ee, monkeypatch, tmp_path):
+    disk = ServiceCache("EARTH_ENGINE", cache_dir=str(tmp_path))
+    monkeypatch.setattr(ProductionEarthEngineAdapter, "_ASSET_CACHE", AssetIntrospectionCache(disk))
+
+    adapter = ProductionEarthEngineAdapter(asset_id="MODIS/061/MOD13Q1")
+    assert adapter._get_asset_type() == "ImageCollection"
+    assert adapter._get_band_names() == ["NDVI", "EVI"]
+    assert adapter._get_date_extent() == ["2021-01-01", "2021-01-17"]
+    assert len(fake_ee.round_trips()) == 3
+
+    # A fresh process starts with an empty memory layer but the same disk cache
+    fake_ee.calls.clear()
+    monkeypatch.setattr(ProductionEarthEngineAdapter, "_ASSET_CACHE", AssetIntrospectionCache(disk))
+    adapter = ProductionEarthEngineAdapter(asset_id="MODIS/061/MOD13Q1")
+    assert adapter._get_asset_type() == "ImageCollection"
+    assert adapter._get_band_names() == ["NDVI", "EVI"]
+    assert adapter._get_date_extent() == ["2021-01-01", "2021-01-17"]
+    assert fake_ee.round_trips() == []
+
+
+def test_region_extent_is_cached_per_bbox_in_memory_only(fake_ee, monkeypatch, tmp_path):
+    disk = ServiceCache("EARTH_ENGINE", cache_dir=str(tmp_path))
+    monkeypatch.setattr(ProductionEarthEngineAdapter, "_ASSET_CACHE", AssetIntrospectionCache(disk))
+    adapter = ProductionEarthEngineAdapter(asset_id="MODIS/061/MOD13Q1")
+    bbox = [-120.005, 36.995, -119.995, 37.005]
+    region = fake_ee.Geometry.Rectangle(bbox)
+
+    assert adapter._get_region_extent(region, bbox) == ["2021-01-01", "2021-01-17"]
+    fake_ee.calls.clear()
+    assert adapter._get_region_extent(region, bbox) == ["2021-01-01", "2021-01-17"]
+    assert fake_ee.round_trips() == []
+    assert not disk.geographic_cache.exists()
+
+
+def test_expired_entries_are_refreshed(monkeypatch):
+    cache = AssetIntrospectionCache()
+    monkeypatch.setitem(AssetIntrospectionCache.TTLS, "bands", -1)
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        return ["B1"]
+
+    cache.get_or_fetch("bands", "ASSET", fetch)
+    cache.get_or_fetch("bands", "ASSET", fetch)
+    assert len(fetches) == 2
@@ -0,0 +1,82 @@
+"""
+Unit tests for batched Earth Engine extraction.
+
+The ``fake_ee`` fixture (see conftest.py) records every ``getInfo()`` round-trip.
+"""
+
+import pytest
+
+from env_agents.adapters.earth_engine.production_adapter import ProductionEarthEngineAdapter
+from env_agents.core.models import RequestSpec, Geometry
+
+
+def _specs(n, time_range=("2021-01-01", "2021-12-31")):
+    return [
+        RequestSpec(geometry=Geometry(type="point", coordinates=[-120.0 + i * 0.1, 37.0]),
+                    time_range=time_range)
+        for i in range(n)
+    ]
+
+
+def test_image_batch_uses_one_reduce_per_chunk(fake_ee):
+    adapter = ProductionEarthEngineAdapter(asset_id="USGS/SRTMGL1_003")
+    results = adapter.fetch_batch(_specs(5), chunk_size=2)
+
+    assert [len(rows) for rows in results] == [1, 1, 1, 1, 1]
+    assert results[3][0]["variable"] == "ee:elevation"
+    assert results[3][0]["longitude"] == pytest.approx(-119.7)
+
+    reduces = [c for c in fake_ee.calls if c[0] == "reduceRegions"]
+    assert [c[2] for c in reduces] == [2, 2, 1]
+    # Asset-type probe + one getInfo per chunk
+    assert len(fake_ee.round_trips()) == 1 + 3
+
+
+def test_collection_batch_groups_geometries_per_window(fake_ee):
+    adapter = ProductionEarthEngineAdapter(asset_id="MODIS/061/MOD13Q1")
+    results = adapter.fetch_batch(_specs(4))
+
+    # Two images x (NDVI, EVI) minus the null EVI value
+    assert [len(rows) for rows in results] == [3, 3, 3, 3]
+    assert {r["time"] for r in results[0]} == {"2021-01-01", "2021-01-17"}
+    assert all(r["attributes"]["temporal_fallback_applied"] is False for r in results[0])
+
+    # Type probe + window size + a single data fetch for all four geometries
+    assert len(fake_ee.round_trips()) == 3
+
+
+def test_collection_chunks_respect_feature_limit(fake_ee, monkeypatch):
+    monkeypatch.setattr(ProductionEarthEngineAdapter, "MAX_FEATURES_PER_REQUEST", 6)
+    adapter = ProductionEarthEngineAdapter(asset_id="MODIS/061/MOD13Q1")
+    adapter.fetch_batch(_specs(7))
+
+    fetches = [c for c in fake_ee.round_trips() if c[1] == "FeatureCollection"]
+    # Two images per window -> at most three geometries per request
+    assert [c[2] for c in fetches] == [6, 6, 2]
+
+
+def test_crowded_collection_window_is_split_by_date(fake_ee, monkeypatch):
+    monkeypatch.setattr(ProductionEarthEngineAdapter, "MAX_FEATURES_PER_REQUEST", 10)
+    fake_ee.assets["TEST/DAILY"] = {"type": "ImageCollection",
+                                    "images": [(f"2021-01-{day:02d}", {"B1": float(day)}) for day in range(1, 31)]}
+    adapter = ProductionEarthEngineAdapter(asset_id="TEST/DAILY")
+    results = adapter.fetch_batch(_specs(2, time_range=("2021-01-01", "2021-02-01")), fallback_to_single=False)
+
+    # 30 images > 10 features: shorter windows, never more than 10 features per request
+    fetches = [c for c in fake_ee.round_trips() if c[1] == "FeatureCollection"]
+    assert len(fetches) > 1 and all(c[2] <= 10 for c in fetches)
+    for rows in results:
+        assert sorted(r["time"] for r in rows) == [f"2021-01-{day:02d}" for day in range(1, 31)]
+        assert {r["attributes"]["requested_date_range"] for r in rows} == {"2021-01-01_to_2021-02-01"}
+
+
+def test_empty_window_falls_back_to_single_fetch(fake_ee, monkeypatch):
+    adapter = ProductionEarthEngineAdapter(asset_id="MODIS/061/MOD13Q1")
+    single_calls = []
+    monkeypatch.setattr(adapter, "_fetch_rows", lambda spec: single_calls.append(spec) or [])
+
+    specs = _specs(2, time_range=("2030-01-01", "2030-12-31"))
+    results = adapter.fetch_batch(specs)
+
+    assert results == [[], []]
+    assert single_calls == specs
@@ -0,0 +1,84 @@
+"""
+Unit tests for composite-asset Earth Engine extraction.
+
+The ``fake_ee`` fixture (see conftest.py) records every ``getInfo()`` round-trip.
+"""
+
+import pytest
+
+from env_agents.adapters.earth_engine.production_adapter import ProductionEarthEngineAdapter
+from env_agents.core.models import RequestSpec, Geometry
+
+
+COMPOSITE = {
+    "SRTM": {"asset_id": "USGS/SRTMGL1_003"},
+    "WORLDCLIM_BIO": {"asset_id": "WORLDCLIM/V1/BIO", "bands": ["bio12"]},
+    "MODIS_NDVI": {"asset_id": "MODIS/061/MOD13Q1", "bands": ["NDVI"],
+                   "time_range": ("2021-01-01", "2021-12-31")},
+    "MODIS_EVI": {"asset_id": "MODIS/061/MOD13Q1", "bands": ["EVI"],
+                  "time_range": ("2021-01-01", "2021-12-31")},
+}
+
+
+def _spec(lon=-120.0):
+    return RequestSpec(geometry=Geometry(type="point", coordinates=[lon, 37.0]),
+                       time_range=("2021-01-01", "2021-12-31"))
+
+
+def _by_member(rows):
+    return {row["attributes"]["composite_member"]: row for row in rows}
+
+
+def test_shared_assets_are_planned_once():
+    sources = ProductionEarthEngineAdapter._plan_composite(COMPOSITE)
+
+    assert [s["asset_id"] for s in sources.values()] == [
+        "USGS/SRTMGL1_003", "WORLDCLIM/V1/BIO", "MODIS/061/MOD13Q1"
+    ]
+    modis = list(sources.values())[2]
+    assert modis["bands"] == ["NDVI", "EVI"]
+    assert set(modis["members"]) == {"MODIS_NDVI", "MODIS_EVI"}
+
+
+def test_composite_fetches_every_member_in_one_request(fake_ee):
+    adapter = ProductionEarthEngineAdapter(composite=COMPOSITE)
+    rows = adapter._fetch_rows(_spec())
+
+    members = _by_member(rows)
+    assert set(members) == set(COMPOSITE)
+    assert members["SRTM"]["value"] == 120.0
+    assert members["WORLDCLIM_BIO"]["variable"] == "ee:bio12"
+    assert members["MODIS_NDVI"]["value"] == pytest.approx(0.45)
+    assert members["MODIS_EVI"]["value"] == pytest.approx(0.2)
+    assert members["MODIS_EVI"]["attributes"]["temporal_reducer"] == "mean"
+
+    # MOD13Q1 is reduced once for both NDVI and EVI
+    assert [c for c in fake_ee.calls if c[0] == "mean"] == [("mean", "MODIS/061/MOD13Q1")]
+    # Only the data fetch needs a round-trip once asset types are known
+    fake_ee.calls.clear()
+    adapter._fetch_rows(_spec())
+    assert fake_ee.round_trips() == [("getInfo", "Dictionary")]
+
+
+def test_composite_batch_uses_reduce_regions(fake_ee):
+    adapter = ProductionEarthEngineAdapter(composite=COMPOSITE)
+    results = adapter.fetch_batch([_spec(-120.0), _spec(-119.0), _spec(-118.0)])
+
+    assert [set(_by_member(rows)) for rows in results] == [set(COMPOSITE)] * 3
+    assert [c for c in fake_ee.calls if c[0] == "reduceRegions"] == [("reduceRegions", "composite", 3)]
+
+
+def test_empty_member_falls_back_to_single_asset(fake_ee, monkeypatch):
+    composite = {**COMPOSITE, "MODIS_NDVI": {"asset_id": "MODIS/061/MOD13Q1", "bands": ["NDVI"],
+                                             "time_range": ("2030-01-01", "2030-12-31")}}
+    fallback = []
+
+    def fake_member(self, member, spec):
+        fallback.append(member)
+        return []
+
+    monkeypatch.setattr(ProductionEarthEngineAdapter, "_fetch_composite_member", fake_member)
+    adapter = ProductionEarthEngineAdapter(composite=composite)
+    adapter._fetch_rows(_spec())
+
+    assert fallback == ["MODIS_NDVI"]
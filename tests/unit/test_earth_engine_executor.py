@@ -0,0 +1,64 @@
+"""
+Unit tests for the managed Earth Engine executor.
+"""
+
+import threading
+
+import pytest
+
+from env_agents.adapters.earth_engine.executor import (
+    EarthEngineExecutor, ExecutorSaturatedError, TimeoutError
+)
+
+
+@pytest.fixture
+def executor():
+    executor = EarthEngineExecutor(max_workers=2, max_draining=1)
+    yield executor
+    executor.shutdown()
+
+
+def test_completed_and_failed_calls_are_counted(executor):
+    assert executor.run(lambda x: x * 2, args=(21,), timeout_sec=5) == 42
+
+    with pytest.raises(ValueError):
+        executor.run(lambda: (_ for _ in ()).throw(ValueError("boom")), timeout_sec=5)
+
+    stats = executor.stats()
+    assert stats["completed"] == 1
+    assert stats["failed"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_timed_out_calls_drain_and_block_new_work(executor):
+    release = threading.Event()
+
+    with pytest.raises(TimeoutError):
+        executor.run(release.wait, timeout_sec=0.05)
+
+    stats = executor.stats()
+    assert stats["timed_out"] == 1
+    assert stats["draining"] == 1
+    assert stats["in_flight"] == 1
+
+    # One abandoned call is the limit - new work is refused until it drains
+    with pytest.raises(ExecutorSaturatedError):
+        executor.run(lambda: 1, timeout_sec=5)
+    assert executor.stats()["rejected"] == 1
+
+    release.set()
+    for _ in range(100):
+        if executor.stats()["draining"] == 0:
+            break
+        threading.Event().wait(0.01)
+
+    assert executor.run(lambda: 1, timeout_sec=5) == 1
+    assert executor.stats()["in_flight"] == 0
+
+
+def test_nested_calls_run_inline(executor):
+    def outer():
+        return executor.run(lambda: threading.current_thread().name, timeout_sec=5)
+
+    # Would deadlock on a saturated pool if the inner call were queued
+    assert executor.run(outer, timeout_sec=5).startswith("ee-worker")
@@ -0,0 +1,141 @@
+"""
+Unit tests for mirror failover and hedged requests.
+
+Each ``mirror`` is a local HTTP server whose ``delay`` (seconds before the
+headers), ``status`` and ``chunks`` (64 KiB body chunks, sent 20 ms apart) can
+be set per test; it counts requests and records whether the client hung up
+before the body was complete.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from env_agents.adapters.overpass.adapter import OverpassAdapter
+from env_agents.core import deadline
+from env_agents.core.deadline import RetryBudget, request_context
+from env_agents.core.endpoints import EndpointPool
+
+CHUNK = b" " * 65536
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        time.sleep(server.delay)
+        head = json.dumps({"mirror": server.name, "elements": []}).encode()
+        self.send_response(server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(head) + server.chunks * len(CHUNK)))
+        self.end_headers()
+        try:
+            self.wfile.write(head)
+            for _ in range(server.chunks):
+                time.sleep(0.02)
+                self.wfile.write(CHUNK)
+        except (BrokenPipeError, ConnectionResetError):
+            server.aborted.set()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def mirrors():
+    servers = []
+
+    def start(name, delay=0.0, status=200, chunks=0):
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        httpd.daemon_threads = True
+        httpd.name, httpd.delay, httpd.status, httpd.chunks = name, delay, status, chunks
+        httpd.requests, httpd.lock, httpd.aborted = 0, threading.Lock(), threading.Event()
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        servers.append(httpd)
+        return httpd, f"http://127.0.0.1:{httpd.server_address[1]}/api/interpreter"
+
+    yield start
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def _get(url):
+    return requests.get(url, timeout=5, stream=True)
+
+
+def test_failover_skips_a_failing_mirror(mirrors):
+    (down, down_url), (up, up_url) = mirrors("down", status=503), mirrors("up")
+    pool = EndpointPool([down_url, up_url])
+
+    assert pool.request(_get).json()["mirror"] == "up"
+    assert pool.ranked() == [up_url, down_url]
+
+    assert pool.request(_get).json()["mirror"] == "up"
+    assert (down.requests, up.requests) == (1, 2)
+    assert pool.stats()["failovers"] == 1
+
+
+def test_connection_errors_fail_over(mirrors):
+    _, up_url = mirrors("up")
+    pool = EndpointPool(["http://127.0.0.1:9/api/interpreter", up_url])
+
+    assert pool.request(_get).json()["mirror"] == "up"
+
+
+def test_hedge_beats_a_slow_mirror_and_the_loser_is_cancelled(mirrors):
+    (slow, slow_url), (fast, fast_url) = mirrors("slow", delay=0.3, chunks=40), mirrors("fast")
+    pool = EndpointPool([slow_url, fast_url], hedge=True, initial_hedge_delay_s=0.05)
+
+    start = time.monotonic()
+    resp = pool.request(_get)
+    assert resp.json()["mirror"] == "fast"
+    assert time.monotonic() - start < 0.25
+
+    # The slow response is closed as soon as its headers arrive, long before
+    # its 40 body chunks (~0.8 s) could have been sent
+    assert slow.aborted.wait(2)
+    stats = pool.stats()
+    assert (stats["hedges"], stats["hedge_wins"], stats["cancelled"]) == (1, 1, 1)
+    assert pool.ranked()[0] == fast_url
+
+
+def test_hedge_delay_follows_the_latency_quantile():
+    pool = EndpointPool(["http://a", "http://b"], hedge=True, initial_hedge_delay_s=5, min_samples=10)
+    assert pool.hedge_delay() == 5
+    for i in range(100):
+        pool.record_success("http://a", (i + 1) / 100)
+    assert pool.hedge_delay() == pytest.approx(0.96)
+
+
+def test_hedges_spend_the_retry_budget(mirrors, monkeypatch):
+    (slow, slow_url), (fast, fast_url) = mirrors("slow", delay=0.15), mirrors("fast")
+    pool = EndpointPool([slow_url, fast_url], hedge=True, initial_hedge_delay_s=0.02)
+
+    monkeypatch.setitem(deadline._BUDGETS, "MIRRORED", RetryBudget(ratio=0.0, reserve=0))
+    with request_context(service="MIRRORED"):
+        assert pool.request(_get).json()["mirror"] == "slow"
+    assert fast.requests == 0
+
+
+def test_overpass_queries_hedge_across_mirrors(mirrors):
+    (_, slow_url), (_, fast_url) = mirrors("slow", delay=0.5), mirrors("fast")
+    adapter = OverpassAdapter(base_url=slow_url)
+    adapter.service_config = {**adapter.service_config, "mirror_urls": [fast_url],
+                              "hedge": True, "hedge_initial_delay_s": 0.05}
+
+    start = time.monotonic()
+    assert adapter._overpass_query(37.0, -122.0, 37.01, -121.99)["mirror"] == "fast"
+    assert time.monotonic() - start < 0.4
+    assert adapter._endpoint_pool().urls == [slow_url, fast_url]
@@ -0,0 +1,119 @@
+"""
+Unit tests for planning EPA AQS requests per parameter and calendar year.
+
+``FakeAQS`` answers every dailyData/byBox call with two daily records and
+rejects date ranges that span calendar years, as AQS does.
+"""
+
+import pytest
+from conftest import ConcurrencyRecorder, FakeResponse
+
+from env_agents.adapters.air.adapter import DEFAULT_PARAM_CODES, MIN_REQUEST_INTERVAL_S, EPAAQSAdapter
+from env_agents.core.config import ConfigManager
+from env_agents.core.models import RequestSpec, Geometry
+from env_agents.core.planner import QueryPlanner
+from env_agents.core.rate_limit import RateLimiter
+
+
+class FakeAQS(ConcurrencyRecorder):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append((params["param"], params["bdate"], params["edate"]))
+        with self.in_flight(0.02):
+            if params["bdate"][:4] != params["edate"][:4]:
+                return FakeResponse({"Header": [{"status": "Failed", "error": ["bdate and edate must be in the same year"]}],
+                                     "Data": []})
+            return FakeResponse({"Header": [{"status": "Success"}], "Data": [
+                {"state_code": "06", "county_code": "001", "site_number": "0007", "latitude": 37.5,
+                 "longitude": -122.1, "date_local": f"{params['bdate'][:4]}-0{day}-01",
+                 "arithmetic_mean": 0.03 + day / 100, "units_of_measure": "Parts per million",
+                 "validity_indicator": "Y" if day == 1 else "N", "local_site_name": "Oakland"}
+                for day in (1, 2)
+            ]})
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    monkeypatch.setenv("EPA_AQS_EMAIL", "me@example.org")
+    monkeypatch.setenv("EPA_AQS_KEY", "test-key")
+    adapter = EPAAQSAdapter()
+    adapter._session = FakeAQS()
+    adapter._rate_limiter = RateLimiter(0)
+    return adapter
+
+
+def _pieces(plan):
+    return [(s.variables[0], s.time_range) for s in plan]
+
+
+def test_plan_splits_on_parameters_and_calendar_years(adapter):
+    spec = RequestSpec(geometry=Geometry(type="point", coordinates=[-122.1, 37.5]),
+                       time_range=("2019-06-15", "2021-03-01"), variables=["ozone", "o3", "so2"])
+
+    # Duplicate names of one parameter collapse to one code
+    assert _pieces(QueryPlanner(adapter).plan(spec)) == [
+        ("44201", ("2019-06-15", "2019-12-31")), ("42401", ("2019-06-15", "2019-12-31")),
+        ("44201", ("2020-01-01", "2020-12-31")), ("42401", ("2020-01-01", "2020-12-31")),
+        ("44201", ("2021-01-01", "2021-03-01")), ("42401", ("2021-01-01", "2021-03-01")),
+    ]
+
+
+def test_defaulted_requests_are_split_too(adapter):
+    spec = RequestSpec(geometry=Geometry(type="point", coordinates=[-122.1, 37.5]))
+    plan = QueryPlanner(adapter).plan(spec)
+
+    # Every default parameter, over the last year (which crosses 1 January)
+    assert {s.variables[0] for s in plan} == set(DEFAULT_PARAM_CODES)
+    assert len(plan) == 2 * len(DEFAULT_PARAM_CODES)
+    assert all(s.time_range[0][:4] == s.time_range[1][:4] for s in plan)
+
+
+def test_configured_spacing_follows_aqs_guidance():
+    # services.yaml overrides the constant, so it must not space requests closer
+    configured = ConfigManager().get_service_config("EPA_AQS")["rate_limit"]["min_interval_seconds"]
+    assert configured == MIN_REQUEST_INTERVAL_S == 5.0
+
+
+def test_multi_year_multi_pollutant_request(adapter):
+    spec = RequestSpec(geometry=Geometry(type="point", coordinates=[-122.1, 37.5]),
+                       time_range=("2019-06-15", "2021-03-01"), variables=["ozone", "so2"])
+    df = QueryPlanner(adapter).fetch(spec)
+
+    assert sorted(adapter._session.calls) == sorted([
+        (param, bdate, edate) for param in ("44201", "42401")
+        for bdate, edate in (("20190615", "20191231"), ("20200101", "20201231"), ("20210101", "20210301"))])
+    assert adapter._session.peak > 1
+    assert len(df) == 6 * 2
+    assert sorted(df["variable"].unique()) == ["air:ozone", "air:sulfur_dioxide"]
+
+
+def test_direct_fetch_runs_planned_pieces_in_order(adapter):
+    spec = RequestSpec(geometry=Geometry(type="point", coordinates=[-122.1, 37.5]),
+                       time_range=("2019-06-15", "2021-03-01"), variables=["ozone", "so2"])
+    rows = adapter._fetch_epa_data_direct(spec, "me@example.org", "key")
+
+    assert adapter._session.peak == 1
+    assert len(rows) == 6 * 2
+
+    # Plan order: calendar year, then parameter
+    assert [r["variable"] for r in rows[::2]] == ["air:ozone", "air:sulfur_dioxide"] * 3
+    assert [r["time"] for r in rows[::4]] == ["2019-01-01T12:00:00Z", "2020-01-01T12:00:00Z",
+                                             "2021-01-01T12:00:00Z"]
+
+
+def test_rows_are_built_from_data_arrays(adapter):
+    spec = RequestSpec(geometry=Geometry(type="bbox", coordinates=[-122.2, 37.4, -122.0, 37.6]),
+                       time_range=("2020-01-01", "2020-12-31"), variables=["44201"])
+    first, second = adapter._fetch_epa_data_direct(spec, "me@example.org", "key")
+
+    assert first["observation_id"] == "epa_aqs_0007_44201_2020-01-01"
+    assert first["spatial_id"] == "EPA_06_001_0007"
+    assert first["geom_wkt"] == "POINT(-122.1 37.5)"
+    assert first["value"] == pytest.approx(0.04)
+    assert (first["qc_flag"], second["qc_flag"]) == ("valid", "flagged")
+    assert first["site_name"] == "EPA Site Oakland"
+    assert first["attributes"]["parameter_code"] == "44201"
+    assert first["provenance"]["collection_date"] == "2020-01-01"
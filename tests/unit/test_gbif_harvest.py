@@ -0,0 +1,153 @@
+"""
+Unit tests for partitioned, concurrent GBIF occurrence harvesting.
+
+``FakeGBIF`` holds a fixed set of occurrences and applies the search
+filters, paging ceiling and year facet the way the occurrence API does.
+The ``ceiling`` fixture shrinks the paging limits so splits happen early.
+"""
+
+import pytest
+from conftest import ConcurrencyRecorder, FakeResponse
+
+from env_agents.adapters.gbif import adapter as gbif_adapter
+from env_agents.adapters.gbif.adapter import GBIFAdapter
+from env_agents.core.models import RequestSpec, Geometry
+
+
+def _occurrences():
+    records = []
+    for i in range(240):
+        year = 2018 + i % 4 if i < 160 else 2021  # 2021 is dense
+        records.append({"key": i, "kingdom": "Plantae" if i % 2 else "Animalia", "year": year,
+                        "eventDate": f"{year}-06-{i % 28 + 1:02d}", "decimalLatitude": 37.0 + (i % 16) / 100,
+                        "decimalLongitude": -122.0 + (i // 16) / 100, "country": "US",
+                        "publishingOrganizationKey": "org"})
+    return records
+
+
+def _in_range(value, text):
+    low, high = text.split(",")
+    return low <= value <= high if isinstance(value, str) else float(low) <= value <= float(high)
+
+
+class FakeGBIF(ConcurrencyRecorder):
+    def __init__(self, ceiling):
+        super().__init__()
+        self.ceiling = ceiling
+        self.records = _occurrences()
+        self.counts, self.pages = [], []
+
+    def get(self, url, params=None, timeout=None):
+        matches = [r for r in self.records if all((
+            "kingdom" not in params or r["kingdom"] == params["kingdom"],
+            "decimalLatitude" not in params or _in_range(r["decimalLatitude"], params["decimalLatitude"]),
+            "decimalLongitude" not in params or _in_range(r["decimalLongitude"], params["decimalLongitude"]),
+            "eventDate" not in params or (r["eventDate"] and _in_range(r["eventDate"], params["eventDate"])),
+            "year" not in params or (r["year"] and _in_range(str(r["year"]), params["year"])),
+        ))]
+        if params["limit"] == 0:
+            with self._lock:
+                self.counts.append(params)
+            years = {}
+            for r in matches:
+                if r["year"]:
+                    years[r["year"]] = years.get(r["year"], 0) + 1
+            return FakeResponse({"count": len(matches), "results": [], "facets": [
+                {"field": "YEAR", "counts": [{"name": str(y), "count": c} for y, c in years.items()]}]})
+
+        assert params["offset"] + params["limit"] <= self.ceiling
+        self.pages.append(params)
+        with self.in_flight(0.01):
+            return FakeResponse({"results": matches[params["offset"]:params["offset"] + params["limit"]]})
+
+
+@pytest.fixture
+def ceiling(monkeypatch):
+    monkeypatch.setattr(gbif_adapter, "OFFSET_CEILING", 50)
+    monkeypatch.setattr(gbif_adapter, "PAGE_SIZE", 20)
+    return 50
+
+
+@pytest.fixture
+def adapter(ceiling):
+    adapter = GBIFAdapter()
+    adapter._session = FakeGBIF(ceiling)
+    return adapter
+
+
+def _spec(time_range=("2018-01-01", "2021-12-31"), **extra):
+    return RequestSpec(geometry=Geometry(type="bbox", coordinates=[-122.0, 37.0, -121.8, 37.2]),
+                       time_range=time_range, extra=extra)
+
+
+def test_spec_becomes_search_parameters(adapter):
+    spec = RequestSpec(geometry=Geometry(type="point", coordinates=[-122.0, 37.0]),
+                       time_range=("2020-01-01T00:00:00", "2020-12-31"), variables=["Plant Occurrences"])
+    adapter._fetch_rows(spec)
+
+    params = adapter._session.counts[0]
+    assert params["eventDate"] == "2020-01-01,2020-12-31"
+    assert params["kingdom"] == "Plantae"
+    low, high = map(float, params["decimalLatitude"].split(","))
+    assert low < 37.0 < high and high - low == pytest.approx(2000 / 111000)
+
+
+def test_partitions_cover_everything_under_the_ceiling(adapter):
+    rows = adapter._fetch_rows(_spec(max_records=None))
+
+    assert sorted(r["attributes"]["gbif_id"] for r in rows) == list(range(240))
+    assert adapter._session.peak > 1
+
+    # 2018-2020 fit as year runs; 2021 alone (100 records) needs bbox quadrants
+    assert any("eventDate" in p and p["eventDate"].startswith("2021") and "decimalLatitude" in p
+               and p["decimalLatitude"] != "37.0,37.2" for p in adapter._session.pages)
+
+
+def test_without_time_range_years_are_split_by_facet(adapter):
+    rows = adapter._fetch_rows(_spec(time_range=None, max_records=None))
+
+    assert len(rows) == 240
+    assert any("year" in p for p in adapter._session.pages)
+
+
+def test_records_without_a_year_are_not_lost(adapter):
+    adapter._session.records += [{"key": 1000 + j, "kingdom": "Plantae", "year": None, "eventDate": None,
+                                  "decimalLatitude": 37.18, "decimalLongitude": -121.85 + j / 1000,
+                                  "country": "US", "publishingOrganizationKey": "org"} for j in range(30)]
+    rows = adapter._fetch_rows(_spec(time_range=None, max_records=None))
+
+    assert len(rows) == 270
+
+
+def test_polygons_are_searched_as_wkt_within_their_bounds(adapter):
+    # Clockwise ring covering every occurrence
+    ring = [[-122.0, 37.0], [-122.0, 37.2], [-121.8, 37.2], [-121.8, 37.0], [-122.0, 37.0]]
+    spec = RequestSpec(geometry=Geometry(type="polygon", coordinates=[ring]), time_range=None,
+                       extra={"max_records": None})
+    rows = adapter._fetch_rows(spec)
+
+    params = adapter._session.counts[0]
+    assert params["geometry"] == "POLYGON ((-122 37, -121.8 37, -121.8 37.2, -122 37.2, -122 37))"
+    assert (params["decimalLatitude"], params["decimalLongitude"]) == ("37.0,37.2", "-122.0,-121.8")
+    assert len(rows) == 240
+    assert all(p["geometry"] == params["geometry"] for p in adapter._session.pages)
+
+
+def test_max_records_needs_no_partitioning(adapter):
+    rows = adapter._fetch_rows(_spec(max_records=30))
+
+    assert len(rows) == 30
+    assert len(adapter._session.counts) == 1
+    assert [(p["offset"], p["limit"]) for p in adapter._session.pages] == [(0, 20), (20, 10)]
+
+
+def test_rows_are_built_columnar(adapter):
+    rows = adapter._fetch_rows(_spec(max_records=2))
+
+    animal, plant = rows
+    assert (animal["variable"], plant["variable"]) == ("Animal Occurrences", "Plant Occurrences")
+    assert animal["observation_id"] == "gbif_0"
+    assert animal["geom_wkt"] == "POINT(-122.0 37.0)"
+    assert animal["time"] == "2018-06-01"
+    assert animal["provenance"] == "GBIF via org"
+    assert plant["attributes"]["terms"]["native_name"] == "Plant Occurrences"
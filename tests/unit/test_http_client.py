@@ -0,0 +1,101 @@
+"""
+Unit tests for the shared, pooled HTTP transport.
+
+A local keep-alive HTTP/1.1 server counts the TCP connections it accepts;
+every response is gzip-compressed when the client offers gzip.
+"""
+
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from env_agents.adapters.gbif.adapter import GBIFAdapter
+from env_agents.adapters.wqp.adapter import WQPAdapter
+from env_agents.core import utils_http
+from env_agents.core.utils_http import HttpClient, get_http_client
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        body = f'{{"path": "{self.path}", "ua": "{self.headers["User-Agent"]}"}}'.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.lock = threading.Lock()
+    httpd.connections = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_sessions_share_keep_alive_connections(server):
+    httpd, url = server
+    client = HttpClient()
+    gbif, wqp = client.new_session("env-agents/GBIF"), client.new_session("env-agents/WQP")
+
+    for i in range(10):
+        assert gbif.get(f"{url}/a{i}").json()["ua"] == "env-agents/GBIF"
+        assert wqp.get(f"{url}/b{i}").json()["ua"] == "env-agents/WQP"
+
+    # 20 requests from two sessions over one connection, gzip decoded transparently
+    assert httpd.connections == 1
+    assert client.stats()[f"http://127.0.0.1:{httpd.server_address[1]}"] == {"requests": 20, "connections": 1}
+    assert "gzip" in gbif.headers["Accept-Encoding"]
+
+
+def test_host_pools_are_sized_and_rate_limited(server):
+    httpd, url = server
+    client = HttpClient(pool_maxsize=2, host_pool_sizes={f"{url}/api": 6}, host_min_intervals={url: 0.02})
+    transport = client.new_session().get_adapter(f"{url}/x")
+    assert transport._pool_maxsize == 6
+
+    start = time.monotonic()
+    for _ in range(4):
+        client.session.get(url)
+    assert time.monotonic() - start >= 0.06
+    assert client.new_session().get_adapter("http://elsewhere.example/")._pool_maxsize == 2
+
+
+def test_adapters_use_the_process_wide_client():
+    client = get_http_client()
+    gbif, wqp = GBIFAdapter(), WQPAdapter()
+
+    assert gbif._session is not wqp._session
+    assert gbif._session.headers["User-Agent"] == "env-agents/GBIF"
+    assert gbif._session.get_adapter("https://api.gbif.org/v1/occurrence/search") is \
+        client.session.get_adapter("https://api.gbif.org/v1/occurrence/search")
+
+    # Per-host pools come from services.yaml concurrency settings
+    assert gbif._session.get_adapter("https://api.gbif.org/v1")._pool_maxsize >= 4
+
+
+def test_http2_falls_back_without_httpx(monkeypatch):
+    monkeypatch.setattr(utils_http, "HTTP2_AVAILABLE", False)
+    client = HttpClient(http2=True)
+    assert not client.http2
+    assert client.session.get_adapter("https://example.org/") is client._default
@@ -0,0 +1,93 @@
+"""
+Unit tests for compiled mapping artifacts and the semantics join.
+
+Registries live in tmp_path; the USGS_NWIS rule packs (rules.py and
+rules_enhanced.py) are the real ones shipped with the NWIS adapter.
+"""
+
+import pandas as pd
+
+from env_agents.core.mappings import MappingArtifact, artifact_path, compile_mapping, compile_mappings, get_mapping
+from env_agents.core.registry import RegistryManager
+from env_agents.core.semantics import attach_semantics
+
+SEED = {"variables": {
+    "water:discharge_cfs": {"label": "Stream discharge", "preferred_unit": "ft3/s",
+                            "observed_property_uri": "http://example.org/discharge",
+                            "datasets": {"USGS_NWIS": {"native": "00060"}}},
+    "water:temperature_c": {"label": "Water temperature", "preferred_unit": "degC"},
+}, "units": {}, "methods": {}, "qc_flags": {}}
+
+
+def _registry(tmp_path):
+    registry = RegistryManager(str(tmp_path))
+    registry.write_seed(SEED)
+    registry.write_overrides({"variables": {"water:gage_height_m": {
+        "datasets": {"USGS_NWIS": {"native": "00065", "manually_curated": True}}}}})
+    registry.write_delta({"USGS_NWIS:72019": {"dataset": "USGS_NWIS", "native_id": "72019", "status": "accepted",
+                                              "accepted_canonical": "water:depth_to_water_ft"},
+                          "USGS_NWIS:99999": {"dataset": "USGS_NWIS", "native_id": "99999", "status": "pending",
+                                              "suggested_canonical": "water:unknown"}})
+    return registry
+
+
+def test_compile_merges_sources_by_precedence(tmp_path):
+    artifact = compile_mapping(_registry(tmp_path), "USGS_NWIS")
+    table = artifact.table.set_index("native_id")
+
+    assert table.loc["00095", ["canonical", "source"]].tolist() == ["water:specific_conductance", "rules_enhanced"]
+    assert table.loc["00010", ["canonical", "source"]].tolist() == ["water:water_temp_c", "rules"]
+    assert table.loc["00060", ["canonical", "source", "observed_property_uri"]].tolist() == [
+        "water:discharge_cfs", "registry", "http://example.org/discharge"]
+    assert table.loc["00065", ["canonical", "source"]].tolist() == ["water:gage_height_m", "curation"]
+    assert table.loc["72019", "canonical"] == "water:depth_to_water_ft" and "99999" not in table.index
+    # Canonical ids resolve to themselves with their metadata
+    assert table.loc["water:temperature_c", ["canonical", "preferred_unit"]].tolist() == ["water:temperature_c", "degC"]
+
+
+def test_version_is_content_derived_and_survives_save(tmp_path):
+    registry = _registry(tmp_path)
+    first = compile_mappings(registry, ["USGS_NWIS"])["USGS_NWIS"]
+    assert compile_mapping(registry, "USGS_NWIS").version == first.version
+
+    loaded = MappingArtifact.load(artifact_path(registry, "USGS_NWIS"))
+    assert (loaded.dataset, loaded.version) == ("USGS_NWIS", first.version)
+    pd.testing.assert_frame_equal(loaded.table, first.table)
+    assert get_mapping(registry, "USGS_NWIS").version == first.version
+
+    seed = registry.get_seed()
+    seed["variables"]["water:temperature_c"]["preferred_unit"] = "degF"
+    registry.write_seed(seed)
+    assert compile_mapping(registry, "USGS_NWIS").version != first.version
+    # The saved artifact is used until it is recompiled
+    assert get_mapping(registry, "USGS_NWIS").version == first.version
+
+
+def test_attach_semantics_joins_against_the_artifact(tmp_path):
+    artifact = compile_mapping(_registry(tmp_path), "USGS_NWIS")
+    shared = {"source": "nwis"}
+    df = pd.DataFrame({
+        "variable": ["raw:00060", "raw:x", "water:temperature_c", "00060", "raw:00060"],
+        "value": [10.0, 1.0, 20.0, 5.0, None],
+        "unit": ["m3/s", "m", "degF", "ft3/s", "ft3/s"],
+        "attributes": [{"native": {"id": "00060"}}, {}, {}, {}, {}],
+        "provenance": [shared, shared, None, "Water Quality Portal", shared],
+    })
+    df = attach_semantics(df, artifact)
+
+    assert df["variable"].tolist() == ["water:discharge_cfs", "raw:x", "water:temperature_c", "00060",
+                                       "water:discharge_cfs"]
+    assert df.at[0, "attributes"]["mapping_source"] == "registry"
+    assert df["observed_property_uri"].tolist() == ["http://example.org/discharge", None, None, None,
+                                                    "http://example.org/discharge"]
+    assert df["preferred_unit"].tolist() == ["ft3/s", "m", "degC", "ft3/s", "ft3/s"]
+    assert round(df.at[0, "value_converted"], 3) == 353.147
+    assert round(df.at[2, "value_converted"], 3) == -6.667
+    assert df["value_converted"].iloc[[1, 3, 4]].isna().all()
+
+    tag = f"USGS_NWIS@{artifact.version}"
+    assert df.attrs["mapping_artifact"] == {"dataset": "USGS_NWIS", "version": artifact.version}
+    assert df.at[0, "provenance"] == {"source": "nwis", "mapping_artifact": tag}
+    assert df.at[0, "provenance"] is df.at[1, "provenance"] and shared == {"source": "nwis"}
+    assert df.at[2, "provenance"] == {"mapping_artifact": tag}
+    assert df.at[3, "provenance"] == "Water Quality Portal"
@@ -0,0 +1,116 @@
+"""
+Unit tests for planned, concurrent and streamed USGS NWIS daily values.
+
+``FakeNWIS`` knows four sites and answers each bBox request with a
+WaterML-JSON body holding a discharge series for every site inside it.
+"""
+
+import json
+
+import pytest
+from conftest import ConcurrencyRecorder, FakeResponse
+
+from env_agents.adapters.nwis import adapter as nwis_adapter
+from env_agents.adapters.nwis.adapter import USGSNWISAdapter
+from env_agents.core.models import RequestSpec, Geometry
+from env_agents.core.planner import QueryPlanner
+
+# (site, lon, lat) - site 03 sits on the edge shared by two sub-boxes
+SITES = [("01", -109.0, 31.0), ("02", -101.0, 31.0), ("03", -105.0, 33.0), ("04", -101.0, 38.0)]
+
+
+def _series(site, lon, lat):
+    return {
+        "name": f"USGS:{site}:00060:00003",
+        "sourceInfo": {"siteName": f"Creek {site}", "siteCode": [{"value": site}],
+                       "geoLocation": {"geogLocation": {"latitude": lat, "longitude": lon}}},
+        "variable": {"variableCode": [{"value": "00060"}], "variableName": "Streamflow",
+                     "unit": {"unitAbbreviation": "ft3/s"}},
+        "values": [{"value": [
+            {"value": "12.5", "qualifiers": ["A"], "dateTime": "2020-01-01T00:00:00.000"},
+            {"value": "", "qualifiers": ["A"], "dateTime": "2020-01-02T00:00:00.000"},
+            {"value": "13", "qualifiers": ["P", "e"], "dateTime": "2020-01-03T00:00:00.000"},
+        ]}],
+    }
+
+
+class FakeNWIS(ConcurrencyRecorder):
+    def __init__(self):
+        super().__init__()
+        self.boxes = []
+
+    def get(self, url, params=None, timeout=None, stream=False):
+        box = tuple(map(float, params["bBox"].split(",")))
+        self.boxes.append(box)
+        with self.in_flight(0.01):
+            inside = [_series(*site) for site in SITES
+                      if box[0] <= site[1] <= box[2] and box[1] <= site[2] <= box[3]]
+            return FakeResponse(content=json.dumps({"value": {"timeSeries": inside}}).encode(),
+                                url=f"{url}?bBox={params['bBox']}")
+
+
+@pytest.fixture
+def adapter():
+    adapter = USGSNWISAdapter()
+    adapter._session = FakeNWIS()
+    adapter._web_metadata_cache = {"source": "test"}
+    return adapter
+
+
+def _spec(**extra):
+    return RequestSpec(geometry=Geometry(type="bbox", coordinates=[-110.0, 30.0, -100.0, 40.0]),
+                       time_range=("2020-01-01", "2020-01-31"), variables=["00060"], extra=extra)
+
+
+def test_planner_splits_bbox_along_area_limit(adapter):
+    boxes = [tuple(s.geometry.coordinates) for s in QueryPlanner(adapter).plan(_spec())]
+
+    assert len(boxes) == 4
+    assert all((b[2] - b[0]) * (b[3] - b[1]) <= 25.0 for b in boxes)
+    assert min(b[0] for b in boxes) == -110.0 and max(b[2] for b in boxes) == -100.0
+
+
+def test_sub_boxes_are_fetched_concurrently_and_deduplicated(adapter):
+    df = QueryPlanner(adapter).fetch(_spec())
+
+    assert len(adapter._session.boxes) == 4
+    assert adapter._session.peak > 1
+
+    # Site 03 is returned by two sub-boxes but kept once; empty values are skipped
+    assert sorted(df["spatial_id"]) == ["01", "01", "02", "02", "03", "03", "04", "04"]
+
+
+def test_point_queries_search_a_small_box(adapter):
+    adapter._fetch_rows(RequestSpec(geometry=Geometry(type="point", coordinates=[-109.0, 31.0]),
+                                    time_range=("2020-01-01", "2020-01-31"), variables=["00060"]))
+
+    assert adapter._session.boxes == [pytest.approx((-109.1, 30.9, -108.9, 31.1))]
+
+
+def test_series_become_core_rows(adapter):
+    rows = adapter._fetch_rows(_spec())
+
+    first, second = [r for r in rows if r["spatial_id"] == "01"]
+    assert first["observation_id"] == "usgs_nwis_01_00060_20200101000000.000"
+    assert first["time"] == "2020-01-01T00:00:00"
+    assert (first["value"], second["value"]) == (12.5, 13.0)
+    assert (first["qc_flag"], second["qc_flag"]) == ("A", "P")
+    assert first["geom_wkt"] == "POINT(-109.0 31.0)"
+    assert first["attributes"]["parameter_name"] == "Streamflow"
+    assert first["attributes"] is second["attributes"]
+
+
+def test_responses_are_decoded_incrementally(adapter, monkeypatch):
+    if not nwis_adapter.IJSON_AVAILABLE:
+        pytest.skip("ijson not installed")
+    monkeypatch.setattr(nwis_adapter.json, "load", lambda *a, **k: pytest.fail("response decoded in full"))
+    assert len(adapter._fetch_rows(_spec())) == 8
+
+
+def test_full_decode_fallback_matches(adapter, monkeypatch):
+    streamed = adapter._fetch_rows(_spec())
+    monkeypatch.setattr(nwis_adapter, "IJSON_AVAILABLE", False)
+
+    decoded = adapter._fetch_rows(_spec())
+    assert [(r["spatial_id"], r["time"], r["value"]) for r in decoded] == \
+        [(r["spatial_id"], r["time"], r["value"]) for r in streamed]
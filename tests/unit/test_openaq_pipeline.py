@@ -0,0 +1,110 @@
+"""
+Unit tests for the concurrent OpenAQ sensor pipeline.
+
+``FakeOpenAQ`` serves three locations, each with a pm25 and a co sensor, and
+five pm25 measurements per sensor spread over pages of two.
+"""
+
+import re
+import time
+
+import pytest
+from conftest import ConcurrencyRecorder, FakeResponse
+
+from env_agents.adapters.openaq.adapter import OpenAQAdapter
+from env_agents.core.models import RequestSpec, Geometry
+from env_agents.core.rate_limit import RateLimiter
+
+
+class FakeOpenAQ(ConcurrencyRecorder):
+    MEASUREMENTS_PER_SENSOR = 5
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls.append((url.rsplit("/v3", 1)[1], dict(params or {})))
+        with self.in_flight(0.01):
+            return FakeResponse(self._route(url, params or {}))
+
+    def _route(self, url, params):
+        if url.endswith("/locations"):
+            return {"results": [{"id": lid} for lid in (1, 2, 3)]}
+
+        match = re.search(r"/locations/(\d+)/sensors$", url)
+        if match:
+            lid = int(match.group(1))
+            return {"results": [
+                {"id": lid * 10 + 1, "parameter": {"name": "pm25"}},
+                {"id": lid * 10 + 2, "parameter": {"name": "co"}},
+            ]}
+
+        sid = int(re.search(r"/sensors/(\d+)/measurements$", url).group(1))
+        page, limit = params["page"], params["limit"]
+        start = (page - 1) * limit
+        stop = min(start + limit, self.MEASUREMENTS_PER_SENSOR)
+        return {
+            "meta": {"page": page, "limit": limit, "found": self.MEASUREMENTS_PER_SENSOR},
+            "results": [
+                {"parameter": {"name": "pm25", "units": "µg/m³"}, "value": float(sid * 100 + i),
+                 "period": {"datetimeTo": {"utc": f"2024-01-01T{i:02d}:00:00Z"}},
+                 "coordinates": {"latitude": 37.0, "longitude": -122.0}}
+                for i in range(start, stop)
+            ],
+        }
+
+    def measurement_pages(self):
+        return [(url, params["page"]) for url, params in self.calls if url.endswith("/measurements")]
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    monkeypatch.setenv("OPENAQ_API_KEY", "test-key")
+    adapter = OpenAQAdapter()
+    adapter._session = FakeOpenAQ()
+    adapter._rate_limiter = RateLimiter(0)
+    monkeypatch.setattr(adapter, "_openaq_parameter_catalog", lambda headers: adapter._get_fallback_parameters())
+    return adapter
+
+
+def _spec(**extra):
+    return RequestSpec(geometry=Geometry(type="point", coordinates=[-122.0, 37.0]),
+                       variables=["air:pm25"], extra={"per_page": 2, **extra})
+
+
+def test_all_pages_of_all_sensors_in_order(adapter):
+    rows = adapter._fetch_rows(_spec())
+
+    assert len(rows) == 3 * 5
+    assert [r["value"] for r in rows[:6]] == [1100.0, 1101.0, 1102.0, 1103.0, 1104.0, 2100.0]
+    assert [r["spatial_id"] for r in rows[::5]] == ["11", "21", "31"]
+    assert {r["variable"] for r in rows} == {"air:pm25"}
+
+    # Three pages per sensor, fetched concurrently
+    assert len(adapter._session.measurement_pages()) == 3 * 3
+    assert adapter._session.peak > 1
+
+
+def test_max_sensors_stops_sensor_lookup(adapter):
+    rows = adapter._fetch_rows(_spec(max_sensors=1, max_concurrent_requests=1))
+
+    assert {r["spatial_id"] for r in rows} == {"11"}
+    sensor_lookups = [url for url, _ in adapter._session.calls if url.endswith("/sensors")]
+    assert sensor_lookups == ["/locations/1/sensors"]
+
+
+def test_max_records_stops_paging_early(adapter):
+    rows = adapter._fetch_rows(_spec(max_records=3, max_concurrent_requests=1))
+
+    assert [r["value"] for r in rows] == [1100.0, 1101.0, 2100.0]
+    # First pages of all sensors plus at most one prefetched page, not all nine
+    assert len(adapter._session.measurement_pages()) < 9
+
+
+def test_rate_limiter_spaces_request_starts():
+    limiter = RateLimiter(0.02)
+    start = time.monotonic()
+    for _ in range(4):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.06
@@ -0,0 +1,60 @@
+"""
+Unit tests for the Overpass QL compiler and output modes.
+"""
+
+import pytest
+
+from env_agents.adapters.overpass.adapter import OverpassAdapter
+from env_agents.adapters.overpass.query import compile_query, merge_selectors
+from env_agents.core.models import RequestSpec, Geometry
+
+BBOX = (37.0, -122.1, 37.1, -122.0)
+
+
+def test_selectors_on_one_key_are_merged():
+    merged = merge_selectors([("amenity", ("cafe",)), ("shop", None), ("amenity", ("school", "cafe"))])
+    assert merged == [("amenity", ("cafe", "school")), ("shop", None)]
+
+    # A bare key absorbs value-specific selectors
+    assert merge_selectors([("amenity", ("cafe",)), ("amenity", None)]) == [("amenity", None)]
+
+
+def test_center_query_targets_requested_tags_only():
+    query = compile_query(BBOX, [("amenity", ("cafe", "school")), ("leisure", None)], timeout=25, maxsize=1024)
+
+    assert query.startswith("[out:json][timeout:25][maxsize:1024][bbox:37.0,-122.1,37.1,-122.0];")
+    assert 'nwr["amenity"~"^(cafe|school)$"];' in query
+    assert 'nwr["leisure"];' in query
+    assert "highway" not in query and "building" not in query
+    assert query.rstrip().endswith("out center;")
+    assert "meta" not in query
+
+
+def test_count_query_has_one_count_per_selector():
+    query = compile_query(BBOX, [("amenity", None), ("shop", ("bakery",))], mode="count")
+
+    assert query.count("out count;") == 2
+    assert 'nwr["shop"="bakery"]; out count;' in query
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        compile_query(BBOX, [("amenity", None)], mode="geom")
+
+
+def test_variables_resolve_to_selectors():
+    adapter = OverpassAdapter()
+    selectors = adapter._resolve_selectors(["Amenity=cafe", "shop", "amenity=school", "not_a_category"])
+    assert selectors == [("amenity", ("cafe", "school")), ("shop", None)]
+
+
+def test_counts_only_mode_returns_one_row_per_tile_and_selector(overpass_adapter):
+    adapter = overpass_adapter
+    spec = RequestSpec(geometry=Geometry(type="bbox", coordinates=[-122.1, 37.0, -122.0, 37.1]),
+                       variables=["amenity", "shop=bakery"], extra={"counts_only": True})
+
+    rows = adapter._fetch_rows(spec)
+
+    assert [(r["variable"], r["value"]) for r in rows] == [("amenity", 3.0), ("shop=bakery", 4.0)]
+    assert rows[0]["attributes"]["ways"] == 1
+    assert rows[0]["geometry_type"] == "polygon"
@@ -0,0 +1,60 @@
+"""
+Unit tests for adaptive Overpass tiling.
+
+The ``overpass_adapter`` fixture (see conftest.py) talks to ``FakeOverpass``.
+"""
+
+import pytest
+
+from env_agents.core.models import RequestSpec, Geometry
+
+
+@pytest.fixture
+def adapter(overpass_adapter):
+    adapter = overpass_adapter
+    adapter.service_config = {**adapter.service_config, "max_tile_deg": 0.2}
+    return adapter
+
+
+def _spec(half_width):
+    return RequestSpec(geometry=Geometry(type="bbox", coordinates=[-122.0 - half_width, 37.0 - half_width,
+                                                                    -122.0 + half_width, 37.0 + half_width]))
+
+
+def test_small_area_needs_a_single_request(adapter):
+    rows = adapter._fetch_rows(_spec(0.02))
+
+    assert len(adapter._session.queries) == 1
+    assert len(rows) == 2
+
+
+def test_large_area_is_covered_without_shrinking(adapter):
+    # 0.4 x 0.4 degrees -> four 0.2 root tiles, each split once into 0.1 quadrants
+    rows = adapter._fetch_rows(_spec(0.2))
+    queries = adapter._session.queries
+
+    assert len(queries) == 4 + 16
+    leaves = [q for q in queries if q[2] - q[0] < 0.15]
+    assert len(leaves) == 16
+    assert min(q[0] for q in leaves) == pytest.approx(36.8)
+    assert max(q[2] for q in leaves) == pytest.approx(37.2)
+
+    # One node per leaf tile plus the border-crossing way, deduplicated
+    assert len(rows) == 16 + 1
+    assert sum(1 for r in rows if r["attributes"]["osm_type"] == "way") == 1
+
+
+def test_concurrency_follows_status_slots(adapter):
+    adapter._fetch_rows(_spec(0.2))
+
+    assert adapter._available_slots() == 2
+    assert adapter._session.peak <= 2
+
+
+def test_tiles_below_minimum_are_not_split_forever(adapter):
+    adapter._session.max_span = 0.0
+    with pytest.warns(UserWarning, match="minimum size"):
+        rows = adapter._fetch_rows(_spec(0.004))
+
+    assert rows == []
+    assert len(adapter._session.queries) == 1 + 4
@@ -0,0 +1,122 @@
+"""
+Unit tests for batched NASA POWER requests.
+
+``FakePOWER`` answers point and regional daily requests with two days of
+values per parameter; each value encodes the grid cell it came from.
+"""
+
+import pytest
+from conftest import ConcurrencyRecorder, FakeResponse
+
+from env_agents.adapters.power import adapter as power_adapter
+from env_agents.adapters.power.adapter import NASAPowerAdapter
+from env_agents.core.models import RequestSpec, Geometry
+
+DAYS = ("20210101", "20210102")
+
+
+def _cell_values(lat, lon, parameters):
+    i, j = power_adapter.grid_cell(lon, lat)
+    return {param: {day: float(i * 1000 + j) for day in DAYS} for param in parameters.split(",")}
+
+
+class FakePOWER(ConcurrencyRecorder):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append((url.rsplit("/", 1)[1], dict(params)))
+        with self.in_flight(0.01):
+            return FakeResponse(self._route(url, params))
+
+    def _route(self, url, params):
+        if url.endswith("/point"):
+            lat, lon = params["latitude"], params["longitude"]
+            return {"geometry": {"coordinates": [lon, lat, 100.0]},
+                    "properties": {"parameter": _cell_values(lat, lon, params["parameters"])}}
+
+        # Regional: every cell center inside the bounds
+        (i0, j0), (i1, j1) = (power_adapter.grid_cell(params["longitude-min"], params["latitude-min"]),
+                              power_adapter.grid_cell(params["longitude-max"], params["latitude-max"]))
+        features = [{"geometry": {"coordinates": [lon, lat, 100.0]},
+                     "properties": {"parameter": _cell_values(lat, lon, params["parameters"])}}
+                    for lat, lon in (power_adapter.cell_center(i, j)
+                                     for i in range(i0, i1 + 1) for j in range(j0, j1 + 1))
+                    if params["latitude-min"] <= lat <= params["latitude-max"]
+                    and params["longitude-min"] <= lon <= params["longitude-max"]]
+        return {"type": "FeatureCollection", "features": features}
+
+    def endpoints(self):
+        return [endpoint for endpoint, _ in self.calls]
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    monkeypatch.setenv("NOAA_EMAIL", "test@example.org")
+    monkeypatch.setenv("NOAA_KEY", "test-key")
+    adapter = NASAPowerAdapter()
+    adapter._session = FakePOWER()
+    return adapter
+
+
+def _spec(lon, lat, variables=("T2M",), **extra):
+    return RequestSpec(geometry=Geometry(type="point", coordinates=[lon, lat]),
+                       time_range=("2021-01-01", "2021-01-02"), variables=list(variables), extra=extra)
+
+
+def test_points_sharing_a_cell_share_one_request(adapter):
+    specs = [_spec(-120.0 + k / 100, 37.0 + k / 100) for k in range(10)] + [_spec(-100.0, 40.0)]
+    results = adapter.fetch_batch(specs)
+
+    assert adapter._session.endpoints() == ["point", "point"]
+    assert [len(rows) for rows in results] == [2] * 11
+
+    # Rows keep the query coordinates but carry the cell's values
+    cell = power_adapter.grid_cell(-120.0, 37.0)
+    assert results[3][0]["longitude"] == -120.0 + 3 / 100
+    assert results[3][0]["value"] == float(cell[0] * 1000 + cell[1])
+    assert results[10][0]["value"] != results[0][0]["value"]
+
+
+def test_parameters_are_chunked_and_fetched_concurrently(adapter, monkeypatch):
+    settings = {"max_point_parameters": 2}
+    monkeypatch.setattr(adapter, "get_service_setting", lambda key, default=None: settings.get(key, default))
+    variables = ["T2M", "RH2M", "WS10M", "PS", "PRECTOTCORR"]
+    rows = adapter.fetch_batch([_spec(-120.0, 37.0, variables)])[0]
+
+    chunks = [params["parameters"].split(",") for _, params in adapter._session.calls]
+    assert sorted(len(chunk) for chunk in chunks) == [1, 2, 2]
+    assert sorted(p for chunk in chunks for p in chunk) == sorted(variables)
+    assert adapter._session.peak > 1
+    assert {r["variable"] for r in rows} == {f"nasa_power:{v}" for v in variables}
+
+
+def test_dense_clusters_use_the_regional_endpoint(adapter):
+    # 400 clusters over ~200 distinct cells in a 5 x 5 degree area, two parameters
+    specs = [_spec(-120.0 + (k % 20) / 4, 35.0 + (k // 20) / 4, ["T2M", "PS"]) for k in range(400)]
+    results = adapter.fetch_batch(specs)
+
+    assert adapter._session.endpoints() == ["regional", "regional"]
+    assert all(len(rows) == 4 for rows in results)
+    for spec, rows in zip(specs[::37], results[::37]):
+        i, j = power_adapter.grid_cell(*spec.geometry.coordinates)
+        assert {r["value"] for r in rows} == {float(i * 1000 + j)}
+
+    west, south, east, north = (adapter._session.calls[0][1][k] for k in
+                                ("longitude-min", "latitude-min", "longitude-max", "latitude-max"))
+    assert 2 <= east - west <= 10 and 2 <= north - south <= 10
+
+
+def test_bbox_grid_sampling_expands_to_cells(adapter):
+    spec = RequestSpec(geometry=Geometry(type="bbox", coordinates=[-120.0, 37.0, -119.0, 38.0]),
+                       time_range=("2021-01-01", "2021-01-02"), variables=["T2M"], extra={"sampling": "grid"})
+    rows = adapter._fetch_rows(spec)
+
+    # 3 rows x 3 cols of cells, two days each
+    assert len({r["spatial_id"] for r in rows}) == 9
+    assert len(rows) == 9 * 2
+
+    center = adapter._fetch_rows(RequestSpec(geometry=spec.geometry, time_range=spec.time_range,
+                                             variables=["T2M"]))
+    assert {(r["longitude"], r["latitude"]) for r in center} == {(-119.5, 37.5)}
@@ -0,0 +1,105 @@
+"""
+Unit tests for splitting RequestSpecs along declared adapter limits.
+
+``FakeAdapter`` returns one row per (site, day, variable) inside the
+requested bbox and time window; sites on tile edges fall in two tiles.
+"""
+
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+from conftest import ConcurrencyRecorder
+
+from env_agents.adapters.nwis.adapter import USGSNWISAdapter
+from env_agents.core.models import RequestSpec, Geometry
+from env_agents.core.planner import AdapterLimits, QueryPlanner, split_time_range
+from env_agents.core.router import EnvRouter
+
+SITES = [(-110.0 + x, 30.0 + y) for x in range(11) for y in range(11)]  # 1 degree lattice
+
+
+class FakeAdapter(ConcurrencyRecorder):
+    DATASET = "FAKE"
+    LIMITS = AdapterLimits(max_bbox_deg2=25.0, max_days=31, max_variables=2)
+
+    def __init__(self, fail_on=None):
+        super().__init__()
+        self.specs = []
+        self.fail_on = fail_on
+
+    def fetch(self, spec):
+        self.specs.append(spec)
+        with self.in_flight(0.01):
+            if self.fail_on and self.fail_on(spec):
+                raise RuntimeError("upstream rejected the request")
+            west, south, east, north = spec.geometry.coordinates
+            start, end = (date.fromisoformat(t) for t in spec.time_range)
+            days = [(start + timedelta(days=d)).isoformat() for d in range((end - start).days + 1)]
+            return pd.DataFrame([
+                {"observation_id": f"{lon}|{lat}|{day}|{var}", "longitude": lon, "latitude": lat,
+                 "time": day, "variable": var, "value": 1.0}
+                for lon, lat in SITES if west <= lon <= east and south <= lat <= north
+                for day in days for var in spec.variables
+            ])
+
+
+def _spec(bbox=(-110.0, 30.0, -100.0, 40.0), time_range=("2021-01-01", "2021-03-31"),
+          variables=("a", "b", "c")):
+    return RequestSpec(geometry=Geometry(type="bbox", coordinates=list(bbox)),
+                       time_range=time_range, variables=list(variables))
+
+
+def test_split_time_range_windows():
+    assert split_time_range(("2021-01-01", "2021-01-31"), max_days=31) == [("2021-01-01", "2021-01-31")]
+    assert split_time_range(("2021-01-01", "2021-03-01"), max_days=31) == [
+        ("2021-01-01", "2021-01-31"), ("2021-02-01", "2021-03-01")]
+    assert split_time_range(("2019-06-15", "2021-03-01"), calendar_year=True) == [
+        ("2019-06-15", "2019-12-31"), ("2020-01-01", "2020-12-31"), ("2021-01-01", "2021-03-01")]
+
+
+def test_plan_covers_every_tile_window_and_variable_chunk():
+    sub_specs = QueryPlanner(FakeAdapter()).plan(_spec())
+
+    # 100 deg2 -> 4 tiles of 25 deg2; Jan-Mar -> 3 windows; 3 variables -> 2 chunks
+    assert len(sub_specs) == 4 * 3 * 2
+    assert {tuple(s.variables) for s in sub_specs} == {("a", "b"), ("c",)}
+    assert all(len(split_time_range(s.time_range, max_days=31)) == 1 for s in sub_specs)
+    assert QueryPlanner(FakeAdapter()).plan(_spec((-110.0, 30.0, -108.0, 32.0), ("2021-01-01", "2021-01-05"),
+                                                  ("a",))) == [_spec((-110.0, 30.0, -108.0, 32.0),
+                                                                     ("2021-01-01", "2021-01-05"), ("a",))]
+
+
+def test_fetch_runs_sub_requests_concurrently_and_deduplicates():
+    adapter = FakeAdapter()
+    df = QueryPlanner(adapter).fetch(_spec())
+
+    assert len(adapter.specs) == 24
+    assert adapter.peak > 1
+    # Every site x day x variable exactly once, edge sites included
+    assert len(df) == len(SITES) * 90 * 3
+    assert df["observation_id"].is_unique
+
+
+def test_env_router_fetches_through_the_planner(tmp_path):
+    adapter = FakeAdapter()
+    adapter.capabilities = lambda extra=None: {}
+    router = EnvRouter(str(tmp_path))
+    router.register(adapter)
+
+    df = router.fetch("FAKE", _spec())
+    assert len(adapter.specs) == 24 and len(df) == len(SITES) * 90 * 3
+
+
+def test_failed_sub_request_fails_the_fetch():
+    adapter = FakeAdapter(fail_on=lambda spec: spec.time_range[0] == "2021-03-04")
+    with pytest.raises(RuntimeError, match="upstream rejected"):
+        QueryPlanner(adapter, max_workers=2).fetch(_spec())
+
+
+def test_adapters_declare_limits():
+    limits = USGSNWISAdapter.LIMITS
+    assert limits.max_bbox_deg2 == 25.0 and limits.max_concurrent == 4
+    assert len(QueryPlanner(USGSNWISAdapter.__new__(USGSNWISAdapter)).plan(_spec())) == 4
+    with pytest.raises(ValueError, match="pagination"):
+        AdapterLimits(pagination="scroll")
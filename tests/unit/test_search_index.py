@@ -0,0 +1,149 @@
+"""
+Unit tests for the BM25 search index and its use by SemanticDiscoveryEngine.
+
+``_service`` builds minimal ServiceMetadata; registries live in tmp_path so
+that the persisted index can be reloaded by a fresh registry.
+"""
+
+from env_agents.core.discovery_engine import MatchType, SemanticDiscoveryEngine
+from env_agents.core.metadata_schema import (DataFormat, ServiceCapabilities, ServiceMetadata,
+                                             SpatialCoverage, TemporalCoverage, VariableInfo)
+from env_agents.core.search_index import SearchIndex, tokenize
+from env_agents.core.service_registry import ServiceRegistry
+
+
+def _service(service_id, title, domain, variables):
+    return ServiceMetadata(
+        service_id=service_id, title=title,
+        description=f"{title} from a public monitoring network, served over a REST API",
+        provider="Test Provider", source_url="https://example.com", license="CC0",
+        capabilities=ServiceCapabilities(
+            domains=[domain],
+            variables=[VariableInfo(id=vid, name=name, canonical=canonical, description=f"{name} measurement")
+                       for vid, name, canonical in variables],
+            spatial_coverage=SpatialCoverage(description="Global"),
+            temporal_coverage=TemporalCoverage(description="2000-present"),
+            data_formats=[DataFormat.TIME_SERIES]))
+
+
+WATER = _service("NWIS", "Stream Gauges", "water", [
+    ("00060", "Discharge", "water:discharge_cfs"),
+    ("00061", "Streamflow", None),
+    ("00010", "Water Temperature", "water:temperature_c"),
+])
+AIR = _service("AQ", "Air Quality Monitors", "air", [
+    ("pm25", "PM2.5", "air:pm25_ugm3"),
+    ("temp", "Air Temperature", None),
+])
+
+
+def test_tokenize_splits_identifiers_and_plurals():
+    assert tokenize("water:discharge_cfs") == ["water", "discharge", "cfs"]
+    assert tokenize("Temperatures of the Streams") == ["temperature", "stream"]
+
+
+def test_bm25_prefers_rare_terms_and_titles():
+    index = SearchIndex()
+    for i in range(20):
+        index.add(f"d{i}", "variable", "S", f"doc {i}", {"description": "water sample"})
+    index.add("nitrate", "variable", "S", "Nitrate", {"name": "Nitrate in water"})
+    index.add("mention", "variable", "S", "Other", {"description": "nitrate water"})
+
+    hits = index.search("nitrate water", limit=3)
+    assert [h.doc_id for h in hits[:2]] == ["nitrate", "mention"]
+    assert hits[0].score > hits[1].score > hits[2].score
+
+
+def test_incremental_updates_score_like_a_fresh_index():
+    docs = [(f"d{i}", f"doc {i}", {"description": " ".join(["water", "sample", "nitrate"][:1 + i % 3])})
+            for i in range(30)]
+    index = SearchIndex()
+    for doc_id, label, fields in docs:
+        index.add(doc_id, "variable", "S", label, fields)
+    index.search("water nitrate")  # Compile the postings, then change the corpus
+    for doc_id, _, _ in docs[::4]:
+        index.remove(doc_id)
+    index.add("d1", "variable", "S", "doc 1", {"description": "nitrate nitrate"})
+
+    fresh = SearchIndex()
+    for doc_id, label, fields in docs:
+        if doc_id in index._slots and doc_id != "d1":
+            fresh.add(doc_id, "variable", "S", label, fields)
+    fresh.add("d1", "variable", "S", "doc 1", {"description": "nitrate nitrate"})
+    assert ({h.doc_id: round(h.score, 9) for h in index.search("water nitrate", limit=None)} ==
+            {h.doc_id: round(h.score, 9) for h in fresh.search("water nitrate", limit=None)})
+
+
+def test_contains_finds_substrings_anywhere_in_labels():
+    index = SearchIndex()
+    index.index_service(WATER)
+    index.index_service(AIR)
+    assert [h.label for h in index.contains("FLOW", kinds=("variable",))] == ["Streamflow"]
+    assert {h.label for h in index.contains("temp", kinds=("variable",))} == {"Water Temperature", "Air Temperature"}
+    assert [h.label for h in index.contains("m2", kinds=("variable",))] == ["PM2.5"]
+    index.remove_service("NWIS")
+    assert index.contains("flow") == []
+
+
+def test_updates_replace_and_remove_documents():
+    index = SearchIndex()
+    index.index_service(WATER)
+    assert index.lookup("00060")[0][0].service_id == "NWIS"
+
+    changed = _service("NWIS", "Stream Gauges", "water", [("00065", "Gage Height", None)])
+    index.index_service(changed)
+    assert index.lookup("00060") == []
+    assert index.search("discharge") == []
+    assert {h.doc_id for h in index.search("gage height")} == {"variable:NWIS:00065"}
+
+    index.remove_service("NWIS")
+    assert len(index) == 0
+
+
+def test_registration_updates_and_persists_the_index(tmp_path):
+    registry = ServiceRegistry(tmp_path / "services.json")
+    engine = SemanticDiscoveryEngine(registry)
+    assert registry.register_service(WATER) and registry.register_service(AIR)
+    registry.register_assets("AQ", [{"id": "ECMWF/CAMS/NRT", "title": "CAMS aerosol forecast",
+                                     "keywords": ["aerosol", "ozone"]}])
+
+    assert [r.service_id for r in engine.discover("stream discharge")] == ["NWIS"]
+    result = engine.discover("aerosol")[0]
+    assert result.service_id == "AQ" and "asset: CAMS aerosol forecast" in result.reason
+
+    restarted = SearchIndex.load(tmp_path / "search_index.json")
+    assert len(restarted) == len(registry.search_index)
+    assert restarted.search_services("aerosol")["AQ"].kind == "asset"
+
+
+def test_variable_discovery_uses_exact_and_prefix_matches(tmp_path):
+    registry = ServiceRegistry(tmp_path / "services.json")
+    registry.register_service(WATER)
+    registry.register_service(AIR)
+    engine = SemanticDiscoveryEngine(registry)
+
+    exact = engine.discover_by_variable("00010")
+    assert [(r.service_id, r.matches[0][0]) for r in exact] == [("NWIS", MatchType.EXACT)]
+
+    canonical = engine.discover_by_variable("AIR:PM25_UGM3", canonical_only=True)
+    assert [(r.service_id, r.matches[0][0]) for r in canonical] == [("AQ", MatchType.CANONICAL)]
+
+    partial = engine.discover_by_variable("temperat")
+    assert {r.service_id for r in partial} == {"NWIS", "AQ"}
+    assert all(r.matches[0][0] == MatchType.FUZZY for r in partial)
+
+    # Matches inside a word are found too
+    inner = engine.discover_by_variable("flow")
+    assert [(r.service_id, r.matches[0][1]) for r in inner] == [("NWIS", "partial: Streamflow")]
+
+
+def test_single_registrations_are_saved_together(tmp_path):
+    registry = ServiceRegistry(tmp_path / "services.json")
+    registry.register_service(WATER)
+    registry.register_service(AIR)
+    assert not (tmp_path / "services.json").exists() and not (tmp_path / "search_index.json").exists()
+
+    registry.close()
+    reloaded = ServiceRegistry(tmp_path / "services.json")
+    assert set(reloaded.list_services()) == {"NWIS", "AQ"}
+    assert len(reloaded.search_index) == len(registry.search_index)
@@ -0,0 +1,85 @@
+"""
+Unit tests for ServiceIndex maintenance and ServiceRegistry persistence.
+
+``_service`` builds minimal ServiceMetadata whose quality score is set
+through the reliability score; registries live in tmp_path.
+"""
+
+from env_agents.core.metadata_schema import (DataFormat, ServiceCapabilities, ServiceMetadata,
+                                             SpatialCoverage, TemporalCoverage, VariableInfo)
+from env_agents.core.service_registry import ServiceIndex, ServiceRegistry
+
+
+def _service(service_id, domain="water", variables=("temp",), provider="Test Provider", reliability=0.5):
+    metadata = ServiceMetadata(
+        service_id=service_id, title=f"{service_id} Service", description="Test service from a public monitoring network",
+        provider=provider, source_url="https://example.com", license="CC0",
+        capabilities=ServiceCapabilities(
+            domains=[domain],
+            variables=[VariableInfo(id=v, name=v.title(), description=f"{v} measurement") for v in variables],
+            spatial_coverage=SpatialCoverage(description="Global"),
+            temporal_coverage=TemporalCoverage(description="2000-present"),
+            data_formats=[DataFormat.TIME_SERIES]))
+    metadata.quality_metrics.reliability_score = reliability
+    return metadata
+
+
+def _postings(index):
+    return ({k: set(v) for k, v in index.domain_index.items()},
+            {k: set(v) for k, v in index.variable_index.items()},
+            {k: set(v) for k, v in index.provider_index.items()},
+            {k: set(v) for k, v in index.auth_index.items()},
+            list(index.quality_index))
+
+
+def test_reindex_and_remove_only_touch_own_keys():
+    index = ServiceIndex()
+    index.index_service(_service("A", variables=("temp", "flow")))
+    index.index_service(_service("B", domain="air", variables=("pm25",), provider="Other"))
+
+    index.index_service(_service("A", variables=("stage",)))
+    assert "flow" not in index.variable_index and index.variable_index["stage"] == {"A"}
+    assert index.search(variable="temp") == []
+
+    index.remove_service("A")
+    assert "water" not in index.domain_index and "test provider" not in index.provider_index
+    assert index.search() == ["B"]
+    assert index.search(domain="air", provider="other", authentication_required=False) == ["B"]
+
+
+def test_quality_order_and_threshold():
+    index = ServiceIndex()
+    for service_id, reliability in (("low", 0.1), ("high", 0.9), ("mid", 0.5)):
+        index.index_service(_service(service_id, reliability=reliability))
+
+    assert index.search() == ["high", "mid", "low"]
+    mid_score = _service("mid", reliability=0.5).get_quality_score()
+    assert index.search(min_quality_score=mid_score) == ["high", "mid"]
+
+    low = _service("low", reliability=1.0)
+    index.update_quality(low)
+    assert index.search()[0] == "low"
+
+
+def test_bulk_load_matches_incremental_indexing():
+    services = [_service(f"S{i}", domain=("water", "air")[i % 2], variables=(f"v{i % 7}", "temp"),
+                         reliability=(i * 37 % 100) / 100) for i in range(200)]
+    incremental, bulk = ServiceIndex(), ServiceIndex()
+    for metadata in services:
+        incremental.index_service(metadata)
+    bulk.bulk_load(services)
+    assert _postings(bulk) == _postings(incremental)
+
+    bulk.rebuild(services[:10])
+    assert sorted(bulk.search()) == sorted(m.service_id for m in services[:10])
+
+
+def test_registry_reloads_services_in_bulk(tmp_path):
+    registry = ServiceRegistry(tmp_path / "services.json")
+    assert registry.register_services([_service("A", reliability=0.2), _service("B", reliability=0.8)]) == ["A", "B"]
+
+    reloaded = ServiceRegistry(tmp_path / "services.json")
+    assert set(reloaded.list_services()) == {"A", "B"}
+    assert reloaded.discover_services(variable="TEMP") == ["B", "A"]
+    assert reloaded.get_service("A").provenance.last_updated == registry.get_service("A").provenance.last_updated
+    assert len(reloaded.search_index) == len(registry.search_index)
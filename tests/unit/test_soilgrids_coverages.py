@@ -0,0 +1,201 @@
+"""
+Unit tests for concurrent SoilGrids coverage fetching and sampling modes.
+
+``FakeWCS`` answers GetCoverage requests with in-memory GeoTIFFs rendered on
+exactly the grid the request asks for.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import ConcurrencyRecorder, FakeResponse
+from rasterio.io import MemoryFile
+from rasterio.transform import from_origin
+
+from env_agents.adapters.soil import soilgrids_wcs_adapter
+from env_agents.adapters.soil.soilgrids_wcs_adapter import SoilGridsWCSAdapter
+from env_agents.core.models import RequestSpec, Geometry
+
+
+class FakeWCS(ConcurrencyRecorder):
+    def __init__(self, delay=0.02):
+        super().__init__()
+        self.delay = delay
+        self.requests = []
+        self.pixels = 0
+
+    def get(self, url, params=None, timeout=None, stream=False):
+        self.requests.append(params["coverageid"])
+        with self.in_flight(self.delay):
+            return FakeResponse(content=self._render(params), headers={"Content-Type": "image/tiff"})
+
+    def _render(self, params):
+        (x0, x1), (y0, y1) = [tuple(map(float, re.search(r"\(([^,]+),([^)]+)\)", s).groups()))
+                              for s in params["subset"]]
+        resx, resy = float(params["resx"].rstrip("m")), float(params["resy"].rstrip("m"))
+        width, height = max(1, round((x1 - x0) / resx)), max(1, round((y1 - y0) / resy))
+        with self._lock:
+            self.pixels += width * height
+        crs = "EPSG:4326" if params["coverageid"] == "MostProbable" else "EPSG:8857"  # Equal Earth
+        data = (np.arange(width * height, dtype=np.int16).reshape(height, width) % 30) + 1
+
+        with MemoryFile() as memfile:
+            with memfile.open(driver="GTiff", width=width, height=height, count=1, dtype="int16",
+                              crs=crs, transform=from_origin(x0, y1, resx, resy)) as dst:
+                dst.write(data, 1)
+            return memfile.read()
+
+
+@pytest.fixture
+def adapter():
+    adapter = SoilGridsWCSAdapter()
+    adapter._session = FakeWCS()
+    adapter.catalog_cache = {
+        "clay": ["clay_0-5cm_mean", "clay_5-15cm_mean", "clay_0-5cm_Q0.5"],
+        "sand": ["sand_0-5cm_mean", "sand_5-15cm_mean"],
+        "phh2o": ["phh2o_0-5cm_mean"],
+        "wrb": ["MostProbable"],
+    }
+    return adapter
+
+
+def _spec(**extra):
+    return RequestSpec(geometry=Geometry(type="bbox", coordinates=[-120.02, 37.0, -120.0, 37.02]),
+                       variables=["soil:clay", "soil:sand", "soil:phh2o"], extra={"max_pixels": 64, **extra})
+
+
+def test_coverages_are_fetched_concurrently(adapter):
+    rows = adapter._fetch_rows(_spec())
+
+    assert sorted(adapter._session.requests) == sorted([
+        "clay_0-5cm_mean", "clay_5-15cm_mean", "sand_0-5cm_mean", "sand_5-15cm_mean",
+        "phh2o_0-5cm_mean", "MostProbable",
+    ])
+    assert adapter._session.peak > 1
+    assert {r["variable"] for r in rows} == {"soil:clay", "soil:sand", "soil:phh2o", "soil:wrb_classification"}
+
+
+def test_numeric_layers_share_one_grid(adapter):
+    rows = adapter._fetch_rows(_spec(include_wrb=False))
+
+    coords = {}
+    for row in rows:
+        coords.setdefault(row["attributes"]["coverage_id"], set()).add(
+            (round(row["latitude"], 9), round(row["longitude"], 9)))
+    assert len(coords) == 5
+    assert len({frozenset(c) for c in coords.values()}) == 1
+
+
+def test_decoding_never_touches_temp_files(adapter, monkeypatch):
+    monkeypatch.setattr(soilgrids_wcs_adapter.rasterio, "open",
+                        lambda *a, **k: pytest.fail("coverage decoded from a file"))
+    assert adapter._fetch_rows(_spec(max_concurrent_coverages=1))
+    assert adapter._session.peak == 1
+
+
+def test_fetch_stays_columnar(adapter, monkeypatch):
+    monkeypatch.setattr(SoilGridsWCSAdapter, "_fetch_rows",
+                        lambda self, spec: pytest.fail("fetch() built row dicts"))
+    df = adapter.fetch(_spec())
+
+    assert isinstance(df["variable"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["depth_top_cm"].dtype, pd.CategoricalDtype)
+    assert df["geom_wkt"].iloc[0] == f"POINT({df['longitude'].iloc[0]} {df['latitude'].iloc[0]})"
+    assert df["observation_id"].is_unique
+
+    # Attribute dicts are shared per layer, not copied per pixel
+    clay = df[df["variable"] == "soil:clay"]
+    assert len({id(a) for a in clay["attributes"]}) == 2
+    assert clay["attributes"].iloc[0]["wcs_method"] == "uniform_grid"
+
+
+def test_row_path_matches_columnar_path(adapter):
+    spec = _spec()
+    rows = adapter._fetch_rows(spec)
+    frame = adapter._fetch_frame(spec)
+
+    assert len(rows) == len(frame)
+    wrb = next(r for r in rows if r["variable"] == "soil:wrb_classification")
+    assert wrb["depth_top_cm"] is None
+    assert wrb["attributes"]["class_name"]
+
+
+def _point_spec(points=None, **extra):
+    return RequestSpec(geometry=Geometry(type="point", coordinates=[-120.011, 37.011]),
+                       variables=["soil:clay", "soil:sand", "soil:phh2o"],
+                       extra={"sampling": "points", **({"points": points} if points else {}), **extra})
+
+
+def test_point_sampling_downloads_small_windows(adapter):
+    rows = adapter._fetch_rows(_point_spec())
+    point_pixels = adapter._session.pixels
+
+    adapter._session.pixels = 0
+    grid_rows = adapter._fetch_rows(_spec(max_pixels=100_000))
+    assert point_pixels * 100 <= adapter._session.pixels
+    assert len(rows) * 1000 <= len(grid_rows)
+
+    # One row per layer, at the exact point
+    assert len(rows) == 6
+    assert {(r["longitude"], r["latitude"]) for r in rows} == {(-120.011, 37.011)}
+    assert {r["attributes"]["wcs_method"] for r in rows} == {"point_sample"}
+
+    # 5x5 native WRB window, point in the middle pixel (row 2, col 2)
+    wrb = next(r for r in rows if r["variable"] == "soil:wrb_classification")
+    assert wrb["value"] == (2 * 5 + 2) % 30 + 1
+    assert wrb["attributes"]["class_name"] == soilgrids_wcs_adapter.WRB_CLASSES[13]
+
+
+def test_nearby_points_share_one_window(adapter):
+    points = [{"id": "a", "lon": -120.012, "lat": 37.012},
+              {"id": "b", "lon": -120.018, "lat": 37.018},
+              {"id": "c", "lon": -119.5, "lat": 37.5}]
+    df = adapter.fetch(_point_spec(points))
+
+    # Two windows (a+b, c) per layer
+    assert len(adapter._session.requests) == 6 * 2
+    assert len(df) == 6 * 3
+    assert set(df["spatial_id"]) == {"a", "b", "c"}
+    assert df["observation_id"].is_unique
+
+
+def test_zonal_statistics_per_layer(adapter):
+    rows = adapter._fetch_rows(_spec(sampling="zonal", zonal_stats=["mean", "p50", "count"]))
+
+    clay = [r for r in rows if r["attributes"]["coverage_id"] == "clay_0-5cm_mean"]
+    assert [r["variable"] for r in clay] == ["soil:clay_mean", "soil:clay_p50", "soil:clay_count"]
+    assert clay[2]["value"] == clay[0]["attributes"]["pixel_count"]
+    assert {r["geometry_type"] for r in rows} == {"polygon"}
+    assert all(r["longitude"] == pytest.approx(-120.01) and r["latitude"] == pytest.approx(37.01) for r in rows)
+
+    wrb = [r for r in rows if r["variable"].startswith("soil:wrb_classification")]
+    assert len(wrb) == 1 and wrb[0]["attributes"]["zonal_statistic"] == "mode"
+
+
+def test_unknown_zonal_statistic_is_rejected(adapter):
+    with pytest.raises(ValueError, match="zonal statistic"):
+        adapter._fetch_rows(_spec(sampling="zonal", zonal_stats=["mode"]))
+    assert adapter._session.requests == []
+
+
+def test_failed_coverage_listings_are_not_cached(tmp_path, monkeypatch):
+    adapter = SoilGridsWCSAdapter()
+    adapter.cache_dir = tmp_path
+    listings = {"clay": ["clay_0-5cm_mean"]}
+
+    def coverages(prop):
+        if prop not in listings:
+            raise ConnectionError("WCS unreachable")
+        return listings[prop]
+
+    monkeypatch.setattr(adapter, "_get_coverages_for_property", coverages)
+    adapter._build_catalog(services=["sand"])
+    assert not (tmp_path / "soilgrids_coverages.json").exists()
+
+    assert adapter._build_catalog(services=["clay", "sand"]) == {"clay": ["clay_0-5cm_mean"]}
+    listings["sand"] = ["sand_0-5cm_mean"]
+    adapter._build_catalog(services=["sand"], refresh=True)
+    assert adapter._build_catalog() == {"clay": ["clay_0-5cm_mean"], "sand": ["sand_0-5cm_mean"]}
+    assert adapter.catalog_cache == {"clay": ["clay_0-5cm_mean"], "sand": ["sand_0-5cm_mean"]}
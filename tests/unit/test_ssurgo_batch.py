@@ -0,0 +1,115 @@
+"""
+Unit tests for batched SSURGO Soil Data Access queries.
+
+``FakeSDA`` answers JSON REST queries: points west of -100 fall in map unit
+111, all others in 222, and every map unit has one component with two horizons.
+"""
+
+import re
+
+import pytest
+from conftest import FakeResponse
+
+from env_agents.adapters.ssurgo.adapter import SSURGOAdapter
+from env_agents.core.errors import FetchError
+from env_agents.core.models import RequestSpec, Geometry
+
+COLUMNS = ["mukey", "cokey", "muname", "hzdept_r", "hzdepb_r", "claytotal_r", "ph1to1h2o_r"]
+
+
+class FakeSDA:
+    def __init__(self):
+        self.queries = []
+
+    def post(self, url, json=None, timeout=None):
+        assert url.endswith("/Tabular/post.rest")
+        assert json["format"] == "JSON+COLUMNNAME"
+        sql = json["query"]
+        self.queries.append(sql)
+
+        if "SDA_Get_Mukey" in sql:
+            lookups = re.findall(r"SELECT (\d+) AS pt, mukey .*?'point\((\S+) (\S+)\)'", sql)
+            return FakeResponse({"Table": [["pt", "mukey"]] + [
+                [pt, "111" if float(lon) < -100 else "222"] for pt, lon, _ in lookups
+            ]})
+
+        mukeys = re.search(r"mu\.mukey IN \(([^)]*)\)", sql).group(1).split(", ")
+        rows = [[mukey, f"{mukey}-1", f"Unit {mukey}", str(top), str(top + 20), str(int(mukey) % 50), ""]
+                for mukey in mukeys for top in (0, 20)]
+        return FakeResponse({"Table": [COLUMNS] + rows} if rows else {})
+
+    def lookups(self):
+        return [q for q in self.queries if "SDA_Get_Mukey" in q]
+
+    def horizon_queries(self):
+        return [q for q in self.queries if "mu.mukey IN" in q]
+
+
+@pytest.fixture
+def adapter():
+    adapter = SSURGOAdapter()
+    adapter._session = FakeSDA()
+    return adapter
+
+
+def _spec(lon, lat):
+    return RequestSpec(geometry=Geometry(type="point", coordinates=[lon, lat]))
+
+
+def test_batch_costs_one_lookup_and_one_join(adapter):
+    specs = [_spec(-120 + i / 100, 37.0) for i in range(5)] + [_spec(-90.0, 40.0)]
+    results = adapter.fetch_batch(specs)
+
+    assert len(adapter._session.lookups()) == 1
+    assert len(adapter._session.horizon_queries()) == 1
+    assert "111, 222" in adapter._session.horizon_queries()[0]
+
+    # Rows fanned back out to each point, at that point's coordinates
+    assert [len(rows) for rows in results] == [2] * 6
+    assert {r["spatial_id"] for r in results[0]} == {"111"}
+    assert {r["spatial_id"] for r in results[5]} == {"222"}
+    assert {r["longitude"] for r in results[3]} == {-120 + 3 / 100}
+    assert {r["variable"] for r in results[0]} == {"soil:clay_content"}
+    assert [r["depth_top_cm"] for r in results[0]] == [0.0, 20.0]
+
+
+def test_cached_map_units_are_not_queried_again(adapter):
+    adapter.fetch_batch([_spec(-120.0, 37.0)])
+    adapter._session.queries.clear()
+
+    results = adapter.fetch_batch([_spec(-121.0, 38.0), _spec(-120.0, 37.0)])
+
+    # The new point needs a lookup, but its map unit is cached; the old point needs nothing
+    assert len(adapter._session.lookups()) == 1
+    assert "point(-120.0 37.0)" not in adapter._session.lookups()[0]
+    assert adapter._session.horizon_queries() == []
+    assert len(results[0]) == len(results[1]) == 2
+
+
+def test_large_batches_are_chunked(adapter, monkeypatch):
+    settings = {"points_per_query": 3, "mukeys_per_query": 1}
+    monkeypatch.setattr(adapter, "get_service_setting", lambda key, default=None: settings.get(key, default))
+
+    specs = [_spec(-120 + i / 100, 37.0) for i in range(4)] + [_spec(-90 - i / 100, 40.0) for i in range(4)]
+    results = adapter.fetch_batch(specs)
+
+    assert len(adapter._session.lookups()) == 3
+    assert len(adapter._session.horizon_queries()) == 2
+    assert all(len(rows) == 2 for rows in results)
+
+
+def test_bbox_uses_centre_and_fetch_rows_goes_through_batch(adapter):
+    rows = adapter._fetch_rows(RequestSpec(geometry=Geometry(type="bbox", coordinates=[-120.2, 37.0, -120.0, 37.2])))
+
+    assert "point(-120.1 37.1)" in adapter._session.lookups()[0]
+    assert rows[0]["geom_wkt"] == "POINT(-120.1 37.1)"
+    assert rows[0]["attributes"]["mukey"] == "111"
+
+
+def test_sda_errors_raise_from_fetch_batch(adapter, monkeypatch):
+    monkeypatch.setattr(adapter._session, "post", lambda url, json=None, timeout=None: FakeResponse({}, 500))
+
+    with pytest.raises(FetchError, match="HTTP 500"):
+        adapter.fetch_batch([_spec(-120.0, 37.0)])
+    with pytest.warns(UserWarning, match="SSURGO fetch error"):
+        assert adapter._fetch_rows(_spec(-120.0, 37.0)) == []
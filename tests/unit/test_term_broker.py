@@ -0,0 +1,111 @@
+"""
+Unit tests for TermBroker candidate generation and batch matching.
+
+``SEED`` is a small canonical registry; the USGS_NWIS rule pack is the real
+one shipped with the NWIS adapter. ``FakeAdapter`` harvests a fixed list of
+parameters for the discovery pipeline test.
+"""
+
+import random
+
+from env_agents.core import term_broker
+from env_agents.core.registry import RegistryManager
+from env_agents.core.registry_curation import AutoCurationPipeline
+from env_agents.core.service_discovery import ServiceDiscoveryEngine
+from env_agents.core.term_broker import NativeParam, TermBroker, _LabelIndex, load_rule_pack
+
+SEED = {"variables": {
+    "water:discharge_cfs": {"label": "Stream discharge", "preferred_unit": "ft3/s", "domain": "water"},
+    "water:water_temp_c": {"label": "Water temperature", "preferred_unit": "degC", "domain": "water"},
+    "water:nitrate_mgl": {"label": "Nitrate", "preferred_unit": "mg/l", "domain": "water"},
+    "air:temp_c": {"label": "Temperature", "preferred_unit": "degC", "domain": "air"},
+}}
+
+
+class FakeAdapter:
+    DATASET = "TEST_WQP"
+
+    def __init__(self, items):
+        self.items = items
+
+    def harvest(self):
+        return self.items
+
+
+class FakeRouter:
+    def __init__(self, *adapters):
+        self.adapters = {a.DATASET: a for a in adapters}
+
+
+def test_label_index_matches_brute_force():
+    rng = random.Random(3)
+    words = ["ab", "nitrate", "total", "n", "water temp", "temperature", "ph", "dissolved oxygen"]
+    keys = sorted({" ".join(rng.sample(words, rng.randint(1, 2))) for _ in range(60)})
+    index = _LabelIndex(keys)
+    for label in [" ".join(rng.sample(words, rng.randint(1, 4))) for _ in range(200)] + ["", "p", "zz"]:
+        contained = [i for i, k in enumerate(keys) if k in label]
+        containing = [i for i, k in enumerate(keys) if k not in label and label in k]
+        assert index.matches(label) == (contained, containing)
+
+
+def test_match_scores_rules_labels_units_and_domains():
+    broker = TermBroker(SEED)
+    accepted, suggested = broker.match("USGS_NWIS", [
+        NativeParam("USGS_NWIS", "00060", "Discharge", "cfs", "water"),
+        NativeParam("USGS_NWIS", "99133", "Nitrate plus nitrite", "mg/l", "water"),
+        NativeParam("USGS_NWIS", "00400", "pH", None),
+    ], auto_accept_threshold=0.9, suggest_threshold=0.2)
+
+    assert [(s.native_id, s.canonical, s.score) for s in accepted] == [("00060", "water:discharge_cfs", 1.79)]
+    assert accepted[0].reasons == ["exact:00060", "label_hint:00060->Stream discharge",
+                                   "label_prefix:Discharge->stream discharge", "unit:eq", "domain:eq"]
+    assert [(s.native_id, s.canonical, s.score, s.reasons) for s in suggested] == [
+        ("99133", "water:nitrate_mgl", 0.24,
+         ["label_contains:Nitrate plus nitrite->nitrate", "unit:eq", "domain:eq"])]
+
+
+def test_match_batch_is_aligned_and_prefers_first_candidate_on_ties():
+    seed = {"variables": dict(SEED["variables"], **{
+        "atm:temp_k": {"label": "Temperature", "preferred_unit": "K", "domain": "atm"}})}
+    broker = TermBroker(seed)
+    natives = [NativeParam("X", "t1", "Temperature", None),
+               NativeParam("X", "none", "Turbidity", "NTU"),
+               NativeParam("X", "t2", "Temperature", "kelvin"),
+               NativeParam("X", "t3", "Temperature, water", "deg C", "water")]
+    best = broker.match_batch("X", natives)
+
+    assert best[1] is None
+    # Both "Temperature" canonicals score the same; the first in registry order wins
+    assert (best[0].canonical, best[0].score) == ("air:temp_c", 0.45)
+    # ...unless the unit breaks the tie (K is only convertible to degC)
+    assert (best[2].canonical, best[2].score, best[2].reasons[-1]) == ("atm:temp_k", 0.48, "unit:eq")
+    assert (best[3].canonical, best[3].score) == ("air:temp_c", 0.23)
+    assert [b.canonical if b else None for b in best] == [
+        s.canonical if s else None for n in natives for s in broker.match_batch("X", [n])]
+
+
+def test_rule_packs_are_compiled_once(monkeypatch):
+    monkeypatch.setattr(term_broker, "_RULE_PACKS", {})
+    pack = load_rule_pack("USGS_NWIS")
+    assert pack.normalized_hints["00060"] == "stream discharge"
+    assert load_rule_pack("usgs_nwis") is pack
+
+    imports = []
+    monkeypatch.setattr(term_broker, "_compile_rule_pack", imports.append)
+    assert load_rule_pack("NO_SUCH_DATASET") is None and load_rule_pack("NO_SUCH_DATASET") is None
+    assert imports == ["NO_SUCH_DATASET"]
+
+
+def test_discovery_pipeline_matches_harvested_parameters(tmp_path):
+    registry = RegistryManager(str(tmp_path))
+    registry.write_seed(dict(SEED, units={}, methods={}, qc_flags={}))
+    items = [{"id": f"P{i}", "name": ("Nitrate, dissolved", "Water temperature", "Turbidity")[i % 3],
+              "unit": ("mg/l", "degC", "NTU")[i % 3], "domain": "water"} for i in range(3000)]
+    pipeline = AutoCurationPipeline(registry, ServiceDiscoveryEngine(registry, str(tmp_path)))
+
+    report = pipeline.run_discovery_pipeline(FakeRouter(FakeAdapter(items)), suggest_threshold=0.2)["TEST_WQP"]
+
+    assert report.discovered_count == 3000 and not report.errors
+    assert len(report.review_queue) == 2000 and len(report.failed_matches) == 1000
+    assert {s.canonical for s in report.review_queue} == {"water:nitrate_mgl", "water:water_temp_c"}
+    assert len(registry.get_delta()) == 2000
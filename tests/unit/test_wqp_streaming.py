@@ -0,0 +1,132 @@
+"""
+Unit tests for streaming WQP result ingestion.
+
+``FakeWQP`` serves 60 stations as a zipped CSV and, per station, three
+results (pH, water temperature and a non-detect) for every Result search;
+Result searches for which ``fail`` is true raise a connection error.
+"""
+
+import csv
+import io
+import zipfile
+
+import pytest
+import requests
+from conftest import ConcurrencyRecorder, FakeResponse
+
+from env_agents.adapters.wqp import adapter as wqp_adapter
+from env_agents.adapters.wqp.adapter import WQPAdapter
+from env_agents.core.errors import FetchError
+from env_agents.core.models import RequestSpec, Geometry
+
+N_STATIONS = 60
+
+
+def _zipped_csv(rows):
+    text = io.StringIO()
+    writer = csv.DictWriter(text, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    body = io.BytesIO()
+    with zipfile.ZipFile(body, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("result.csv", text.getvalue())
+    return body.getvalue()
+
+
+class FakeWQP(ConcurrencyRecorder):
+    def __init__(self, fail=lambda sites: False):
+        super().__init__()
+        self.fail = fail
+        self.result_queries = []
+
+    def get(self, url, params=None, timeout=None, stream=False):
+        assert params["zip"] == "yes"
+        if url.endswith("/Station/search"):
+            return FakeResponse(content=_zipped_csv([
+                {"MonitoringLocationIdentifier": f"ST-{i}", "MonitoringLocationName": f"Station {i}",
+                 "MonitoringLocationTypeName": "Stream", "LatitudeMeasure": 37 + i / 1000,
+                 "LongitudeMeasure": -122 - i / 1000, "UnusedColumn": "x"}
+                for i in range(N_STATIONS)
+            ]))
+
+        sites = params["siteid"].split(";")
+        self.result_queries.append(sites)
+        with self.in_flight(0.01):
+            if self.fail(sites):
+                raise requests.ConnectionError("connection reset")
+            return FakeResponse(content=_zipped_csv([
+                {"MonitoringLocationIdentifier": site, "ActivityIdentifier": f"A-{site}",
+                 "ResultIdentifier": f"R-{site}-{name}", "ActivityStartDate": "2022-07-01",
+                 "CharacteristicName": name, "ResultMeasureValue": value,
+                 "ResultMeasure/MeasureUnitCode": unit, "OrganizationFormalName": "Org"}
+                for site in sites
+                for name, value, unit in (("pH", "7.1", "std units"), ("Temperature, water", "18.5", "deg C"),
+                                          ("Nitrate", "ND", "mg/l"))
+            ]))
+
+
+@pytest.fixture
+def adapter():
+    adapter = WQPAdapter()
+    adapter._session = FakeWQP()
+    return adapter
+
+
+def _spec(variables=None, **extra):
+    return RequestSpec(geometry=Geometry(type="bbox", coordinates=[-122.1, 37.0, -122.0, 37.1]),
+                       time_range=("2022-06-01", "2022-12-31"), variables=variables,
+                       extra={"station_batch_size": 7, **extra})
+
+
+def test_every_station_batch_is_fetched_concurrently(adapter):
+    rows = adapter._fetch_rows(_spec())
+
+    queried = [site for batch in adapter._session.result_queries for site in batch]
+    assert sorted(queried) == sorted(f"ST-{i}" for i in range(N_STATIONS))
+    assert adapter._session.peak > 1
+
+    # Non-detects are dropped, numeric results kept for all stations in station order
+    assert len(rows) == N_STATIONS * 2
+    assert [r["spatial_id"] for r in rows[::2]] == [f"ST-{i}" for i in range(N_STATIONS)]
+
+
+def test_station_coordinates_are_joined(adapter):
+    rows = adapter._fetch_rows(_spec())
+
+    row = next(r for r in rows if r["spatial_id"] == "ST-5")
+    assert row["latitude"] == pytest.approx(37.005)
+    assert row["longitude"] == pytest.approx(-122.005)
+    assert row["site_name"] == "Station 5"
+    assert row["attributes"]["station_type"] == "Stream"
+    assert row["time"] == "2022-07-01T00:00:00"
+
+
+def test_variables_are_post_filtered(adapter):
+    rows = adapter._fetch_rows(_spec(variables=["temperature"]))
+
+    assert {r["variable"] for r in rows} == {"Temperature, water"}
+    assert len(rows) == N_STATIONS
+
+
+def test_results_are_parsed_in_chunks(adapter, monkeypatch):
+    expected = adapter._fetch_rows(_spec())
+    monkeypatch.setattr(wqp_adapter, "CSV_CHUNK_ROWS", 4)
+
+    chunked = adapter._fetch_rows(_spec())
+    assert [(r["spatial_id"], r["variable"], r["value"]) for r in chunked] == \
+        [(r["spatial_id"], r["variable"], r["value"]) for r in expected]
+
+
+def test_failed_batch_keeps_the_other_batches(adapter, caplog):
+    adapter._session.fail = lambda sites: "ST-0" in sites
+    rows = adapter._fetch_rows(_spec())
+
+    # The first batch (ST-0..ST-6) is lost, the other 53 stations are kept
+    assert len(rows) == (N_STATIONS - 7) * 2
+    assert "results are partial" in caplog.text
+
+
+def test_every_batch_failing_is_an_error(adapter):
+    adapter._session.fail = lambda sites: True
+    with pytest.raises(FetchError, match="all 9 result queries failed"):
+        adapter._fetch_rows(_spec())